@@ -23,6 +23,8 @@ from cmakelang import configuration
 from cmakelang import lex
 from cmakelang import parse
 from cmakelang import render
+from cmakelang import profiling
+from cmakelang import stats
 
 
 EMBED_TPL = """
@@ -50,11 +52,25 @@ def annotate_file(config, infile, outfile, outfmt=None):
     detected = __main__.detect_line_endings(infile_content)
     config = config.clone()
     config.format.set_line_ending(detected)
-  tokens = lex.tokenize(infile_content)
+  with stats.timer("lex"):
+    tokens = lex.tokenize(infile_content)
+  stats.count("tokens", len(tokens))
   parse_db = parse.funs.get_parse_db()
   parse_db.update(parse.funs.get_funtree(config.parse.fn_spec))
   ctx = parse.ParseContext(parse_db)
-  parse_tree = parse.parse(tokens, ctx)
+  with stats.timer("parse"):
+    parse_tree = parse.parse(tokens, ctx)
+  if stats.ACTIVE is not None:
+    stats.count("parse_nodes", stats.count_nodes(parse_tree))
+
+  with stats.timer("annotate"):
+    render_tree(parse_tree, outfile, outfmt)
+
+
+def render_tree(parse_tree, outfile, outfmt):
+  """
+  Write the annotated html for the parse tree in the requested format.
+  """
 
   if outfmt == "page":
     html_content = render.get_html(parse_tree, fullpage=True)
@@ -83,7 +99,8 @@ USAGE_STRING = """
 cmake-annotate [-h]
              [--format {page,stub}]
              [-o OUTFILE_PATH]
-             [-c CONFIG_FILE]
+             [-c CONFIG_FILE] [--stats[=json]]
+             [--profile OUT [--profile-per-file]]
              infilepath [infilepath ...]
 """
 
@@ -104,6 +121,8 @@ def setup_argparser(arg_parser):
                                'Default is stdout.')
   arg_parser.add_argument('-c', '--config-file',
                           help='path to configuration file')
+  stats.add_argument(arg_parser)
+  profiling.add_argument(arg_parser)
   arg_parser.add_argument('infilepaths', nargs='*')
 
 
@@ -136,48 +155,66 @@ def main():
 
   argdict = __main__.get_argdict(args)
   output_format = argdict.pop("format")
+  argdict.pop("config_file", None)
 
-  for infile_path in args.infilepaths:
-    # NOTE(josh): have to load config once for every file, because we may pick
-    # up a new config file location for each path
-    if infile_path == '-':
-      config_dict = __main__.get_config(os.getcwd(), args.config_file)
-    else:
-      config_dict = __main__.get_config(infile_path, args.config_file)
-    config_dict.update(argdict)
-
-    cfg = configuration.Configuration(**config_dict)
-    if args.outfile_path == '-':
-      # NOTE(josh): The behavior or sys.stdout is different in python2 and
-      # python3. sys.stdout is opened in 'w' mode which means that write()
-      # takes strings in python2 and python3 and, in particular, in python3
-      # it does not take byte arrays. io.StreamWriter will write to
-      # it with byte arrays (assuming it was opened with 'wb'). So we use
-      # io.open instead of open in this case
-      outfile = io.open(
-          os.dup(sys.stdout.fileno()),
-          mode='w', encoding=cfg.encode.output_encoding, newline='')
-    else:
-      outfile = io.open(
-          args.outfile_path, 'w', encoding=cfg.encode.output_encoding,
-          newline='')
-
-    if infile_path == '-':
-      infile = io.open(
-          os.dup(sys.stdin.fileno()),
-          mode='r', encoding=cfg.encode.input_encoding, newline='')
-    else:
-      infile = io.open(infile_path, 'r', encoding=cfg.encode.input_encoding)
-
-    try:
-      with infile:
-        annotate_file(cfg, infile, outfile, output_format)
-    except:
-      sys.stderr.write('While processing {}\n'.format(infile_path))
-      raise
-    finally:
-      outfile.close()
+  config_files = None
+  if args.config_file:
+    config_files = [args.config_file]
 
+  stats_list = []
+  profile_list = []
+  for infile_path in args.infilepaths:
+    with stats.collect(infile_path, bool(args.stats)) as file_stats, \
+        profiling.collect(infile_path, bool(args.profile)) as file_profile:
+      # NOTE(josh): have to load config once for every file, because we may pick
+      # up a new config file location for each path
+      if infile_path == '-':
+        config_dict = __main__.get_config(os.getcwd(), config_files)
+      else:
+        config_dict = __main__.get_config(infile_path, config_files)
+      config_dict.update(argdict)
+
+      cfg = configuration.Configuration(**config_dict)
+      if args.outfile_path == '-':
+        # NOTE(josh): The behavior or sys.stdout is different in python2 and
+        # python3. sys.stdout is opened in 'w' mode which means that write()
+        # takes strings in python2 and python3 and, in particular, in python3
+        # it does not take byte arrays. io.StreamWriter will write to
+        # it with byte arrays (assuming it was opened with 'wb'). So we use
+        # io.open instead of open in this case
+        outfile = io.open(
+            os.dup(sys.stdout.fileno()),
+            mode='w', encoding=cfg.encode.output_encoding, newline='')
+      else:
+        outfile = io.open(
+            args.outfile_path, 'w', encoding=cfg.encode.output_encoding,
+            newline='')
+
+      if infile_path == '-':
+        infile = io.open(
+            os.dup(sys.stdin.fileno()),
+            mode='r', encoding=cfg.encode.input_encoding, newline='')
+      else:
+        infile = io.open(infile_path, 'r', encoding=cfg.encode.input_encoding)
+
+      try:
+        with infile, profiling.section():
+          annotate_file(cfg, infile, outfile, output_format)
+      except:
+        sys.stderr.write('While processing {}\n'.format(infile_path))
+        raise
+      finally:
+        outfile.close()
+    if file_stats is not None:
+      stats_list.append(file_stats)
+    if file_profile is not None:
+      profile_list.append(file_profile)
+
+  if args.stats:
+    stats.write_report(sys.stderr, args.stats, stats_list)
+  if args.profile:
+    profiling.write_profiles(
+        args.profile, profile_list, args.profile_per_file)
   return 0
 
 
@@ -0,0 +1,281 @@
+"""
+Benchmark suite for cmakelang.
+
+Generates a deterministic synthetic corpus (see `cmakelang.bench.corpus`)
+and times each stage of the pipeline (lex, parse, layout, write, lint) over
+each corpus shape, as well as the cmake-format and cmake-lint command line
+tools end-to-end. Results are written as json, along with metadata about the
+environment. Nothing is downloaded, so the suite may be run offline.
+
+Use ``--quick`` for a smaller corpus and fewer repetitions (under two
+minutes).
+
+Use ``compare BASE.json NEW.json`` to compare two sets of results. It exits
+with a nonzero status if any benchmark regressed by more than the tolerance
+(see `cmakelang.bench.compare`).
+
+Use ``fastmode`` to run the benchmarks both with and without
+``CMAKELANG_FAST=1`` in the environment (see `cmakelang.common.FAST_MODE`)
+and print the speedup of fast mode.
+
+Use ``names`` to compare the lookup of builtin variable and property names
+with the regular expressions and with the generated index (see
+`cmakelang.parse.name_index`).
+
+Use ``fuzz`` to search for inputs on which the layout cost grows
+superlinearly (see `cmakelang.bench.fuzz`).
+"""
+
+from __future__ import unicode_literals
+
+import argparse
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+from cmakelang.bench import benchmarks
+from cmakelang.bench import compare
+from cmakelang.bench import fuzz
+
+logger = logging.getLogger(__name__)
+
+# Options (size, repeat, min_time) for quick and full mode
+QUICK_OPTIONS = (40, 3, 0.01)
+FULL_OPTIONS = (200, 5, 0.1)
+
+
+def setup_argparser(argparser):
+  """
+  Add argparse options to the parser.
+  """
+  argparser.add_argument(
+      '-l', '--log-level', default="info",
+      choices=["error", "warning", "info", "debug"])
+  subparsers = argparser.add_subparsers(dest="command")
+
+  subparser = subparsers.add_parser(
+      "run", help="Run the benchmarks and write the results as json")
+  subparser.add_argument(
+      '--quick', action='store_true',
+      help='Use a smaller corpus and fewer repetitions')
+  subparser.add_argument(
+      '--size', type=int, default=None,
+      help='Approximate number of statements in each generated listfile')
+  subparser.add_argument(
+      '--repeat', type=int, default=None,
+      help='Number of timing samples to record for each benchmark')
+  subparser.add_argument(
+      '--seed', type=int, default=0,
+      help='Seed for the corpus generator')
+  subparser.add_argument(
+      '-k', '--filter', default=None,
+      help='Only run benchmarks with a name (stage/shape/size) matching'
+           ' this regular expression')
+  subparser.add_argument(
+      '--list', action='store_true',
+      help='List the benchmarks which would be run, and exit')
+  subparser.add_argument(
+      '--no-memory', action='store_false', dest='trace_memory',
+      help="Don't run each benchmark again under tracemalloc to record its"
+           " peak memory usage")
+  subparser.add_argument(
+      '-o', '--outfile-path', default=None,
+      help='Where to write the results. Default is stdout.')
+
+  subparser = subparsers.add_parser(
+      "compare", help="Compare two results files and fail on regression")
+  subparser.add_argument('base', help='Results of the baseline')
+  subparser.add_argument('new', help='Results to check for regressions')
+  subparser.add_argument(
+      '-t', '--tolerance', type=float, default=0.1,
+      help='Allowed fractional increase in median time, in addition to the'
+           ' measured noise (interquartile range)')
+  subparser.add_argument(
+      '-m', '--memory-tolerance', type=float, default=0.1,
+      help='Allowed fractional increase in peak memory')
+
+  subparser = subparsers.add_parser(
+      "fastmode", help="Measure the speedup of CMAKELANG_FAST=1")
+  subparser.add_argument(
+      '--quick', action='store_true',
+      help='Use a smaller corpus and fewer repetitions')
+  subparser.add_argument(
+      '--repeat', type=int, default=None,
+      help='Number of timing samples to record for each benchmark')
+  subparser.add_argument(
+      '-k', '--filter', default="^(layout|write|cli)/",
+      help='Only run benchmarks with a name (stage/shape/size) matching'
+           ' this regular expression. Default is the stages which are'
+           ' affected by fast mode.')
+
+  subparser = subparsers.add_parser(
+      "names", help="Time the lookup of builtin variable and property names")
+  subparser.add_argument(
+      '--quick', action='store_true',
+      help='Use a smaller corpus and fewer repetitions')
+  subparser.add_argument(
+      '--seed', type=int, default=0,
+      help='Seed for the corpus generator')
+
+  subparser = subparsers.add_parser(
+      "fuzz", help="Search for inputs with superlinear layout cost")
+  subparser.add_argument(
+      '--seed', type=int, default=0,
+      help='Seed for the choice of snippets and mutations')
+  subparser.add_argument(
+      '--budget', type=float, default=60.0,
+      help='Number of seconds to search for')
+  subparser.add_argument(
+      '--threshold', type=float, default=1.5,
+      help='Report inputs whose cost grows with an exponent greater than'
+           ' this')
+  subparser.add_argument(
+      '--max-reflows', type=int, default=200000,
+      help='Abort any one layout after this many reflows')
+  subparser.add_argument(
+      '--save-dir', nargs='?', default=None, const=fuzz.CASES_DIR,
+      help='Save the minimized inputs as regression cases in this directory'
+           ' (default {})'.format(os.path.relpath(fuzz.CASES_DIR)))
+
+
+def run_main(args):
+  size, repeat, min_time = QUICK_OPTIONS if args.quick else FULL_OPTIONS
+  if args.size is not None:
+    size = args.size
+  if args.repeat is not None:
+    repeat = args.repeat
+  assert size > 0, "--size must be positive"
+  assert repeat > 0, "--repeat must be positive"
+
+  suite = benchmarks.get_benchmarks(size, args.seed, pattern=args.filter)
+  if args.list:
+    for benchmark in suite:
+      sys.stdout.write("{}\n".format(benchmark.name))
+    return 0
+
+  results = benchmarks.run_suite(suite, repeat, min_time, {
+      "quick": args.quick,
+      "size": size,
+      "repeat": repeat,
+      "min_time": min_time,
+      "seed": args.seed,
+      "filter": args.filter,
+  }, args.trace_memory)
+
+  if args.outfile_path is None or args.outfile_path == '-':
+    outfile = io.open(os.dup(sys.stdout.fileno()), mode='w', encoding='utf-8')
+  else:
+    outfile = io.open(args.outfile_path, 'w', encoding='utf-8')
+  with outfile:
+    outfile.write("{}\n".format(json.dumps(results, indent=2)))
+  return 0
+
+
+def compare_main(args):
+  assert args.tolerance >= 0, "--tolerance must not be negative"
+  assert args.memory_tolerance >= 0, "--memory-tolerance must not be negative"
+  base_results = compare.load_results(args.base)
+  new_results = compare.load_results(args.new)
+
+  for key in ("python_version", "python_implementation", "platform"):
+    base_value = base_results["environment"].get(key)
+    new_value = new_results["environment"].get(key)
+    if base_value != new_value:
+      logger.warning(
+          "Results are from different environments: %s is %s vs %s",
+          key, base_value, new_value)
+  if base_results["options"] != new_results["options"]:
+    logger.warning("Results were collected with different options")
+
+  comparisons = compare.compare_results(
+      base_results, new_results, args.tolerance, args.memory_tolerance)
+  compare.write_table(sys.stdout, comparisons)
+  if compare.has_regression(comparisons):
+    return 1
+  return 0
+
+
+def fastmode_main(args):
+  # NOTE(josh): fast mode is fixed when cmakelang is imported, so each mode
+  # is run in a separate process.
+  tempdir = tempfile.mkdtemp(prefix="cmakelang-bench-")
+  argv = [sys.executable, "-Bm", "cmakelang.bench", "-l", args.log_level,
+          "run", "--no-memory", "-k", args.filter]
+  if args.quick:
+    argv.append("--quick")
+  if args.repeat is not None:
+    argv.extend(["--repeat", str(args.repeat)])
+
+  results = []
+  for fast_mode in ("0", "1"):
+    outfile_path = os.path.join(tempdir, "fast{}.json".format(fast_mode))
+    env = dict(os.environ)
+    env["CMAKELANG_FAST"] = fast_mode
+    logger.info("Running with CMAKELANG_FAST=%s", fast_mode)
+    subprocess.check_call(argv + ["-o", outfile_path], env=env)
+    results.append(compare.load_results(outfile_path))
+    os.unlink(outfile_path)
+  os.rmdir(tempdir)
+
+  comparisons = compare.compare_results(results[0], results[1])
+  compare.write_table(sys.stdout, comparisons)
+  return 0
+
+
+def names_main(args):
+  size, repeat, min_time = QUICK_OPTIONS if args.quick else FULL_OPTIONS
+  rows = benchmarks.run_name_lookups(size, repeat, min_time, args.seed)
+  sys.stdout.write("{:20s} {:>6s} {:>10s} {:>10s} {:>8s}\n".format(
+      "names", "count", "regex(us)", "index(us)", "speedup"))
+  for label, count, regex_time, index_time in rows:
+    sys.stdout.write("{:20s} {:6d} {:10.2f} {:10.2f} {:7.2f}x\n".format(
+        label, count, 1e6 * regex_time, 1e6 * index_time,
+        regex_time / index_time))
+  return 0
+
+
+def fuzz_main(args):
+  findings = fuzz.fuzz(
+      args.seed, args.budget, args.threshold, args.max_reflows)
+  for finding in findings:
+    sys.stdout.write(
+        "{} {} x{}: exponent {:.2f}, reflows {}\n".format(
+            finding.seed_name, finding.mutation, finding.scale,
+            finding.exponent,
+            [cost.reflow_calls for cost in finding.costs]))
+    if args.save_dir is not None:
+      outpath = fuzz.save_case(args.save_dir, finding)
+      sys.stdout.write("  saved {}\n".format(outpath))
+  return 0
+
+
+def main():
+  logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+  argparser = argparse.ArgumentParser(
+      description=__doc__,
+      formatter_class=argparse.RawDescriptionHelpFormatter)
+  setup_argparser(argparser)
+  args = argparser.parse_args()
+  logging.getLogger().setLevel(getattr(logging, args.log_level.upper()))
+
+  if args.command == "run":
+    return run_main(args)
+  if args.command == "compare":
+    return compare_main(args)
+  if args.command == "fastmode":
+    return fastmode_main(args)
+  if args.command == "names":
+    return names_main(args)
+  if args.command == "fuzz":
+    return fuzz_main(args)
+
+  argparser.print_usage()
+  return 1
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,442 @@
+"""
+Benchmarks for each stage of the pipeline, and for the command line tools.
+
+Each benchmark is constructed with its input (a generated listfile, see
+`corpus`) and prepares everything up to the stage it measures in `setup()`,
+so that `run()` times only that stage.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import logging
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+  import tracemalloc
+except ImportError:
+  # NOTE(josh): python2
+  tracemalloc = None
+
+import cmakelang
+from cmakelang import common
+from cmakelang import configuration
+from cmakelang import git_util
+from cmakelang import lex
+from cmakelang import parse
+from cmakelang import stats
+from cmakelang.bench import corpus
+from cmakelang.format import formatter
+from cmakelang.lint import basic_checker
+from cmakelang.lint import lint_util
+from cmakelang.parse import properties
+from cmakelang.parse import variables
+
+logger = logging.getLogger(__name__)
+
+# The tools exercised by the "cli" stage
+CLI_TOOLS = ("format", "lint")
+
+
+class Benchmark(object):
+  """Base class for a benchmark of one stage over one input."""
+
+  stage = None
+
+  # Whether the memory allocated by `run()` can be traced in this process
+  traces_memory = True
+
+  def __init__(self, shape, size, seed=0):
+    self.shape = shape
+    self.size = size
+    self.seed = seed
+    self.config = configuration.Configuration()
+    self.content = None
+
+  @property
+  def name(self):
+    return "{}/{}/{}".format(self.stage, self.shape, self.size)
+
+  def setup(self):
+    self.content = corpus.generate(self.shape, self.size, self.seed)
+
+  def run(self):
+    raise NotImplementedError()
+
+  def teardown(self):
+    pass
+
+  def get_line_count(self):
+    """Return the number of lines of input processed by `run()`, or None."""
+    if self.content is None:
+      return None
+    return self.content.count("\n")
+
+  def get_parse_db(self):
+    parse_db = parse.funs.get_parse_db()
+    parse_db.update(parse.funs.get_funtree(self.config.parse.fn_spec))
+    return parse_db
+
+
+class LexBenchmark(Benchmark):
+  stage = "lex"
+
+  def run(self):
+    lex.tokenize(self.content)
+
+
+class ParseBenchmark(Benchmark):
+  stage = "parse"
+
+  def __init__(self, *args, **kwargs):
+    super(ParseBenchmark, self).__init__(*args, **kwargs)
+    self.tokens = None
+    self.parse_db = None
+
+  def setup(self):
+    super(ParseBenchmark, self).setup()
+    self.tokens = lex.tokenize(self.content)
+    self.parse_db = self.get_parse_db()
+
+  def run(self):
+    # NOTE(josh): parse() consumes the token list
+    parse.parse(
+        list(self.tokens),
+        parse.ParseContext(self.parse_db, config=self.config))
+
+
+class LayoutBenchmark(ParseBenchmark):
+  stage = "layout"
+
+  def __init__(self, *args, **kwargs):
+    super(LayoutBenchmark, self).__init__(*args, **kwargs)
+    self.parse_tree = None
+    self.first_token = None
+
+  def setup(self):
+    super(LayoutBenchmark, self).setup()
+    self.parse_tree = parse.parse(
+        list(self.tokens),
+        parse.ParseContext(self.parse_db, config=self.config))
+    self.first_token = lex.get_first_non_whitespace_token(self.tokens)
+
+  def run(self):
+    formatter.layout_tree(
+        self.parse_tree, self.config, first_token=self.first_token)
+
+
+class WriteBenchmark(LayoutBenchmark):
+  stage = "write"
+
+  def __init__(self, *args, **kwargs):
+    super(WriteBenchmark, self).__init__(*args, **kwargs)
+    self.box_tree = None
+
+  def setup(self):
+    super(WriteBenchmark, self).setup()
+    self.box_tree = formatter.layout_tree(
+        self.parse_tree, self.config, first_token=self.first_token)
+
+  def run(self):
+    formatter.write_tree(self.box_tree, self.config, self.content)
+
+
+class LintBenchmark(Benchmark):
+  """Time the lint checks, given the tokens and the parse tree."""
+  stage = "lint"
+
+  def __init__(self, *args, **kwargs):
+    super(LintBenchmark, self).__init__(*args, **kwargs)
+    self.tokens = None
+    self.parse_tree = None
+
+  def setup(self):
+    super(LintBenchmark, self).setup()
+    self.tokens = lex.tokenize(self.content)
+    local_ctx = self.get_file_ctx()
+    self.parse_tree = parse.parse(
+        list(self.tokens),
+        parse.ParseContext(self.get_parse_db(), local_ctx, self.config))
+    self.parse_tree.build_ancestry()
+
+  def get_file_ctx(self):
+    return lint_util.GlobalContext(None).get_file_ctx(
+        "{}.cmake".format(self.shape), self.config)
+
+  def run(self):
+    checker = basic_checker.LintChecker(self.config, self.get_file_ctx())
+    checker.check_basics(self.content)
+    checker.check_tokens(self.tokens)
+    checker.check_parse_tree(self.parse_tree)
+
+
+class LintScanBenchmark(LintBenchmark):
+  """Time only the lint checks of the lines and tokens of the file, which
+     don't need the parse tree."""
+  stage = "lintscan"
+
+  def run(self):
+    checker = basic_checker.LintChecker(self.config, self.get_file_ctx())
+    checker.check_basics(self.content)
+    checker.check_tokens(self.tokens)
+
+
+class CliBenchmark(Benchmark):
+  """
+  Time a command line tool end-to-end (including interpreter startup) over a
+  directory containing one generated listfile per corpus shape. The `shape`
+  is the name of the tool.
+  """
+  stage = "cli"
+  traces_memory = False
+
+  def __init__(self, *args, **kwargs):
+    super(CliBenchmark, self).__init__(*args, **kwargs)
+    self.tempdir = None
+    self.env = None
+
+  def setup(self):
+    self.tempdir = tempfile.mkdtemp(prefix="cmakelang-bench-")
+    corpus.write_corpus(self.tempdir, corpus.SHAPES, self.size, self.seed)
+
+    # Ensure that the subprocess imports this copy of cmakelang
+    self.env = os.environ.copy()
+    python_path_parts = [
+        os.path.dirname(os.path.dirname(os.path.abspath(cmakelang.__file__)))]
+    if self.env.get("PYTHONPATH"):
+      python_path_parts.append(self.env["PYTHONPATH"])
+    self.env["PYTHONPATH"] = os.pathsep.join(python_path_parts)
+
+  def run(self):
+    with open(os.devnull, "wb") as devnull:
+      subprocess.call(
+          [sys.executable, "-Bm", "cmakelang.{}".format(self.shape),
+           self.tempdir],
+          stdout=devnull, stderr=devnull, cwd=self.tempdir, env=self.env)
+
+  def teardown(self):
+    shutil.rmtree(self.tempdir)
+
+
+BENCHMARK_TYPES = collections.OrderedDict([
+    (benchmark_type.stage, benchmark_type) for benchmark_type in (
+        LexBenchmark, ParseBenchmark, LayoutBenchmark, WriteBenchmark,
+        LintBenchmark, LintScanBenchmark, CliBenchmark)])
+
+
+def get_benchmarks(size, seed=0, shapes=corpus.SHAPES, pattern=None):
+  """
+  Return the list of all benchmarks for the given corpus size. If `pattern`
+  is given, only those with a name matching that regular expression are
+  included.
+  """
+  out = []
+  for stage, benchmark_type in BENCHMARK_TYPES.items():
+    if stage == "cli":
+      variants = CLI_TOOLS
+    else:
+      variants = shapes
+    for variant in variants:
+      benchmark = benchmark_type(variant, size, seed)
+      if pattern is None or re.search(pattern, benchmark.name):
+        out.append(benchmark)
+  return out
+
+
+def measure(fun, repeat, min_time):
+  """
+  Return a list of `repeat` samples of the time (in seconds) for one call of
+  `fun`. Each sample averages enough calls to take at least `min_time`.
+  """
+  start = stats.get_time()
+  fun()
+  elapsed = stats.get_time() - start
+  number = 1
+  if 0 < elapsed < min_time:
+    number = int(min_time / elapsed) + 1
+
+  samples = []
+  for _ in range(repeat):
+    start = stats.get_time()
+    for _ in range(number):
+      fun()
+    samples.append((stats.get_time() - start) / number)
+  return samples
+
+
+def measure_memory(fun):
+  """
+  Return the peak size (in bytes) of memory allocated during one call of
+  `fun`, as traced by `tracemalloc`, or None if it is not available.
+  """
+  if tracemalloc is None:
+    return None
+  tracemalloc.start()
+  try:
+    fun()
+    _, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return peak
+
+
+def get_percentile(samples, fraction):
+  """Return the `fraction` percentile of samples, interpolating linearly
+     between the nearest two."""
+  ordered = sorted(samples)
+  position = fraction * (len(ordered) - 1)
+  lower = int(position)
+  upper = min(lower + 1, len(ordered) - 1)
+  weight = position - lower
+  return (1.0 - weight) * ordered[lower] + weight * ordered[upper]
+
+
+def get_median(samples):
+  return get_percentile(samples, 0.5)
+
+
+def get_iqr(samples):
+  """Return the interquartile range of samples."""
+  return get_percentile(samples, 0.75) - get_percentile(samples, 0.25)
+
+
+def run_benchmark(benchmark, repeat, min_time, trace_memory=True):
+  """
+  Setup, measure and teardown a benchmark and return its result. If
+  `trace_memory` then the benchmark is run once more under `tracemalloc` to
+  record its peak memory usage (which is otherwise None).
+  """
+  benchmark.setup()
+  try:
+    samples = measure(benchmark.run, repeat, min_time)
+    memory_peak = None
+    if trace_memory and benchmark.traces_memory:
+      memory_peak = measure_memory(benchmark.run)
+    line_count = benchmark.get_line_count()
+  finally:
+    benchmark.teardown()
+
+  median = get_median(samples)
+  throughput = None
+  if line_count and median > 0:
+    throughput = line_count / median
+  return collections.OrderedDict([
+      ("name", benchmark.name),
+      ("stage", benchmark.stage),
+      ("shape", benchmark.shape),
+      ("size", benchmark.size),
+      ("samples", samples),
+      ("min", min(samples)),
+      ("median", median),
+      ("iqr", get_iqr(samples)),
+      ("memory_peak", memory_peak),
+      ("lines", line_count),
+      ("throughput", throughput),
+  ])
+
+
+def get_git_revision():
+  """Return the git revision of the cmakelang source tree, if available."""
+  srcdir = os.path.dirname(os.path.abspath(cmakelang.__file__))
+  try:
+    return git_util.run_git(
+        ["rev-parse", "HEAD"], cwd=srcdir).strip() or None
+  except common.UserError:
+    return None
+
+
+def get_environment():
+  """Return metadata describing the machine and the software under test."""
+  return collections.OrderedDict([
+      ("cmakelang_version", cmakelang.__version__),
+      ("git_revision", get_git_revision()),
+      ("python_version", platform.python_version()),
+      ("python_implementation", platform.python_implementation()),
+      ("platform", platform.platform()),
+      ("machine", platform.machine()),
+      ("processor", platform.processor()),
+      ("cpu_count", os.cpu_count() if hasattr(os, "cpu_count") else None),
+      ("fast_mode", common.FAST_MODE),
+      ("timestamp", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())),
+  ])
+
+
+def run_suite(benchmarks, repeat, min_time, options=None, trace_memory=True):
+  """
+  Run each of the benchmarks and return the json-serializable results
+  document, including environment metadata and the given `options`.
+  """
+  results = []
+  for benchmark in benchmarks:
+    logger.info("Running %s", benchmark.name)
+    result = run_benchmark(benchmark, repeat, min_time, trace_memory)
+    if result["throughput"]:
+      logger.info("  median %.3fms, %.0f lines/s", 1000.0 * result["median"],
+                  result["throughput"])
+    else:
+      logger.info("  median %.3fms", 1000.0 * result["median"])
+    results.append(result)
+
+  return collections.OrderedDict([
+      ("environment", get_environment()),
+      ("options", options or {}),
+      ("benchmarks", results),
+  ])
+
+
+def get_builtin_names(module):
+  """Return the names of the builtins in `module` (`variables` or
+     `properties`), with each generic label replaced by "CXX"."""
+  regex = re.compile(r"\(\?P<[\w_]+>\.\*\)")
+  return [regex.sub("CXX", pattern) for pattern in module.PATTERNS]
+
+
+def lookup_regex(module, names):
+  """Look up each name as `check_varname()` did, with the regexes."""
+  for name in names:
+    imatch = module.CASE_INSENSITIVE_REGEX.match(name)
+    if imatch is not None and all(
+        groupstr is None for groupstr in imatch.groups()):
+      module.CASE_SENSITIVE_REGEX.match(name)
+
+
+def lookup_index(module, names):
+  """Look up each name as `check_varname()` does, with the `NameIndex`."""
+  for name in names:
+    index = module.INDEX.match(name, ignorecase=True)
+    if index is not None and not module.INDEX.is_templated(index):
+      module.INDEX.match(name)
+
+
+def run_name_lookups(size, repeat, min_time, seed=0):
+  """
+  Time the lookup of builtin names with the regular expressions and with the
+  index. The names are the words of the corpus and the builtin names. Return
+  a list of `(label, count, regex_time, index_time)` for each set of names,
+  where the times are the median time per name.
+  """
+  words = set()
+  for shape in corpus.SHAPES:
+    words.update(re.findall(
+        r"[A-Za-z_][A-Za-z0-9_]*", corpus.generate(shape, size, seed)))
+
+  out = []
+  for label, module, names in (
+      ("variables/corpus", variables, sorted(words)),
+      ("variables/builtin", variables, get_builtin_names(variables)),
+      ("properties/builtin", properties, get_builtin_names(properties))):
+    times = []
+    for lookup in (lookup_regex, lookup_index):
+      samples = measure(
+          lambda lookup=lookup, module=module, names=names:
+          lookup(module, names), repeat, min_time)
+      times.append(get_median(samples) / len(names))
+    out.append((label, len(names), times[0], times[1]))
+  return out
@@ -0,0 +1,155 @@
+"""
+Compare two benchmark results files and flag regressions.
+
+Each benchmark is compared by the ratio of its median time in the new results
+to that in the base results. Because timings are noisy, the threshold for a
+regression (or an improvement) is the requested tolerance plus the relative
+interquartile range of the base and new samples. That is, a benchmark
+regresses if::
+
+  new_median > base_median * (1 + tolerance + noise)
+
+where ``noise = (base_iqr + new_iqr) / base_median``. Peak memory, if it was
+recorded in both files, is compared with a separate tolerance. Memory is not
+noisy in the same way, so no allowance is made for noise.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import io
+import json
+
+# Status for each comparison
+REGRESSION = "REGRESSION"
+IMPROVEMENT = "improvement"
+UNCHANGED = "~"
+MISSING = "missing"
+ADDED = "new"
+
+Comparison = collections.namedtuple(
+    "Comparison", [
+        "name", "base", "new", "time_ratio", "noise", "time_status",
+        "memory_ratio", "memory_status"])
+
+
+def load_results(inpath):
+  """Return the benchmark results from a file written by ``bench run``."""
+  with io.open(inpath, "r", encoding="utf-8") as infile:
+    return json.load(infile)
+
+
+def get_status(ratio, threshold):
+  if ratio is None:
+    return UNCHANGED
+  if ratio > 1.0 + threshold:
+    return REGRESSION
+  if ratio < 1.0 - threshold:
+    return IMPROVEMENT
+  return UNCHANGED
+
+
+def compare_one(base, new, tolerance, memory_tolerance):
+  """Return a `Comparison` of the results for one benchmark."""
+  time_ratio = None
+  noise = 0.0
+  if base["median"] > 0:
+    time_ratio = new["median"] / base["median"]
+    noise = (base.get("iqr", 0.0) + new.get("iqr", 0.0)) / base["median"]
+
+  memory_ratio = None
+  if base.get("memory_peak") and new.get("memory_peak") is not None:
+    memory_ratio = float(new["memory_peak"]) / base["memory_peak"]
+
+  return Comparison(
+      base["name"], base, new, time_ratio, noise,
+      get_status(time_ratio, tolerance + noise),
+      memory_ratio, get_status(memory_ratio, memory_tolerance))
+
+
+def compare_results(base_results, new_results, tolerance=0.1,
+                    memory_tolerance=0.1):
+  """
+  Return a list of `Comparison` for every benchmark in either results
+  document, in the order of the base results followed by any benchmarks
+  which are only in the new results.
+  """
+  new_byname = collections.OrderedDict(
+      (result["name"], result) for result in new_results["benchmarks"])
+  base_names = set()
+
+  out = []
+  for base in base_results["benchmarks"]:
+    base_names.add(base["name"])
+    new = new_byname.get(base["name"])
+    if new is None:
+      out.append(Comparison(
+          base["name"], base, None, None, None, MISSING, None, MISSING))
+    else:
+      out.append(compare_one(base, new, tolerance, memory_tolerance))
+
+  for name, new in new_byname.items():
+    if name not in base_names:
+      out.append(Comparison(name, None, new, None, None, ADDED, None, ADDED))
+  return out
+
+
+def has_regression(comparisons):
+  return any(
+      REGRESSION in (comparison.time_status, comparison.memory_status)
+      for comparison in comparisons)
+
+
+def format_time(result):
+  if result is None:
+    return "-"
+  return "{:.3f}ms".format(1000.0 * result["median"])
+
+
+def format_memory(result):
+  if result is None or result.get("memory_peak") is None:
+    return "-"
+  return "{:.1f}KiB".format(result["memory_peak"] / 1024.0)
+
+
+def format_ratio(ratio):
+  if ratio is None:
+    return "-"
+  return "{:.3f}".format(ratio)
+
+
+def write_table(outfile, comparisons):
+  """Write a human readable table of the comparisons."""
+  columns = ["benchmark", "base", "new", "ratio", "noise", "time",
+             "base mem", "new mem", "ratio", "memory"]
+  rows = []
+  for comparison in comparisons:
+    noise = "-"
+    if comparison.noise is not None:
+      noise = "{:.1f}%".format(100.0 * comparison.noise)
+    rows.append([
+        comparison.name,
+        format_time(comparison.base),
+        format_time(comparison.new),
+        format_ratio(comparison.time_ratio),
+        noise,
+        comparison.time_status,
+        format_memory(comparison.base),
+        format_memory(comparison.new),
+        format_ratio(comparison.memory_ratio),
+        comparison.memory_status,
+    ])
+
+  widths = [
+      max([len(columns[idx])] + [len(row[idx]) for row in rows])
+      for idx in range(len(columns))]
+  for row in [columns] + rows:
+    cells = [row[0].ljust(widths[0])] + [
+        cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+    outfile.write("{}\n".format("  ".join(cells).rstrip()))
+
+  num_regressions = sum(
+      1 for comparison in comparisons
+      if REGRESSION in (comparison.time_status, comparison.memory_status))
+  outfile.write("\n{} benchmarks, {} regressions\n".format(
+      len(comparisons), num_regressions))
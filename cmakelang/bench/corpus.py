@@ -0,0 +1,197 @@
+"""
+Deterministic generator for synthetic listfiles.
+
+Each shape stresses a different part of the pipeline:
+
+* ``flat_set``: many short-to-medium `set()` statements
+* ``deep_if``: deeply nested `if()`/`elseif()` blocks
+* ``long_calls``: `add_library()`, `install()` and `target_link_libraries()`
+  calls with long argument lists
+* ``comments``: comment blocks, bulleted lists and trailing argument comments
+* ``bracket``: bracket arguments and bracket comments
+* ``format_off``: `cmake-format: off` regions between formatted statements
+* ``mixed``: all of the above, interleaved
+
+The content depends only on the shape, the size (roughly the number of
+statements) and the seed.
+"""
+
+from __future__ import unicode_literals
+
+import io
+import os
+import random
+
+WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf",
+    "hotel", "india", "juliet", "kilo", "lima", "mike", "november", "oscar",
+    "papa", "quebec", "romeo", "sierra", "tango", "uniform", "victor",
+    "whiskey", "xray", "yankee", "zulu",
+]
+
+CONDITIONS = [
+    "WIN32", "APPLE", "UNIX AND NOT APPLE", "CMAKE_BUILD_TYPE STREQUAL Debug",
+    "DEFINED {var}", "NOT {var}", "{var} VERSION_GREATER 3.10",
+    "({var} OR {var}) AND NOT ({var} STREQUAL \"{word}\")",
+    "EXISTS ${{CMAKE_CURRENT_SOURCE_DIR}}/{word}.txt",
+]
+
+
+class ListfileGenerator(object):
+  """Generates statements for each shape from a seeded random stream."""
+
+  def __init__(self, seed=0):
+    self.rng = random.Random(seed)
+
+  def word(self):
+    return self.rng.choice(WORDS)
+
+  def words(self, lo, hi):
+    return [self.word() for _ in range(self.rng.randint(lo, hi))]
+
+  def ident(self, upper=True):
+    ident = "{}_{}".format(self.word(), self.rng.randint(0, 999))
+    if upper:
+      return ident.upper()
+    return ident
+
+  def condition(self):
+    return self.rng.choice(CONDITIONS).format(
+        var=self.ident(), word=self.word())
+
+  def sources(self, lo, hi):
+    return [
+        "src/{}/{}_{}.cc".format(self.word(), self.word(), idx)
+        for idx in range(self.rng.randint(lo, hi))]
+
+  def flat_set(self, size):
+    lines = []
+    for _ in range(size):
+      lines.append("set({} {})".format(self.ident(), " ".join(
+          self.words(1, 12))))
+    return lines
+
+  def deep_if(self, size, maxdepth=12):
+    lines = []
+    depth = 0
+    for _ in range(size):
+      indent = "  " * depth
+      choice = self.rng.random()
+      if depth < maxdepth and choice < 0.3:
+        lines.append("{}if({})".format(indent, self.condition()))
+        depth += 1
+      elif depth > 0 and choice < 0.4:
+        lines.append("{}elseif({})".format(indent[2:], self.condition()))
+      elif depth > 0 and choice < 0.55:
+        depth -= 1
+        lines.append("{}endif()".format(indent[2:]))
+      else:
+        lines.append("{}message(STATUS \"{}\" ${{{}}})".format(
+            indent, " ".join(self.words(1, 6)), self.ident()))
+    while depth > 0:
+      depth -= 1
+      lines.append("{}endif()".format("  " * depth))
+    return lines
+
+  def long_calls(self, size):
+    lines = []
+    for _ in range(size):
+      choice = self.rng.random()
+      target = self.ident(upper=False)
+      if choice < 0.4:
+        lines.append("add_library({} {} {})".format(
+            target, self.rng.choice(["STATIC", "SHARED", "OBJECT"]),
+            " ".join(self.sources(4, 40))))
+      elif choice < 0.7:
+        lines.append(
+            "install(TARGETS {} EXPORT {}Targets RUNTIME DESTINATION bin"
+            " LIBRARY DESTINATION lib ARCHIVE DESTINATION lib/static"
+            " COMPONENT {} PERMISSIONS OWNER_READ OWNER_WRITE GROUP_READ"
+            " WORLD_READ)".format(
+                " ".join(self.ident(upper=False) for _ in range(
+                    self.rng.randint(1, 8))),
+                self.word(), self.word()))
+      else:
+        lines.append("target_link_libraries({} PUBLIC {} PRIVATE {})".format(
+            target, " ".join(self.words(1, 10)), " ".join(self.words(1, 10))))
+    return lines
+
+  def comments(self, size):
+    lines = []
+    for _ in range(size):
+      choice = self.rng.random()
+      if choice < 0.3:
+        for _ in range(self.rng.randint(1, 6)):
+          lines.append("# {}".format(" ".join(self.words(4, 24))))
+      elif choice < 0.5:
+        lines.append("# {}:".format(" ".join(self.words(2, 5))))
+        for _ in range(self.rng.randint(2, 6)):
+          lines.append("# * {}".format(" ".join(self.words(3, 16))))
+      elif choice < 0.8:
+        args = ["  {}  # {}".format(self.word(), " ".join(self.words(1, 8)))
+                for _ in range(self.rng.randint(1, 6))]
+        lines.append("set({}\n{}\n)".format(self.ident(), "\n".join(args)))
+      else:
+        lines.append("list(APPEND {} {}) # {}".format(
+            self.ident(), " ".join(self.words(1, 6)),
+            " ".join(self.words(3, 12))))
+      lines.append("")
+    return lines
+
+  def bracket(self, size):
+    lines = []
+    for _ in range(size):
+      equals = "=" * self.rng.randint(0, 3)
+      body = "\n".join(" ".join(self.words(2, 10))
+                       for _ in range(self.rng.randint(1, 5)))
+      if self.rng.random() < 0.5:
+        lines.append("set({} [{}[{}]{}])".format(
+            self.ident(), equals, body, equals))
+      else:
+        lines.append("#[{}[{}]{}]".format(equals, body, equals))
+        lines.append("message(STATUS [[{}]])".format(" ".join(
+            self.words(1, 6))))
+    return lines
+
+  def format_off(self, size):
+    lines = []
+    while len(lines) < size:
+      lines.extend(self.flat_set(self.rng.randint(1, 4)))
+      lines.append("# cmake-format: off")
+      for _ in range(self.rng.randint(1, 4)):
+        lines.append("set(  {}   {}   )".format(
+            self.ident(), "     ".join(self.words(1, 8))))
+      lines.append("# cmake-format: on")
+    return lines
+
+  def mixed(self, size):
+    lines = []
+    shapes = [shape for shape in SHAPES if shape != "mixed"]
+    chunk = max(1, size // 20)
+    while len(lines) < size:
+      lines.extend(getattr(self, self.rng.choice(shapes))(chunk))
+    return lines
+
+
+SHAPES = ("flat_set", "deep_if", "long_calls", "comments", "bracket",
+          "format_off", "mixed")
+
+
+def generate(shape, size, seed=0):
+  """Return the content of a listfile of the given shape and size."""
+  assert shape in SHAPES, "Unknown corpus shape {}".format(shape)
+  lines = getattr(ListfileGenerator(seed), shape)(size)
+  return "\n".join(lines) + "\n"
+
+
+def write_corpus(outdir, shapes, size, seed=0):
+  """Write one listfile per shape into `outdir` and return their paths."""
+  if not os.path.exists(outdir):
+    os.makedirs(outdir)
+  outpaths = []
+  for shape in shapes:
+    outpath = os.path.join(outdir, "{}.cmake".format(shape))
+    with io.open(outpath, "w", encoding="utf-8", newline="") as outfile:
+      outfile.write(generate(shape, size, seed))
+    outpaths.append(outpath)
+  return outpaths
@@ -0,0 +1,443 @@
+"""
+Stress harness which hunts for inputs that make the layout superlinear.
+
+The seed corpus is the set of test snippets in ``command_tests/*.cmake``.
+Each trial picks a snippet and a mutation, which is some combination of:
+
+* ``nest``: wrap the snippet in ``scale`` levels of flow control
+* ``inflate``: repeat the arguments of every statement ``scale`` times
+* ``comments``: add a line comment after every argument
+* ``line_width``: format with a different line width
+
+The mutated snippet is formatted at ``scale``, ``2 * scale`` and
+``4 * scale`` and the cost is measured as the number of calls to
+`LayoutNode.reflow()` (which is deterministic, unlike wall time). The growth
+exponent of the cost with respect to the size of the input (in tokens)
+between two scales ``a`` and ``b`` is::
+
+  log(cost[b] / cost[a]) / log(tokens[b] / tokens[a])
+
+Linear layout has an exponent near one. The exponent of a trial is the
+smaller of the two, so that a single jump in cost (e.g. when a statement no
+longer fits on one line) is not mistaken for superlinear growth. A layout
+which exceeds the reflow budget has an infinite exponent.
+
+If the exponent exceeds the threshold, the snippet is minimized (by removing
+statements, and then transformations, for as long as the exponent stays
+above the threshold) and may be saved as a regression case. A saved case
+records the costs, and `check_case()` fails if the cost at the largest scale
+grows beyond that.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import glob
+import hashlib
+import io
+import logging
+import math
+import os
+import random
+
+from cmakelang import configuration
+from cmakelang import lex
+from cmakelang import stats
+from cmakelang.format import __main__
+
+logger = logging.getLogger(__name__)
+
+THISDIR = os.path.dirname(os.path.abspath(__file__))
+
+# Default location of the seed corpus and of the saved regression cases
+COMMAND_TESTS_DIR = os.path.join(os.path.dirname(THISDIR), "command_tests")
+CASES_DIR = os.path.join(THISDIR, "fuzz_cases")
+
+LINE_WIDTHS = (20, 40, 60, 80, 120)
+SCALES = (2, 3, 4, 6)
+
+# Statements whose arguments are not inflated, since repeating them would
+# not yield a meaningful listfile
+FLOW_CONTROL = (
+    "if", "elseif", "else", "endif", "foreach", "endforeach", "while",
+    "endwhile", "function", "endfunction", "macro", "endmacro", "block",
+    "endblock")
+
+# Statements used to nest the snippet, as (open, close) pairs
+NESTING = (
+    ("if(FUZZ_{0})", "endif()"),
+    ("foreach(fuzz_{0} IN LISTS FUZZ_{0})", "endforeach()"),
+    ("while(FUZZ_{0})", "endwhile()"),
+    ("function(fuzz_{0})", "endfunction()"),
+    ("macro(fuzz_{0})", "endmacro()"),
+)
+
+Mutation = collections.namedtuple(
+    "Mutation", ["nest", "inflate", "comments", "line_width"])
+
+# The measured cost of formatting one listfile
+Cost = collections.namedtuple(
+    "Cost", ["tokens", "reflow_calls", "seconds", "exceeded"])
+
+Finding = collections.namedtuple(
+    "Finding", ["seed_name", "content", "mutation", "scale", "exponent",
+                "costs"])
+
+
+class ReflowBudgetExceeded(Exception):
+  """Raised when a layout takes more reflows than the budget allows."""
+
+
+class BudgetStats(stats.Stats):
+  """`stats.Stats` which aborts the layout when it exceeds a reflow budget."""
+
+  def __init__(self, max_reflows, name=None):
+    super(BudgetStats, self).__init__(name)
+    self.max_reflows = max_reflows
+
+  def count(self, key, increment=1):
+    super(BudgetStats, self).count(key, increment)
+    if key == "reflow_calls" and self.counters[key] > self.max_reflows:
+      raise ReflowBudgetExceeded()
+
+
+def iter_seed_snippets(dirpath=COMMAND_TESTS_DIR):
+  """
+  Generate (name, content) for each test snippet in the sidecar files of
+  `dirpath`, with the test metadata stripped.
+  """
+  for filepath in sorted(glob.glob(os.path.join(dirpath, "*.cmake"))):
+    with io.open(filepath, "r", encoding="utf-8") as infile:
+      lines = infile.read().split("\n")
+
+    test_name = None
+    body = []
+    terminator = None
+    for line in lines + ["# test: "]:
+      if terminator is not None:
+        if line == terminator:
+          terminator = None
+        continue
+      if line.startswith("# test: ") or line.endswith("# end-test"):
+        if test_name and "".join(body).strip():
+          yield ("{}:{}".format(os.path.basename(filepath), test_name),
+                 "\n".join(body).strip("\n") + "\n")
+        test_name = line[8:] if line.startswith("# test: ") else None
+        body = []
+      elif line in ("#[=[", "#[==[") and test_name and not body:
+        terminator = "]" + line[2:-1] + "]"
+      elif test_name:
+        body.append(line)
+
+
+def get_statement_name(tokens, idx):
+  """Return the (lowercase) name of the statement whose left parenthesis is
+     at `idx`, or None."""
+  idx -= 1
+  while idx >= 0 and tokens[idx].type == lex.TokenType.WHITESPACE:
+    idx -= 1
+  if idx >= 0 and tokens[idx].type == lex.TokenType.WORD:
+    return tokens[idx].spelling.lower()
+  return None
+
+
+def inflate_arguments(content, factor):
+  """Repeat the arguments of every (non flow-control) statement `factor`
+     times."""
+  tokens = lex.tokenize(content)
+  out = []
+  depth = 0
+  argbuf = None
+  for idx, token in enumerate(tokens):
+    if argbuf is not None:
+      if token.type == lex.TokenType.LEFT_PAREN:
+        depth += 1
+      elif token.type == lex.TokenType.RIGHT_PAREN:
+        depth -= 1
+      if depth > 0:
+        argbuf.append(token)
+        continue
+      separator = " "
+      if argbuf and argbuf[-1].type == lex.TokenType.COMMENT:
+        separator = "\n"
+      args = "".join(tok.spelling for tok in argbuf)
+      out.append(separator.join([args] * factor))
+      argbuf = None
+
+    out.append(token.spelling)
+    if (token.type == lex.TokenType.LEFT_PAREN
+        and get_statement_name(tokens, idx) not in FLOW_CONTROL):
+      depth = 1
+      argbuf = []
+  if argbuf is not None:
+    out.extend(tok.spelling for tok in argbuf)
+  return "".join(out)
+
+
+def inject_comments(content):
+  """Add a line comment after every argument of every statement."""
+  tokens = lex.tokenize(content)
+  out = []
+  depth = 0
+  for idx, token in enumerate(tokens):
+    out.append(token.spelling)
+    if token.type == lex.TokenType.LEFT_PAREN:
+      depth += 1
+    elif token.type == lex.TokenType.RIGHT_PAREN:
+      depth -= 1
+    elif depth > 0 and token.type in (
+        lex.TokenType.WORD, lex.TokenType.UNQUOTED_LITERAL,
+        lex.TokenType.QUOTED_LITERAL, lex.TokenType.DEREF,
+        lex.TokenType.NUMBER):
+      out.append(" # fuzz comment {}\n".format(idx))
+  return "".join(out)
+
+
+def nest_statements(content, depth):
+  """Wrap content in `depth` levels of flow control."""
+  lines = content.rstrip("\n").split("\n")
+  for level in reversed(range(depth)):
+    opener, closer = NESTING[level % len(NESTING)]
+    lines = [opener.format(level)] + lines + [closer]
+  return "\n".join(lines) + "\n"
+
+
+def apply_mutation(content, mutation, scale):
+  """Return the content mutated at the given scale."""
+  if mutation.comments:
+    content = inject_comments(content)
+  if mutation.inflate:
+    content = inflate_arguments(content, scale)
+  if mutation.nest:
+    content = nest_statements(content, scale)
+  return content
+
+
+def measure_cost(content, line_width, max_reflows):
+  """Format `content` and return its `Cost`."""
+  config = configuration.Configuration(format={"line_width": line_width})
+  collector = BudgetStats(max_reflows)
+  exceeded = False
+  with stats.collect(collector=collector):
+    try:
+      __main__.process_file(config, content)
+    except ReflowBudgetExceeded:
+      exceeded = True
+  return Cost(
+      collector.counters["tokens"], collector.counters["reflow_calls"],
+      collector.timers["total"], exceeded)
+
+
+def get_exponent(small, large):
+  """Return the growth exponent between two costs (see module docs)."""
+  if large.exceeded:
+    return float("inf")
+  if (small.reflow_calls == 0 or small.tokens == 0
+      or large.tokens <= small.tokens):
+    return 0.0
+  return (math.log(float(large.reflow_calls) / small.reflow_calls)
+          / math.log(float(large.tokens) / small.tokens))
+
+
+def evaluate(content, mutation, scale, max_reflows):
+  """
+  Return (exponent, costs) for the mutation of `content` at `scale`,
+  `2 * scale` and `4 * scale`. Raises whatever `process_file()` raises for
+  invalid input.
+  """
+  costs = []
+  for factor in (scale, 2 * scale, 4 * scale):
+    costs.append(measure_cost(
+        apply_mutation(content, mutation, factor), mutation.line_width,
+        max_reflows))
+    if costs[-1].exceeded:
+      break
+  exponent = min(
+      get_exponent(small, large) for small, large in zip(costs, costs[1:]))
+  return exponent, tuple(costs)
+
+
+def split_statements(content):
+  """Split content into chunks, each ending with the newline after a top
+     level statement or comment."""
+  chunks = []
+  chunk = []
+  depth = 0
+  for token in lex.tokenize(content):
+    chunk.append(token.spelling)
+    if token.type == lex.TokenType.LEFT_PAREN:
+      depth += 1
+    elif token.type == lex.TokenType.RIGHT_PAREN:
+      depth -= 1
+    elif (token.type == lex.TokenType.NEWLINE and depth == 0
+          and "".join(chunk).strip()):
+      chunks.append("".join(chunk))
+      chunk = []
+  if "".join(chunk).strip():
+    chunks.append("".join(chunk))
+  return chunks
+
+
+def minimize(chunks, is_interesting, is_expired=lambda: False):
+  """
+  Return a minimal sublist of `chunks` for which `is_interesting()` still
+  holds, by repeatedly removing contiguous runs of them (delta debugging).
+  Stops early when `is_expired()`.
+  """
+  granularity = 2
+  while len(chunks) >= 2 and not is_expired():
+    runsize = int(math.ceil(len(chunks) / float(granularity)))
+    for start in range(0, len(chunks), runsize):
+      candidate = chunks[:start] + chunks[start + runsize:]
+      if candidate and is_interesting(candidate):
+        chunks = candidate
+        granularity = max(granularity - 1, 2)
+        break
+    else:
+      if granularity >= len(chunks):
+        break
+      granularity = min(2 * granularity, len(chunks))
+  return chunks
+
+
+def simplify_mutation(mutation, is_interesting):
+  """Return `mutation` with each of its transformations disabled, so long as
+     `is_interesting(mutation)` still holds."""
+  for field in ("comments", "inflate", "nest"):
+    candidate = mutation._replace(**{field: False})
+    if not (candidate.nest or candidate.inflate):
+      continue
+    if is_interesting(candidate):
+      mutation = candidate
+  return mutation
+
+
+def random_mutation(rng):
+  while True:
+    mutation = Mutation(
+        nest=rng.random() < 0.5, inflate=rng.random() < 0.7,
+        comments=rng.random() < 0.3, line_width=rng.choice(LINE_WIDTHS))
+    if mutation.nest or mutation.inflate:
+      return mutation
+
+
+def fuzz(seed=0, budget=60.0, threshold=1.5, max_reflows=200000,
+         max_trials=None, snippets=None):
+  """
+  Run random trials until `budget` seconds have elapsed (or `max_trials`
+  trials are done) and return the list of (minimized) `Finding` whose growth
+  exponent exceeded `threshold`.
+  """
+  rng = random.Random(seed)
+  if snippets is None:
+    snippets = list(iter_seed_snippets())
+  deadline = stats.get_time() + budget
+
+  def is_expired():
+    return stats.get_time() > deadline
+
+  findings = []
+  seen = set()
+  trialno = 0
+  while not is_expired() and (max_trials is None or trialno < max_trials):
+    trialno += 1
+    seed_name, content = rng.choice(snippets)
+    mutation = random_mutation(rng)
+    scale = rng.choice(SCALES)
+    try:
+      exponent, costs = evaluate(content, mutation, scale, max_reflows)
+    except Exception:  # pylint: disable=broad-except
+      logger.debug("Failed to format %s", seed_name, exc_info=True)
+      continue
+    logger.debug("%s %s x%d: exponent %.2f", seed_name, mutation, scale,
+                 exponent)
+    if exponent <= threshold:
+      continue
+
+    logger.info("Minimizing %s %s x%d: exponent %.2f", seed_name, mutation,
+                scale, exponent)
+
+    def is_interesting(content, mutation):
+      try:
+        return evaluate(content, mutation, scale, max_reflows)[0] > threshold
+      except Exception:  # pylint: disable=broad-except
+        return False
+
+    content = "".join(minimize(
+        split_statements(content),
+        lambda chunks: is_interesting("".join(chunks), mutation),
+        is_expired))
+    mutation = simplify_mutation(
+        mutation, lambda candidate: is_interesting(content, candidate))
+    if (content, mutation) in seen:
+      continue
+    seen.add((content, mutation))
+    exponent, costs = evaluate(content, mutation, scale, max_reflows)
+    findings.append(
+        Finding(seed_name, content, mutation, scale, exponent, costs))
+  logger.info("Ran %d trials, found %d superlinear cases", trialno,
+              len(findings))
+  return findings
+
+
+def format_case(finding):
+  """Return the content of a regression case file for a `Finding`."""
+  meta = collections.OrderedDict([
+      ("seed", finding.seed_name),
+      ("nest", finding.mutation.nest),
+      ("inflate", finding.mutation.inflate),
+      ("comments", finding.mutation.comments),
+      ("line_width", finding.mutation.line_width),
+      ("scale", finding.scale),
+      ("exponent", round(finding.exponent, 3)),
+      ("reflow_calls", [cost.reflow_calls for cost in finding.costs]),
+  ])
+  lines = ["# fuzz-case", "#[=["]
+  lines.extend("{} = {!r}".format(key, value) for key, value in meta.items())
+  lines.append("]=]")
+  return "\n".join(lines) + "\n" + finding.content
+
+
+def save_case(outdir, finding):
+  """Write a `Finding` as a regression case in `outdir`, and return its
+     path. The filename is derived from the content, so saving the same
+     finding twice overwrites it."""
+  case_content = format_case(finding)
+  digest = hashlib.sha1(case_content.encode("utf-8")).hexdigest()[:12]
+  if not os.path.exists(outdir):
+    os.makedirs(outdir)
+  outpath = os.path.join(outdir, "case_{}.cmake".format(digest))
+  with io.open(outpath, "w", encoding="utf-8", newline="") as outfile:
+    outfile.write(case_content)
+  return outpath
+
+
+def load_case(inpath):
+  """Return (meta, content) for a regression case file."""
+  with io.open(inpath, "r", encoding="utf-8") as infile:
+    lines = infile.read().split("\n")
+  assert lines[:2] == ["# fuzz-case", "#[=["], \
+      "{} is not a fuzz case".format(inpath)
+  end = lines.index("]=]")
+  meta = {}
+  exec("\n".join(lines[2:end]), meta)  # pylint: disable=exec-used
+  meta.pop("__builtins__")
+  return meta, "\n".join(lines[end + 1:])
+
+
+def iter_cases(dirpath=CASES_DIR):
+  """Generate the paths of all saved regression cases."""
+  return iter(sorted(glob.glob(os.path.join(dirpath, "case_*.cmake"))))
+
+
+def check_case(meta, content, slack=0.1):
+  """
+  Re-measure a regression case and return (ok, costs), where `ok` is false
+  if the cost at the largest scale exceeds the recorded cost by more than
+  `slack`.
+  """
+  mutation = Mutation(
+      meta["nest"], meta["inflate"], meta["comments"], meta["line_width"])
+  limit = int(meta["reflow_calls"][-1] * (1.0 + slack))
+  _, costs = evaluate(content, mutation, meta["scale"], limit)
+  return not costs[-1].exceeded, costs
@@ -0,0 +1,14 @@
+# fuzz-case
+#[=[
+seed = 'misc_tests.cmake:macro_def'
+nest = False
+inflate = True
+comments = False
+line_width = 60
+scale = 2
+exponent = 1.596
+reflow_calls = [26, 333, 647]
+]=]
+macro(forbarbaz arg1)
+  do_something(arg1 ${ARGN})
+endmacro()
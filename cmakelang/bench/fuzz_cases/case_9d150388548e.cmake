@@ -0,0 +1,12 @@
+# fuzz-case
+#[=[
+seed = 'misc_tests.cmake:collapse_additional_newlines'
+nest = True
+inflate = True
+comments = False
+line_width = 40
+scale = 4
+exponent = 1.67
+reflow_calls = [85, 681, 2011]
+]=]
+project(cmakelang_test)
@@ -0,0 +1,12 @@
+# fuzz-case
+#[=[
+seed = 'add_executable_tests.cmake:single_argument'
+nest = False
+inflate = True
+comments = False
+line_width = 80
+scale = 3
+exponent = 1.986
+reflow_calls = [14, 482, 1704]
+]=]
+add_executable(foobar foo.cc)
@@ -0,0 +1,200 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cmakelang import configuration
+from cmakelang.bench import benchmarks
+from cmakelang.bench import compare
+from cmakelang.bench import corpus
+from cmakelang.bench import fuzz
+from cmakelang.format import __main__
+
+
+class TestCorpus(unittest.TestCase):
+
+  def test_deterministic(self):
+    for shape in corpus.SHAPES:
+      with self.subTest(shape=shape):  # pylint: disable=no-member
+        self.assertEqual(
+            corpus.generate(shape, 10, seed=1),
+            corpus.generate(shape, 10, seed=1))
+    self.assertNotEqual(
+        corpus.generate("mixed", 10, seed=1),
+        corpus.generate("mixed", 10, seed=2))
+
+  def test_shapes_format(self):
+    """Every shape should be a listfile which formats stably."""
+    config = configuration.Configuration()
+    for shape in corpus.SHAPES:
+      with self.subTest(shape=shape):  # pylint: disable=no-member
+        content = corpus.generate(shape, 5)
+        formatted, _ = __main__.process_file(config, content)
+        self.assertEqual(
+            formatted, __main__.process_file(config, formatted)[0])
+
+
+class TestBenchmarks(unittest.TestCase):
+
+  def test_get_benchmarks(self):
+    names = [
+        benchmark.name for benchmark in benchmarks.get_benchmarks(
+            10, pattern="^(lint|cli)/")]
+    self.assertEqual(
+        ["lint/{}/10".format(shape) for shape in corpus.SHAPES]
+        + ["cli/format/10", "cli/lint/10"], names)
+
+  def test_run_suite(self):
+    suite = benchmarks.get_benchmarks(2, pattern="^(?!cli/)")
+    self.assertEqual(6 * len(corpus.SHAPES), len(suite))
+    results = benchmarks.run_suite(suite, 2, 0.0, {"size": 2})
+    # Must be serializable
+    results = json.loads(json.dumps(results))
+    self.assertIn("python_version", results["environment"])
+    self.assertEqual({"size": 2}, results["options"])
+    self.assertEqual(
+        [benchmark.name for benchmark in suite],
+        [result["name"] for result in results["benchmarks"]])
+    for result in results["benchmarks"]:
+      self.assertEqual(2, len(result["samples"]))
+      self.assertLessEqual(result["min"], result["median"])
+      self.assertGreaterEqual(result["iqr"], 0.0)
+      self.assertGreater(result["lines"], 0)
+      self.assertGreater(result["throughput"], 0.0)
+      if benchmarks.tracemalloc is not None:
+        self.assertGreater(result["memory_peak"], 0)
+
+  def test_name_lookups(self):
+    rows = benchmarks.run_name_lookups(2, 1, 0.0)
+    self.assertEqual(
+        ["variables/corpus", "variables/builtin", "properties/builtin"],
+        [row[0] for row in rows])
+    for _, count, regex_time, index_time in rows:
+      self.assertGreater(count, 0)
+      self.assertGreater(regex_time, 0.0)
+      self.assertGreater(index_time, 0.0)
+
+  def test_percentile(self):
+    samples = [5.0, 1.0, 4.0, 2.0, 3.0]
+    self.assertEqual(3.0, benchmarks.get_median(samples))
+    self.assertEqual(2.5, benchmarks.get_median([4.0, 1.0, 3.0, 2.0]))
+    self.assertEqual(2.0, benchmarks.get_iqr(samples))
+    self.assertEqual(0.0, benchmarks.get_iqr([1.0]))
+
+
+def make_result(name, median, iqr=0.0, memory_peak=None):
+  return {"name": name, "median": median, "iqr": iqr,
+          "memory_peak": memory_peak}
+
+
+class TestCompare(unittest.TestCase):
+
+  def test_compare_results(self):
+    base_results = {"benchmarks": [
+        make_result("same", 1.0, 0.1, 1000),
+        make_result("slower", 1.0, 0.05),
+        make_result("noisy", 1.0, 0.2),
+        make_result("faster", 1.0),
+        make_result("bigger", 1.0, 0.0, 1000),
+        make_result("removed", 1.0),
+    ]}
+    new_results = {"benchmarks": [
+        make_result("same", 1.05, 0.1, 1050),
+        make_result("slower", 1.2, 0.0),
+        make_result("noisy", 1.3, 0.2),
+        make_result("faster", 0.5),
+        make_result("bigger", 1.0, 0.0, 1200),
+        make_result("added", 1.0),
+    ]}
+    comparisons = compare.compare_results(base_results, new_results, 0.1)
+    self.assertEqual(
+        [("same", compare.UNCHANGED, compare.UNCHANGED),
+         ("slower", compare.REGRESSION, compare.UNCHANGED),
+         ("noisy", compare.UNCHANGED, compare.UNCHANGED),
+         ("faster", compare.IMPROVEMENT, compare.UNCHANGED),
+         ("bigger", compare.UNCHANGED, compare.REGRESSION),
+         ("removed", compare.MISSING, compare.MISSING),
+         ("added", compare.ADDED, compare.ADDED)],
+        [(comparison.name, comparison.time_status, comparison.memory_status)
+         for comparison in comparisons])
+    self.assertTrue(compare.has_regression(comparisons))
+    self.assertFalse(compare.has_regression(comparisons[:1]))
+
+    outfile = io.StringIO()
+    compare.write_table(outfile, comparisons)
+    self.assertIn("7 benchmarks, 2 regressions", outfile.getvalue())
+
+
+class TestFuzz(unittest.TestCase):
+
+  def test_mutations(self):
+    self.assertEqual(
+        "set(a b # x\n a b # x\n)\nif(x)\nfoo(a b a b)\nendif()\n",
+        fuzz.inflate_arguments(
+            "set(a b # x\n)\nif(x)\nfoo(a b)\nendif()\n", 2))
+    self.assertEqual(
+        "foo(a # fuzz comment 2\n \"b\" # fuzz comment 4\n)\n",
+        fuzz.inject_comments("foo(a \"b\")\n"))
+    self.assertEqual(
+        "if(FUZZ_0)\nforeach(fuzz_1 IN LISTS FUZZ_1)\nfoo()\n"
+        "endforeach()\nendif()\n",
+        fuzz.nest_statements("foo()\n", 2))
+    self.assertEqual(
+        ["# c\n", "set(a\n b)\n", "\nfoo()\n"],
+        fuzz.split_statements("# c\nset(a\n b)\n\nfoo()\n"))
+
+  def test_minimize(self):
+    chunks = ["a", "b", "c", "d", "e", "f", "g"]
+    self.assertEqual(
+        ["c", "f"],
+        fuzz.minimize(chunks, lambda chunks: "c" in chunks and "f" in chunks))
+
+  def test_fuzz_fixed_seed(self):
+    """
+    Run a few fuzz trials on a fixed seed and time budget and check that the
+    findings are minimal and can be saved and checked as regression cases.
+    """
+    # NOTE(josh): with a threshold below one, every trial of these snippets
+    # is a finding (layout is linear), so that the test doesn't depend on
+    # there being a superlinear layout bug for the fuzzer to find.
+    snippets = [("linear", "set(a b c)\n"
+                           "message(STATUS \"foo\")\n"
+                           "add_library(foo foo.cc)\n")]
+    findings = fuzz.fuzz(seed=0, budget=60.0, threshold=0.5, max_trials=2,
+                         snippets=snippets)
+    self.assertTrue(findings)
+    outdir = tempfile.mkdtemp(prefix="cmakelang-fuzz-")
+    try:
+      for finding in findings:
+        self.assertGreater(finding.exponent, 0.5)
+        self.assertEqual(1, len(fuzz.split_statements(finding.content)))
+        self.assertTrue(finding.mutation.nest or finding.mutation.inflate)
+        meta, content = fuzz.load_case(fuzz.save_case(outdir, finding))
+        self.assertEqual(finding.content, content)
+        self.assertEqual(
+            [cost.reflow_calls for cost in finding.costs],
+            meta["reflow_calls"])
+        self.assertTrue(fuzz.check_case(meta, content)[0])
+    finally:
+      shutil.rmtree(outdir)
+
+  def test_regression_cases(self):
+    """The layout cost of saved fuzz cases must not grow."""
+    casepaths = list(fuzz.iter_cases())
+    self.assertTrue(casepaths)
+    for casepath in casepaths:
+      casename = os.path.basename(casepath)
+      with self.subTest(case=casename):  # pylint: disable=no-member
+        meta, content = fuzz.load_case(casepath)
+        ok, costs = fuzz.check_case(meta, content)
+        self.assertTrue(
+            ok, "reflow calls {} exceed {}".format(
+                [cost.reflow_calls for cost in costs], meta["reflow_calls"]))
+
+
+if __name__ == '__main__':
+  unittest.main()
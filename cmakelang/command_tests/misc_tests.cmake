@@ -732,6 +732,42 @@ FoO(bar baz)
 ]==]
 FoO(bar baz)
 
+# test: percommand_keyword_case
+#[=[
+keyword_case = "lower"
+per_command = {
+  "foo": {
+    "keyword_case": "upper"
+  }
+}
+]=]
+#[==[
+foo(bar baz)
+list(APPEND foo a b c)
+]==]
+foo(BAR BAZ)
+list(append foo a b c)
+
+# test: percommand_max_pargs_hwrap
+#[=[
+per_command = {
+  "install": {
+    "max_pargs_hwrap": 3
+  }
+}
+]=]
+#[==[
+install(TARGETS foo bar baz boo DESTINATION lib)
+add_library(foo STATIC bar.cc baz.cc boo.cc)
+]==]
+install(
+  TARGETS foo
+          bar
+          baz
+          boo
+  DESTINATION lib)
+add_library(foo STATIC bar.cc baz.cc boo.cc)
+
 # test: keyword_comment
 #[==[
 find_package(package REQUIRED
@@ -15,7 +15,7 @@ class TestMiscFormatting(TestBase):
   """
   Ensure that various inputs format the way we want them to
   """
-  kExpectNumSidecarTests = 86
+  kExpectNumSidecarTests = 88
 
   def test_config_hashruler_minlength(self):
 
@@ -128,6 +128,21 @@ project(cmakelang_test)
 project(cmakelang_test)
 """
 
+  def test_config_change_after_format(self):
+    # make sure per-command values are not stale when the configuration is
+    # changed after it has already been used to format
+    assert_format(self, "foo(a b c)\n", "foo(a b c)\n")
+
+    self.config.format.command_case = "upper"
+    assert_format(self, "foo(a b c)\n", "FOO(a b c)\n")
+
+    self.config.format.max_pargs_hwrap = 1
+    assert_format(self, "foo(a b c)\n", """\
+FOO(a
+    b
+    c)
+""")
+
   def test_example_file(self):
     thisdir = os.path.dirname(__file__)
     infile_path = os.path.join(
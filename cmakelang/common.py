@@ -1,5 +1,14 @@
 from __future__ import unicode_literals
 
+import os
+
+# If true, skip the runtime type checks and assertions on the hot paths of the
+# formatter (see `cmakelang.format.formatter`). These checks guard against
+# programming errors, not user errors, so the output is the same either way.
+# This is read once at import time, so it must be set in the environment
+# (``CMAKELANG_FAST=1``) before cmakelang is imported.
+FAST_MODE = os.environ.get("CMAKELANG_FAST", "") not in ("", "0")
+
 
 class EnumObject(object):
   """
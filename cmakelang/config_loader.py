@@ -0,0 +1,419 @@
+"""
+Load configuration dictionaries from config files on disk.
+
+The loader caches the result of each step so that the work is done once per
+process, regardless of how many listfiles are processed:
+
+* The format of each config file (json, yaml, or python) is determined once,
+  by extension or by sniffing the content of extensionless files.
+* Parsed json/yaml dictionaries and compiled python code objects are cached
+  by ``(path, mtime, size)``.
+* The ``include`` graph for a list of config files is flattened once (with
+  cycle detection) and re-validated by ``stat()`` on subsequent loads.
+* The config file discovered for each directory is remembered.
+
+Python configs are re-executed (from the cached code object) once on every
+load since they may compute values dynamically.
+"""
+
+from __future__ import unicode_literals
+
+import ast
+import io
+import json
+import logging
+import os
+
+try:
+  from collections.abc import Mapping
+except ImportError:
+  from collections import Mapping
+
+import six
+
+from cmakelang import common
+from cmakelang import config_util
+from cmakelang import stats
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILENAMES = (
+    '.cmake-format',
+    '.cmake-format.py',
+    '.cmake-format.json',
+    '.cmake-format.yaml',
+    'cmake-format.py',
+    'cmake-format.json',
+    'cmake-format.yaml',
+)
+
+
+def load_yaml(config_file):
+  """
+  Attempt to load yaml configuration from an opened file
+  """
+  import yaml
+  try:
+    from yaml import CLoader as Loader
+  except ImportError:
+    from yaml import Loader
+  out = yaml.load(config_file, Loader=Loader)
+  if out is None:
+    return {}
+  return out
+
+
+def map_merge(output_map, increment_map):
+  """
+  Merge `increment_map` into `output_map` recursively.
+  """
+  for key, increment_value in increment_map.items():
+    if key not in output_map:
+      output_map[key] = increment_value
+      continue
+
+    existing_value = output_map[key]
+    if isinstance(existing_value, Mapping):
+      if isinstance(increment_value, Mapping):
+        map_merge(existing_value, increment_value)
+      else:
+        logger.warning(
+            "Cannot merge config %s of type %s into a dictionary",
+            key, type(increment_value))
+      continue
+
+    output_map[key] = increment_value
+
+  return output_map
+
+
+def copy_config(value):
+  """
+  Return a copy of a configuration value in which all of the containers
+  (dictionaries and lists) are copied, and any leaf values are shared. This
+  is what we hand out from the cache since `ConfigObject` consumes
+  (i.e. pops from) the dictionaries it is constructed from. We can't use
+  `copy.deepcopy` because python configs may contain modules or functions.
+  """
+  if isinstance(value, Mapping):
+    return {key: copy_config(subvalue) for key, subvalue in value.items()}
+  if isinstance(value, list):
+    return [copy_config(subvalue) for subvalue in value]
+  return value
+
+
+def get_statkey(filepath):
+  """Return a tuple which changes whenever the content of the file (very
+     likely) changes."""
+  stat = os.stat(filepath)
+  return (stat.st_mtime, stat.st_size)
+
+
+def looks_like_python(content):
+  """
+  Return true if the content is python source containing at least one
+  statement which could produce configuration (e.g. an assignment). Note that
+  a lot of simple yaml is also syntactically valid python (``key: value`` is an
+  annotation), so being parseable is not sufficient.
+  """
+  try:
+    module = ast.parse(content)
+  except SyntaxError:
+    return False
+
+  # pylint: disable=no-member
+  annotation_types = (ast.Expr,)
+  if hasattr(ast, "AnnAssign"):
+    annotation_types += (getattr(ast, "AnnAssign"),)
+  for stmt in module.body:
+    if not isinstance(stmt, annotation_types):
+      return True
+  return False
+
+
+def sniff_format(content):
+  """
+  Given the content of an extensionless config file, return which of "json",
+  "yaml" or "python" it is written in.
+  """
+  stripped = content.strip()
+  if not stripped:
+    return "json"
+
+  if stripped[0] in "{[":
+    try:
+      json.loads(content)
+      return "json"
+    except ValueError:
+      pass
+
+  if looks_like_python(content):
+    return "python"
+
+  return "yaml"
+
+
+class ConfigLoader(object):
+  """
+  Loads, caches, and merges configuration files. A single loader is shared
+  by all of the frontends (see `get_default_loader()`).
+  """
+
+  def __init__(self):
+    # Map of absolute path -> (statkey, format, payload) where payload is
+    # either a parsed dictionary (json/yaml) or a code object (python)
+    self._file_cache = {}
+
+    # Map of tuple(config paths) -> (list of (path, statkey), flat list of
+    # paths in merge order)
+    self._include_cache = {}
+
+    # Map of directory -> discovered config file path (or None)
+    self._find_cache = {}
+
+    # Number of times a config file was actually read from disk
+    self.read_count = 0
+
+  def clear(self):
+    """Drop all cached state."""
+    self._file_cache.clear()
+    self._include_cache.clear()
+    self._find_cache.clear()
+
+  def find_config_file(self, infile_path):
+    """
+    Search parent directories of an infile path and find a config file if
+    one exists.
+    """
+    realpath = os.path.realpath(infile_path)
+    if os.path.isdir(infile_path):
+      head = infile_path
+    else:
+      head, _ = os.path.split(realpath)
+
+    visited = []
+    found = None
+    while head:
+      if head in self._find_cache:
+        found = self._find_cache[head]
+        break
+      visited.append(head)
+      for filename in CONFIG_FILENAMES:
+        configpath = os.path.join(head, filename)
+        if os.path.exists(configpath):
+          found = configpath
+          break
+      if found is not None:
+        break
+      head2, _ = os.path.split(head)
+      if head == head2:
+        break
+      head = head2
+
+    for dirpath in visited:
+      self._find_cache[dirpath] = found
+    return found
+
+  def _read_entry(self, configfile_path):
+    """
+    Return the (format, payload) cache entry for the given file, reading and
+    parsing it only if it isn't cached or has changed on disk.
+    """
+    abspath = os.path.abspath(configfile_path)
+    statkey = get_statkey(abspath)
+    cached = self._file_cache.get(abspath)
+    if cached is not None and cached[0] == statkey:
+      return cached[1], cached[2]
+
+    self.read_count += 1
+    with io.open(abspath, 'r', encoding='utf-8') as infile:
+      content = infile.read()
+
+    if abspath.endswith('.json'):
+      fmt = "json"
+    elif abspath.endswith('.yaml'):
+      fmt = "yaml"
+    elif abspath.endswith('.py'):
+      fmt = "python"
+    else:
+      fmt = sniff_format(content)
+
+    if fmt == "json":
+      # NOTE(josh): an empty file is not valid JSON, but we don't need to be
+      # as pedantic
+      if not content.strip():
+        payload = {}
+      else:
+        try:
+          payload = json.loads(content)
+        except ValueError as ex:
+          raise common.UserError(
+              "Failed to parse json config file {}: {}"
+              .format(configfile_path, ex))
+    elif fmt == "yaml":
+      try:
+        payload = load_yaml(content)
+      except ValueError as ex:
+        raise common.UserError(
+            "Failed to parse yaml config file {}: {}"
+            .format(configfile_path, ex))
+    else:
+      try:
+        payload = compile(content, abspath, "exec")
+      except SyntaxError as ex:
+        raise common.UserError(
+            "Failed to parse python config file {}: {}"
+            .format(configfile_path, ex))
+
+    if fmt != "python" and not isinstance(payload, Mapping):
+      raise common.UserError(
+          "Config file {} must contain a dictionary, not a {}"
+          .format(configfile_path, type(payload).__name__))
+
+    self._file_cache[abspath] = (statkey, fmt, payload)
+    return fmt, payload
+
+  def get_one_config_dict(self, configfile_path):
+    """
+    Return a dictionary of configuration options read from the given file
+    path. The returned dictionary is owned by the caller.
+    """
+    if not os.path.exists(configfile_path):
+      raise common.UserError(
+          "Desired config file does not exist: {}".format(configfile_path))
+
+    fmt, payload = self._read_entry(configfile_path)
+    if fmt != "python":
+      return copy_config(payload)
+
+    _global = config_util.ExecGlobal(configfile_path)
+    try:
+      # pylint: disable=exec-used
+      exec(payload, _global)
+    except Exception as ex:
+      raise common.UserError(
+          "Failed to parse python config file {}: {}"
+          .format(configfile_path, ex))
+    _global.pop("__builtins__", None)
+    return _global
+
+  def _load_once(self, configfile_path, loaded):
+    """
+    Return a dictionary of configuration options read from the given file
+    path, owned by the caller. `loaded` is a map of absolute path -> config
+    dictionary of the files already loaded, so that a file which is included
+    more than once is only loaded (i.e. python configs are executed) once.
+    """
+    abspath = os.path.abspath(configfile_path)
+    if abspath not in loaded:
+      loaded[abspath] = self.get_one_config_dict(configfile_path)
+    return copy_config(loaded[abspath])
+
+  def _resolve_includes(self, configfile_paths):
+    """
+    Return the list of (path, config dictionary) to merge (in order) for the
+    given list of root config files. This is the breadth-first expansion of
+    the `include` graph. Raise `UserError` if the include graph contains a
+    cycle.
+    """
+    out = []
+    loaded = {}
+    queue = [(os.path.expanduser(path), ()) for path in configfile_paths]
+    while queue:
+      configfile_path, ancestry = queue.pop(0)
+      abspath = os.path.abspath(configfile_path)
+      if abspath in ancestry:
+        raise common.UserError(
+            "Config include cycle: {}".format(
+                " -> ".join(ancestry + (abspath,))))
+
+      config_dict = self._load_once(configfile_path, loaded)
+      out.append((configfile_path, config_dict))
+
+      include_paths = config_dict.get("include", [])
+      if not isinstance(include_paths, (list, tuple)) or not all(
+          isinstance(path, six.string_types)
+          for path in include_paths):
+        raise common.UserError(
+            "`include` in config file {} must be a list of paths, not {!r}"
+            .format(configfile_path, include_paths))
+
+      for include_path in include_paths:
+        include_path = os.path.expanduser(include_path)
+        if not os.path.isabs(include_path):
+          include_path = os.path.join(
+              os.path.dirname(configfile_path), include_path)
+        queue.append((include_path, ancestry + (abspath,)))
+    return out
+
+  def _get_merge_entries(self, configfile_paths):
+    """
+    Return the list of (path, config dictionary or None) to merge for the
+    given list of root config files. The list of paths is cached. The
+    dictionaries are only available when the list was (re)built, since that
+    requires loading them anyway, and are otherwise None.
+    """
+    cachekey = tuple(configfile_paths)
+    cached = self._include_cache.get(cachekey)
+    if cached is not None:
+      statkeys, merge_list = cached
+      try:
+        if all(get_statkey(path) == statkey for path, statkey in statkeys):
+          return [(path, None) for path in merge_list]
+      except OSError:
+        pass
+
+    entries = self._resolve_includes(configfile_paths)
+    merge_list = [path for path, _ in entries]
+    statkeys = [(path, get_statkey(path)) for path in set(merge_list)]
+    self._include_cache[cachekey] = (statkeys, merge_list)
+    return entries
+
+  def get_merge_list(self, configfile_paths):
+    """
+    Return the (cached) list of config files to merge for the given list
+    of root config files.
+    """
+    return [path for path, _ in self._get_merge_entries(configfile_paths)]
+
+  def get_configdict(self, configfile_paths):
+    """
+    Return the merged configuration dictionary for a list of config files,
+    including any files that they `include`.
+    """
+    config_dict = {}
+    loaded = {}
+    for configfile_path, increment_dict in self._get_merge_entries(
+        configfile_paths):
+      if increment_dict is None:
+        increment_dict = self._load_once(configfile_path, loaded)
+      increment_dict.pop("include", None)
+      map_merge(config_dict, increment_dict)
+    return config_dict
+
+  def get_config(self, infile_path, configfile_paths):
+    """
+    If configfile_path is not none, then load the configuration. Otherwise
+    search for a config file in the ancestry of the filesystem of infile_path
+    and find a config file to load.
+    """
+    with stats.timer("config"):
+      stats.count("config_loads")
+      if configfile_paths is None:
+        inferred_configpath = self.find_config_file(infile_path)
+        if inferred_configpath is None:
+          return {}
+        configfile_paths = [inferred_configpath]
+
+      return self.get_configdict(configfile_paths)
+
+
+_DEFAULT_LOADER = None
+
+
+def get_default_loader():
+  """Return the process-wide `ConfigLoader`."""
+  global _DEFAULT_LOADER  # pylint: disable=global-statement
+  if _DEFAULT_LOADER is None:
+    _DEFAULT_LOADER = ConfigLoader()
+  return _DEFAULT_LOADER
@@ -185,7 +185,11 @@ class SubtreeDescriptor(Descriptor):
     if not hasattr(obj, "_" + self.name):
       # Unlike for config variables, for subtree objects we always instanciate
       # the shadow member.
-      setattr(obj, "_" + self.name, self.subtree_class())
+      subtree = self.subtree_class()
+      # NOTE(josh): the subtree notifies its parent of changes to its fields
+      # so that the parent can discard any values derived from them.
+      subtree._parent_config = obj  # pylint: disable=protected-access
+      setattr(obj, "_" + self.name, subtree)
 
     return getattr(obj, "_" + self.name)
 
@@ -246,10 +250,12 @@ class FieldDescriptor(Descriptor):
 
   def __set__(self, obj, value):
     setattr(obj, "_" + self.name, value)
+    obj._field_changed()  # pylint: disable=protected-access
 
   def unset(self, obj):
     if self.has_override(obj):
       delattr(obj, "_" + self.name)
+      obj._field_changed()  # pylint: disable=protected-access
 
   def __set_name__(self, owner, name):
     # pylint: disable=protected-access
@@ -347,6 +353,13 @@ class ConfigObject(six.with_metaclass(ConfigMeta)):
   def _update_derived(self):
     """subclass hook to update any derived values after a change."""
 
+  def _field_changed(self):
+    """Called whenever a field of this object, or of any subtree object
+       below it, is assigned."""
+    parent = getattr(self, "_parent_config", None)
+    if parent is not None:
+      parent._field_changed()  # pylint: disable=protected-access
+
   def __init__(self, **kwargs):
     # Ensure that the most derived class has a field registry
     assert hasattr(self.__class__, "_field_registry"), (
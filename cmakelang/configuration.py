@@ -421,7 +421,27 @@ class MiscConfig(ConfigObject):
   per_command = FieldDescriptor(
       {},
       "A dictionary containing any per-command configuration overrides."
-      " Currently only `command_case` is supported."
+      " Currently only `command_case`, `keyword_case`, `max_pargs_hwrap`"
+      " and `max_subgroups_hwrap` are supported."
+  )
+
+  listfile_globs = FieldDescriptor(
+      ["CMakeLists.txt", "*.cmake"],
+      "When a directory is given as an input path, process files within it"
+      " (recursively) whose name matches any of these glob patterns."
+  )
+
+  ignore_files = FieldDescriptor(
+      [".gitignore", ".cmake-format-ignore"],
+      "When searching a directory for listfiles, honor any files with these"
+      " names as `.gitignore`-style lists of paths to skip."
+  )
+
+  exclude = FieldDescriptor(
+      [],
+      "When searching a directory for listfiles, skip any paths matching these"
+      " `.gitignore`-style patterns (relative to the directory being"
+      " searched)."
   )
 
   def _update_derived(self):
@@ -442,6 +462,39 @@ class MiscConfig(ConfigObject):
     super(MiscConfig, self).__init__(**kwargs)
 
 
+# Configuration keys which may be overridden on a per-command basis. These are
+# the fields of `CommandConfig`, named by the last component of the key.
+COMMAND_CONFIG_KEYS = (
+    "format.command_case",
+    "format.keyword_case",
+    "format.max_pargs_hwrap",
+    "format.max_subgroups_hwrap",
+    "spelling",
+)
+
+
+class CommandConfig(object):
+  """
+  Flattened view of the effective value of each per-command configuration
+  key for one particular command. Instances are built by
+  `Configuration.get_command_config()` and should be treated as read-only.
+  """
+
+  __slots__ = tuple(key.split(".")[-1] for key in COMMAND_CONFIG_KEYS)
+
+  def __init__(self, **kwargs):
+    for fieldname in self.__slots__:
+      setattr(self, fieldname, kwargs.pop(fieldname, None))
+    if kwargs:
+      raise ValueError(
+          "Unexpected CommandConfig fields: {}".format(", ".join(kwargs)))
+
+  def __repr__(self):
+    return "CommandConfig({})".format(", ".join(
+        "{}={!r}".format(fieldname, getattr(self, fieldname))
+        for fieldname in self.__slots__))
+
+
 class Configuration(ConfigObject):
   """Various configuration options and parameters"""
   _field_registry = []
@@ -453,6 +506,67 @@ class Configuration(ConfigObject):
   encode = SubtreeDescriptor(EncodingConfig)
   misc = SubtreeDescriptor(MiscConfig)
 
+  def __init__(self, **kwargs):
+    # Map of command spelling to CommandConfig, populated lazily by
+    # get_command_config(). This is a derived value, and is discarded any time
+    # a field of the configuration is assigned.
+    self._command_configs = {}
+    super(Configuration, self).__init__(**kwargs)
+
+  def _field_changed(self):
+    self._command_configs = {}
+    super(Configuration, self)._field_changed()
+
+  def _compile_command_config(self, command_name):
+    """
+    Resolve all of the per-command configuration keys for the given
+    (lowercase) command name and return the `CommandConfig`.
+    """
+    command_dict = self.misc.per_command_.get(command_name, {})
+    values = {}
+    for config_key in COMMAND_CONFIG_KEYS:
+      configpath = config_key.split(".")
+      fieldname = configpath.pop(-1)
+      configobj = self
+      for subname in configpath:
+        configobj = getattr(configobj, subname)
+      value = getattr(configobj, fieldname, None)
+
+      if config_key in command_dict:
+        value = command_dict[config_key]
+      elif fieldname in command_dict:
+        # legacy unqualified fieldname
+        value = command_dict[fieldname]
+      values[fieldname] = value
+    return CommandConfig(**values)
+
+  def get_command_config(self, command_name):
+    """
+    Return the `CommandConfig` holding the effective value of each per-command
+    configuration key for `command_name`. The table is populated on first use
+    of each command spelling so that subsequent lookups (e.g. in the formatter
+    hot path) are a single dictionary lookup.
+    """
+    cmdconfig = self._command_configs.get(command_name)
+    if cmdconfig is not None:
+      return cmdconfig
+
+    lower_name = command_name.lower()
+    cmdconfig = self._command_configs.get(lower_name)
+    if cmdconfig is None:
+      if lower_name in self.misc.per_command_:
+        cmdconfig = self._compile_command_config(lower_name)
+      else:
+        # All commands without overrides share the same view of the global
+        # configuration
+        cmdconfig = self._command_configs.get(None)
+        if cmdconfig is None:
+          cmdconfig = self._compile_command_config(None)
+          self._command_configs[None] = cmdconfig
+      self._command_configs[lower_name] = cmdconfig
+    self._command_configs[command_name] = cmdconfig
+    return cmdconfig
+
   def resolve_for_command(self, command_name, config_key, default_value=None):
     """
     Check for a per-command value or override of the given configuration key
@@ -16,6 +16,7 @@ from xml.etree import ElementTree as ET
 
 from cmakelang.format import __main__
 from cmakelang import lex
+from cmakelang import memstats
 from cmakelang import parse
 
 
@@ -99,7 +100,7 @@ class ParseContext(object):
     self.tests = {}
 
   # pylint: disable=W0613
-  def parse_add_test(self, tokens, _breakstack):
+  def parse_add_test(self, _ctx, tokens, _breakstack):
     """Parse an add_test() statement. This statement contains the test name
        and the command for the test.
     """
@@ -124,7 +125,7 @@ class ParseContext(object):
     logger.debug("Adding test %s", test_name)
     self.tests[test_name] = TestSpec(test_name, test_argv, self.cwd)
 
-  def parse_set_tests_properties(self, tokens, _breakstack):
+  def parse_set_tests_properties(self, _ctx, tokens, _breakstack):
     """Parse a set_tests_properties() statement. This statement can set
        properties (key/value strings) on one or more tests.
     """
@@ -169,7 +170,7 @@ class ParseContext(object):
       logger.debug("Updating properties for %s", test_name)
       self.tests[test_name].props.update(properties)
 
-  def parse_subdirs(self, tokens, _breakstack):
+  def parse_subdirs(self, _ctx, tokens, _breakstack):
     """Parse a subdirs() statement. This statement is actually deprecated in
        cmake but it appears it is still in use by ctest.
     """
@@ -202,8 +203,10 @@ class ParseContext(object):
       return
     with io.open(filepath, "r", encoding="utf-8") as infile:
       infile_content = infile.read()
-    tokens = lex.tokenize(infile_content)
-    _ = parse.parse(tokens, self.get_db())
+    with memstats.stage("tokenize"):
+      tokens = lex.tokenize(infile_content)
+    with memstats.stage("parse"):
+      _ = parse.parse(tokens, parse.ParseContext(self.get_db()))
 
   def start(self, firstdir):
     """Main entry-point into the parse. Pushes the first directory onto the
@@ -240,6 +243,7 @@ def setup_argparse(argparser):
       "--json", action="store_const", dest="out_type", const="json")
   mgroup.add_argument(
       "--xml", action="store_const", dest="out_type", const="xml")
+  memstats.add_argument(argparser)
   argparser.add_argument("directory", nargs="?", default=".")
 
 
@@ -250,7 +254,10 @@ def main():
   args = argparser.parse_args()
   logger.setLevel(getattr(logging, args.log_level.upper()))
   ctx = ParseContext()
-  ctx.start(args.directory)
+  with memstats.collect(args.directory, args.memstats) as dir_memstats:
+    ctx.start(args.directory)
+  if dir_memstats is not None:
+    memstats.write_report(sys.stderr, [dir_memstats])
 
   out_type = getattr(args, "out_type", "json")
   if out_type == "json":
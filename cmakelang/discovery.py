@@ -0,0 +1,270 @@
+"""
+Discover listfiles within directory trees.
+
+Directories given on the command line are walked with `os.scandir`.
+Any files matching the configured `listfile_globs` are yielded, unless they
+are excluded by a `.gitignore`-style ignore file (see `ignore_files`) or by
+the configured `exclude` patterns. Directory scans are dispatched to a small
+thread pool ahead of consumption, but paths are always yielded in the same
+(sorted, depth-first) order so that output is deterministic.
+"""
+
+from __future__ import unicode_literals
+
+import fnmatch
+import io
+import logging
+import os
+import re
+
+try:
+  from concurrent import futures
+except ImportError:
+  futures = None
+
+logger = logging.getLogger(__name__)
+
+# Version control metadata directories which are never descended into
+SKIP_DIRNAMES = (".git", ".hg", ".svn")
+
+# Number of threads used to scan directories ahead of consumption
+NUM_SCAN_THREADS = 8
+
+
+def translate_glob(pattern):
+  """
+  Translate a gitignore glob (without any leading `!`, or leading/trailing
+  slash) into a regular expression string. `*` and `?` do not match `/`,
+  while `**` matches any number of path components.
+  """
+  out = []
+  idx = 0
+  while idx < len(pattern):
+    char = pattern[idx]
+    if pattern.startswith("**/", idx):
+      out.append("(?:.*/)?")
+      idx += 3
+      continue
+    if pattern.startswith("**", idx):
+      out.append(".*")
+      idx += 2
+      continue
+    if char == "*":
+      out.append("[^/]*")
+    elif char == "?":
+      out.append("[^/]")
+    elif char == "[":
+      endidx = pattern.find("]", idx + 1)
+      if endidx < 0:
+        out.append(re.escape(char))
+      else:
+        content = pattern[idx + 1:endidx]
+        if content.startswith("!"):
+          content = "^" + content[1:]
+        out.append("[" + content.replace("\\", "\\\\") + "]")
+        idx = endidx
+    elif char == "\\" and idx + 1 < len(pattern):
+      idx += 1
+      out.append(re.escape(pattern[idx]))
+    else:
+      out.append(re.escape(char))
+    idx += 1
+  return "".join(out)
+
+
+class IgnoreRule(object):
+  """A single compiled line from a `.gitignore`-style file."""
+
+  def __init__(self, basedir, pattern):
+    self.basedir = basedir
+    self.negate = False
+    self.dir_only = False
+
+    if pattern.startswith("!"):
+      self.negate = True
+      pattern = pattern[1:]
+    elif pattern.startswith("\\!") or pattern.startswith("\\#"):
+      pattern = pattern[1:]
+
+    if pattern.endswith("/"):
+      self.dir_only = True
+      pattern = pattern.rstrip("/")
+
+    if "/" in pattern:
+      # Patterns with a slash are relative to the directory of the ignore file
+      regex = translate_glob(pattern.lstrip("/"))
+    else:
+      # Otherwise they match a basename at any depth
+      regex = "(?:.*/)?" + translate_glob(pattern)
+    self.regex = re.compile("^" + regex + "$")
+
+  def match(self, relpath, is_dir):
+    if self.dir_only and not is_dir:
+      return False
+    return self.regex.match(relpath) is not None
+
+
+def parse_ignore_lines(basedir, lines):
+  """Return a list of `IgnoreRule` for the lines of an ignore file which lives
+     in `basedir`."""
+  rules = []
+  for line in lines:
+    line = line.rstrip("\r\n")
+    if not line.endswith("\\ "):
+      line = line.rstrip()
+    if not line or line.startswith("#"):
+      continue
+    rules.append(IgnoreRule(basedir, line))
+  return rules
+
+
+class IgnoreRules(object):
+  """
+  An ordered collection of ignore rules accumulated while walking down a
+  directory tree. As with git, the last matching rule wins.
+  """
+
+  def __init__(self, rules=None):
+    self.rules = list(rules or [])
+
+  def extend(self, rules):
+    """Return a new `IgnoreRules` with `rules` appended."""
+    if not rules:
+      return self
+    return IgnoreRules(self.rules + list(rules))
+
+  def extend_from_dir(self, dirpath, filenames):
+    """Return a new `IgnoreRules` including the rules from any of the ignore
+       files `filenames` found in `dirpath`."""
+    rules = []
+    for filename in filenames:
+      ignorepath = os.path.join(dirpath, filename)
+      if not os.path.isfile(ignorepath):
+        continue
+      try:
+        with io.open(ignorepath, "r", encoding="utf-8") as infile:
+          rules.extend(parse_ignore_lines(dirpath, infile))
+      except (IOError, OSError, UnicodeDecodeError):
+        logger.warning("Failed to read ignore file %s", ignorepath)
+    return self.extend(rules)
+
+  def is_ignored(self, path, is_dir):
+    ignored = False
+    for rule in self.rules:
+      relpath = os.path.relpath(path, rule.basedir)
+      if relpath.startswith(os.pardir):
+        continue
+      relpath = relpath.replace(os.sep, "/")
+      if rule.match(relpath, is_dir):
+        ignored = not rule.negate
+    return ignored
+
+
+def iter_dir_entries(dirpath):
+  """Yield (name, path, is_dir, is_file) for each entry in `dirpath`."""
+  if hasattr(os, "scandir"):
+    for entry in os.scandir(dirpath):
+      yield (entry.name, entry.path,
+             entry.is_dir(follow_symlinks=False),
+             entry.is_file())
+  else:
+    for name in os.listdir(dirpath):
+      path = os.path.join(dirpath, name)
+      yield (name, path,
+             os.path.isdir(path) and not os.path.islink(path),
+             os.path.isfile(path))
+
+
+class ListfileFinder(object):
+  """
+  Configuration for a listfile search. `globs` are matched against file
+  basenames, `ignore_files` are the names of gitignore-style files to honor,
+  and `exclude` is an additional list of gitignore-style patterns relative
+  to each search root.
+  """
+
+  def __init__(self, globs, ignore_files=None, exclude=None):
+    self.globs = list(globs)
+    self.ignore_files = list(ignore_files or [])
+    self.exclude = list(exclude or [])
+
+  def is_listfile(self, name):
+    for pattern in self.globs:
+      if fnmatch.fnmatchcase(name, pattern):
+        return True
+    return False
+
+  def scan_dir(self, dirpath, rules):
+    """
+    Scan a single directory and return a tuple of `(listfiles, subdirs)`
+    where `subdirs` is a list of `(path, rules)` for each subdirectory that
+    should be descended into. Both lists are sorted.
+    """
+    rules = rules.extend_from_dir(dirpath, self.ignore_files)
+    listfiles = []
+    subdirs = []
+    try:
+      entries = sorted(iter_dir_entries(dirpath))
+    except (IOError, OSError) as ex:
+      logger.warning("Failed to scan %s: %s", dirpath, ex)
+      return listfiles, subdirs
+
+    for name, path, is_dir, is_file in entries:
+      if is_dir:
+        if name in SKIP_DIRNAMES or rules.is_ignored(path, True):
+          continue
+        subdirs.append((path, rules))
+      elif is_file and self.is_listfile(name):
+        if rules.is_ignored(path, False):
+          continue
+        listfiles.append(path)
+    return listfiles, subdirs
+
+  def iter_listfiles(self, rootdir):
+    """
+    Generate the paths of all listfiles under `rootdir` in depth-first,
+    sorted order. Directory scans are submitted to a thread pool as soon as
+    their parent has been scanned, so discovery runs ahead of the consumer.
+    """
+    rules = IgnoreRules(parse_ignore_lines(rootdir, self.exclude))
+
+    if futures is None:
+      stack = [(rootdir, rules)]
+      while stack:
+        dirpath, dirrules = stack.pop(-1)
+        listfiles, subdirs = self.scan_dir(dirpath, dirrules)
+        for path in listfiles:
+          yield path
+        stack.extend(reversed(subdirs))
+      return
+
+    executor = futures.ThreadPoolExecutor(NUM_SCAN_THREADS)
+    try:
+      stack = [executor.submit(self.scan_dir, rootdir, rules)]
+      while stack:
+        listfiles, subdirs = stack.pop(-1).result()
+        for path in listfiles:
+          yield path
+        stack.extend(reversed([
+            executor.submit(self.scan_dir, dirpath, dirrules)
+            for dirpath, dirrules in subdirs]))
+    finally:
+      for future in stack:
+        future.cancel()
+      executor.shutdown(wait=False)
+
+
+def iter_infilepaths(infilepaths, get_finder):
+  """
+  Expand the list of input paths from the command line. Files (and `-` for
+  stdin) are passed through as-is. Directories are replaced by the listfiles
+  discovered within them. `get_finder` is called with a directory path and
+  must return the `ListfileFinder` to use for that directory.
+  """
+  for infile_path in infilepaths:
+    if infile_path != "-" and os.path.isdir(infile_path):
+      finder = get_finder(infile_path)
+      for listfile_path in finder.iter_listfiles(infile_path):
+        yield listfile_path
+    else:
+      yield infile_path
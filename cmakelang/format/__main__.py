@@ -17,10 +17,7 @@ from __future__ import unicode_literals
 
 import argparse
 import collections
-try:
-  from collections.abc import Mapping
-except ImportError:
-  from collections import Mapping
+import functools
 import io
 import json
 import logging
@@ -31,11 +28,19 @@ import sys
 import cmakelang
 from cmakelang import common
 from cmakelang import configuration
-from cmakelang import config_util
+from cmakelang import config_loader
+from cmakelang import discovery
+from cmakelang import git_util
+from cmakelang.format import batch
+from cmakelang.format import explain
 from cmakelang.format import formatter
 from cmakelang import lex
 from cmakelang import markup
+from cmakelang import memstats
+from cmakelang import parallel
+from cmakelang import profiling
 from cmakelang import parse
+from cmakelang import stats
 from cmakelang.parse.argument_nodes import StandardParser2
 from cmakelang.parse.common import NodeType, TreeNode
 from cmakelang.parse.printer import dump_tree as dump_parse
@@ -131,9 +136,11 @@ def dump_parsedb(parsedb, outfile=None, indent=None):
       outfile.write(": {}\n".format(type(value)))
 
 
-def process_file(config, infile_content, dump=None):
+def process_file(config, infile_content, dump=None, line_ranges=None):
   """
-  Parse the input cmake file, re-format it, and print to the output file.
+  Parse the input cmake file, re-format it, and print to the output file. If
+  `line_ranges` is not None then only statements overlapping those (one-based,
+  inclusive) line ranges are reformatted.
   """
 
   outfile = io.StringIO(newline='')
@@ -141,7 +148,9 @@ def process_file(config, infile_content, dump=None):
     detected = detect_line_endings(infile_content)
     config = config.clone()
     config.format.set_line_ending(detected)
-  tokens = lex.tokenize(infile_content)
+  with stats.timer("lex"), memstats.stage("tokenize"):
+    tokens = lex.tokenize(infile_content)
+  stats.count("tokens", len(tokens))
   if dump == "lex":
     for token in tokens:
       outfile.write("{}\n".format(token))
@@ -155,7 +164,10 @@ def process_file(config, infile_content, dump=None):
     return outfile.getvalue(), True
 
   ctx = parse.ParseContext(parse_db, config=config)
-  parse_tree = parse.parse(tokens, ctx)
+  with stats.timer("parse"), memstats.stage("parse"):
+    parse_tree = parse.parse(tokens, ctx)
+  if stats.ACTIVE is not None:
+    stats.count("parse_nodes", stats.count_nodes(parse_tree))
   if dump == "parse":
     dump_parse([parse_tree], outfile)
     return outfile.getvalue(), True
@@ -163,16 +175,23 @@ def process_file(config, infile_content, dump=None):
     dump_markup([parse_tree], config, outfile)
     return outfile.getvalue(), True
 
-  box_tree = formatter.layout_tree(parse_tree, config, first_token=first_token)
+  with stats.timer("layout"):
+    box_tree = formatter.layout_tree(
+        parse_tree, config, first_token=first_token)
+  if stats.ACTIVE is not None:
+    stats.count("layout_nodes", stats.count_nodes(box_tree))
   if dump == "layout":
     formatter.dump_tree([box_tree], outfile)
     return outfile.getvalue(), True
 
-  outstr = formatter.write_tree(box_tree, config, infile_content)
+  with stats.timer("write"), memstats.stage("write_tree"):
+    outstr = formatter.write_tree(
+        box_tree, config, infile_content, line_ranges)
+  if line_ranges is None:
+    outstr = formatter.replace_with_tabs(outstr, config)
   if config.encode.emit_byteorder_mark:
     outstr = "\ufeff" + outstr
 
-  outstr = formatter.replace_with_tabs(outstr, config)
   return (outstr, box_tree.reflow_valid)
 
 
@@ -181,167 +200,35 @@ def find_config_file(infile_path):
   Search parent directories of an infile path and find a config file if
   one exists.
   """
-  realpath = os.path.realpath(infile_path)
-  if os.path.isdir(infile_path):
-    head = infile_path
-  else:
-    head, _ = os.path.split(realpath)
-
-  while head:
-    for filename in ['.cmake-format',
-                     '.cmake-format.py',
-                     '.cmake-format.json',
-                     '.cmake-format.yaml',
-                     'cmake-format.py',
-                     'cmake-format.json',
-                     'cmake-format.yaml', ]:
-      configpath = os.path.join(head, filename)
-      if os.path.exists(configpath):
-        return configpath
-    head2, _ = os.path.split(head)
-    if head == head2:
-      break
-    head = head2
-  return None
+  return config_loader.get_default_loader().find_config_file(infile_path)
 
 
 def load_yaml(config_file):
   """
   Attempt to load yaml configuration from an opened file
   """
-  import yaml
-  try:
-    from yaml import CLoader as Loader
-  except ImportError:
-    from yaml import Loader
-  out = yaml.load(config_file, Loader=Loader)
-  if out is None:
-    return {}
-  return out
-
-
-def exec_pyconfig(configfile_path):
-  _global = config_util.ExecGlobal(configfile_path)
-  with io.open(configfile_path, 'r', encoding='utf-8') as infile:
-    # pylint: disable=exec-used
-    exec(infile.read(), _global)
-  _global.pop("__builtins__", None)
-  return _global
-
-
-def try_get_configdict(configfile_path):
-  """
-  Try to read the configuration as yaml first, then json, then python.
-
-  TODO(josh): maybe read the first line and look for some kind of comment
-  sentinel to indicate the file format?
-  """
-  try:
-    with io.open(configfile_path, 'r', encoding='utf-8') as config_file:
-      return json.load(config_file)
-  except:  # pylint: disable=bare-except
-    pass
-
-  try:
-    with io.open(configfile_path, 'r', encoding='utf-8') as config_file:
-      return load_yaml(config_file)
-  except:  # pylint: disable=bare-except
-    pass
-
-  try:
-    return exec_pyconfig(configfile_path)
-  except:  # pylint: disable=bare-except
-    pass
-
-  raise RuntimeError("Failed to parse {} as any of yaml, json, or python"
-                     .format(configfile_path))
+  return config_loader.load_yaml(config_file)
 
 
 def get_one_config_dict(configfile_path):
   """
   Return a dictionary of configuration options read from the given file path.
   If the filepath has a known extension then we parse it according to that
-  extension. Otherwise we try to parse is using each parser one by one.
-  """
-  if not os.path.exists(configfile_path):
-    raise common.UserError(
-        "Desired config file does not exist: {}".format(configfile_path))
-
-  if configfile_path.endswith('.json'):
-    # NOTE(josh): an empty file is not valid JSON, but we don't need to be as
-    # pedantic
-    if os.stat(configfile_path).st_size == 0:
-      return {}
-    with io.open(configfile_path, 'r', encoding='utf-8') as config_file:
-      try:
-        return json.load(config_file)
-      except ValueError as ex:
-        message = (
-            "Failed to parse json config file {}: {}"
-            .format(configfile_path, ex))
-        raise common.UserError(message)
-
-  if configfile_path.endswith('.yaml'):
-    with io.open(configfile_path, 'r', encoding='utf-8') as config_file:
-      try:
-        return load_yaml(config_file)
-      except ValueError as ex:
-        message = (
-            "Failed to parse yaml config file {}: {}"
-            .format(configfile_path, ex))
-        raise common.UserError(message)
-
-  if configfile_path.endswith('.py'):
-    try:
-      return exec_pyconfig(configfile_path)
-    except Exception as ex:
-      message = (
-          "Failed to parse python config file {}: {}"
-          .format(configfile_path, ex))
-      raise common.UserError(message)
-
-  return try_get_configdict(configfile_path)
+  extension. Otherwise we sniff the content to determine the format.
+  """
+  return config_loader.get_default_loader().get_one_config_dict(
+      configfile_path)
 
 
 def get_configdict(configfile_paths):
-  include_queue = list(configfile_paths)
-  config_dict = {}
-  while include_queue:
-    configfile_path = include_queue.pop(0)
-    configfile_path = os.path.expanduser(configfile_path)
-    increment_dict = get_one_config_dict(configfile_path)
-
-    for include_path in increment_dict.pop("include", []):
-      if not os.path.isabs(include_path):
-        include_path = os.path.join(
-            os.path.dirname(configfile_path), include_path)
-      include_queue.append(include_path)
-    map_merge(config_dict, increment_dict)
-  return config_dict
+  return config_loader.get_default_loader().get_configdict(configfile_paths)
 
 
 def map_merge(output_map, increment_map):
   """
   Merge `increment_map` into `output_map` recursively.
   """
-  for key, increment_value in increment_map.items():
-    if key not in output_map:
-      output_map[key] = increment_value
-      continue
-
-    existing_value = output_map[key]
-    if isinstance(existing_value, Mapping):
-      if isinstance(increment_value, Mapping):
-        map_merge(existing_value, increment_value)
-      else:
-        logger.warning(
-            "Cannot merge config %s of type %s into a dictionary",
-            key, type(increment_value))
-      continue
-
-    output_map[key] = increment_value
-
-  return output_map
+  return config_loader.map_merge(output_map, increment_map)
 
 
 def get_config(infile_path, configfile_paths):
@@ -350,13 +237,8 @@ def get_config(infile_path, configfile_paths):
   for a config file in the ancestry of the filesystem of infile_path and find
   a config file to load.
   """
-  if configfile_paths is None:
-    inferred_configpath = find_config_file(infile_path)
-    if inferred_configpath is None:
-      return {}
-    configfile_paths = [inferred_configpath]
-
-  return get_configdict(configfile_paths)
+  return config_loader.get_default_loader().get_config(
+      infile_path, configfile_paths)
 
 
 def yaml_odict_handler(dumper, value):
@@ -405,7 +287,11 @@ def dump_config(args, config_dict, outfile):
 USAGE_STRING = """
 cmake-format [-h]
              [--dump-config {yaml,json,python} | -i | -o OUTFILE_PATH]
-             [-c CONFIG_FILE]
+             [-c CONFIG_FILE] [-j JOBS]
+             [--since REV] [--staged] [--changed-lines-only]
+             [--stats[=json]] [--profile OUT [--profile-per-file]]
+             [--trace OUT] [--slowest N [--slowest-format {text,json}]]
+             [--memstats] [--explain-layout LINE]
              infilepath [infilepath ...]
 """
 
@@ -436,6 +322,11 @@ def setup_argparser(argparser):
   mutex.add_argument(
       '--dump', choices=['lex', 'parse', 'parsedb', 'layout', 'markup'],
       default=None)
+  argparser.add_argument(
+      '--explain-layout', type=int, metavar='LINE', default=None,
+      help="Write a trace of every layout attempt for the statement at line"
+           " LINE, with the reason each rejected layout was rejected, to"
+           " stderr")
 
   argparser.add_argument(
       "--no-help", action="store_false", dest="with_help",
@@ -457,11 +348,42 @@ def setup_argparser(argparser):
   mutex.add_argument('-o', '--outfile-path', default=None,
                      help='Where to write the formatted file. '
                           'Default is stdout.')
+  mutex.add_argument(
+      '--batch', choices=batch.FRAMINGS, default=None, const='length',
+      nargs='?',
+      help='Read a stream of (path hint, content) records from stdin and '
+           'write a framed (path hint, status, content) result to stdout for '
+           'each one, in order. Records are either length-prefixed or '
+           'NUL-delimited. See cmakelang/format/batch.py for details.')
 
   argparser.add_argument(
       '-c', '--config-files', nargs='+', action='extend',
       help='path to configuration file(s)')
-  argparser.add_argument('infilepaths', nargs='*')
+  argparser.add_argument(
+      '-j', '--jobs', type=int, default=1,
+      help='Number of worker processes to use. Zero means one per cpu.')
+  argparser.add_argument(
+      '--since', metavar='REV', default=None,
+      help='Only process listfiles which differ (according to git) between'
+           ' REV and the working tree. Input paths, if given, restrict this'
+           ' to the changed files within them.')
+  argparser.add_argument(
+      '--staged', action='store_true',
+      help='Only process listfiles with changes staged in the git index'
+           ' (relative to REV if --since is also given).')
+  argparser.add_argument(
+      '--changed-lines-only', action='store_true',
+      help='With --since or --staged, only reformat statements which overlap'
+           ' the changed lines. Everything else is left untouched.')
+  stats.add_argument(argparser)
+  stats.add_trace_argument(argparser)
+  stats.add_slowest_argument(argparser)
+  profiling.add_argument(argparser)
+  memstats.add_argument(argparser)
+  argparser.add_argument(
+      'infilepaths', nargs='*',
+      help='Listfiles to process. Directories are searched recursively for'
+           ' files matching `listfile_globs`.')
 
   configuration.Configuration().add_to_argparser(argparser)
 
@@ -478,16 +400,21 @@ def get_argdict(args):
     if hasattr(configuration.Configuration, key):
       continue
     # Remove common command line arguments
-    if key in ["log_level", "outfile_path", "infilepaths", "config_files"]:
+    if key in ["log_level", "outfile_path", "infilepaths", "config_files",
+               "jobs", "stats", "trace", "slowest", "slowest_format",
+               "profile", "profile_per_file", "memstats"]:
       continue
     # Remove --dump-config command line arguments
     if key in ["dump_config", "with_help", "with_defaults"]:
       continue
     # Remove cmake-format command line arguments
-    if key in ["dump", "check", "in_place"]:
+    if key in ["dump", "check", "in_place", "since", "staged",
+               "changed_lines_only", "batch", "explain_layout"]:
       continue
     # Remove cmake-lint command line arguments
-    if key in ["suppress_decorations"]:
+    if key in ["suppress_decorations", "cache_dir", "cache_size",
+               "baseline", "write_baseline", "output_format",
+               "project_index"]:
       continue
     if value is None:
       continue
@@ -496,9 +423,81 @@ def get_argdict(args):
   return out
 
 
-def onefile_main(infile_path, args, argparse_dict):
+def get_listfile_finder(dirpath, args, argparse_dict):
   """
-  Find config, open file, process, write result
+  Return the `discovery.ListfileFinder` configured for searching the
+  directory `dirpath`.
+  """
+  config_dict = get_config(dirpath, args.config_files)
+  cfg = configuration.Configuration(**config_dict)
+  cfg.legacy_consume(dict(argparse_dict))
+  return discovery.ListfileFinder(
+      cfg.misc.listfile_globs, cfg.misc.ignore_files, cfg.misc.exclude)
+
+
+def iter_infilepaths(args, argparse_dict):
+  """
+  Generate the input file paths from the command line, expanding any
+  directories into the listfiles found within them.
+  """
+  return discovery.iter_infilepaths(
+      args.infilepaths,
+      functools.partial(
+          get_listfile_finder, args=args, argparse_dict=argparse_dict))
+
+
+def iter_changed_listfiles(args, argparse_dict):
+  """
+  Generate the paths of the listfiles changed according to git (see `--since`
+  and `--staged`). If input paths are given on the command line, only changed
+  files at or within those paths are generated.
+  """
+  finder = get_listfile_finder(os.getcwd(), args, argparse_dict)
+  roots = [os.path.realpath(infile_path) for infile_path in args.infilepaths]
+  for changed_path in git_util.get_changed_files(args.since, args.staged):
+    realpath = os.path.realpath(changed_path)
+    if realpath not in roots:
+      if not finder.is_listfile(os.path.basename(realpath)):
+        continue
+      if roots and not any(
+          realpath.startswith(os.path.join(root, "")) for root in roots):
+        continue
+    if os.path.isfile(realpath):
+      yield os.path.relpath(changed_path)
+
+
+def get_changed_lines(args):
+  """
+  Return a map from the real path of each changed file to the list of changed
+  line ranges, if --changed-lines-only was requested. Otherwise return None.
+  """
+  if not args.changed_lines_only:
+    return None
+  return {
+      os.path.realpath(changed_path): ranges
+      for changed_path, ranges in git_util.get_changed_lines(
+          args.since, args.staged).items()}
+
+
+def write_stdout(outbytes):
+  """
+  Write already-encoded output to stdout.
+  """
+  # NOTE(josh): The behavior of sys.stdout is different in python2 and
+  # python3. sys.stdout is opened in 'w' mode which means that write()
+  # takes strings in python2 and python3 and, in particular, in python3
+  # it does not take byte arrays. So we use io.open on a duplicate of the
+  # file descriptor instead.
+  with io.open(os.dup(sys.stdout.fileno()), mode='wb') as outfile:
+    outfile.write(outbytes)
+
+
+def onefile_main(infile_path, args, argparse_dict, line_ranges=None):
+  """
+  Find config, open file, process, write result. If the result is destined
+  for stdout then it is returned (encoded) rather than written, so that the
+  caller can serialize the output of parallel workers. If `line_ranges` is
+  not None, only statements overlapping those lines are reformatted.
   """
   # NOTE(josh): have to load config once for every file, because we may pick
   # up a new config file location for each path
@@ -519,17 +518,23 @@ def onefile_main(infile_path, args, argparse_dict):
   else:
     infile = io.open(
         infile_path, 'r', encoding=cfg.encode.input_encoding, newline='')
-  with infile:
+  with infile, stats.timer("read"):
     intext = infile.read()
 
   try:
-    outtext, reflow_valid = process_file(cfg, intext, args.dump)
+    with profiling.section(), \
+        explain.collect(args.explain_layout) as explainer:
+      outtext, reflow_valid = process_file(
+          cfg, intext, args.dump, line_ranges)
     if cfg.format.require_valid_layout and not reflow_valid:
       raise common.FormatError("Failed to format {}".format(infile_path))
   except:
     logger.warning('While processing %s', infile_path)
     raise
 
+  if explainer is not None:
+    explainer.write_report(sys.stderr)
+
   if args.check:
     if intext != outtext:
       raise common.FormatError("Check failed: {}".format(infile_path))
@@ -542,21 +547,12 @@ def onefile_main(infile_path, args, argparse_dict):
     tempfile_path = infile_path + ".cmf-temp"
     outfile = io.open(
         tempfile_path, 'w', encoding=cfg.encode.output_encoding, newline='')
+  elif args.outfile_path == '-':
+    return outtext.encode(cfg.encode.output_encoding)
   else:
-    if args.outfile_path == '-':
-      # NOTE(josh): The behavior of sys.stdout is different in python2 and
-      # python3. sys.stdout is opened in 'w' mode which means that write()
-      # takes strings in python2 and python3 and, in particular, in python3
-      # it does not take byte arrays. io.StreamWriter will write to
-      # it with byte arrays (assuming it was opened with 'wb'). So we use
-      # io.open instead of open in this case
-      outfile = io.open(
-          os.dup(sys.stdout.fileno()),
-          mode='w', encoding=cfg.encode.output_encoding, newline='')
-    else:
-      outfile = io.open(
-          args.outfile_path, 'w', encoding=cfg.encode.output_encoding,
-          newline='')
+    outfile = io.open(
+        args.outfile_path, 'w', encoding=cfg.encode.output_encoding,
+        newline='')
 
   with outfile:
     outfile.write(outtext)
@@ -564,6 +560,99 @@ def onefile_main(infile_path, args, argparse_dict):
   if args.in_place:
     shutil.copymode(infile_path, tempfile_path)
     shutil.move(tempfile_path, infile_path)
+  return None
+
+
+# Result of processing one file with `onefile_worker()`
+WorkerResult = collections.namedtuple(
+    "WorkerResult",
+    ["infile_path", "outbytes", "error_msg", "stats", "profile",
+     "memstats"])
+
+
+def onefile_worker(infile_path, args, argparse_dict, changed_lines=None):
+  """
+  Wrapper for `onefile_main` to be mapped over input files, possibly in a
+  worker process. Returns a `WorkerResult` rather than raising `FormatError`,
+  so that the remaining files are still processed. `changed_lines`, if not
+  None, is the map returned by `get_changed_lines()`.
+  """
+  line_ranges = None
+  if changed_lines is not None:
+    line_ranges = changed_lines.get(os.path.realpath(infile_path), [])
+
+  outbytes = None
+  error_msg = None
+  with stats.collect(infile_path, stats.is_requested(args),
+                     trace=bool(args.trace)) as file_stats, \
+      profiling.collect(infile_path, bool(args.profile)) as file_profile, \
+      memstats.collect(infile_path, args.memstats) as file_memstats:
+    try:
+      outbytes = onefile_main(infile_path, args, argparse_dict, line_ranges)
+    except common.FormatError as ex:
+      error_msg = ex.msg
+  return WorkerResult(
+      infile_path, outbytes, error_msg, file_stats, file_profile,
+      file_memstats)
+
+
+def batch_worker(record, args, argparse_dict):
+  """
+  Format one `--batch` record of (path hint, content) and return the fields
+  of the output record: (path hint, status, formatted content or error
+  message).
+  """
+  # NOTE(josh): one bad buffer must not end the stream, so any error is
+  # reported as an error record instead of escaping the worker.
+  path_hint_bytes, content = record
+  path_hint = "<undecoded>"
+  try:
+    path_hint = path_hint_bytes.decode('utf-8', 'replace')
+    config_dict = get_config(path_hint or os.getcwd(), args.config_files)
+    cfg = configuration.Configuration(**config_dict)
+    cfg.legacy_consume(dict(argparse_dict))
+    intext = content.decode(cfg.encode.input_encoding)
+    if cfg.format.disable:
+      outtext = intext
+    else:
+      outtext, reflow_valid = process_file(cfg, intext)
+      if cfg.format.require_valid_layout and not reflow_valid:
+        raise common.FormatError("Failed to format {}".format(path_hint))
+    return (path_hint_bytes, b"ok",
+            outtext.encode(cfg.encode.output_encoding))
+  except (common.FormatError, common.UserError) as ex:
+    msg = ex.msg or "Failed to format {}".format(path_hint)
+    return (path_hint_bytes, b"error", msg.encode('utf-8'))
+  except UnicodeError as ex:
+    msg = "Unable to decode {}: {}".format(path_hint, ex)
+    return (path_hint_bytes, b"error", msg.encode('utf-8'))
+  except Exception as ex:  # pylint: disable=broad-except
+    logger.exception("Internal error while formatting %s", path_hint)
+    msg = "An internal error occured while formatting {}: {}".format(
+        path_hint, getattr(ex, "msg", None) or repr(ex))
+    return (path_hint_bytes, b"error", msg.encode('utf-8'))
+
+
+def batch_main(args, argparse_dict):
+  """
+  Process `--batch` records from stdin, writing results to stdout as each
+  one completes.
+  """
+  infile = io.open(os.dup(sys.stdin.fileno()), mode='rb')
+  outfile = io.open(os.dup(sys.stdout.fileno()), mode='wb')
+  worker = functools.partial(
+      batch_worker, args=args, argparse_dict=argparse_dict)
+
+  returncode = 0
+  with infile, outfile:
+    records = batch.iter_records(infile, args.batch)
+    for fields in parallel.imap(worker, records, args.jobs):
+      if fields[1] != b"ok":
+        logger.error(fields[2].decode('utf-8'))
+        returncode = 1
+      outfile.write(batch.encode_record(fields, args.batch))
+      outfile.flush()
+  return returncode
 
 
 def inner_main():
@@ -594,7 +683,16 @@ def inner_main():
 
   assert args.in_place is False or args.outfile_path is None, \
       "if inplace is specified than outfile is invalid"
-  assert (len(args.infilepaths) == 1
+
+  if args.batch:
+    assert not args.infilepaths, \
+        "input paths are read from stdin in --batch mode"
+    assert not (args.dump or args.since is not None or args.staged), \
+        "--batch cannot be combined with --dump, --since or --staged"
+    return batch_main(args, get_argdict(args))
+  use_git = args.since is not None or args.staged
+  assert ((len(args.infilepaths) == 1 and not use_git
+           and not os.path.isdir(args.infilepaths[0]))
           or (args.in_place is True or args.outfile_path is None)), \
       ("if more than one input file is specified, then formatting must be done"
        " in-place or written to stdout")
@@ -608,16 +706,55 @@ def inner_main():
     assert args.outfile_path == '-', \
         "If stdin is the input file, then stdout must be the output file"
 
+  assert use_git or not args.changed_lines_only, \
+      "--changed-lines-only requires --since or --staged"
+  assert not (use_git and '-' in args.infilepaths), \
+      "stdin cannot be used as input with --since or --staged"
+
   argparse_dict = get_argdict(args)
 
+  if use_git:
+    infilepaths = iter_changed_listfiles(args, argparse_dict)
+    changed_lines = get_changed_lines(args)
+  else:
+    infilepaths = iter_infilepaths(args, argparse_dict)
+    changed_lines = None
+
+  worker = functools.partial(
+      onefile_worker, args=args, argparse_dict=argparse_dict,
+      changed_lines=changed_lines)
+
   returncode = 0
-  for infile_path in args.infilepaths:
-    try:
-      onefile_main(infile_path, args, argparse_dict)
-    except common.FormatError as ex:
-      logger.error(ex.msg)
+  stats_list = []
+  profile_list = []
+  memstats_list = []
+  for result in parallel.imap(worker, infilepaths, args.jobs):
+    if result.error_msg is not None:
+      logger.error(result.error_msg)
       returncode = 1
-
+    if result.outbytes is not None:
+      write_stdout(result.outbytes)
+    if result.stats is not None:
+      stats_list.append(result.stats)
+    if result.profile is not None:
+      profile_list.append(result.profile)
+    if result.memstats is not None:
+      memstats_list.append(result.memstats)
+
+  if args.stats:
+    stats.write_report(sys.stderr, args.stats, stats_list)
+  if args.trace:
+    with io.open(args.trace, "w", encoding="utf-8") as outfile:
+      stats.write_trace(outfile, stats_list)
+  if args.slowest and args.slowest_format == "json":
+    stats.write_slowest_json(sys.stderr, stats_list, args.slowest)
+  elif args.slowest:
+    stats.write_slowest_text(sys.stderr, stats_list, args.slowest)
+  if args.profile:
+    profiling.write_profiles(
+        args.profile, profile_list, args.profile_per_file)
+  if args.memstats:
+    memstats.write_report(sys.stderr, memstats_list)
   return returncode
 
 
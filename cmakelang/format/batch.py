@@ -0,0 +1,118 @@
+"""
+Record framing for ``cmake-format --batch``.
+
+In batch mode cmake-format reads a stream of records from stdin, formats each
+one, and writes one result record to stdout per input record, in the same
+order. Each input record has two fields:
+
+1. a path hint, used to resolve configuration (as if the content were a file
+   at that path) and in messages. It need not exist. An empty hint means the
+   current directory.
+2. the listfile content
+
+Each output record has three fields:
+
+1. the path hint, echoed back
+2. the status: ``ok`` or ``error``
+3. the formatted content, or the error message if the status is ``error``
+
+Path hints and status are utf-8. Content is in the configured
+``input_encoding`` / ``output_encoding``. Two framings are supported:
+
+* ``length`` (default): each field is its size in bytes as ascii decimal,
+  a newline, and then exactly that many bytes, e.g.
+  ``14\\nCMakeLists.txt11\\nset(a   b)\\n``
+* ``nul``: each field is terminated by a NUL byte, e.g.
+  ``CMakeLists.txt\\0set(a   b)\\n\\0``
+
+Output is flushed after each record, so a generator may interleave writing
+records with reading results.
+"""
+
+from __future__ import unicode_literals
+
+from cmakelang import common
+
+FRAMINGS = ("length", "nul")
+
+# Number of fields in an input record, and in an output record
+NUM_INPUT_FIELDS = 2
+NUM_OUTPUT_FIELDS = 3
+
+
+def iter_length_fields(infile):
+  """Generate length-prefixed fields (as bytes) from a binary file."""
+  while True:
+    header = infile.readline()
+    if not header:
+      return
+    try:
+      size = int(header.strip())
+    except ValueError:
+      raise common.UserError(
+          "Invalid batch field header: {!r}".format(header))
+    data = infile.read(size) if size else b""
+    if len(data) != size:
+      raise common.UserError(
+          "Truncated batch field: expected {} bytes, got {}"
+          .format(size, len(data)))
+    yield data
+
+
+def iter_nul_fields(infile, chunksize=65536):
+  """Generate NUL-terminated fields (as bytes) from a binary file."""
+  # NOTE(josh): use read1() so that we don't block waiting for a full chunk
+  # when the writer is waiting on our output.
+  read = getattr(infile, "read1", infile.read)
+  # NOTE(josh): only the new chunk is searched for a terminator, and the
+  # pieces of a field are joined once it is complete, so that a field spanning
+  # many chunks isn't copied and scanned again for each one.
+  pieces = []
+  while True:
+    chunk = read(chunksize)
+    if not chunk:
+      break
+    start = 0
+    end = chunk.find(b"\0")
+    while end >= 0:
+      pieces.append(chunk[start:end])
+      yield b"".join(pieces)
+      pieces = []
+      start = end + 1
+      end = chunk.find(b"\0", start)
+    if start < len(chunk):
+      pieces.append(chunk[start:])
+  if pieces:
+    raise common.UserError("Batch input does not end with a NUL terminator")
+
+
+def iter_records(infile, framing="length", num_fields=NUM_INPUT_FIELDS):
+  """Generate tuples of `num_fields` fields from a binary file."""
+  if framing == "length":
+    fields = iter_length_fields(infile)
+  elif framing == "nul":
+    fields = iter_nul_fields(infile)
+  else:
+    raise common.UserError("Unknown batch framing {}".format(framing))
+
+  record = []
+  for field in fields:
+    record.append(field)
+    if len(record) == num_fields:
+      yield tuple(record)
+      record = []
+  if record:
+    raise common.UserError(
+        "Incomplete batch record: got {} of {} fields"
+        .format(len(record), num_fields))
+
+
+def encode_record(fields, framing="length"):
+  """Return the framed bytes for a record of fields (each bytes)."""
+  if framing == "nul":
+    for field in fields:
+      if b"\0" in field:
+        raise common.UserError("Batch output field contains a NUL byte")
+    return b"".join(field + b"\0" for field in fields)
+  return b"".join(
+      "{:d}\n".format(len(field)).encode("ascii") + field for field in fields)
@@ -0,0 +1,184 @@
+"""
+Record the layout search for the statement at one line of a listfile, to
+explain why it was formatted the way it was.
+
+Like `stats`, this is disabled unless an explainer is activated with
+`collect()`. While active, `LayoutNode.reflow()` records every layout
+attempt (one per pass that is tried) for each node within the target
+statement: the pass number and wrap decision, the cursor in and out, the
+column extent and whether the layout was accepted. When a layout is rejected
+the node records the reason with `reject()`:
+
+* ``overflow``: the layout overflows the line width
+* ``max_lines_hwrap``: horizontal wrapping takes too many lines
+* ``always_wrap``: the node path is configured to always wrap
+* ``max_prefix_chars``: the statement name or keyword is too long to not nest
+* ``max_pargs_hwrap``: too many positional arguments to not wrap
+* ``max_subgroups_hwrap``: too many argument subgroups to not wrap
+* ``max_rows_cmdline``: a command line wraps onto too many rows
+* ``rparen_overflow``: there is no room for the closing parenthesis
+
+A rejected layout with no reason of its own was rejected because the layout
+of one of its children was rejected (``child``).
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import contextlib
+
+from cmakelang.parse.common import NodeType
+from cmakelang.parse.util import iter_syntactic_tokens
+
+# The currently active explainer, if any
+ACTIVE = None
+
+# Node types which have a single token as their content
+TOKEN_NODE_TYPES = (
+    NodeType.FUNNAME, NodeType.ARGUMENT, NodeType.KEYWORD, NodeType.FLAG,
+    NodeType.LPAREN, NodeType.RPAREN)
+
+
+class Attempt(object):
+  """One pass of the layout of one node."""
+
+  def __init__(self, node, depth, passno, wrap, cursor):
+    self.node = node
+    self.depth = depth
+    self.passno = passno
+    self.wrap = wrap
+    self.cursor_in = tuple(cursor)
+    self.cursor_out = None
+    self.colextent = None
+    self.valid = None
+    self.reasons = []
+
+  def get_reason(self):
+    if self.valid:
+      return None
+    if self.reasons:
+      return ",".join(self.reasons)
+    return "child"
+
+
+def describe_node(node):
+  """Return a short string identifying a layout node."""
+  if node.node_type is NodeType.STATEMENT:
+    detail = node.name
+  elif node.node_type is NodeType.KWARGGROUP:
+    detail = node.name
+  elif node.node_type in TOKEN_NODE_TYPES and node.pnode.children:
+    spelling = node.pnode.children[0].spelling
+    if len(spelling) > 24:
+      spelling = spelling[:21] + "..."
+    detail = '"{}"'.format(spelling)
+  else:
+    detail = node.node_type.name
+  return "{}({})".format(node.__class__.__name__, detail)
+
+
+def get_statement_lines(node):
+  """Return the (first, last) one-based source lines of a statement node."""
+  tokens = list(iter_syntactic_tokens(node.pnode.get_tokens()))
+  return tokens[0].begin.line, tokens[-1].end.line
+
+
+class LayoutExplainer(object):
+  """Records the layout attempts for the statement(s) at `lineno`."""
+
+  def __init__(self, lineno):
+    self.lineno = lineno
+    self.statements = []
+    self.attempts = []
+    self._stack = []
+
+  def is_target(self, node):
+    """Return true if attempts at laying out `node` should be recorded."""
+    if self._stack:
+      return True
+    if node.node_type is not NodeType.STATEMENT:
+      return False
+    first, last = get_statement_lines(node)
+    if first <= self.lineno <= last:
+      if node not in self.statements:
+        self.statements.append(node)
+      return True
+    return False
+
+  def begin_attempt(self, node, passno, wrap, cursor):
+    attempt = Attempt(node, len(self._stack), passno, wrap, cursor)
+    self.attempts.append(attempt)
+    self._stack.append(attempt)
+
+  def end_attempt(self, node, cursor):
+    attempt = self._stack.pop(-1)
+    assert attempt.node is node
+    attempt.cursor_out = tuple(cursor)
+    attempt.colextent = node.colextent
+    attempt.valid = node.reflow_valid
+
+  def reject(self, node, reason):
+    if self._stack and self._stack[-1].node is node:
+      self._stack[-1].reasons.append(reason)
+
+  def write_report(self, outfile):
+    """Write the attempts as an indented tree, followed by the counts of
+       attempts by node type and of rejections by reason."""
+    outfile.write("explain-layout: line {}\n".format(self.lineno))
+    if not self.statements:
+      outfile.write("  no statement at line {}\n".format(self.lineno))
+      return
+
+    for attempt in self.attempts:
+      outfile.write(
+          "{}{} pass={} wrap={} in=({},{}) out=({},{}) colextent={} {}\n"
+          .format(
+              "  " * (attempt.depth + 1), describe_node(attempt.node),
+              attempt.passno, "T" if attempt.wrap else "F",
+              attempt.cursor_in[0], attempt.cursor_in[1],
+              attempt.cursor_out[0], attempt.cursor_out[1],
+              attempt.colextent,
+              "ok" if attempt.valid
+              else "rejected: {}".format(attempt.get_reason())))
+
+    node_counts = collections.Counter(
+        attempt.node.__class__.__name__ for attempt in self.attempts)
+    reason_counts = collections.Counter(
+        attempt.get_reason() for attempt in self.attempts
+        if not attempt.valid)
+    outfile.write("\n  {} attempts, {} rejected\n".format(
+        len(self.attempts), sum(reason_counts.values())))
+    outfile.write("  attempts by node:\n")
+    for name, count in node_counts.most_common():
+      outfile.write("    {:>6d} {}\n".format(count, name))
+    if reason_counts:
+      outfile.write("  rejections by reason:\n")
+      for reason, count in reason_counts.most_common():
+        outfile.write("    {:>6d} {}\n".format(count, reason))
+
+
+def reject(node, reason):
+  """Record `reason` as a reason the current layout of `node` is rejected."""
+  if ACTIVE is not None:
+    ACTIVE.reject(node, reason)
+
+
+@contextlib.contextmanager
+def collect(lineno):
+  """
+  Activate a new `LayoutExplainer` for the statement at `lineno` for the
+  duration of the context and yield it. If `lineno` is None, yield None and
+  leave the explainer disabled.
+  """
+  global ACTIVE  # pylint: disable=global-statement
+  if lineno is None:
+    yield None
+    return
+
+  prev = ACTIVE
+  ACTIVE = LayoutExplainer(lineno)
+  explainer = ACTIVE
+  try:
+    yield explainer
+  finally:
+    ACTIVE = prev
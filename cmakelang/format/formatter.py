@@ -11,8 +11,11 @@ import sys
 
 from cmakelang import lex
 from cmakelang import markup
+from cmakelang import memstats
+from cmakelang import stats
+from cmakelang.format import explain
 
-from cmakelang.common import UserError
+from cmakelang.common import FAST_MODE, UserError
 from cmakelang.lex import TokenType
 from cmakelang.parse.argument_nodes import PositionalGroupNode
 from cmakelang.parse.common import FlowType, NodeType, TreeNode
@@ -32,6 +35,8 @@ PAREN_TYPES = (NodeType.LPAREN, NodeType.RPAREN)
 
 MATCH_TYPES = BLOCK_TYPES + GROUP_TYPES + SCALAR_TYPES + PAREN_TYPES
 
+IS_PY2 = sys.version_info[0] < 3
+
 
 def clamp(value, min_value, max_value):
   """Simple double-ended saturation function."""
@@ -78,6 +83,8 @@ def format_comment_lines(node, stack_context, line_width):
   """
   config = stack_context.config
   inlines = get_comment_lines(config, node)
+  if stats.ACTIVE is not None:
+    stats.ACTIVE.count("comment_reflows")
 
   if (isinstance(node, simple_nodes.CommentNode) and node.is_explicit_trailing):
     prefix = config.markup.explicit_trailing_pattern
@@ -296,6 +303,12 @@ class StackContext(object):
 
 
 class AssertTypeDescriptor(object):
+  """
+  Data descriptor which asserts the type of each value assigned to it. In fast
+  mode (see `cmakelang.common.FAST_MODE`) these are not installed and the
+  attributes are plain instance attributes.
+  """
+
   def __init__(self, assert_type, hidden_name):
     self._assert_type = assert_type
     self._hidden_name = hidden_name
@@ -316,8 +329,9 @@ class LayoutNode(object):
   separate I think.
   """
 
-  _position = AssertTypeDescriptor(Cursor, "__position")
-  _size = AssertTypeDescriptor(Cursor, "__size")
+  if not FAST_MODE:
+    _position = AssertTypeDescriptor(Cursor, "__position")
+    _size = AssertTypeDescriptor(Cursor, "__size")
 
   def __init__(self, pnode):
     self.pnode = pnode
@@ -364,7 +378,8 @@ class LayoutNode(object):
     # when viewing the tree for debugging.
     self._wrap = False
 
-    assert isinstance(pnode, TreeNode)
+    if not FAST_MODE:
+      assert isinstance(pnode, TreeNode)
 
   def _index_in_parent(self):
     for idx, child in enumerate(self._parent.children):
@@ -469,12 +484,13 @@ class LayoutNode(object):
   # Lock the tree structure and prevent further updates.
   # Compute `stmt_depth` and `subtree_depth`. Replace the children list with
   # a tuple.
-  def lock(self, config, stmt_depth=0):
+  def lock(self, config, stmt_depth=0, cmdconfig=None):
     """
     Lock the tree structure (topology) and prevent further updates. This is
     mostly for sanity checking. It also computes topological statistics such
     as `stmt_depth` and `subtree_depth`, and replaces the mutable list of
-    children with an immuatable tuple.
+    children with an immuatable tuple. `cmdconfig` is the `CommandConfig` of
+    the statement which contains this node (if any).
     """
     self._stmt_depth = stmt_depth
     self._subtree_depth = self.get_depth()
@@ -493,7 +509,7 @@ class LayoutNode(object):
       nextdepth = 0
 
     for child in self._children:
-      child.lock(config, nextdepth)
+      child.lock(config, nextdepth, cmdconfig)
 
   def _reflow(self, stack_context, cursor, passno):
     """
@@ -513,6 +529,7 @@ class LayoutNode(object):
     # If the bounding box overflows the column limit then the layout is
     # automatically voided
     if end_extent[1] > config.format.linewidth:
+      explain.reject(self, "overflow")
       return False
 
     size = end_extent - start_extent
@@ -524,11 +541,13 @@ class LayoutNode(object):
       # contributions to the size, as noted in the algorithm doc.
       if size[0] > config.format.max_lines_hwrap:
         if not isinstance(self, (BodyNode, CommentNode, FlowControlNode)):
+          explain.reject(self, "max_lines_hwrap")
           return False
 
       # Or if this nodepath is marked to always be vertical layout
       pathstr = get_pathstr(stack_context.node_path)
       if pathstr in config.format.always_wrap:
+        explain.reject(self, "always_wrap")
         return False
 
     return True
@@ -539,8 +558,9 @@ class LayoutNode(object):
     be placed at the given `cursor` on the current `parent_passno`.
     """
 
-    assert self._locked
-    assert isinstance(self.pnode, TreeNode)
+    if not FAST_MODE:
+      assert self._locked
+      assert isinstance(self.pnode, TreeNode)
 
     self._position = cursor.clone()
     outcursor = None
@@ -549,10 +569,22 @@ class LayoutNode(object):
         stack_context.config.format.layout_passes.get(
             self.__class__.__name__, self._layout_passes)
 
+    collector = stats.ACTIVE
+    if collector is not None:
+      collector.count("reflow_calls")
+
+    explainer = explain.ACTIVE
+    if explainer is not None and not explainer.is_target(self):
+      explainer = None
+
     with stack_context.push_node(self):
       for passno, wrap in layout_passes:
         if passno > parent_passno:
           break
+        if collector is not None:
+          collector.count("passes." + self.__class__.__name__)
+        if explainer is not None:
+          explainer.begin_attempt(self, passno, wrap, cursor)
         self._passno = passno
         self._wrap = wrap
         self._reflow_valid = True
@@ -562,9 +594,12 @@ class LayoutNode(object):
         end_extent = Cursor(outcursor[0], self._colextent)
         self._reflow_valid &= self._validate_layout(
             stack_context, start_extent, end_extent)
+        if explainer is not None:
+          explainer.end_attempt(self, outcursor)
         if self._reflow_valid:
           break
-    assert outcursor is not None
+    if not FAST_MODE:
+      assert outcursor is not None
     return outcursor
 
   def write(self, config, ctx):
@@ -638,6 +673,14 @@ class ScalarNode(LayoutNode):
   positional arguments.
   """
 
+  def __init__(self, pnode):
+    super(ScalarNode, self).__init__(pnode)
+    self._cmdconfig = None
+
+  def lock(self, config, stmt_depth=0, cmdconfig=None):
+    super(ScalarNode, self).lock(config, stmt_depth, cmdconfig)
+    self._cmdconfig = cmdconfig
+
   def has_terminal_comment(self):
     if not self.children:
       return False
@@ -653,9 +696,11 @@ class ScalarNode(LayoutNode):
     Reflow is pretty trivial for a scalar node. We don't have any choices to
     make, there is only one possible rendering.
     """
-    assert self.pnode.children
+    if not FAST_MODE:
+      assert self.pnode.children
     token = self.pnode.children[0]
-    assert isinstance(token, lex.Token)
+    if not FAST_MODE:
+      assert isinstance(token, lex.Token)
 
     # This might be a multiline string or a multiline bracket argument. In
     # that case we need to normalize line endings and flow each line
@@ -675,14 +720,15 @@ class ScalarNode(LayoutNode):
     # up as children in the layout graph. This is the only possible child of
     # a scalar node.
     if self.children:
-      # We should not have more than one terminal comment associated with a
-      # given scalar node
-      assert len(self.children) == 1
-
-      # The only kind of children we store for a scalar node are argument
-      # comments.
       child = self.children[0]
-      assert child.node_type == NodeType.COMMENT
+      if not FAST_MODE:
+        # We should not have more than one terminal comment associated with a
+        # given scalar node
+        assert len(self.children) == 1
+
+        # The only kind of children we store for a scalar node are argument
+        # comments.
+        assert child.node_type == NodeType.COMMENT
 
       # Reflow the comment after the scalar
       cursor = child.reflow(stack_context, cursor + (0, 1), passno)
@@ -699,24 +745,31 @@ class ScalarNode(LayoutNode):
     assert isinstance(token, lex.Token)
 
     spelling = normalize_line_endings(token.spelling)
+    cmdconfig = self._cmdconfig
     if self.node_type == NodeType.FUNNAME:
-      command_case = config.resolve_for_command(
-          token.spelling, "format.command_case")
+      if cmdconfig is None:
+        cmdconfig = config.get_command_config(token.spelling)
+      command_case = cmdconfig.command_case
       if command_case in ("lower", "upper"):
         spelling = getattr(token.spelling, command_case)()
       elif command_case == "canonical":
         if (self._parent.pnode.cmdspec is not None
             and self._parent.pnode.cmdspec.spelling is not None):
           spelling = self._parent.pnode.cmdspec.spelling
+        elif cmdconfig.spelling is not None:
+          spelling = cmdconfig.spelling
         else:
-          spelling = config.resolve_for_command(
-              token.spelling, "spelling", token.spelling.lower())
+          spelling = token.spelling.lower()
       else:
         assert command_case == "unchanged", (
             "Unrecognized command case {}".format(command_case))
-    elif (self.node_type in (NodeType.KEYWORD, NodeType.FLAG)
-          and config.format.keyword_case in ("lower", "upper")):
-      spelling = getattr(token.spelling, config.format.keyword_case)()
+    elif self.node_type in (NodeType.KEYWORD, NodeType.FLAG):
+      if cmdconfig is None:
+        keyword_case = config.format.keyword_case
+      else:
+        keyword_case = cmdconfig.keyword_case
+      if keyword_case in ("lower", "upper"):
+        spelling = getattr(token.spelling, keyword_case)()
 
     ctx.outfile.write_at(self.position, spelling)
     children = list(self.children)
@@ -807,6 +860,11 @@ class StatementNode(LayoutNode):
         stack_context, cursor,
         max(passno for passno, _ in self._layout_passes))
 
+  def lock(self, config, stmt_depth=0, cmdconfig=None):
+    cmdconfig = config.get_command_config(
+        self.children[0].pnode.children[0].spelling)
+    super(StatementNode, self).lock(config, stmt_depth, cmdconfig)
+
   def get_prefix_width(self, config):
     prefix_width = len(self.name) + 1
     if need_paren_space(self.name, config):
@@ -824,6 +882,7 @@ class StatementNode(LayoutNode):
     # If the bounding box overflows the column limit then the layout is
     # automatically voided
     if end_extent[1] > config.format.linewidth:
+      explain.reject(self, "overflow")
       return False
 
     size = end_extent - start_extent
@@ -833,6 +892,7 @@ class StatementNode(LayoutNode):
       # nest.
       if (size[0] > 1 and
           self.get_prefix_width(config) > config.format.max_prefix_chars):
+        explain.reject(self, "max_prefix_chars")
         return False
     return True
 
@@ -916,6 +976,7 @@ class StatementNode(LayoutNode):
       dangle_parens = True
       # But we really want to nest first in this case
       if not self._wrap:
+        explain.reject(self, "rparen_overflow")
         self._reflow_valid = False
     elif prev.has_terminal_comment():
       # If the final token in an argument list is a line comment, then we must
@@ -986,6 +1047,7 @@ class StatementNode(LayoutNode):
     if not ctx.is_active():
       return
     super(StatementNode, self).write(config, ctx)
+    ctx.record_statement(self)
 
 
 class AtWordStatementNode(LayoutNode):
@@ -1085,6 +1147,7 @@ class KwargGroupNode(LayoutNode):
     # If the bounding box overflows the column limit then the layout is
     # automatically voided
     if end_extent[1] > config.format.linewidth:
+      explain.reject(self, "overflow")
       return False
 
     size = end_extent - start_extent
@@ -1093,6 +1156,7 @@ class KwargGroupNode(LayoutNode):
       # the content is forced to wrap, then we require the statement content to
       # nest.
       if size[0] > 1 and len(self.name) > config.format.max_prefix_chars:
+        explain.reject(self, "max_prefix_chars")
         return False
     return True
 
@@ -1217,15 +1281,18 @@ class PargGroupNode(LayoutNode):
       return True
     return self.children[-1].has_terminal_comment()
 
-  def lock(self, config, stmt_depth=0):
+  def lock(self, config, stmt_depth=0, cmdconfig=None):
     if (config.format.autosort and
         isinstance(self.pnode, PositionalGroupNode) and
         self.pnode.sortable):
       self._children = sort_arguments(self._children)
 
-    super(PargGroupNode, self).lock(config, stmt_depth)
+    super(PargGroupNode, self).lock(config, stmt_depth, cmdconfig)
 
-    self._max_pargs_hwrap = config.format.max_pargs_hwrap
+    if cmdconfig is None:
+      self._max_pargs_hwrap = config.format.max_pargs_hwrap
+    else:
+      self._max_pargs_hwrap = cmdconfig.max_pargs_hwrap
     if (isinstance(self.pnode, PositionalGroupNode)
         and self.pnode.spec is not None
         and self.pnode.spec.max_pargs_hwrap is not None):
@@ -1321,9 +1388,12 @@ class PargGroupNode(LayoutNode):
     # ArgGroup. Therefore, we must invalidate here, rather than forcing
     # _vertical above.
     if is_cmdline:
-      self._reflow_valid &= (rowcount <= config.format.max_rows_cmdline)
-    elif numpargs > self._max_pargs_hwrap:
-      self._reflow_valid &= self._wrap
+      if rowcount > config.format.max_rows_cmdline:
+        explain.reject(self, "max_rows_cmdline")
+        self._reflow_valid = False
+    elif numpargs > self._max_pargs_hwrap and not self._wrap:
+      explain.reject(self, "max_pargs_hwrap")
+      self._reflow_valid = False
 
     return cursor
 
@@ -1366,9 +1436,12 @@ class ArgGroupNode(LayoutNode):
         (5, True),
     ]
 
-  def lock(self, config, stmt_depth=0):
-    super(ArgGroupNode, self).lock(config, stmt_depth)
-    self._max_subgroups_hwrap = config.format.max_subgroups_hwrap
+  def lock(self, config, stmt_depth=0, cmdconfig=None):
+    super(ArgGroupNode, self).lock(config, stmt_depth, cmdconfig)
+    if cmdconfig is None:
+      self._max_subgroups_hwrap = config.format.max_subgroups_hwrap
+    else:
+      self._max_subgroups_hwrap = cmdconfig.max_subgroups_hwrap
     if (hasattr(self.pnode, "cmdspec")
         and getattr(self.pnode, "cmdspec") is not None
         and getattr(self.pnode, "cmdspec").max_subgroups_hwrap is not None):
@@ -1459,8 +1532,9 @@ class ArgGroupNode(LayoutNode):
     # the start of this function, the parent Statement wont nest this
     # ArgGroup. Therefore, we must invalidate here, rather than forcing
     # _vertical above.
-    if numgroups > self._max_subgroups_hwrap:
-      self._reflow_valid &= self._wrap
+    if numgroups > self._max_subgroups_hwrap and not self._wrap:
+      explain.reject(self, "max_subgroups_hwrap")
+      self._reflow_valid = False
 
     return cursor
 
@@ -1772,10 +1846,12 @@ def layout_tree(parsetree_root, config, linewidth=None, first_token=None):
   if linewidth is None:
     linewidth = config.format.linewidth
 
-  root_box = create_box_tree(parsetree_root)
-  root_box.lock(config)
+  with memstats.stage("create_box_tree"):
+    root_box = create_box_tree(parsetree_root)
+    root_box.lock(config)
   stack_context = StackContext(config, first_token)
-  root_box.reflow(stack_context, Cursor(0, 0))
+  with memstats.stage("reflow"):
+    root_box.reflow(stack_context, Cursor(0, 0))
 
   return root_box
 
@@ -1913,10 +1989,18 @@ class CursorFile(object):
     self._cursor = Cursor(0, 0)
     self._config = config
 
+    # Number of newlines actually written. Unlike the cursor, this is not
+    # affected by forge_cursor()
+    self._rowcount = 0
+
   @property
   def cursor(self):
     return Cursor(*self._cursor)
 
+  @property
+  def rowcount(self):
+    return self._rowcount
+
   def assert_at(self, cursor):
     assert (self._cursor[0] == cursor[0]
             and self._cursor[1] == cursor[1]), \
@@ -1935,15 +2019,17 @@ class CursorFile(object):
     self._cursor = cursor
 
   def write_at(self, cursor, text):
-    if sys.version_info[0] < 3 and isinstance(text, str):
+    if IS_PY2 and isinstance(text, str):
       text = text.decode('utf-8')
-    self.assert_lt(cursor)
+    if not FAST_MODE:
+      self.assert_lt(cursor)
 
     rows = (cursor[0] - self._cursor[0])
     if rows:
       self._fobj.write(self._config.format.endl * rows)
       self._cursor[0] += rows
       self._cursor[1] = 0
+      self._rowcount += rows
 
     cols = (cursor[1] - self._cursor[1])
     if cols:
@@ -1959,12 +2045,13 @@ class CursorFile(object):
       self._fobj.write(self._config.format.endl)
       self._cursor[0] += 1
       self._cursor[1] = 0
+      self._rowcount += 1
       line = lines.pop(0)
       self._fobj.write(line)
       self._cursor[1] += len(line)
 
   def write(self, copy_text):
-    if sys.version_info[0] < 3 and isinstance(copy_text, str):
+    if IS_PY2 and isinstance(copy_text, str):
       copy_text = copy_text.decode('utf-8')
     self._fobj.write(copy_text)
 
@@ -1973,6 +2060,7 @@ class CursorFile(object):
     else:
       self._cursor[0] += copy_text.count('\n')
       self._cursor[1] = len(copy_text.split('\n')[-1])
+      self._rowcount += copy_text.count('\n')
 
   def getvalue(self):
     return self._fobj.getvalue() + self._config.format.endl
@@ -1995,13 +2083,90 @@ class WriteContext(object):
     self.infile = io.BytesIO(bytearray(infile_content, 'utf-8'))
     self.outfile = CursorFile(config)
 
+    # List of (pnode, first_row, last_row) for each statement written, where
+    # the rows are the (zero-based) rows of the output that it occupies
+    self.statement_rows = []
+
   def is_active(self):
     return self.offswitch_location is None
 
+  def record_statement(self, node):
+    """
+    Record the output rows of a statement which was just written.
+    """
+    last_row = self.outfile.rowcount
+    first_row = last_row - (self.outfile.cursor[0] - node.position[0])
+    self.statement_rows.append((node.pnode, first_row, last_row))
+
+
+def split_lines(content):
+  """
+  Split `content` into lines, keeping the line endings. Unlike
+  `str.splitlines()` only newline characters are considered line breaks, to
+  agree with the line numbers of the lexer.
+  """
+  lines = [line + "\n" for line in content.split("\n")]
+  lines[-1] = lines[-1][:-1]
+  if not lines[-1]:
+    lines.pop(-1)
+  return lines
+
+
+def get_source_lines(pnode):
+  """
+  Return the (first, last) one-based source lines spanned by the tokens of a
+  statement, excluding any surrounding whitespace.
+  """
+  tokens = [
+      token for token in pnode.get_tokens()
+      if token.type not in (TokenType.WHITESPACE, TokenType.NEWLINE)]
+  return tokens[0].begin.line, tokens[-1].end.line
+
+
+def splice_statements(infile_content, outstr, statement_rows, line_ranges):
+  """
+  Return `infile_content` with only those statements which overlap any of
+  `line_ranges` (one-based, inclusive) replaced by their formatted text from
+  `outstr`. Everything else is transcribed verbatim. Statements which share
+  a source line are replaced (or not) together.
+  """
+  # Each block is [src_first, src_last, out_first, out_last, selected]
+  blocks = []
+  for pnode, out_first, out_last in statement_rows:
+    src_first, src_last = get_source_lines(pnode)
+    selected = any(
+        begin <= src_last and src_first <= end for begin, end in line_ranges)
+    if blocks and src_first <= blocks[-1][1]:
+      block = blocks[-1]
+      block[1] = max(block[1], src_last)
+      block[3] = out_last
+      block[4] = block[4] or selected
+    else:
+      blocks.append([src_first, src_last, out_first, out_last, selected])
+
+  if infile_content.startswith("\ufeff"):
+    infile_content = infile_content[1:]
+  inlines = split_lines(infile_content)
+  outlines = split_lines(outstr)
+
+  pieces = []
+  nextline = 0
+  for src_first, src_last, out_first, out_last, selected in blocks:
+    if not selected:
+      continue
+    pieces.extend(inlines[nextline:src_first - 1])
+    pieces.extend(outlines[out_first:out_last + 1])
+    nextline = src_last
+  pieces.extend(inlines[nextline:])
+  return "".join(pieces)
+
 
-def write_tree(root_box, config, infile_content):
+def write_tree(root_box, config, infile_content, line_ranges=None):
   """
-  Format the tree for size only, then print all of the boxes to outfile
+  Format the tree for size only, then print all of the boxes to outfile. If
+  `line_ranges` is not None, then it is a list of one-based (first, last)
+  line ranges of the input and only statements overlapping those lines are
+  replaced by their formatted text (see `splice_statements()`).
   """
   ctx = WriteContext(config, infile_content)
   root_box.write(config, ctx)
@@ -2010,4 +2175,12 @@ def write_tree(root_box, config, infile_content):
     logging.warning("'# cmake-format: off' is never turned back 'on'"
                     "at %d:%d", ctx.offswitch_location.line,
                     ctx.offswitch_location.col)
-  return ctx.outfile.getvalue()
+  outstr = ctx.outfile.getvalue()
+  if line_ranges is None:
+    return outstr
+
+  # NOTE(josh): the tab policy is applied to the formatted statements only.
+  # Untouched lines are transcribed exactly as they are in the input.
+  return splice_statements(
+      infile_content, replace_with_tabs(outstr, config), ctx.statement_rows,
+      line_ranges)
@@ -367,6 +367,266 @@ class TestInvocations(unittest.TestCase):
           stdout=outfile, stderr=outfile, env=self.env)
     self.assertEqual(1, statuscode)
 
+  def test_directory_invocation(self):
+    """
+    Verify that directories are searched for listfiles, that ignore files and
+    exclude patterns are honored, and that --jobs formats them all.
+    """
+    thisdir = os.path.realpath(os.path.dirname(__file__))
+    infile_path = os.path.join(thisdir, 'testdata', 'test_in.cmake')
+    expectfile_path = os.path.join(thisdir, 'testdata', 'test_out.cmake')
+
+    treedir = os.path.join(self.tempdir, 'tree')
+    relpaths = [
+        'CMakeLists.txt',
+        'src/CMakeLists.txt',
+        'src/util.cmake',
+        'src/notes.txt',
+        'build/CMakeLists.txt',
+        'third_party/CMakeLists.txt',
+    ]
+    untouched = (
+        'src/notes.txt',
+        'build/CMakeLists.txt',
+        'third_party/CMakeLists.txt',
+    )
+    for relpath in relpaths:
+      filepath = os.path.join(treedir, relpath)
+      if not os.path.exists(os.path.dirname(filepath)):
+        os.makedirs(os.path.dirname(filepath))
+      shutil.copyfile(infile_path, filepath)
+    with io.open(os.path.join(treedir, '.gitignore'), 'w') as outfile:
+      outfile.write('build/\n')
+
+    subprocess.check_call(
+        [sys.executable, '-Bm', 'cmakelang.format', '-i', '-j', '2',
+         '--exclude=third_party', treedir],
+        cwd=self.tempdir, env=self.env)
+
+    with io.open(infile_path, 'r', encoding='utf8') as infile:
+      unformatted_text = infile.read()
+    with io.open(expectfile_path, 'r', encoding='utf8') as infile:
+      expected_text = infile.read()
+
+    for relpath in relpaths:
+      with io.open(os.path.join(treedir, relpath), 'r',
+                   encoding='utf8') as infile:
+        actual_text = infile.read()
+      with self.subTest(relpath=relpath):
+        if relpath in untouched:
+          self.assertEqual(unformatted_text, actual_text)
+        else:
+          self.assertEqual(expected_text, actual_text)
+
+
+  def test_batch_invocation(self):
+    """
+    Verify that --batch formats each record from stdin and writes framed
+    results in order, for both framings.
+    """
+    from cmakelang.format import batch
+
+    records = [
+        (b"CMakeLists.txt", b"set(a   b)\n"),
+        (b"sub/foo.cmake", b"if(\n"),
+        (b"", b"foo( x )\n"),
+    ]
+    expected = [
+        (b"CMakeLists.txt", b"ok", b"set(a b)\n"),
+        (b"", b"ok", b"foo(x)\n"),
+    ]
+
+    for framing in batch.FRAMINGS:
+      with self.subTest(framing=framing):
+        proc = subprocess.Popen(
+            [sys.executable, '-Bm', 'cmakelang.format',
+             '--batch={}'.format(framing)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, cwd=self.tempdir, env=self.env)
+        stdout, _ = proc.communicate(b"".join(
+            batch.encode_record(record, framing) for record in records))
+        self.assertEqual(1, proc.returncode)
+
+        results = list(batch.iter_records(
+            io.BytesIO(stdout), framing, batch.NUM_OUTPUT_FIELDS))
+        self.assertEqual(3, len(results))
+        self.assertEqual(expected[0], results[0])
+        self.assertEqual((b"sub/foo.cmake", b"error"), results[1][:2])
+        self.assertEqual(expected[1], results[2])
+
+  def test_batch_internal_error(self):
+    """
+    Verify that a --batch record which causes an internal error is reported
+    as an error record, and that the records after it are still formatted.
+    """
+    from cmakelang.format import batch
+
+    records = [
+        (b"broken.cmake", b")))"),
+        (b"CMakeLists.txt", b"set(b   c)\n"),
+    ]
+    proc = subprocess.Popen(
+        [sys.executable, '-Bm', 'cmakelang.format', '--batch'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, cwd=self.tempdir, env=self.env)
+    stdout, _ = proc.communicate(b"".join(
+        batch.encode_record(record, "length") for record in records))
+    self.assertEqual(1, proc.returncode)
+
+    results = list(batch.iter_records(
+        io.BytesIO(stdout), "length", batch.NUM_OUTPUT_FIELDS))
+    self.assertEqual(2, len(results))
+    self.assertEqual((b"broken.cmake", b"error"), results[0][:2])
+    self.assertEqual((b"CMakeLists.txt", b"ok", b"set(b c)\n"), results[1])
+
+  def test_batch_bad_records(self):
+    """
+    Verify that a --batch record with a path hint which is not utf-8, or which
+    raises an arbitrary exception, doesn't end the stream.
+    """
+    from cmakelang.format import batch
+
+    os.mkdir(os.path.join(self.tempdir, "sub"))
+    with io.open(os.path.join(self.tempdir, "sub", ".cmake-format.py"), "w",
+                 encoding="utf-8") as outfile:
+      outfile.write("dangle_align = 3\n")
+
+    records = [
+        (b"\xff\xfe.cmake", b"foo( x )\n"),
+        (b"sub/foo.cmake", b"set(a   b)\n"),
+        (b"CMakeLists.txt", b"set(b   c)\n"),
+    ]
+    proc = subprocess.Popen(
+        [sys.executable, '-Bm', 'cmakelang.format', '--batch=nul'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE, cwd=self.tempdir, env=self.env)
+    stdout, _ = proc.communicate(b"".join(
+        batch.encode_record(record, "nul") for record in records))
+    self.assertEqual(1, proc.returncode)
+
+    results = list(batch.iter_records(
+        io.BytesIO(stdout), "nul", batch.NUM_OUTPUT_FIELDS))
+    self.assertEqual(3, len(results))
+    self.assertEqual((b"\xff\xfe.cmake", b"ok", b"foo(x)\n"), results[0])
+    self.assertEqual((b"sub/foo.cmake", b"error"), results[1][:2])
+    self.assertIn(b"dangle_align", results[1][2])
+    self.assertEqual((b"CMakeLists.txt", b"ok", b"set(b c)\n"), results[2])
+
+  def test_stats_invocation(self):
+    """
+    Verify that --stats=json reports per-file phase timings and counters on
+    stderr without changing the formatted output.
+    """
+    import json
+
+    thisdir = os.path.realpath(os.path.dirname(__file__))
+    infile_path = os.path.join(thisdir, 'testdata', 'test_in.cmake')
+    proc = subprocess.Popen(
+        [sys.executable, '-Bm', 'cmakelang.format', '--stats=json',
+         infile_path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=self.tempdir, env=self.env)
+    stdout, stderr = proc.communicate()
+    self.assertEqual(0, proc.returncode)
+
+    with io.open(os.path.join(thisdir, 'testdata', 'test_out.cmake'), 'rb') \
+        as infile:
+      self.assertEqual(infile.read().decode('utf-8'), stdout.decode('utf-8'))
+
+    report = json.loads(stderr.decode('utf-8'))
+    self.assertEqual([infile_path],
+                     [file_stats["name"] for file_stats in report["files"]])
+    for phase in ("config", "lex", "parse", "layout", "write", "total"):
+      self.assertIn(phase, report["total"]["timers"])
+    for key in ("tokens", "parse_nodes", "layout_nodes", "reflow_calls"):
+      self.assertGreater(report["total"]["counters"][key], 0)
+    self.assertEqual(1, report["total"]["counters"]["files"])
+
+  def test_slowest_invocation(self):
+    """
+    Verify that --slowest reports the slowest files with their node counts,
+    as json from cmake-format and in the summary of cmake-lint.
+    """
+    import json
+
+    thisdir = os.path.realpath(os.path.dirname(__file__))
+    infile_path = os.path.join(thisdir, 'testdata', 'test_in.cmake')
+    for idx in range(3):
+      shutil.copyfile(
+          infile_path, os.path.join(self.tempdir, "test_{}.cmake".format(idx)))
+
+    proc = subprocess.Popen(
+        [sys.executable, '-Bm', 'cmakelang.format', '-i', '--slowest', '2',
+         '--slowest-format', 'json', self.tempdir],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=self.tempdir, env=self.env)
+    _, stderr = proc.communicate()
+    self.assertEqual(0, proc.returncode)
+    slowest = json.loads(stderr.decode('utf-8'))
+    self.assertEqual(2, len(slowest))
+    self.assertGreaterEqual(slowest[0]["time"], slowest[1]["time"])
+    for file_stats in slowest:
+      for key in ("tokens", "parse_nodes", "layout_nodes"):
+        self.assertGreater(file_stats[key], 0)
+
+    proc = subprocess.Popen(
+        [sys.executable, '-Bm', 'cmakelang.lint', '--slowest', '2',
+         self.tempdir],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        cwd=self.tempdir, env=self.env)
+    stdout, _ = proc.communicate()
+    summary = stdout.decode('utf-8').split("Summary\n")[1]
+    table = summary.split("slowest files:\n")[1].strip().split("\n")
+    self.assertEqual(["file", "time", "tokens", "parse_nodes"], table[0].split())
+    self.assertEqual(3, len(table))
+
+  def test_trace_invocation(self):
+    """
+    Verify that --trace writes a Chrome trace with one file span per input,
+    containing the phase spans, on one track per worker.
+    """
+    import json
+
+    thisdir = os.path.realpath(os.path.dirname(__file__))
+    infile_path = os.path.join(thisdir, 'testdata', 'test_in.cmake')
+    for idx in range(4):
+      shutil.copyfile(
+          infile_path, os.path.join(self.tempdir, "test_{}.cmake".format(idx)))
+    trace_path = os.path.join(self.tempdir, "trace.json")
+
+    subprocess.check_call(
+        [sys.executable, '-Bm', 'cmakelang.format', '-j', '2', '-i',
+         '--trace', trace_path, self.tempdir],
+        cwd=self.tempdir, env=self.env)
+    with io.open(trace_path, 'r', encoding='utf-8') as infile:
+      events = json.load(infile)["traceEvents"]
+
+    file_spans = [event for event in events if event.get("cat") == "file"]
+    self.assertEqual(
+        ["test_{}.cmake".format(idx) for idx in range(4)],
+        sorted(os.path.basename(event["name"]) for event in file_spans))
+    tids = set(event["tid"] for event in file_spans)
+    self.assertEqual(
+        tids, set(event["tid"] for event in events if event["ph"] == "M"))
+    self.assertLessEqual(len(tids), 2)
+
+    for file_span in file_spans:
+      phases = [
+          event for event in events
+          if event.get("cat") == "phase"
+          and event["args"]["file"] == file_span["name"]]
+      self.assertEqual(
+          ["config", "read", "lex", "parse", "layout", "write"],
+          [event["name"] for event in sorted(phases, key=lambda e: e["ts"])])
+      for event in phases:
+        self.assertEqual(file_span["tid"], event["tid"])
+        # NOTE(josh): allow for rounding of the microsecond timestamps
+        self.assertGreaterEqual(event["ts"] + 1e-3, file_span["ts"])
+        self.assertLessEqual(
+            event["ts"] + event["dur"],
+            file_span["ts"] + file_span["dur"] + 1e-3)
+
+
 
 if __name__ == '__main__':
   unittest.main()
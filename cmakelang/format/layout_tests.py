@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 
 import contextlib
+import io
 import logging
 import unittest
 import sys
@@ -10,6 +11,7 @@ from cmakelang.format import __main__
 from cmakelang import configuration
 from cmakelang import lex
 from cmakelang import parse
+from cmakelang.format import explain
 from cmakelang.format import formatter
 from cmakelang.parse.common import NodeType
 
@@ -818,6 +820,46 @@ class TestCanonicalLayout(unittest.TestCase):
       ])
 
 
+  def test_explain_layout(self):
+    """
+    Only the statement at the requested line is explained, and each rejected
+    attempt carries the reason it was rejected.
+    """
+    input_str = strip_indent("""\
+      set(foo bar)
+      add_executable(myprogram main.cpp foo.cpp bar.cpp baz.cpp qux.cpp
+                     quux.cpp corge.cpp)
+      set(baz qux)
+      """)
+    parse_tree = parse.parse(lex.tokenize(input_str), self.parse_ctx)
+    with explain.collect(3) as explainer:
+      formatter.layout_tree(parse_tree, self.config)
+    self.assertIsNone(explain.ACTIVE)
+
+    self.assertEqual(["add_executable"],
+                     [node.name for node in explainer.statements])
+    statement_attempts = [
+        attempt for attempt in explainer.attempts if attempt.depth == 0]
+    self.assertEqual(
+        [0, 1, 2, 3, 4],
+        [attempt.passno for attempt in statement_attempts])
+    self.assertEqual(
+        ["child"] * 4 + [None],
+        [attempt.get_reason() for attempt in statement_attempts])
+    self.assertIn(
+        "max_pargs_hwrap",
+        [attempt.get_reason() for attempt in explainer.attempts])
+
+    outfile = io.StringIO()
+    explainer.write_report(outfile)
+    self.assertIn(
+        "{} attempts".format(len(explainer.attempts)), outfile.getvalue())
+
+    with explain.collect(100) as explainer:
+      formatter.layout_tree(parse_tree, self.config)
+    self.assertEqual([], explainer.attempts)
+
+
 if __name__ == '__main__':
   format_str = '[%(levelname)-4s] %(filename)s:%(lineno)-3s: %(message)s'
   logging.basicConfig(level=logging.DEBUG,
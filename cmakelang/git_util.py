@@ -0,0 +1,120 @@
+"""
+Query a local git checkout for changed files and changed line ranges.
+
+This is used by ``cmake-format --since REV`` and ``cmake-format --staged`` to
+restrict processing to the listfiles (and optionally the statements) which
+were touched.
+"""
+
+from __future__ import unicode_literals
+
+import logging
+import os
+import re
+import subprocess
+
+from cmakelang import common
+
+logger = logging.getLogger(__name__)
+
+# Matches the header of a unified-diff hunk. The line counts are optional and
+# default to one.
+HUNK_HEADER = re.compile(
+    r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def run_git(args, cwd=None):
+  """
+  Execute git with the given list of arguments and return its stdout as a
+  string. Raise `UserError` if git is missing or the command fails.
+  """
+  command = ["git", "-c", "core.quotePath=false"] + list(args)
+  try:
+    proc = subprocess.Popen(
+        command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+  except OSError as ex:
+    raise common.UserError("Failed to execute git: {}".format(ex))
+  stdout, stderr = proc.communicate()
+  if proc.returncode != 0:
+    raise common.UserError(
+        "'{}' failed: {}".format(
+            " ".join(command), stderr.decode("utf-8", "replace").strip()))
+  return stdout.decode("utf-8")
+
+
+def get_toplevel(cwd=None):
+  """Return the root directory of the working tree containing `cwd`."""
+  return run_git(["rev-parse", "--show-toplevel"], cwd).strip()
+
+
+def get_diff_args(since=None, staged=False):
+  """
+  Return the `git diff` arguments selecting the changes to consider. With
+  `staged`, changes in the index are compared to `since` (default HEAD).
+  Otherwise the working tree is compared to `since` (default the index).
+  Deleted files are omitted.
+  """
+  args = ["diff", "--no-color", "--no-ext-diff", "--diff-filter=d"]
+  if staged:
+    args.append("--cached")
+  if since is not None:
+    args.append(since)
+  return args
+
+
+def get_changed_files(since=None, staged=False, cwd=None):
+  """
+  Return a sorted list of the absolute paths of all files which were changed.
+  """
+  toplevel = get_toplevel(cwd)
+  output = run_git(
+      get_diff_args(since, staged) + ["--name-only", "-z"], toplevel)
+  return sorted(
+      os.path.join(toplevel, relpath)
+      for relpath in output.split("\0") if relpath)
+
+
+def parse_hunks(diff_text):
+  """
+  Parse the output of `git diff -U0` and return a dictionary mapping the
+  (repository-relative) path of each changed file to a list of one-based,
+  inclusive `(first, last)` line ranges of the new file which were touched.
+  A pure deletion is reported as a range covering the lines on either side.
+  """
+  out = {}
+  ranges = None
+  for line in diff_text.split("\n"):
+    if line.startswith("+++ "):
+      relpath = line[4:].rstrip("\t")
+      if relpath == "/dev/null":
+        ranges = None
+        continue
+      if relpath.startswith("b/"):
+        relpath = relpath[2:]
+      ranges = out.setdefault(relpath, [])
+      continue
+
+    match = HUNK_HEADER.match(line)
+    if match is None or ranges is None:
+      continue
+    first = int(match.group(3))
+    count = 1 if match.group(4) is None else int(match.group(4))
+    if count:
+      ranges.append((first, first + count - 1))
+    else:
+      ranges.append((max(first, 1), first + 1))
+  return out
+
+
+def get_changed_lines(since=None, staged=False, cwd=None):
+  """
+  Return a dictionary mapping the absolute path of each changed file to the
+  list of line ranges which were changed (see `parse_hunks()`).
+  """
+  toplevel = get_toplevel(cwd)
+  output = run_git(
+      get_diff_args(since, staged)
+      + ["-U0", "--src-prefix=a/", "--dst-prefix=b/"], toplevel)
+  return {
+      os.path.join(toplevel, relpath): ranges
+      for relpath, ranges in parse_hunks(output).items()}
@@ -206,8 +206,9 @@ def tokenize(contents):
   lineno = 1
   col = 0
   offset = 0
+  check_unicode = sys.version_info[0] < 3 and not common.FAST_MODE
   for tok_index, (tok_type, spelling) in enumerate(tokens):
-    if sys.version_info[0] < 3:
+    if check_unicode:
       assert isinstance(spelling, unicode)
     begin = SourceLocation((lineno, col, offset))
 
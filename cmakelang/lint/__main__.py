@@ -6,6 +6,7 @@ Check cmake listfile for lint
 from __future__ import unicode_literals
 
 import argparse
+import functools
 import io
 import logging
 import os
@@ -16,10 +17,18 @@ from cmakelang import common
 from cmakelang.format import __main__
 from cmakelang import configuration
 from cmakelang import lex
+from cmakelang import parallel
+from cmakelang import profiling
 from cmakelang import parse
+from cmakelang import stats
 
 from cmakelang.lint import basic_checker
+from cmakelang.lint import lint_baseline
+from cmakelang.lint import lint_cache
+from cmakelang.lint import lint_output
 from cmakelang.lint import lint_util
+from cmakelang.lint import project_checker
+from cmakelang.lint import symbol_index
 
 logger = logging.getLogger(__name__)
 
@@ -35,16 +44,26 @@ def process_file(config, local_ctx, infile_content):
     config.set_line_ending(detected)
 
   checker = basic_checker.LintChecker(config, local_ctx)
-  checker.check_basics(infile_content)
-  tokens = lex.tokenize(infile_content)
-  checker.check_tokens(tokens)
+  with stats.timer("lint"):
+    checker.check_basics(infile_content)
+  with stats.timer("lex"):
+    tokens = lex.tokenize(infile_content)
+  stats.count("tokens", len(tokens))
+  with stats.timer("lint"):
+    checker.check_tokens(tokens)
 
   parse_db = parse.funs.get_parse_db()
   parse_db.update(parse.funs.get_funtree(config.parse.fn_spec))
   ctx = parse.ParseContext(parse_db, local_ctx, config)
-  parse_tree = parse.parse(tokens, ctx)
-  parse_tree.build_ancestry()
-  checker.check_parse_tree(parse_tree)
+  with stats.timer("parse"):
+    parse_tree = parse.parse(tokens, ctx)
+    parse_tree.build_ancestry()
+  if stats.ACTIVE is not None:
+    stats.count("parse_nodes", stats.count_nodes(parse_tree))
+  with stats.timer("lint"):
+    checker.check_parse_tree(parse_tree)
+    lint_baseline.annotate_records(
+        local_ctx.get_lint(), parse_tree, infile_content)
 
 
 def setup_argparse(argparser):
@@ -77,11 +96,49 @@ def setup_argparse(argparser):
   argparser.add_argument(
       "--suppress-decorations", action="store_true",
       help="Suppress the file title decoration and summary statistics")
+  argparser.add_argument(
+      "--output-format", choices=lint_output.OUTPUT_FORMATS, default="text",
+      help="Format of the lint output. `jsonl` writes one json object per"
+           " lint record, as soon as each file is checked. `sarif` writes a"
+           " SARIF log of all of the lint once all files are checked. Neither"
+           " includes the decorations or summary.")
 
+  argparser.add_argument(
+      '--cache-dir', default=None,
+      help='Cache the lint found in each file in this directory, and skip'
+           ' checking files which (along with their configuration) have not'
+           ' changed since they were cached.')
+  argparser.add_argument(
+      '--cache-size', type=int, default=lint_cache.DEFAULT_MAX_ENTRIES,
+      help='Maximum number of files in the lint cache. The least recently'
+           ' used are removed.')
+  argparser.add_argument(
+      '--baseline', default=None,
+      help='Only report lint which is not in this baseline file (see'
+           ' --write-baseline).')
+  argparser.add_argument(
+      '--write-baseline', default=None,
+      help='Write the lint found in all files to this baseline file.')
+  argparser.add_argument(
+      '--project-index', default=None,
+      help='Index the functions, macros and commands of all of the files in'
+           ' this file (re-indexing only those which have changed), and also'
+           ' run the checks which depend on the whole project, such as calls'
+           ' to undefined commands.')
   argparser.add_argument(
       '-c', '--config-files', nargs='+',
       help='path to configuration file(s)')
-  argparser.add_argument('infilepaths', nargs='*')
+  argparser.add_argument(
+      '-j', '--jobs', type=int, default=1,
+      help='Number of worker processes to use. Zero means one per cpu.')
+  stats.add_argument(argparser)
+  stats.add_trace_argument(argparser)
+  stats.add_slowest_argument(argparser)
+  profiling.add_argument(argparser)
+  argparser.add_argument(
+      'infilepaths', nargs='*',
+      help='Listfiles to check. Directories are searched recursively for'
+           ' files matching `listfile_globs`.')
 
   configuration.Configuration().add_to_argparser(argparser)
 
@@ -89,11 +146,161 @@ def setup_argparse(argparser):
 USAGE_STRING = """
 cmake-lint [-h]
            [--dump-config {yaml,json,python} | -o OUTFILE_PATH]
-           [-c CONFIG_FILE]
+           [--output-format {text,jsonl,sarif}]
+           [-c CONFIG_FILE] [-j JOBS] [--stats[=json]] [--trace OUT]
+           [--cache-dir DIR [--cache-size N]]
+           [--baseline FILE] [--write-baseline FILE]
+           [--project-index FILE]
+           [--slowest N [--slowest-format {text,json}]]
+           [--profile OUT [--profile-per-file]]
            infilepath [infilepath ...]
 """
 
 
+def onefile_worker(infile_path, args, argdict):
+  """
+  Wrapper for `onefile_main` to be mapped over input files, possibly in a
+  worker process. Returns a tuple of the `lint_util.FileContext` (or None),
+  the collected `stats.Stats` (or None if none of --stats, --trace or
+  --slowest were given) and the `profiling.FileProfile` (or None if --profile
+  was not given).
+  """
+  with stats.collect(infile_path, stats.is_requested(args),
+                     trace=bool(args.trace)) as file_stats, \
+      profiling.collect(infile_path, bool(args.profile)) as file_profile:
+    local_ctx = onefile_main(infile_path, args, argdict)
+  return local_ctx, file_stats, file_profile
+
+
+def read_file(infile_path, args, argdict, quiet=False):
+  """
+  Load config and read one file. Return a tuple of the configuration and the
+  content of the file, or `None` if the file could not be read (which is
+  logged unless `quiet`).
+  """
+  # NOTE(josh): have to load config once for every file, because we may pick
+  # up a new config file location for each path
+  if infile_path == '-':
+    config_dict = __main__.get_config(os.getcwd(), args.config_files)
+  else:
+    config_dict = __main__.get_config(infile_path, args.config_files)
+  config_dict.update(argdict)
+  cfg = configuration.Configuration(**config_dict)
+
+  try:
+    if infile_path == '-':
+      infile = io.open(os.dup(sys.stdin.fileno()), mode='r',
+                       encoding=cfg.encode.input_encoding, newline='')
+    else:
+      infile = io.open(infile_path, mode='r',
+                       encoding=cfg.encode.input_encoding, newline='')
+  except (IOError, OSError):
+    if not quiet:
+      logger.error("Failed to open %s for read", infile_path)
+    return None
+
+  try:
+    with infile, stats.timer("read"):
+      intext = infile.read()
+  except UnicodeDecodeError:
+    if not quiet:
+      logger.error(
+          "Unable to read %s as %s", infile_path, cfg.encode.input_encoding)
+    return None
+  return cfg, intext
+
+
+def onefile_main(infile_path, args, argdict):
+  """
+  Load config, read and check one file. Return the populated
+  `lint_util.FileContext`, or `None` if the file could not be read.
+  """
+  loaded = read_file(infile_path, args, argdict)
+  if loaded is None:
+    return None
+  cfg, intext = loaded
+
+  local_ctx = lint_util.GlobalContext(None).get_file_ctx(infile_path, cfg)
+  cache = None
+  cache_key = None
+  cached = None
+  if args.cache_dir:
+    cache = lint_cache.LintCache(args.cache_dir, args.cache_size)
+    cache_key = lint_cache.get_cache_key(cfg, intext)
+  if cache_key is not None:
+    cached = cache.load(cache_key, local_ctx.global_ctx.lintdb)
+
+  if cached is not None:
+    stats.count("lint_cache_hits")
+    local_ctx.set_lint(*cached)
+  else:
+    with profiling.section():
+      process_file(cfg, local_ctx, intext)
+    if cache_key is not None:
+      cache.store(cache_key, local_ctx.get_lint(),
+                  local_ctx.get_suppression_events())
+
+  # NOTE(josh): lint from the project checks depends on other files, so it
+  # isn't cached with the lint of this file
+  if args.project_index:
+    with stats.timer("lint"):
+      project_checker.check_file(
+          cfg, local_ctx, symbol_index.get_cached_index(args.project_index))
+  return local_ctx
+
+
+def index_worker(item, args, argdict):
+  """
+  Index the symbols of one file, given as a tuple of its path and its content
+  hash when it was last indexed (or None). Returns a tuple of the path and
+  its `symbol_index.FileSymbols`, or None (in place of the symbols) if the
+  file has not changed or could not be read.
+  """
+  infile_path, digest = item
+  loaded = read_file(infile_path, args, argdict, quiet=True)
+  if loaded is None:
+    return infile_path, None
+  cfg, intext = loaded
+
+  new_digest = symbol_index.get_digest(intext)
+  if new_digest == digest:
+    return infile_path, None
+
+  parse_db = parse.funs.get_parse_db()
+  parse_db.update(parse.funs.get_funtree(cfg.parse.fn_spec))
+  ctx = parse.ParseContext(parse_db, None, cfg)
+  parse_tree = parse.parse(lex.tokenize(intext), ctx)
+  return infile_path, symbol_index.get_file_symbols(
+      parse_tree, new_digest, project_checker.get_builtins())
+
+
+def update_project_index(args, argdict, infilepaths):
+  """
+  Update the symbol index at `args.project_index` with the files which have
+  changed since they were indexed, and remove the files which no longer
+  exist.
+  """
+  index = symbol_index.SymbolIndex.load(args.project_index)
+  num_removed = index.remove_missing()
+  worker = functools.partial(index_worker, args=args, argdict=argdict)
+  items = [(infile_path, index.get_digest(infile_path))
+           for infile_path in infilepaths]
+  num_updated = 0
+  for infile_path, symbols in parallel.imap(
+      worker, items, args.jobs, ordered=False):
+    if symbols is not None:
+      index.update(infile_path, symbols)
+      num_updated += 1
+  try:
+    index.dump()
+  except (IOError, OSError):
+    raise common.UserError(
+        "Failed to write project index {}".format(args.project_index))
+  logger.debug(
+      "Indexed %d files (%d changed, %d removed)", len(items), num_updated,
+      num_removed)
+
+
 def inner_main():
   """Parse arguments, open files, start work."""
   logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
@@ -120,9 +327,13 @@ def inner_main():
   if args.outfile_path is None:
     args.outfile_path = '-'
 
+  assert args.cache_size > 0, "--cache-size must be positive"
+
   if '-' in args.infilepaths:
     assert len(args.infilepaths) == 1, \
         "You cannot mix stdin as an input with other input files"
+    assert not args.project_index, \
+        "You cannot use a project index with stdin as an input"
 
   if args.outfile_path == '-':
     outfile = io.open(os.dup(sys.stdout.fileno()),
@@ -131,52 +342,93 @@ def inner_main():
     outfile = io.open(args.outfile_path, 'w', encoding="utf-8", newline='')
 
   global_ctx = lint_util.GlobalContext(outfile)
+  baseline = None
+  if args.baseline:
+    try:
+      baseline = lint_baseline.Baseline.load(args.baseline)
+    except (IOError, OSError, UnicodeDecodeError):
+      raise common.UserError(
+          "Failed to read baseline {}".format(args.baseline))
+    global_ctx.baseline_count = 0
+  baseline_fingerprints = []
   returncode = 0
   argdict = __main__.get_argdict(args)
-
-  for infile_path in args.infilepaths:
-    # NOTE(josh): have to load config once for every file, because we may pick
-    # up a new config file location for each path
-    if infile_path == '-':
-      config_dict = __main__.get_config(os.getcwd(), args.config_files)
-    else:
-      config_dict = __main__.get_config(infile_path, args.config_files)
-    config_dict.update(argdict)
-
-    cfg = configuration.Configuration(**config_dict)
-    if infile_path == '-':
-      infile_path = os.dup(sys.stdin.fileno())
-
-    try:
-      infile = io.open(
-          infile_path, mode='r', encoding=cfg.encode.input_encoding, newline='')
-    except (IOError, OSError):
-      logger.error("Failed to open %s for read", infile_path)
-      returncode = 1
-      continue
-
-    try:
-      with infile:
-        intext = infile.read()
-    except UnicodeDecodeError:
-      logger.error(
-          "Unable to read %s as %s", infile_path, cfg.encode.input_encoding)
+  decorations = (
+      args.output_format == "text" and not args.suppress_decorations)
+
+  worker = functools.partial(onefile_worker, args=args, argdict=argdict)
+  infilepaths = __main__.iter_infilepaths(args, argdict)
+  if args.project_index:
+    infilepaths = list(infilepaths)
+    update_project_index(args, argdict, infilepaths)
+
+  # NOTE(josh): each json line names its file, so there is no need to wait
+  # for a slow file before writing the lint of the files after it
+  stats_list = []
+  profile_list = []
+  execution_successful = True
+  for local_ctx, file_stats, file_profile in parallel.imap(
+      worker, infilepaths, args.jobs,
+      ordered=(args.output_format == "text")):
+    if file_stats is not None:
+      stats_list.append(file_stats)
+      global_ctx.add_file_stats(file_stats)
+    if file_profile is not None:
+      profile_list.append(file_profile)
+    if local_ctx is None:
       returncode = 1
+      execution_successful = False
       continue
 
-    local_ctx = global_ctx.get_file_ctx(infile_path, cfg)
-    process_file(cfg, local_ctx, intext)
-    if not args.suppress_decorations:
-      outfile.write("{}\n{}\n".format(infile_path, "=" * len(infile_path)))
-    local_ctx.writeout(outfile)
-    if not args.suppress_decorations:
-      outfile.write("\n")
+    global_ctx.add_file_ctx(local_ctx)
+    infile_path = local_ctx.infile_path
+    if args.write_baseline:
+      baseline_fingerprints.extend(lint_baseline.get_fingerprints(
+          lint_baseline.get_relpath(infile_path, args.write_baseline),
+          local_ctx.get_lint()))
+    if baseline is not None:
+      new_records, baseline_count = baseline.filter(
+          infile_path, local_ctx.get_lint())
+      local_ctx.set_lint(new_records)
+      global_ctx.baseline_count += baseline_count
+    if args.output_format == "jsonl":
+      lint_output.write_jsonl(outfile, local_ctx)
+      outfile.flush()
+    elif args.output_format == "text":
+      if decorations:
+        outfile.write(
+            "{}\n{}\n".format(infile_path, "=" * len(infile_path)))
+      local_ctx.writeout(outfile)
+      if decorations:
+        outfile.write("\n")
     if local_ctx.has_lint():
       returncode = 1
 
-  if not args.suppress_decorations:
-    global_ctx.write_summary(outfile)
+  if args.cache_dir:
+    lint_cache.LintCache(args.cache_dir, args.cache_size).prune()
+  if args.write_baseline:
+    lint_baseline.write_baseline(args.write_baseline, baseline_fingerprints)
+  if args.output_format == "sarif":
+    lint_output.write_sarif(outfile, global_ctx, execution_successful)
+
+  num_slowest = 0
+  if args.slowest_format == "text":
+    num_slowest = args.slowest
+  if decorations:
+    global_ctx.write_summary(outfile, num_slowest)
+  elif num_slowest:
+    stats.write_slowest_text(sys.stderr, stats_list, num_slowest)
   outfile.close()
+  if args.slowest and args.slowest_format == "json":
+    stats.write_slowest_json(sys.stderr, stats_list, args.slowest)
+  if args.stats:
+    stats.write_report(sys.stderr, args.stats, stats_list)
+  if args.trace:
+    with io.open(args.trace, "w", encoding="utf-8") as tracefile:
+      stats.write_trace(tracefile, stats_list)
+  if args.profile:
+    profiling.write_profiles(
+        args.profile, profile_list, args.profile_per_file)
   return returncode
 
 
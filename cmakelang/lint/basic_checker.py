@@ -1,4 +1,5 @@
 # pylint: disable=W0613
+import collections
 import enum
 import logging
 import re
@@ -27,12 +28,12 @@ def find_statements_in_subtree(subtree, funnames):
   the provided set of `funnames`.
   """
   if isinstance(subtree, (list, tuple)):
-    queue = subtree
+    queue = collections.deque(subtree)
   else:
-    queue = [subtree]
+    queue = collections.deque([subtree])
 
   while queue:
-    node = queue.pop(0)
+    node = queue.popleft()
     if isinstance(node, StatementNode):
       if node.get_funname() in funnames:
         yield node
@@ -46,12 +47,12 @@ def find_nodes_in_subtree(subtree, nodetypes):
      given type(s) `nodetypes`.
   """
   if isinstance(subtree, (list, tuple)):
-    queue = subtree
+    queue = collections.deque(subtree)
   else:
-    queue = [subtree]
+    queue = collections.deque([subtree])
 
   while queue:
-    node = queue.pop(0)
+    node = queue.popleft()
     if isinstance(node, nodetypes):
       yield node
 
@@ -60,6 +61,13 @@ def find_nodes_in_subtree(subtree, nodetypes):
         queue.append(child)
 
 
+def subtree_has_statement(subtree):
+  """Return true if the `subtree` is, or contains, a statement node."""
+  for _ in find_nodes_in_subtree(subtree, StatementNode):
+    return True
+  return False
+
+
 def loop_contains_argn(loop_stmt):
   """Return true if the loop statement contains ${ARGN} as an argument"""
   for token in loop_stmt.argtree.get_semantic_tokens():
@@ -164,6 +172,22 @@ def make_varref_callback(repl):
   return varref_callback
 
 
+# A complete variable reference, along with any escaped backslashes before it
+VARREF_REGEX = re.compile(
+    r"(?<!\\)(\\\\)*"
+    r"\$\{(?:(?:[A-Za-z0-9_./+-])|(?:\\[^A-Za-z0-9_./+-]))+\}")
+
+# The start of a variable reference which is missing the closing brace
+MISSING_SUFFIX_REGEX = re.compile(
+    r"(?<!\\)(?:\\\\)*"
+    r"(\$\{)((?:(?:[A-Za-z0-9_./+-])|(?:\\[^A-Za-z0-9_./+-]))+)")
+
+# A variable reference which is missing the dollar sign or the opening brace
+MISSING_PREFIX_REGEX = re.compile(
+    r"(?<!\\)(?:\\\\)*"
+    r"(\$|\{)((?:(?:[A-Za-z0-9_./+-])|(?:\\[^A-Za-z0-9_./+-]))+)")
+
+
 def mock_varrefs(tokenstr, repl=None):
   """Recursively replace variable references with a dummy string until all
      variable references are resolved.
@@ -174,15 +198,203 @@ def mock_varrefs(tokenstr, repl=None):
   if repl is None:
     repl = "foo"
 
-  varref = re.compile(
-      r"(?<!\\)(\\\\)*"
-      r"\$\{(?:(?:[A-Za-z0-9_./+-])|(?:\\[^A-Za-z0-9_./+-]))+\}")
-
   # NOTE(josh): in python2 we are not allowed to use \1 when the match is
   # empty, so we have to use a callback function to implement the replacement.
-  while varref.search(tokenstr):
-    tokenstr = varref.sub(make_varref_callback(repl), tokenstr)
-  return tokenstr
+  callback = make_varref_callback(repl)
+  while True:
+    tokenstr, count = VARREF_REGEX.subn(callback, tokenstr)
+    if not count:
+      return tokenstr
+
+
+# Compiled line scanners for each configuration, see `get_line_scanner()`
+_LINE_SCANNERS = {}
+
+
+def get_line_scanner(config):
+  """
+  Return a regular expression which matches a newline followed by a line that
+  may have lint for one of the checks of `check_line()` under the given
+  configuration, capturing the line (without the newline). It may also match
+  some lines which don't have any lint, but never misses one which does.
+  The scanner skips over any other lines without returning to python, which
+  is much faster than checking each line.
+  """
+  key = (config.format.line_width, config.format.line_ending,
+         config.format.use_tabchars, config.format.fractional_tab_policy)
+  scanner = _LINE_SCANNERS.get(key)
+  if scanner is not None:
+    return scanner
+
+  # C0301: the line is too long
+  conditions = [r"[^\n]{{{:d}}}".format(config.format.line_width + 1)]
+
+  # C0303 and C0327: the line ends with whitespace (which includes a carriage
+  # return), or doesn't end with a carriage return if it should
+  if config.format.line_ending == "windows":
+    conditions.append(r"[^\n]*(?:(?<!\r)|[^\S\n]\r)$")
+  else:
+    conditions.append(r"[^\n]*[^\S\n]$")
+
+  # C0306: the indentation has the wrong kind of whitespace
+  if not config.format.use_tabchars:
+    conditions.append(r" *\t")
+  elif config.format.fractional_tab_policy == "round-up":
+    conditions.append(r"\t* ")
+  else:
+    conditions.append(r"\t* [ \t]*\t")
+
+  # NOTE(josh): starting with a literal newline (rather than ^) allows the
+  # regex engine to skip quickly to the start of each line.
+  scanner = re.compile(
+      r"\n(?={})([^\n]*)".format("|".join(conditions)), re.MULTILINE)
+  _LINE_SCANNERS[key] = scanner
+  return scanner
+
+
+CheckSpec = collections.namedtuple(
+    "CheckSpec", ["name", "node_types", "token_types", "leave", "ids"])
+
+# Checks registered with `visits()`, in the order they are defined
+CHECKS = []
+
+
+def visits(*types, **kwargs):
+  """
+  Decorator for a `LintChecker` method which registers it as a check. The
+  check is called with each parse tree node which is an instance of one of
+  the given node classes, and with each token which is of one of the given
+  `TokenType` (or each token at all if `Token` is given). If `leave=True` then
+  it is called with each node after (rather than before) the subtree of that
+  node is traversed.
+
+  `ids` is the list of lint ids which the check can record. If all of them
+  are disabled (or suppressed for the whole file) then the check is not run.
+  If `ids` is None then the check is always run.
+  """
+  leave = kwargs.pop("leave", False)
+  ids = kwargs.pop("ids", None)
+  assert not kwargs, "Unexpected keyword arguments {}".format(list(kwargs))
+
+  node_types = []
+  token_types = []
+  for type_ in types:
+    if type_ is Token:
+      token_types.extend(TokenType._id_map.values())  # pylint: disable=W0212
+    elif isinstance(type_, TokenType):
+      token_types.append(type_)
+    else:
+      assert issubclass(type_, TreeNode), (
+          "Checks must visit nodes or tokens, not {}".format(type_))
+      node_types.append(type_)
+  assert not (leave and token_types), "Tokens have no subtree to leave"
+
+  def decorator(fun):
+    CHECKS.append(
+        CheckSpec(fun.__name__, tuple(node_types), tuple(token_types), leave,
+                  None if ids is None else tuple(ids)))
+    return fun
+
+  return decorator
+
+
+# Lint ids recorded by `check_basics()`
+BASIC_IDS = ("C0301", "C0327", "C0303", "C0306", "C0304")
+
+# Lint ids recorded by `check_tokens()`
+TOKEN_IDS = ("W0106",)
+
+# Lint ids recorded from the `DefinitionStats` of a function or macro body
+DEFN_BODY_IDS = ("C0201", "R0911", "R0912", "R0915")
+
+PRAGMA_PREFIX = "# cmake-lint: "
+
+
+def iter_pragma_suppressions(node):
+  """Yield the lint ids of any ``disable=`` cmake-lint directives (pragmas)
+     in the line comments of a comment node. Invalid directives are
+     ignored."""
+  for child in node.children:
+    if not isinstance(child, Token) or child.type is not TokenType.COMMENT:
+      continue
+    if not child.spelling.startswith(PRAGMA_PREFIX):
+      continue
+    for item in child.spelling[len(PRAGMA_PREFIX):].split():
+      key, _, value = item.partition("=")
+      if key == "disable" and value:
+        for idstr in value.split(","):
+          yield idstr
+
+
+def get_file_suppressions(tree):
+  """
+  Return the lint ids which are disabled by pragmas in the comments at the
+  top of a file, before the first statement. These are suppressed for the
+  whole file.
+  """
+  out = []
+  for child in tree.children:
+    if not isinstance(child, TreeNode):
+      continue
+    if child.node_type is NodeType.COMMENT:
+      out.extend(iter_pragma_suppressions(child))
+    elif child.node_type is not NodeType.WHITESPACE:
+      break
+  return out
+
+
+# Kinds of nodes which are counted on the checker's node stack
+(OTHER_NODE, BODY_NODE, STATEMENT_NODE, ARGGROUP_NODE, LOOP_NODE) = range(5)
+
+
+def get_node_kind(node):
+  """Return the kind of node for the counts of the checker's node stack."""
+  if isinstance(node, BodyNode):
+    return BODY_NODE
+  if isinstance(node, StatementNode):
+    return STATEMENT_NODE
+  if isinstance(node, ArgGroupNode):
+    return ARGGROUP_NODE
+  if (isinstance(node, FlowControlNode)
+      and node.children[0].get_funname() in ("foreach", "while")):
+    return LOOP_NODE
+  return OTHER_NODE
+
+
+class DefinitionStats(object):
+  """
+  Counts of things in the body of a function or macro definition, which are
+  accumulated while the body is traversed.
+  """
+
+  def __init__(self, defn_node, body):
+    self.defn_node = defn_node
+    self.body = body
+    # We report these at the first line following the opening statement,
+    # which is where the body starts
+    self.body_line = defn_node.get_tokens()[-1].get_location().line + 1
+    self.return_count = 0
+    self.branch_count = 0
+    self.statement_count = 0
+    self.uses_parse_arguments = False
+    self.argn_loops = []
+
+
+class ArgnLoop(object):
+  """
+  A foreach() or while() loop over ${ARGN} within a function or macro
+  definition, and the number of conditionals in its body which compare the
+  loop variable against a string (see `check_for_custom_parse_logic`).
+  """
+
+  def __init__(self, loop_stmt, body, order):
+    self.loop_stmt = loop_stmt
+    self.body = body
+    self.loopvar = loop_stmt.argtree.get_semantic_tokens()[0]
+    # (depth, preorder index) of the loop statement, which sorts loops in
+    # breadth-first order
+    self.order = order
+    self.conditional_count = 0
 
 
 class LintChecker(object):
@@ -192,6 +404,60 @@ class LintChecker(object):
     self._node_stack = []
     self._indent_token = None
 
+    # The kind of each node on the stack, and the number of nodes of each
+    # kind on the stack, which are updated as nodes are pushed and popped so
+    # that the scope can be queried for each token without scanning the stack
+    self._node_kinds = []
+    self._kind_counts = [0] * (LOOP_NODE + 1)
+
+    # Number of nodes visited so far, the preorder index of the next node
+    self._visit_count = 0
+
+    # Map id() of a body node to the `DefinitionStats` and `ArgnLoop` which
+    # begin accumulating when that body is entered
+    self._pending_bodies = collections.defaultdict(list)
+    # `DefinitionStats` and `ArgnLoop` of the bodies we are currently in
+    self._defns = []
+    self._argn_loops = []
+
+    # Lint ids which are disabled by the config, or suppressed for the whole
+    # file by a pragma.
+    self._inactive_ids = set(cfg.lint.disabled_codes)
+
+    # The registered checks which are run, and the bound check methods for
+    # each token type, and for each node class (and whether entering or
+    # leaving) as they are encountered.
+    self._checks = []
+    self._token_checks = None
+    self._node_checks = None
+    self.update_checks()
+
+  def is_active(self, ids):
+    """Return true if any of the lint ids might be recorded."""
+    return ids is None or not self._inactive_ids.issuperset(ids)
+
+  def update_checks(self):
+    """Update the dispatch tables to include only the checks which can
+       record some lint id which is active."""
+    self._checks = [spec for spec in CHECKS if self.is_active(spec.ids)]
+    self._token_checks = collections.defaultdict(list)
+    self._node_checks = {}
+    for spec in self._checks:
+      for token_type in spec.token_types:
+        self._token_checks[token_type].append(getattr(self, spec.name))
+
+  def get_node_checks(self, node_class, leave=False):
+    """Return the list of check methods for nodes of type `node_class`."""
+    key = (node_class, leave)
+    checks = self._node_checks.get(key)
+    if checks is None:
+      checks = [
+          getattr(self, spec.name) for spec in self._checks
+          if spec.leave == leave and spec.node_types
+          and issubclass(node_class, spec.node_types)]
+      self._node_checks[key] = checks
+    return checks
+
   @property
   def context(self):
     """
@@ -203,68 +469,74 @@ class LintChecker(object):
     """
     return (self.cfg, self.local_ctx)
 
-  def check_basics(self, infile_content):
-    """Perform  basic checks before even lexing the file
-    """
+  def check_line(self, lineno, line):
+    """Check the line ending, trailing whitespace, indentation and length of
+       one line (without the newline) of the file."""
     (cfg, local_ctx) = self.context
-    lines = infile_content.split("\n")
-    indent_regex = re.compile(r"([ \t]*)(.*)")
-
-    for lineno, line in enumerate(lines):
-      # NOTE(josh): The tokenizer starts lineno at "1", so we must do the same
-      # here in order to be consistent.
-      lineno += 1
-      if len(line) > cfg.format.line_width:
+    fmt = cfg.format
+    if len(line) > fmt.line_width:
+      local_ctx.record_lint(
+          "C0301", len(line), fmt.line_width, location=(lineno,))
+
+    if line.endswith("\r"):
+      if fmt.line_ending == "unix":
+        local_ctx.record_lint(
+            "C0327", "windows", location=(lineno,))
+      line = line[:-1]
+    else:
+      if fmt.line_ending == "windows":
         local_ctx.record_lint(
-            "C0301", len(line), cfg.format.line_width, location=(lineno,))
+            "C0327", "unix", location=(lineno,))
 
-      if line.endswith("\r"):
-        if cfg.format.line_ending == "unix":
-          local_ctx.record_lint(
-              "C0327", "windows", location=(lineno,))
-        line = line[:-1]
-      else:
-        if cfg.format.line_ending == "windows":
-          local_ctx.record_lint(
-              "C0327", "unix", location=(lineno,))
+    if len(line.rstrip()) != len(line):
+      local_ctx.record_lint("C0303", location=(lineno,))
 
-      if len(line.rstrip()) != len(line):
-        local_ctx.record_lint("C0303", location=(lineno,))
+    indentation = line[:len(line) - len(line.lstrip(" \t"))]
+    if not fmt.use_tabchars:
+      if "\t" in indentation:
+        colno = indentation.find("\t")
+        local_ctx.record_lint(
+            "C0306", "tab", "space", location=(lineno, colno))
+    elif fmt.fractional_tab_policy == "round-up":
+      if " " in indentation:
+        colno = indentation.find(" ")
+        local_ctx.record_lint(
+            "C0306", "space", "tab", location=(lineno, colno))
+    else:
+      subindent = indentation.lstrip("\t")
+      if "\t" in subindent:
+        colno = len(indentation) - len(subindent)
+        local_ctx.record_lint(
+            "C0306", "space", "tab", location=(lineno, colno))
 
-      match = indent_regex.match(line)
-      indentation = match.group(1)
-      if not cfg.format.use_tabchars:
-        if "\t" in indentation:
-          colno = indentation.find("\t")
-          local_ctx.record_lint(
-              "C0306", "tab", "space", location=(lineno, colno))
-      elif cfg.format.fractional_tab_policy == "round-up":
-        if " " in indentation:
-          colno = indentation.find(" ")
-          local_ctx.record_lint(
-              "C0306", "space", "tab", location=(lineno, colno))
-      else:
-        subindent = indentation.lstrip("\t")
-        if "\t" in subindent:
-          colno = len(indentation) - len(subindent)
-          local_ctx.record_lint(
-              "C0306", "space", "tab", location=(lineno, colno))
+  def check_basics(self, infile_content):
+    """Perform  basic checks before even lexing the file
+    """
+    (cfg, local_ctx) = self.context
+    if not self.is_active(BASIC_IDS):
+      return
+
+    # NOTE(josh): The tokenizer starts lineno at "1", so we must do the same
+    # here in order to be consistent. The scanner matches the newline before
+    # each line, so the content is prefixed with one for the first line.
+    content = "\n" + infile_content
+    lineno = 0
+    pos = 0
+    for match in get_line_scanner(cfg).finditer(content):
+      lineno += content.count("\n", pos, match.start(1))
+      pos = match.start(1)
+      self.check_line(lineno, match.group(1))
 
     # check that the file ends with newline
     if not infile_content.endswith("\n"):
-      local_ctx.record_lint("C0304", location=(len(lines),))
+      local_ctx.record_lint(
+          "C0304", location=(infile_content.count("\n") + 1,))
 
   def check_tokens(self, tokens):
     """Look for anything that looks like an incomplete variable substitution."""
     (_, local_ctx) = self.context
-
-    missing_suffix = re.compile(
-        r"(?<!\\)(?:\\\\)*"
-        r"(\$\{)((?:(?:[A-Za-z0-9_./+-])|(?:\\[^A-Za-z0-9_./+-]))+)")
-
-    missing_prefix = re.compile(
-        r"(?<!\\)(?:\\\\)*"
-        r"(\$|\{)((?:(?:[A-Za-z0-9_./+-])|(?:\\[^A-Za-z0-9_./+-]))+)")
+    if not self.is_active(TOKEN_IDS):
+      return
 
     match_types = (
         TokenType.QUOTED_LITERAL,
@@ -276,10 +548,16 @@ class LintChecker(object):
       if token.type not in match_types:
         continue
 
-      resolved = mock_varrefs(token.spelling)
+      # NOTE(josh): both patterns (and any variable reference) start with
+      # either "$" or "{", so most tokens can be skipped without any regex.
+      spelling = token.spelling
+      if "$" not in spelling and "{" not in spelling:
+        continue
+
+      resolved = mock_varrefs(spelling)
 
-      match = missing_prefix.search(resolved)
-      if match and variables.CASE_SENSITIVE_REGEX.match(match.group(2)):
+      match = MISSING_PREFIX_REGEX.search(resolved)
+      if match and variables.INDEX.match(match.group(2)) is not None:
         catmatch = "".join(match.group(1, 2))
         if catmatch == "$ENV":
           # This is an environment variable reference, so we don't try to
@@ -290,42 +568,28 @@ class LintChecker(object):
             "W0106", "open", catmatch, location=token.get_location())
         continue
 
-      match = missing_suffix.search(resolved)
-      if match and variables.CASE_SENSITIVE_REGEX.match(match.group(2)):
+      match = MISSING_SUFFIX_REGEX.search(resolved)
+      if match and variables.INDEX.match(match.group(2)) is not None:
+        catmatch = "".join(match.group(1, 2))
         local_ctx.record_lint(
             "W0106", "closing", catmatch, location=token.get_location())
         continue
 
-  def check_for_custom_parse_logic(self, stmt_node):
+  def check_for_custom_parse_logic(self, defn_stats):
     """Ensure that a function or macro definition doesn't contain custom parser
       logic. The check is heuristic, but what we look for is a loop over ARGN
       where the body of the loop contains multiple conditional checks against
       the string value of the arguments
     """
     (cfg, local_ctx) = self.context
-    block = stmt_node.parent.get_block_with(stmt_node)
-    for _ in find_statements_in_subtree(
-        block.body, ("cmake_parse_arguments",)):
+    if defn_stats.uses_parse_arguments:
       # function/macro definition uses the std parser, so the check is complete
       return
 
-    for loop_stmt in find_statements_in_subtree(
-        block.body, ("foreach", "while")):
-      if loop_contains_argn(loop_stmt):
-        conditional_count = 0
-        loopvar = loop_stmt.argtree.get_semantic_tokens()[0]
-        loop_body = loop_stmt.parent.get_block_with(loop_stmt).body
-        for conditional in find_nodes_in_subtree(
-            loop_body, ConditionalGroupNode):
-          tokens = conditional.get_semantic_tokens()
-          if not tokens:
-            continue
-          if tokens[0].spelling == loopvar.spelling:
-            if tokens[1].spelling in ("STREQUAL", "MATCHES"):
-              conditional_count += 1
-        if conditional_count > cfg.lint.max_conditionals_custom_parser:
-          local_ctx.record_lint("C0201", location=loop_stmt.get_location())
-          return
+    for loop in sorted(defn_stats.argn_loops, key=lambda loop: loop.order):
+      if loop.conditional_count > cfg.lint.max_conditionals_custom_parser:
+        local_ctx.record_lint("C0201", location=loop.loop_stmt.get_location())
+        return
 
   def check_argument_names(self, defn_node):
     """Check that the argument names in a function or macro definition match
@@ -373,37 +637,43 @@ class LintChecker(object):
 
   def check_defn(self, defn_node, name_pattern):
     """Perform checks on a function or macro"""
-    (cfg, local_ctx) = self.context
-    self.check_for_custom_parse_logic(defn_node)
     self.check_name_against_pattern(defn_node, name_pattern)
     self.check_argument_names(defn_node)
 
-    # TODO(josh): I guess logically the following checks should really be
-    # part of check_body... in the case that the body within a function.
-    # I'm not sure what the best way to organize that flow. In any case
-    # we'll report the following errors at the first line following the
-    # opening statement, which is where the body starts
-    body_line = defn_node.get_tokens()[-1].get_location().line + 1
-
-    block = defn_node.parent.get_block_with(defn_node)
-    return_count = sum(
-        1 for _ in find_statements_in_subtree(block.body, ("return",)))
-    if return_count > cfg.lint.max_returns:
-      local_ctx.record_lint("R0911", return_count, cfg.lint.max_returns,
-                            location=(body_line,))
-
-    branch_count = sum(
-        1 for _ in find_statements_in_subtree(
-            block.body, ("if", "elseif", "else")))
-    if branch_count > cfg.lint.max_branches:
-      local_ctx.record_lint("R0912", branch_count, cfg.lint.max_branches,
-                            location=(body_line,))
-
-    stmt_count = sum(
-        1 for _ in find_nodes_in_subtree(block.body, StatementNode))
-    if stmt_count > cfg.lint.max_statements:
-      local_ctx.record_lint("R0915", stmt_count, cfg.lint.max_statements,
-                            location=(body_line,))
+  @visits(FlowControlNode, ids=DEFN_BODY_IDS)
+  def begin_defn(self, node):
+    """
+    Begin checks on the content of the body of a function or macro. The
+    content is counted up as the body is traversed (see `count_statement`)
+    and checked when we leave it (see `check_defn_body`).
+    """
+    stmt = node.children[0]
+    if not statement_is_fundef(stmt):
+      return
+    block = node.get_block_with(stmt)
+    self._pending_bodies[id(block.body)].append(
+        DefinitionStats(stmt, block.body))
+
+  def check_defn_body(self, defn_stats):
+    """Perform checks on the content of the body of a function or macro."""
+    (cfg, local_ctx) = self.context
+    self.check_for_custom_parse_logic(defn_stats)
+
+    body_line = defn_stats.body_line
+    if defn_stats.return_count > cfg.lint.max_returns:
+      local_ctx.record_lint(
+          "R0911", defn_stats.return_count, cfg.lint.max_returns,
+          location=(body_line,))
+
+    if defn_stats.branch_count > cfg.lint.max_branches:
+      local_ctx.record_lint(
+          "R0912", defn_stats.branch_count, cfg.lint.max_branches,
+          location=(body_line,))
+
+    if defn_stats.statement_count > cfg.lint.max_statements:
+      local_ctx.record_lint(
+          "R0915", defn_stats.statement_count, cfg.lint.max_statements,
+          location=(body_line,))
 
   def check_fundef(self, node):
     """Perform checks on a function definition"""
@@ -429,6 +699,7 @@ class LintChecker(object):
           "C0103", "argument", token.spelling, cfg.lint.argument_var_pattern,
           location=token.get_location())
 
+  @visits(FlowControlNode, ids=("C0103", "C0202", "E0108", "E0109", "R0913"))
   def check_flow_control(self, node):
     """Perform checks on a flowcontrol node."""
     stmt = node.children[0]
@@ -475,27 +746,25 @@ class LintChecker(object):
       if child.type is not TokenType.COMMENT:
         continue
       token = child
-      pragma_prefix = "# cmake-lint: "
-      if not token.spelling.startswith(pragma_prefix):
+      if not token.spelling.startswith(PRAGMA_PREFIX):
         continue
 
       row, col, _ = token.get_location()
-      content = token.spelling[len(pragma_prefix):]
-      col += len(pragma_prefix)
+      content = token.spelling[len(PRAGMA_PREFIX):]
+      col += len(PRAGMA_PREFIX)
       self.parse_pragmas_from_token(content, row, col, suppressions)
 
     return suppressions
 
-  def check_body(self, node):
-    """Perform checks on a body node."""
-    (cfg, local_ctx) = self.context
+  @visits(BodyNode)
+  def check_body_pragmas(self, node):
+    """Parse any cmake-lint directives (pragmas) from the comments in the body
+       and suppress the requested lint until the end of the body."""
+    (_, local_ctx) = self.context
     suppressions = []
-    prevchild = [None, None]
-    for idx, child in enumerate(node.children):
+    for child in node.children:
       if not isinstance(child, TreeNode):
-        # Should not be the case. Should we assert here?
         continue
-
       if child.node_type is NodeType.COMMENT:
         requested_suppressions = self.parse_pragmas_from_comment(child)
         if requested_suppressions:
@@ -503,6 +772,23 @@ class LintChecker(object):
           new_suppressions = local_ctx.suppress(lineno, requested_suppressions)
           suppressions.extend(new_suppressions)
 
+    lineno = node.get_tokens()[-1].get_location().line
+    if suppressions:
+      local_ctx.unsuppress(lineno, suppressions)
+
+  @visits(BodyNode, ids=("C0111", "C0112", "C0321", "C0305", "W0101"))
+  def check_body(self, node):
+    """Perform checks on a body node."""
+    (cfg, local_ctx) = self.context
+    prevchild = [None, None]
+    # For each child, whether any later child is (or contains) a statement.
+    # Computed when we first need it.
+    followed_by_statement = None
+    for idx, child in enumerate(node.children):
+      if not isinstance(child, TreeNode):
+        # Should not be the case. Should we assert here?
+        continue
+
       # Check for docstrings
       # TODO(josh): move into flow-control or fundef/macrodef checkers? Would
       # require an API to get siblings
@@ -536,17 +822,80 @@ class LintChecker(object):
 
       if (isinstance(child, StatementNode) and
           child.get_funname() in ("break", "continue", "return")):
-        for _ in find_nodes_in_subtree(node.children[idx + 1:], StatementNode):
+        if followed_by_statement is None:
+          followed_by_statement = [False] * len(node.children)
+          for ridx in range(len(node.children) - 2, -1, -1):
+            followed_by_statement[ridx] = (
+                followed_by_statement[ridx + 1]
+                or subtree_has_statement(node.children[ridx + 1]))
+        if followed_by_statement[idx]:
           local_ctx.record_lint("W0101", location=child.get_location())
-          break
 
       prevchild[1] = prevchild[0]
       prevchild[0] = child
 
-    lineno = node.get_tokens()[-1].get_location().line
-    if suppressions:
-      local_ctx.unsuppress(lineno, suppressions)
+  @visits(BodyNode, ids=DEFN_BODY_IDS)
+  def begin_body(self, node):
+    """Begin accumulating the definition and loop statistics which are
+       pending for this body."""
+    for item in self._pending_bodies.pop(id(node), ()):
+      if isinstance(item, DefinitionStats):
+        self._defns.append(item)
+      else:
+        self._argn_loops.append(item)
+
+  @visits(BodyNode, leave=True, ids=DEFN_BODY_IDS)
+  def end_body(self, node):
+    """Finish the definition and loop statistics of this body."""
+    while self._argn_loops and self._argn_loops[-1].body is node:
+      self._argn_loops.pop(-1)
+    while self._defns and self._defns[-1].body is node:
+      self.check_defn_body(self._defns.pop(-1))
+
+  @visits(StatementNode, ids=DEFN_BODY_IDS)
+  def count_statement(self, node):
+    """Count statements within the bodies of function or macro
+       definitions."""
+    if not self._defns:
+      return
+
+    funname = node.get_funname()
+    for defn_stats in self._defns:
+      defn_stats.statement_count += 1
+      if funname == "return":
+        defn_stats.return_count += 1
+      elif funname in ("if", "elseif", "else"):
+        defn_stats.branch_count += 1
+      elif funname == "cmake_parse_arguments":
+        defn_stats.uses_parse_arguments = True
+
+    if funname in ("foreach", "while") and loop_contains_argn(node):
+      # NOTE(josh): a loop has a single block, with the body after the
+      # opening statement
+      loop = ArgnLoop(
+          node, node.parent.blocks[0].body,
+          (len(self._node_stack), self._visit_count))
+      for defn_stats in self._defns:
+        defn_stats.argn_loops.append(loop)
+      self._pending_bodies[id(loop.body)].append(loop)
+
+  @visits(ConditionalGroupNode, ids=("C0201",))
+  def count_conditional(self, node):
+    """Count conditionals within loops over ${ARGN} which compare the loop
+       variable to a string."""
+    if not self._argn_loops:
+      return
+
+    tokens = node.get_semantic_tokens()
+    if len(tokens) < 2:
+      return
+    if tokens[1].spelling not in ("STREQUAL", "MATCHES"):
+      return
+    for loop in self._argn_loops:
+      if tokens[0].spelling == loop.loopvar.spelling:
+        loop.conditional_count += 1
 
+  @visits(ArgGroupNode, ids=("E1122",))
   def check_arggroup(self, node):
     (_, local_ctx) = self.context
     kwargs_seen = set()
@@ -561,6 +910,7 @@ class LintChecker(object):
               "E1122", kwarg, location=kwarg_token.get_location())
         kwargs_seen.add(kwarg)
 
+  @visits(PositionalGroupNode, ids=("E1120",))
   def check_positional_group(self, node):
     """Perform checks on a positional group node."""
     (_, local_ctx) = self.context
@@ -578,26 +928,8 @@ class LintChecker(object):
     """Ensure that a break() or continue() statement has a foreach() or
       while() node in it's ancestry."""
     (_, local_ctx) = self.context
-    prevparent = node
-    parent = node.parent
-
-    while parent:
-      if not isinstance(parent, FlowControlNode):
-        prevparent = parent
-        parent = parent.parent
-        continue
-
-      block = parent.get_block_with(prevparent)
-      if block is None:
-        prevparent = parent
-        parent = parent.parent
-        continue
-
-      if block.open_stmt.get_funname() in ("foreach", "while"):
-        return True
-
-      prevparent = parent
-      parent = parent.parent
+    if self._kind_counts[LOOP_NODE]:
+      return True
     local_ctx.record_lint(
         "E0103", node.get_funname(), location=node.get_location())
 
@@ -668,6 +1000,7 @@ class LintChecker(object):
             "C0103", "directory variable", varname.spelling, pattern,
             location=varname.get_location())
 
+  @visits(StatementNode, ids=("E0103", "C0103"))
   def check_statement(self, node):
     """Perform checks on a statement."""
     if node.get_funname() in ("break", "continue"):
@@ -682,38 +1015,38 @@ class LintChecker(object):
     """
     (_, local_ctx) = self.context
 
-    imatch = variables.CASE_INSENSITIVE_REGEX.match(varname)
-    if not imatch:
+    index = variables.INDEX.match(varname, ignorecase=True)
+    if index is None:
       # variable name isn't a match for any builtins
       return
 
-    for groupstr in imatch.groups():
-      if groupstr is not None:
-        # variable name matches a dynamic pattern and we don't have the context
-        # yet to actually compare against these
-        return
+    if variables.INDEX.is_templated(index):
+      # variable name matches a dynamic pattern and we don't have the context
+      # yet to actually compare against these
+      return
 
-    if not variables.CASE_SENSITIVE_REGEX.match(varname):
+    if variables.INDEX.match(varname) is None:
       # variable name is a match for a builtin except for case
       local_ctx.record_lint(
           "W0105", contextstr, varname,
           location=token.get_location())
 
-  def check_variable_assignments(self, tree):
+  @visits(StatementNode, ids=("W0105",))
+  def check_variable_assignment(self, node):
     """
-    Check if any variable assignments are a case-insensitive match to any
-    builtin variable names. This is probably a spelling error.
+    Check if a variable assignment is a case-insensitive match to any builtin
+    variable names. This is probably a spelling error.
     """
-    for stmt in find_statements_in_subtree(tree, ["set", "list"]):
-      if stmt.get_funname() == "set":
-        token = stmt.argtree.varname
-      elif stmt.get_funname() == "list":
-        token = stmt.argtree.parg_groups[0].get_tokens(kind="semantic")[1]
-      else:
-        continue
-      self.check_varname(token.spelling, token, "Assignment to")
+    if node.get_funname() == "set":
+      token = node.argtree.varname
+    elif node.get_funname() == "list":
+      token = node.argtree.parg_groups[0].get_tokens(kind="semantic")[1]
+    else:
+      return
+    self.check_varname(token.spelling, token, "Assignment to")
 
-  def check_variable_references(self, tree):
+  @visits(TokenType.QUOTED_LITERAL, TokenType.DEREF, ids=("W0105",))
+  def check_variable_reference(self, token):
     """
     Check if any variable references are a case-insensitive match to any
     builtin variable names. This is probably a spelling error.
@@ -721,13 +1054,10 @@ class LintChecker(object):
     # TODO(josh): replace with a stateful parser that builds up
     # global/directory/local namespaces and can check for usage before
     # assignment, shadowing, etc
-    for token in tree.get_tokens(kind="semantic"):
-      if token.type not in (
-          TokenType.QUOTED_LITERAL, TokenType.DEREF):
-        continue
-      for varname in re.findall(r"\$\{([\w_]+)\}", token.spelling):
-        self.check_varname(varname, token, "Reference to")
+    for varname in re.findall(r"\$\{([\w_]+)\}", token.spelling):
+      self.check_varname(varname, token, "Reference to")
 
+  @visits(CommentNode)
   def check_comment(self, node):
     if not self.am_in_statement():
       return
@@ -742,24 +1072,15 @@ class LintChecker(object):
     local_ctx.unsuppress(lineno + 1, new_suppressions)
 
   def am_in_statement(self):
-    for node in self._node_stack:
-      if isinstance(node, StatementNode):
-        return True
-    return False
+    return self._kind_counts[STATEMENT_NODE] > 0
 
   def am_in_arggroup(self):
-    for node in self._node_stack:
-      if isinstance(node, ArgGroupNode):
-        return True
-    return False
+    return self._kind_counts[ARGGROUP_NODE] > 0
 
   def get_scope_depth(self):
-    depth = 0
-    for node in self._node_stack:
-      if isinstance(node, BodyNode):
-        depth += 1
-    return depth
+    return self._kind_counts[BODY_NODE]
 
+  @visits(Token, ids=("C0307",))
   def check_token(self, token):
     (cfg, local_ctx) = self.context
 
@@ -793,33 +1114,58 @@ class LintChecker(object):
 
       self._indent_token = None
 
-  def check_tree(self, node):
-    if isinstance(node, Token):
-      self.check_token(node)
+  def suppress_file_wide(self, tree):
+    """
+    Suppress, for the whole file, any lint which is disabled by pragmas before
+    the first statement. Checks which can only record suppressed or disabled
+    lint are removed from the dispatch tables.
+    """
+    (_, local_ctx) = self.context
+    idlist = [
+        idstr for idstr in get_file_suppressions(tree)
+        if local_ctx.is_idstr(idstr)]
+    if not idlist:
       return
+    # NOTE(josh): line zero so that this also applies to lint which is
+    # recorded without a location
+    local_ctx.suppress(0, idlist)
+    self._inactive_ids.update(idlist)
+    self.update_checks()
 
-    if not isinstance(node, TreeNode):
-      return
+  def check_parse_tree(self, node):
+    """
+    Traverse the parse tree once (depth first), and call each of the checks
+    registered with `visits()` for each node and token that they visit.
+    """
+    self.suppress_file_wide(node)
+
+    # Stack of (node, leave) where `leave` is true if the subtree of `node`
+    # has been traversed.
+    stack = [(node, False)]
+    while stack:
+      node, leave = stack.pop(-1)
+      if leave:
+        for check in self.get_node_checks(type(node), leave=True):
+          check(node)
+        self._node_stack.pop(-1)
+        self._kind_counts[self._node_kinds.pop(-1)] -= 1
+        continue
 
-    self._node_stack.append(node)
-    if node.node_type is NodeType.BODY:
-      self.check_body(node)
-    elif node.node_type is NodeType.FLOW_CONTROL:
-      self.check_flow_control(node)
-    elif isinstance(node, ArgGroupNode):
-      self.check_arggroup(node)
-    elif isinstance(node, StatementNode):
-      self.check_statement(node)
-    elif isinstance(node, PositionalGroupNode):
-      self.check_positional_group(node)
-    elif isinstance(node, CommentNode):
-      self.check_comment(node)
+      if isinstance(node, Token):
+        for check in self._token_checks.get(node.type, ()):
+          check(node)
+        continue
 
-    for child in node.children:
-      self.check_tree(child)
-    self._node_stack.pop(-1)
+      if not isinstance(node, TreeNode):
+        continue
 
-  def check_parse_tree(self, node):
-    self.check_variable_assignments(node)
-    self.check_variable_references(node)
-    self.check_tree(node)
+      self._node_stack.append(node)
+      kind = get_node_kind(node)
+      self._node_kinds.append(kind)
+      self._kind_counts[kind] += 1
+      for check in self.get_node_checks(type(node)):
+        check(node)
+      self._visit_count += 1
+
+      stack.append((node, True))
+      stack.extend((child, False) for child in reversed(node.children))
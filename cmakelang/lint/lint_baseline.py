@@ -0,0 +1,174 @@
+"""
+Baseline of known lint, so that only new lint is reported.
+
+Each lint record is identified by a fingerprint of:
+
+* the path of the file, relative to the directory of the baseline file
+* the lint id
+* a hash of the normalized text of the statement containing the record (the
+  semantic tokens of the statement, separated by a single space), or of the
+  line, if the record is not within a statement
+* the occurrence index of the record, among the records of the file with the
+  same lint id and statement text
+
+so that the fingerprint of a record doesn't change when lines are added or
+removed elsewhere in the file, or when the statement is reformatted.
+
+The baseline file is a sorted list of fingerprints, one per line, each a
+compact json list. Fingerprints are compared as text, so loading the baseline
+is just reading the lines of the file into a set.
+"""
+
+from __future__ import unicode_literals
+
+import bisect
+import collections
+import hashlib
+import io
+import json
+import os
+import sys
+
+from cmakelang.parse.common import NodeType, TreeNode
+
+STATEMENT_TYPES = (NodeType.STATEMENT, NodeType.ATWORDSTATEMENT)
+
+
+def normalize_text(text):
+  """Return the text with each run of whitespace replaced by a single
+     space."""
+  return " ".join(text.split())
+
+
+def iter_statements(parse_tree):
+  """Yield each statement node in the parse tree, in order."""
+  stack = [parse_tree]
+  while stack:
+    node = stack.pop()
+    if node.node_type in STATEMENT_TYPES:
+      yield node
+      continue
+    stack.extend(
+        child for child in reversed(node.children)
+        if isinstance(child, TreeNode))
+
+
+class StatementIndex(object):
+  """
+  Index of the source range and normalized text of each statement in a parse
+  tree.
+  """
+
+  def __init__(self, parse_tree):
+    self._begins = []
+    self._ends = []
+    self._texts = []
+    for node in iter_statements(parse_tree):
+      tokens = node.get_tokens()
+      if not tokens:
+        continue
+      self._begins.append(tuple(tokens[0].begin[:2]))
+      self._ends.append(tokens[-1].end[0])
+      self._texts.append(
+          " ".join(token.spelling for token in node.get_semantic_tokens()))
+
+  def get_text(self, location):
+    """
+    Return the normalized text of the statement containing `location` (a
+    tuple of line and, optionally, column) or None if it is not within a
+    statement.
+    """
+    if len(location) < 2:
+      # NOTE(josh): a record for a whole line is assigned to the last
+      # statement which starts on, or spans, that line
+      location = (location[0], sys.maxsize)
+    idx = bisect.bisect_right(self._begins, tuple(location[:2])) - 1
+    if idx < 0 or location[0] > self._ends[idx]:
+      return None
+    return self._texts[idx]
+
+
+def annotate_records(records, parse_tree, content):
+  """
+  Set the `statement` of each lint record to the normalized text of the
+  statement (or line) which contains it.
+  """
+  if not records:
+    return
+
+  index = StatementIndex(parse_tree)
+  lines = content.split("\n")
+  for record in records:
+    if not record.location:
+      continue
+    text = index.get_text(record.location)
+    if text is None:
+      lineno = record.location[0]
+      text = ""
+      if 0 < lineno <= len(lines):
+        text = normalize_text(lines[lineno - 1])
+    record.statement = text
+
+
+def get_relpath(infile_path, baseline_path):
+  """
+  Return the path of the file relative to the directory of the baseline, with
+  forward slashes.
+  """
+  if infile_path == "-":
+    return infile_path
+  basedir = os.path.dirname(os.path.abspath(baseline_path))
+  relpath = os.path.relpath(os.path.abspath(infile_path), basedir)
+  return relpath.replace(os.sep, "/")
+
+
+def get_fingerprints(relpath, records):
+  """Return the list of fingerprints of the (sorted) lint records of a
+     file."""
+  counts = collections.Counter()
+  fingerprints = []
+  for record in records:
+    digest = hashlib.sha1(record.statement.encode("utf-8")).hexdigest()[:16]
+    key = (record.spec.idstr, digest)
+    fingerprints.append(json.dumps(
+        [relpath, record.spec.idstr, digest, counts[key]],
+        separators=(",", ":")))
+    counts[key] += 1
+  return fingerprints
+
+
+class Baseline(object):
+  """The set of fingerprints loaded from a baseline file."""
+
+  def __init__(self, baseline_path, fingerprints=None):
+    self.baseline_path = baseline_path
+    if fingerprints is None:
+      fingerprints = set()
+    self.fingerprints = fingerprints
+
+  @classmethod
+  def load(cls, baseline_path):
+    with io.open(baseline_path, "r", encoding="utf-8") as infile:
+      fingerprints = set(infile.read().splitlines())
+    fingerprints.discard("")
+    return cls(baseline_path, fingerprints)
+
+  def filter(self, infile_path, records):
+    """
+    Return the list of lint records which are not in the baseline, and the
+    number of records which are.
+    """
+    relpath = get_relpath(infile_path, self.baseline_path)
+    new_records = [
+        record for record, fingerprint
+        in zip(records, get_fingerprints(relpath, records))
+        if fingerprint not in self.fingerprints]
+    return new_records, len(records) - len(new_records)
+
+
+def write_baseline(baseline_path, fingerprints):
+  """Write the fingerprints to the baseline file, in sorted order."""
+  with io.open(baseline_path, "w", encoding="utf-8", newline="") as outfile:
+    for fingerprint in sorted(fingerprints):
+      outfile.write(fingerprint)
+      outfile.write("\n")
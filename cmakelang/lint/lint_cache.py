@@ -0,0 +1,179 @@
+"""
+Persistent cache of the lint found in each file.
+
+Each entry holds the lint records of one file (the lint id, location,
+message and statement text of each) and its suppression events, under a key
+which is a hash of the content of the file, the effective configuration and
+the version of cmakelang. When a file and its configuration haven't changed,
+the records are replayed into the file context instead of lexing, parsing
+and checking the file again.
+
+Entries are json files in the cache directory. Each one is written to a
+temporary file and then renamed into place, so that parallel workers (or
+concurrent runs of cmake-lint) never read a partial entry, and don't need to
+lock the cache. A cache hit updates the modification time of the entry, and
+`prune()` removes the least recently used entries in excess of the size
+limit.
+"""
+
+from __future__ import unicode_literals
+
+import errno
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+
+import cmakelang
+from cmakelang.lint import lint_util
+
+logger = logging.getLogger(__name__)
+
+# Incremented whenever the content of a cache entry changes
+CACHE_FORMAT = 3
+
+# Default maximum number of entries in the cache
+DEFAULT_MAX_ENTRIES = 10000
+
+# Temporary files older than this (in seconds) were left behind by a worker
+# which didn't finish writing them, and are removed by `prune()`.
+STALE_TEMPFILE_AGE = 3600.0
+
+ENTRY_SUFFIX = ".json"
+TEMPFILE_PREFIX = ".tmp-"
+
+
+def get_cache_key(config, content):
+  """
+  Return the cache key for the lint of a file with the given `content` (text)
+  checked with the given `config`, or None if the configuration cannot be
+  serialized.
+  """
+  try:
+    config_str = json.dumps(config.as_dict(), sort_keys=True)
+  except (TypeError, ValueError):
+    return None
+
+  hasher = hashlib.sha1()
+  for part in ("{}:{}".format(cmakelang.__version__, CACHE_FORMAT),
+               config_str, content):
+    hasher.update(part.encode("utf-8"))
+    hasher.update(b"\0")
+  return hasher.hexdigest()
+
+
+def serialize_records(records):
+  """Return a json-serializable list of the lint records."""
+  return [[record.spec.idstr, list(record.location or ()), record.msg,
+           record.statement]
+          for record in records]
+
+
+def deserialize_records(lintdb, data):
+  """Return the list of lint records from their serialized form."""
+  return [lint_util.LintRecord(lintdb[idstr], tuple(location), msg, statement)
+          for idstr, location, msg, statement in data]
+
+
+class LintCache(object):
+  """A directory of cached lint records, with at most `max_entries`."""
+
+  def __init__(self, cachedir, max_entries=DEFAULT_MAX_ENTRIES):
+    self.cachedir = cachedir
+    self.max_entries = max_entries
+
+  def get_path(self, key):
+    return os.path.join(self.cachedir, key + ENTRY_SUFFIX)
+
+  def load(self, key, lintdb):
+    """
+    Return the list of lint records and the list of suppression events cached
+    under `key`, or None if there is no (readable) entry.
+    """
+    entry_path = self.get_path(key)
+    try:
+      with io.open(entry_path, "r", encoding="utf-8") as infile:
+        data = json.load(infile)
+      records = deserialize_records(lintdb, data["records"])
+      events = [lint_util.SuppressionEvent(lineno, mode, suppressions)
+                for lineno, mode, suppressions in data["suppressions"]]
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+      # NOTE(josh): the entry may have been removed by a concurrent prune,
+      # or it may be from an incompatible version of the lint database.
+      return None
+
+    try:
+      # Mark the entry as recently used
+      os.utime(entry_path, None)
+    except (IOError, OSError):
+      pass
+    return records, events
+
+  def store(self, key, records, suppression_events=()):
+    """Write the lint records and suppression events as the entry for
+       `key`."""
+    try:
+      if not os.path.isdir(self.cachedir):
+        os.makedirs(self.cachedir)
+    except OSError as ex:
+      if ex.errno != errno.EEXIST:
+        logger.warning("Failed to create lint cache %s", self.cachedir)
+        return
+
+    content = "{}\n".format(json.dumps({
+        "records": serialize_records(records),
+        "suppressions": [list(event) for event in suppression_events],
+    }))
+    try:
+      fileno, temp_path = tempfile.mkstemp(
+          suffix=ENTRY_SUFFIX, prefix=TEMPFILE_PREFIX, dir=self.cachedir)
+      with io.open(fileno, "w", encoding="utf-8") as outfile:
+        outfile.write(content)
+      # NOTE(josh): rename is atomic, so readers see either no entry or the
+      # whole entry. os.rename() doesn't replace an existing file on windows.
+      getattr(os, "replace", os.rename)(temp_path, self.get_path(key))
+    except (IOError, OSError):
+      logger.warning("Failed to write lint cache entry %s", key)
+
+  def prune(self):
+    """
+    Remove the least recently used entries in excess of `max_entries`, and
+    any stale temporary files. Return the number of entries removed.
+    """
+    try:
+      names = os.listdir(self.cachedir)
+    except (IOError, OSError):
+      return 0
+
+    now = time.time()
+    entries = []
+    for name in names:
+      path = os.path.join(self.cachedir, name)
+      try:
+        mtime = os.path.getmtime(path)
+      except (IOError, OSError):
+        continue
+      if name.startswith(TEMPFILE_PREFIX):
+        if now - mtime > STALE_TEMPFILE_AGE:
+          remove_file(path)
+      elif name.endswith(ENTRY_SUFFIX):
+        entries.append((mtime, path))
+
+    if len(entries) <= self.max_entries:
+      return 0
+    entries.sort()
+    excess = entries[:len(entries) - self.max_entries]
+    for _, path in excess:
+      remove_file(path)
+    return len(excess)
+
+
+def remove_file(path):
+  """Remove a file, which may have already been removed concurrently."""
+  try:
+    os.remove(path)
+  except (IOError, OSError):
+    pass
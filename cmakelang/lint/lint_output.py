@@ -0,0 +1,146 @@
+"""
+Machine readable output of lint records.
+
+* ``jsonl``: one json object per lint record, written as soon as each file
+  is checked.
+* ``sarif``: a SARIF 2.1.0 log (a single json document) of all of the lint
+  records, written once all files are checked, with a rule for each entry in
+  `lintdb.LINT_DB`.
+"""
+
+from __future__ import unicode_literals
+
+import json
+
+import cmakelang
+from cmakelang.lint import lint_util
+from cmakelang.lint import lintdb
+
+OUTPUT_FORMATS = ["text", "jsonl", "sarif"]
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+INFORMATION_URI = "https://cmake-format.readthedocs.io"
+HELP_URI = INFORMATION_URI + "/en/latest/lint-implemented.html#{}"
+
+# Map of lint category character to SARIF result level
+SARIF_LEVELS = {
+    "C": "note",
+    "E": "error",
+    "R": "note",
+    "W": "warning",
+}
+
+
+def get_record_dict(infile_path, record):
+  """Return a json-serializable dictionary describing one lint record."""
+  location = record.location or ()
+  return {
+      "path": infile_path,
+      "line": location[0] if location else None,
+      "column": location[1] if len(location) > 1 else None,
+      "id": record.spec.idstr,
+      "category": lint_util.GlobalContext.category_names.get(
+          record.spec.idstr[0]),
+      "message": record.msg,
+  }
+
+
+def write_jsonl(outfile, file_ctx):
+  """Write one json line for each lint record of the file."""
+  for record in file_ctx.get_lint():
+    outfile.write(json.dumps(
+        get_record_dict(file_ctx.infile_path, record), sort_keys=True))
+    outfile.write("\n")
+
+
+def get_first_paragraph(text):
+  return " ".join(text.strip().split("\n\n")[0].split())
+
+
+def get_sarif_rules():
+  """Return the list of SARIF rule descriptors for the lint database."""
+  rules = []
+  for idstr, msgfmt, kwargs in lintdb.LINT_DB:
+    description = kwargs.get("description", "").strip()
+    rule = {
+        "id": idstr,
+        "shortDescription": {
+            "text": get_first_paragraph(description or msgfmt)
+        },
+        "helpUri": HELP_URI.format(idstr.lower()),
+        "defaultConfiguration": {
+            "level": SARIF_LEVELS[idstr[0]]
+        },
+    }
+    if description:
+      rule["fullDescription"] = {"text": description}
+    explain = kwargs.get("explain", "").strip()
+    if explain:
+      rule["help"] = {"text": explain}
+    rules.append(rule)
+  return rules
+
+
+def get_sarif_result(infile_path, record, rule_index):
+  """Return the SARIF result object for one lint record."""
+  idstr = record.spec.idstr
+  result = {
+      "ruleId": idstr,
+      "ruleIndex": rule_index[idstr],
+      "level": SARIF_LEVELS[idstr[0]],
+      "message": {"text": record.msg},
+  }
+  physical_location = {
+      "artifactLocation": {"uri": infile_path.replace("\\", "/")}
+  }
+  # NOTE(josh): lint columns are zero-based, SARIF columns are one-based. A
+  # record on line zero (or with no location) is for the whole file.
+  location = record.location or ()
+  if location and location[0] > 0:
+    region = {"startLine": location[0]}
+    if len(location) > 1:
+      region["startColumn"] = location[1] + 1
+    physical_location["region"] = region
+  result["locations"] = [{"physicalLocation": physical_location}]
+  return result
+
+
+def get_sarif_log(file_ctxs, execution_successful=True):
+  """Return the SARIF log of the lint records of the file contexts."""
+  rules = get_sarif_rules()
+  rule_index = {rule["id"]: idx for idx, rule in enumerate(rules)}
+  results = []
+  for file_ctx in file_ctxs:
+    for record in file_ctx.get_lint():
+      results.append(
+          get_sarif_result(file_ctx.infile_path, record, rule_index))
+
+  return {
+      "$schema": SARIF_SCHEMA,
+      "version": SARIF_VERSION,
+      "runs": [{
+          "tool": {
+              "driver": {
+                  "name": "cmake-lint",
+                  "version": cmakelang.__version__,
+                  "informationUri": INFORMATION_URI,
+                  "rules": rules,
+              }
+          },
+          "invocations": [{
+              "executionSuccessful": execution_successful
+          }],
+          "results": results,
+      }],
+  }
+
+
+def write_sarif(outfile, global_ctx, execution_successful=True):
+  """Write the SARIF log of all files checked under the global context."""
+  file_ctxs = [global_ctx.file_ctxs[infile_path]
+               for infile_path in sorted(global_ctx.file_ctxs)]
+  outfile.write(json.dumps(
+      get_sarif_log(file_ctxs, execution_successful), indent=2,
+      sort_keys=True))
+  outfile.write("\n")
@@ -1,7 +1,9 @@
 from __future__ import unicode_literals
+import bisect
 import collections
 import logging
 
+from cmakelang import stats
 from cmakelang.lint import lintdb
 
 logger = logging.getLogger(__name__)
@@ -11,10 +13,13 @@ class LintRecord(object):
   """Records an instance of lint at a particular location
   """
 
-  def __init__(self, spec, location, msg):
+  def __init__(self, spec, location, msg, statement=""):
     self.spec = spec
     self.location = location
     self.msg = msg
+    # Normalized text of the statement containing this record, which
+    # identifies it in a baseline (see `lint_baseline`)
+    self.statement = statement
 
   def __repr__(self):
     if self.location is None:
@@ -30,7 +35,61 @@ class LintRecord(object):
 
 
 SuppressionEvent = collections.namedtuple(
-    "SuppresionEvent", ["lineno", "mode", "suppressions"])
+    "SuppressionEvent", ["lineno", "mode", "suppressions"])
+
+
+def get_sort_key(record):
+  return (record.location, record.spec.idstr)
+
+
+class SuppressionIndex(object):
+  """
+  Index of the ranges of lines over which each lint id is suppressed, built
+  from a list of suppression events. Each "add" event for an id opens a range
+  at its line number, which is closed (exclusive) at the line number of the
+  next "remove" event for that id, or else extends to the end of the file.
+  """
+
+  def __init__(self, events):
+    ranges = collections.defaultdict(list)
+    open_ranges = {}
+    for event in events:
+      if event.mode == "add":
+        for idstr in event.suppressions:
+          open_ranges.setdefault(idstr, event.lineno)
+      elif event.mode == "remove":
+        for idstr in event.suppressions:
+          begin = open_ranges.pop(idstr, None)
+          if begin is not None and begin < event.lineno:
+            ranges[idstr].append((begin, event.lineno))
+      else:
+        raise ValueError("Illegal suppression event {}".format(event.mode))
+    for idstr, begin in open_ranges.items():
+      ranges[idstr].append((begin, float("inf")))
+
+    # For each id, the sorted begin and end lines of the disjoint ranges
+    # formed by merging any that overlap
+    self._begins = {}
+    self._ends = {}
+    for idstr, idranges in ranges.items():
+      begins = []
+      ends = []
+      for begin, end in sorted(idranges):
+        if ends and begin <= ends[-1]:
+          ends[-1] = max(ends[-1], end)
+        else:
+          begins.append(begin)
+          ends.append(end)
+      self._begins[idstr] = begins
+      self._ends[idstr] = ends
+
+  def is_suppressed(self, idstr, lineno):
+    """Return true if lint `idstr` is suppressed at line `lineno`."""
+    begins = self._begins.get(idstr)
+    if not begins:
+      return False
+    idx = bisect.bisect_right(begins, lineno) - 1
+    return idx >= 0 and lineno < self._ends[idstr][idx]
 
 
 class FileContext(object):
@@ -40,6 +99,11 @@ class FileContext(object):
     self.config = None
     self._lint = []
 
+    # The results of `get_lint()` and `get_category_counts()`, which are
+    # cleared whenever new lint or suppressions are recorded
+    self._lint_cache = None
+    self._category_counts = None
+
     # Suppressions active at the current depth
     self._suppressions = set()
     self._supressed_count = collections.defaultdict(int)
@@ -48,6 +112,20 @@ class FileContext(object):
     # and ending at the line number of the next entry in the list
     self._suppression_events = []
 
+  def __getstate__(self):
+    # NOTE(josh): file contexts are returned from worker processes, so don't
+    # drag along the global context (which owns the output file) or config.
+    state = dict(self.__dict__)
+    state["global_ctx"] = None
+    state["config"] = None
+    state["_lint_cache"] = None
+    state["_category_counts"] = None
+    return state
+
+  def clear_cache(self):
+    self._lint_cache = None
+    self._category_counts = None
+
   def is_idstr(self, idstr):
     return idstr in self.global_ctx.lintdb
 
@@ -65,6 +143,7 @@ class FileContext(object):
 
     self._suppression_events.append(
         SuppressionEvent(lineno, "add", list(new_suppressions)))
+    self.clear_cache()
     return new_suppressions
 
   def unsuppress(self, lineno, idlist):
@@ -75,6 +154,7 @@ class FileContext(object):
       self._suppressions.discard(idstr)
     self._suppression_events.append(
         SuppressionEvent(lineno, "remove", list(idlist)))
+    self.clear_cache()
 
   def record_lint(self, idstr, *args, **kwargs):
     if idstr in self.config.lint.disabled_codes:
@@ -87,40 +167,56 @@ class FileContext(object):
 
     spec = self.global_ctx.lintdb[idstr]
     location = kwargs.pop("location", ())
+    statement = kwargs.pop("statement", "")
     msg = spec.msgfmt.format(*args, **kwargs)
-    record = LintRecord(spec, location, msg)
+    record = LintRecord(spec, location, msg, statement)
     self._lint.append(record)
+    self.clear_cache()
 
   def get_lint(self):
-    """Return lint records in sorted order"""
-    records = [
-        record for _, _, _, record in sorted(
-            (record.location, record.spec.idstr, idx, record)
-            for idx, record in enumerate(self._lint))]
-
-    # Remove any lint records that were suppressed at the line number where
-    # they were recorded
-    out = []
-    events = list(self._suppression_events)
-    active_suppressions = set()
-
-    for record in records:
-      if record.location:
-        while events and record.location[0] >= events[0].lineno:
-          event = events.pop(0)
-          if event.mode == "add":
-            for idstr in event.suppressions:
-              active_suppressions.add(idstr)
-          elif event.mode == "remove":
-            for idstr in event.suppressions:
-              active_suppressions.discard(idstr)
-          else:
-            raise ValueError("Illegal suppression event {}".format(event.mode))
-      if record.spec.idstr in active_suppressions:
-        continue
-      out.append(record)
+    """
+    Return lint records in sorted order, excluding any that were suppressed at
+    the line number where they were recorded. The result is cached until more
+    lint or suppressions are recorded, and must not be modified.
+    """
+    if self._lint_cache is not None:
+      return self._lint_cache
+
+    # NOTE(josh): the sort is stable, so records with the same location and id
+    # are kept in the order they were recorded. Records are mostly recorded
+    # in order, so sorting in place is nearly linear, even when repeated.
+    self._lint.sort(key=get_sort_key)
+
+    # Records without a location are only suppressed by suppressions which
+    # start at line zero (i.e. those for the whole file).
+    index = SuppressionIndex(self._suppression_events)
+    self._lint_cache = [
+        record for record in self._lint
+        if not index.is_suppressed(
+            record.spec.idstr, record.location[0] if record.location else 0)]
+    return self._lint_cache
+
+  def set_lint(self, records, suppression_events=None):
+    """
+    Replace the lint of this file with `records`, which have already been
+    filtered for suppressions (e.g. records from the lint cache). The
+    `suppression_events` of the file, if given, apply to any lint recorded
+    afterward.
+    """
+    self._lint = list(records)
+    self._suppression_events = list(suppression_events or [])
+    self.clear_cache()
 
-    return out
+  def get_suppression_events(self):
+    return self._suppression_events
+
+  def get_category_counts(self):
+    """Return a map of category character (e.g. "C") to the number of
+       lint records in that category."""
+    if self._category_counts is None:
+      self._category_counts = collections.Counter(
+          record.spec.idstr[0] for record in self.get_lint())
+    return self._category_counts
 
   def writeout(self, outfile):
     for record in self.get_lint():
@@ -142,6 +238,9 @@ class GlobalContext(object):
     self.outfile = outfile
     self.lintdb = lintdb.get_database()
     self.file_ctxs = {}
+    self.file_stats = []
+    # Number of lint records which matched the baseline (if any)
+    self.baseline_count = None
 
   def get_file_ctx(self, infile_path, config):
     if infile_path not in self.file_ctxs:
@@ -150,19 +249,31 @@ class GlobalContext(object):
     ctx.config = config
     return ctx
 
+  def add_file_ctx(self, file_ctx):
+    """Adopt a file context that was populated under a different global
+       context (e.g. in a worker process)."""
+    file_ctx.global_ctx = self
+    self.file_ctxs[file_ctx.infile_path] = file_ctx
+    return file_ctx
+
+  def add_file_stats(self, file_stats):
+    """Record the `stats.Stats` collected while checking one file."""
+    self.file_stats.append(file_stats)
+
   def get_category_counts(self):
-    lint_counts = {}
-    for _, file_ctx in sorted(self.file_ctxs.items()):
-      for record in file_ctx.get_lint():
-        category_char = record.spec.idstr[0]
-        if category_char not in lint_counts:
-          lint_counts[category_char] = 0
-        lint_counts[category_char] += 1
-    return lint_counts
-
-  def write_summary(self, outfile):
+    lint_counts = collections.Counter()
+    for file_ctx in self.file_ctxs.values():
+      lint_counts.update(file_ctx.get_category_counts())
+    return dict(lint_counts)
+
+  def write_summary(self, outfile, num_slowest=0):
+    """Write the number of files scanned and the lint counts by category. If
+       `num_slowest` then also write a table of that many of the slowest
+       files, from the recorded file stats."""
     outfile.write("Summary\n=======\n")
     outfile.write("files scanned: {:d}\n".format(len(self.file_ctxs)))
+    if self.baseline_count is not None:
+      outfile.write("lint in baseline: {:d}\n".format(self.baseline_count))
     outfile.write("found lint:\n")
 
     lint_counts = self.get_category_counts()
@@ -172,3 +283,5 @@ class GlobalContext(object):
       category_name = self.category_names[category_char]
       outfile.write(fmtstr.format(category_name, count))
     outfile.write("\n")
+    if num_slowest and self.file_stats:
+      stats.write_slowest_text(outfile, self.file_stats, num_slowest)
@@ -204,6 +204,17 @@ This message belongs to the basic checker.
 }), (
 "E0109", "Invalid argument name {:s} in function/macro definition", {
 }), (
+"E0110",
+"Command \"{:s}\" is not a builtin and is not defined in the project", {
+"description": """\
+Used when a command is called which is neither a known builtin (or listed in
+`additional_commands`) nor defined by a function() or macro() in any listfile
+of the project.
+
+This message belongs to the project checker, which is only run when a
+project index is given (--project-index).
+""",
+}), (
 "E1120", "Missing required positional argument", {
 "description": """\
 Used when a positional argument group expecting an exact number of arguments
@@ -263,5 +274,19 @@ well as for variable expansion in an argument (e.g. `"${CMAKE_Cxx_STANDARD}"`).
 }), (
 "W0106",
 "String looks like a variable reference missing an {:s} tag '{:s}'", {
+}), (
+"W0107", "{:s} \"{:s}\" is never called in the project", {
+"description": """\
+Used when a function or macro is defined but is not called from any listfile
+of the project.
+
+This message belongs to the project checker, which is only run when a
+project index is given (--project-index).
+""",
+"explain": """\
+Commands which are defined for use outside of the project (e.g. in a package
+config file) are never called in the project. Suppress this message for
+those definitions.
+"""
 })
 ]
@@ -0,0 +1,69 @@
+"""
+Lint checks which depend on more than one listfile, using the symbols of the
+whole project from a `symbol_index.SymbolIndex`.
+"""
+
+from __future__ import unicode_literals
+
+from cmakelang.parse.funs import get_parse_db
+
+# Lint ids recorded by `check_file()`
+IDS = ("E0110", "W0107")
+
+# NOTE(josh): commands which cmake knows, but which aren't in the parse
+# database (see `test/command_db_test.py`)
+EXTRA_BUILTINS = (
+    "add_link_options",
+    "block",
+    "cmake_language",
+    "cmake_path",
+    "endblock",
+    "endforeach",
+    "endfunction",
+    "endmacro",
+    "target_link_directories",
+    "target_link_options",
+    "target_precompile_headers",
+)
+
+_BUILTINS = []
+
+
+def get_builtins():
+  """Return the set of (lower case) names of builtin commands."""
+  if not _BUILTINS:
+    _BUILTINS.append(frozenset(get_parse_db()) | frozenset(EXTRA_BUILTINS))
+  return _BUILTINS[0]
+
+
+def get_known_commands(config):
+  """Return the set of builtin commands and those in `additional_commands`."""
+  return get_builtins() | frozenset(
+      name.lower() for name in config.parse.fn_spec.kwargs)
+
+
+def check_file(config, local_ctx, index):
+  """
+  Record lint for the calls to undefined commands in the file, and for the
+  functions and macros it defines which are not called in the project.
+  """
+  if not set(IDS) - set(config.lint.disabled_codes):
+    return
+  symbols = index.get_file(local_ctx.infile_path)
+  if symbols is None:
+    return
+
+  known_commands = get_known_commands(config)
+  for funname, locations in sorted(symbols.calls.items()):
+    if funname in known_commands or index.get_definitions(funname):
+      continue
+    for line, col in locations:
+      local_ctx.record_lint(
+          "E0110", funname, location=(line, col), statement=funname)
+
+  for name, kind, line, col in symbols.definitions:
+    if name.lower() in known_commands or index.get_call_count(name):
+      continue
+    local_ctx.record_lint(
+        "W0107", kind.capitalize(), name, location=(line, col),
+        statement="{}({})".format(kind, name))
@@ -0,0 +1,256 @@
+"""
+Index of the symbols defined and used in each listfile of a project.
+
+For each file the index records:
+
+* the `function()` and `macro()` definitions, with their location
+* the call sites of each command which is not a builtin
+* the `include()` and `add_subdirectory()` edges to other files
+* the names of variables assigned with `set()` or `option()`
+
+along with a hash of the content of the file, so that the index can be
+updated incrementally: a file is only parsed again if its content has
+changed. Checks which need to know about more than one file (e.g. whether
+a command is defined anywhere) query the index instead of parsing the other
+files.
+
+The index is stored as a single compact json file. Files are keyed by their
+path relative to the directory of the index file, so that the index is valid
+regardless of the working directory that cmake-lint is run from.
+"""
+
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+
+from cmakelang.lint import lint_baseline
+
+logger = logging.getLogger(__name__)
+
+# Incremented whenever the content of the index changes
+INDEX_FORMAT = 2
+
+DEFINITION_COMMANDS = ("function", "macro")
+INCLUDE_COMMANDS = ("include", "add_subdirectory")
+ASSIGNMENT_COMMANDS = ("set", "option")
+
+
+def get_digest(content):
+  """Return the hash of the content (text) of a listfile."""
+  return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def get_index_path(infile_path, index_path):
+  """Return the path of a listfile relative to the directory of the index
+     file, used as its key in the index."""
+  return lint_baseline.get_relpath(infile_path, index_path)
+
+
+class FileSymbols(object):
+  """
+  Symbols of one listfile:
+
+  * `definitions`: list of `[name, kind, line, col]` for each function or
+    macro definition, where `kind` is "function" or "macro"
+  * `calls`: map of (lower case) command name to the list of `[line, col]`
+    of each call site
+  * `includes`: list of `[command, argument, line]` for each `include()` or
+    `add_subdirectory()`
+  * `assignments`: map of variable name to the list of line numbers where it
+    is assigned
+  """
+
+  def __init__(self, digest, definitions=None, calls=None, includes=None,
+               assignments=None):
+    self.digest = digest
+    self.definitions = definitions or []
+    self.calls = calls or {}
+    self.includes = includes or []
+    self.assignments = assignments or {}
+
+  def as_dict(self):
+    return {
+        "digest": self.digest,
+        "definitions": self.definitions,
+        "calls": self.calls,
+        "includes": self.includes,
+        "assignments": self.assignments,
+    }
+
+  @classmethod
+  def from_dict(cls, data):
+    return cls(data["digest"], data["definitions"], data["calls"],
+               data["includes"], data["assignments"])
+
+
+def get_arguments(node):
+  """Return the semantic tokens of the arguments of a statement."""
+  if node.argtree is None:
+    return []
+  return [token for token in node.argtree.get_semantic_tokens()
+          if token.spelling not in ("(", ")")]
+
+
+def get_file_symbols(parse_tree, digest, builtins):
+  """
+  Return the `FileSymbols` of a parse tree. Calls to commands in `builtins`
+  (a set of lower case command names) are not recorded.
+  """
+  symbols = FileSymbols(digest)
+  for node in lint_baseline.iter_statements(parse_tree):
+    if not hasattr(node, "get_funname"):
+      # @-word statements (i.e. in configured files) aren't commands
+      continue
+    funname = node.get_funname()
+    args = get_arguments(node)
+    if funname in DEFINITION_COMMANDS:
+      if args:
+        line, col = args[0].get_location()[:2]
+        symbols.definitions.append([args[0].spelling, funname, line, col])
+    elif funname in INCLUDE_COMMANDS:
+      if args:
+        symbols.includes.append(
+            [funname, args[0].spelling, node.get_location()[0]])
+    elif funname in ASSIGNMENT_COMMANDS:
+      if args:
+        symbols.assignments.setdefault(args[0].spelling, []).append(
+            args[0].get_location()[0])
+    elif (funname == "cmake_language" and len(args) > 1
+          and args[0].spelling.upper() == "CALL"):
+      # NOTE(josh): a dynamic call to a command with a literal name
+      line, col = args[1].get_location()[:2]
+      symbols.calls.setdefault(args[1].spelling.lower(), []).append(
+          [line, col])
+
+    if funname not in builtins:
+      # NOTE(josh): calls to builtins far outnumber the others, and aren't
+      # needed to check whether project commands are defined or used
+      line, col = node.get_location()[:2]
+      symbols.calls.setdefault(funname, []).append([line, col])
+  return symbols
+
+
+class SymbolIndex(object):
+  """
+  Map of listfile path (relative to the directory of the index file at
+  `index_path`) to the `FileSymbols` of that file.
+  """
+
+  def __init__(self, index_path, files=None):
+    self.index_path = index_path
+    self.files = files or {}
+    self._definitions = None
+    self._call_counts = None
+
+  @classmethod
+  def load(cls, index_path):
+    """Load the index from a file, or return an empty index if the file
+       doesn't exist or is from a different version."""
+    try:
+      with io.open(index_path, "r", encoding="utf-8") as infile:
+        data = json.load(infile)
+      if data.get("format") != INDEX_FORMAT:
+        return cls(index_path)
+      return cls(index_path, {path: FileSymbols.from_dict(filedata)
+                              for path, filedata in data["files"].items()})
+    except (IOError, OSError):
+      return cls(index_path)
+    except (ValueError, KeyError, TypeError, AttributeError):
+      logger.warning("Ignoring invalid symbol index %s", index_path)
+      return cls(index_path)
+
+  def dump(self):
+    """Write the index to its file."""
+    index_path = self.index_path
+    content = json.dumps(
+        {"format": INDEX_FORMAT,
+         "files": {path: symbols.as_dict()
+                   for path, symbols in self.files.items()}},
+        sort_keys=True, separators=(",", ":"))
+    dirname = os.path.dirname(os.path.abspath(index_path))
+    fileno, temp_path = tempfile.mkstemp(
+        prefix=".tmp-", suffix=".json", dir=dirname)
+    with io.open(fileno, "w", encoding="utf-8") as outfile:
+      outfile.write(content)
+      outfile.write("\n")
+    # NOTE(josh): os.rename() doesn't replace an existing file on windows.
+    getattr(os, "replace", os.rename)(temp_path, index_path)
+
+  def get_digest(self, infile_path):
+    """Return the content hash of the file when it was indexed, or None if
+       it is not in the index."""
+    symbols = self.get_file(infile_path)
+    if symbols is None:
+      return None
+    return symbols.digest
+
+  def get_file(self, infile_path):
+    """Return the `FileSymbols` of a file, or None if it is not indexed."""
+    return self.files.get(get_index_path(infile_path, self.index_path))
+
+  def update(self, infile_path, symbols):
+    """Replace the symbols of one file."""
+    self.files[get_index_path(infile_path, self.index_path)] = symbols
+    self._definitions = None
+    self._call_counts = None
+
+  def remove_missing(self):
+    """Remove the files which no longer exist from the index. Return the
+       number of files removed."""
+    basedir = os.path.dirname(os.path.abspath(self.index_path))
+    missing = [path for path in self.files
+               if not os.path.exists(os.path.join(basedir, path))]
+    for path in missing:
+      self.files.pop(path)
+    if missing:
+      self._definitions = None
+      self._call_counts = None
+    return len(missing)
+
+  def get_definitions(self, name):
+    """
+    Return a list of `(path, kind, line, col)` for each definition of the
+    command `name` (case insensitive) in the project.
+    """
+    if self._definitions is None:
+      self._definitions = {}
+      for path, symbols in sorted(self.files.items()):
+        for defname, kind, line, col in symbols.definitions:
+          self._definitions.setdefault(defname.lower(), []).append(
+              (path, kind, line, col))
+    return self._definitions.get(name.lower(), [])
+
+  def get_call_count(self, name):
+    """Return the number of calls to the command `name` in the project."""
+    if self._call_counts is None:
+      self._call_counts = {}
+      for symbols in self.files.values():
+        for funname, locations in symbols.calls.items():
+          self._call_counts[funname] = (
+              self._call_counts.get(funname, 0) + len(locations))
+    return self._call_counts.get(name.lower(), 0)
+
+
+# Index loaded by `get_cached_index()` in this process, and the path and
+# modification time of the file it was loaded from
+_LOADED_INDEX = [None, None]
+
+
+def get_cached_index(index_path):
+  """
+  Return the index loaded from `index_path`, loading it only once per process
+  (e.g. once in each worker) unless the file has changed.
+  """
+  try:
+    key = (index_path, os.path.getmtime(index_path))
+  except (IOError, OSError):
+    key = (index_path, None)
+  if _LOADED_INDEX[0] != key:
+    _LOADED_INDEX[0] = key
+    _LOADED_INDEX[1] = SymbolIndex.load(index_path)
+  return _LOADED_INDEX[1]
@@ -5,13 +5,26 @@ import unittest
 
 # pylint: disable=W0401,W0611,W0614
 from cmakelang.lint.test import genfiles
+from cmakelang.lint.test.baseline_tests import TestLintBaseline
+from cmakelang.lint.test.cache_tests import TestLintCache
+from cmakelang.lint.test.checker_tests import (
+    TestFileContext, TestLineScanner, TestLintChecker)
 from cmakelang.lint.test.expect_tests import gen_test_classes, ConfigTestCase
 from cmakelang.lint.test.execution_tests import TestFormatFiles
+from cmakelang.lint.test.output_tests import TestLintOutput
+from cmakelang.lint.test.project_tests import TestProjectChecks
 
 if __name__ == "__main__":
   classnames = [
       "ConfigTestCase",
+      "TestFileContext",
       "TestFormatFiles",
+      "TestLineScanner",
+      "TestLintBaseline",
+      "TestLintCache",
+      "TestLintChecker",
+      "TestLintOutput",
+      "TestProjectChecks",
   ]
 
   classobj = None
@@ -0,0 +1,137 @@
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from cmakelang import configuration
+from cmakelang.lint import __main__
+from cmakelang.lint import lint_baseline
+from cmakelang.lint import lint_util
+
+ROOTDIR = os.sep.join(os.path.realpath(__file__).split(os.sep)[:-4])
+
+
+class TestLintBaseline(unittest.TestCase):
+
+  def setUp(self):
+    self.tempdir = tempfile.mkdtemp(prefix="cmakelang-lint-baseline-")
+    self.config = configuration.Configuration()
+
+  def tearDown(self):
+    shutil.rmtree(self.tempdir)
+
+  def get_lint(self, content):
+    global_ctx = lint_util.GlobalContext(None)
+    local_ctx = global_ctx.get_file_ctx("test.cmake", self.config)
+    __main__.process_file(self.config, local_ctx, content)
+    return local_ctx.get_lint()
+
+  def get_fingerprints(self, content):
+    return lint_baseline.get_fingerprints("test.cmake", self.get_lint(content))
+
+  def test_statement_text(self):
+    records = self.get_lint("\n".join([
+        "set(lowerCase 1)",
+        "if(FOO)",
+        "  set(otherCase",
+        "      2)  ",
+        "endif()",
+        "# a   comment  ",
+        "",
+    ]))
+    self.assertEqual(
+        [("C0103", "set ( lowerCase 1 )"),
+         ("C0103", "set ( otherCase 2 )"),
+         ("C0303", "set ( otherCase 2 )"),
+         ("C0303", "# a comment")],
+        [(record.spec.idstr, record.statement) for record in records])
+
+  def test_survives_line_shifts(self):
+    fingerprints = self.get_fingerprints("\n".join([
+        "set(lowerCase 1)",
+        "set(lowerCase 1)",
+        "",
+    ]))
+    self.assertEqual(
+        ['["test.cmake","C0103","f61534e556413c89",0]',
+         '["test.cmake","C0103","f61534e556413c89",1]'], fingerprints)
+    self.assertEqual(fingerprints, self.get_fingerprints("\n".join([
+        "# a comment",
+        "",
+        "set(lowerCase  1)",
+        "set(",
+        "  lowerCase 1)",
+        "",
+    ])))
+
+  def test_filter(self):
+    baseline = lint_baseline.Baseline(
+        os.path.join(self.tempdir, "baseline.jsonl"),
+        set(self.get_fingerprints("set(lowerCase 1)\n")))
+    records = self.get_lint("\n".join([
+        "set(lowerCase 1)",
+        "set(lowerCase 1)",
+        "set(upperCase 1)",
+        "",
+    ]))
+
+    # NOTE(josh): the path in each fingerprint is relative to the baseline
+    new_records, count = baseline.filter(
+        os.path.join(self.tempdir, "test.cmake"), records)
+    self.assertEqual(1, count)
+    self.assertEqual(
+        ["02,04: [C0103]", "03,04: [C0103]"],
+        [repr(record)[:14] for record in new_records])
+
+    new_records, count = baseline.filter(
+        os.path.join(self.tempdir, "other.cmake"), records)
+    self.assertEqual(0, count)
+    self.assertEqual(3, len(new_records))
+
+  def test_write_and_load(self):
+    baseline_path = os.path.join(self.tempdir, "baseline.jsonl")
+    fingerprints = self.get_fingerprints(
+        "set(lowerCase 1)  \nset(upperCase 1)\n")
+    lint_baseline.write_baseline(baseline_path, fingerprints)
+    with io.open(baseline_path, "r", encoding="utf-8") as infile:
+      self.assertEqual(sorted(fingerprints), infile.read().splitlines())
+    self.assertEqual(
+        set(fingerprints),
+        lint_baseline.Baseline.load(baseline_path).fingerprints)
+
+  def test_baseline_output(self):
+    """Lint in the baseline is not reported, with or without the cache."""
+    infile_path = os.path.join(self.tempdir, "test.cmake")
+    baseline_path = os.path.join(self.tempdir, "baseline.jsonl")
+    cachedir = os.path.join(self.tempdir, "cache")
+    with io.open(infile_path, "w", encoding="utf-8") as outfile:
+      outfile.write("set(lowerCase 1)\n")
+
+    argv = [sys.executable, "-Bm", "cmakelang.lint", "--cache-dir", cachedir,
+            infile_path]
+    proc = subprocess.Popen(
+        argv + ["--write-baseline", baseline_path], cwd=ROOTDIR,
+        stdout=subprocess.PIPE)
+    self.assertIn(b"[C0103]", proc.communicate()[0])
+    self.assertEqual(1, proc.returncode)
+
+    with io.open(infile_path, "w", encoding="utf-8") as outfile:
+      outfile.write("\n\nset(lowerCase 1)\n")
+    for _ in range(2):
+      proc = subprocess.Popen(
+          argv + ["--baseline", baseline_path], cwd=ROOTDIR,
+          stdout=subprocess.PIPE)
+      output = proc.communicate()[0]
+      self.assertEqual(0, proc.returncode)
+      self.assertNotIn(b"[C0103]", output)
+      self.assertIn(b"lint in baseline: 1\n", output)
+    self.assertEqual(2, len(os.listdir(cachedir)))
+
+
+if __name__ == "__main__":
+  unittest.main()
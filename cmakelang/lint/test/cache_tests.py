@@ -0,0 +1,98 @@
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from cmakelang import configuration
+from cmakelang.lint import lint_cache
+from cmakelang.lint import lint_util
+
+ROOTDIR = os.sep.join(os.path.realpath(__file__).split(os.sep)[:-4])
+
+
+class TestLintCache(unittest.TestCase):
+
+  def setUp(self):
+    self.cachedir = tempfile.mkdtemp(prefix="cmakelang-lint-cache-")
+    self.config = configuration.Configuration()
+    self.global_ctx = lint_util.GlobalContext(None)
+
+  def tearDown(self):
+    shutil.rmtree(self.cachedir)
+
+  def make_records(self):
+    local_ctx = self.global_ctx.get_file_ctx("test.cmake", self.config)
+    local_ctx.record_lint("C0303", location=(3,))
+    local_ctx.record_lint("C0301", 90, 80, location=(1,))
+    local_ctx.record_lint("C0111", location=(5, 2, 40))
+    return local_ctx.get_lint()
+
+  def test_cache_key(self):
+    key = lint_cache.get_cache_key(self.config, "foo()\n")
+    self.assertEqual(key, lint_cache.get_cache_key(self.config, "foo()\n"))
+    self.assertNotEqual(key, lint_cache.get_cache_key(self.config, "bar()\n"))
+    other_config = configuration.Configuration(line_width=100)
+    self.assertNotEqual(key, lint_cache.get_cache_key(other_config, "foo()\n"))
+
+  def test_store_and_load(self):
+    cache = lint_cache.LintCache(self.cachedir)
+    self.assertIsNone(cache.load("abc", self.global_ctx.lintdb))
+
+    records = self.make_records()
+    events = [lint_util.SuppressionEvent(6, "add", ["C0111"])]
+    cache.store("abc", records, events)
+    loaded, loaded_events = cache.load("abc", self.global_ctx.lintdb)
+    self.assertEqual(
+        [repr(record) for record in records],
+        [repr(record) for record in loaded])
+    self.assertEqual(events, loaded_events)
+
+    # Replayed records are written out the same way, and the suppressions
+    # apply to lint recorded afterward
+    local_ctx = self.global_ctx.get_file_ctx("other.cmake", self.config)
+    local_ctx.set_lint(loaded, loaded_events)
+    local_ctx.record_lint("C0111", location=(6, 0, 50))
+    self.assertEqual(
+        {"C": 3}, dict(local_ctx.get_category_counts()))
+
+    # A corrupt entry is a miss
+    with io.open(cache.get_path("abc"), "w", encoding="utf-8") as outfile:
+      outfile.write("{\"records\": [")
+    self.assertIsNone(cache.load("abc", self.global_ctx.lintdb))
+
+  def test_prune(self):
+    cache = lint_cache.LintCache(self.cachedir, max_entries=3)
+    for idx, key in enumerate("abcde"):
+      cache.store(key, [])
+      os.utime(cache.get_path(key), (1000 + idx, 1000 + idx))
+
+    # A hit marks the entry as recently used
+    self.assertEqual(([], []), cache.load("a", self.global_ctx.lintdb))
+    self.assertEqual(2, cache.prune())
+    self.assertEqual(
+        ["a.json", "d.json", "e.json"], sorted(os.listdir(self.cachedir)))
+    self.assertEqual(0, cache.prune())
+
+  def test_cached_output(self):
+    """The output of cmake-lint is the same when the lint is replayed from
+       the cache."""
+    argv = [sys.executable, "-Bm", "cmakelang.lint", "--cache-dir",
+            self.cachedir, os.path.join("cmakelang", "lint", "test",
+                                        "expect_lint.cmake")]
+    outputs = []
+    for _ in range(2):
+      proc = subprocess.Popen(argv, cwd=ROOTDIR, stdout=subprocess.PIPE)
+      outputs.append(proc.communicate()[0])
+      self.assertEqual(1, proc.returncode)
+    self.assertEqual(1, len(os.listdir(self.cachedir)))
+    self.assertEqual(outputs[0], outputs[1])
+    self.assertIn(b"[C0111]", outputs[1])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import random
+import unittest
+
+from cmakelang import configuration
+from cmakelang import lex
+from cmakelang import parse
+from cmakelang.lint import basic_checker
+from cmakelang.lint import lint_util
+from cmakelang.lint import lintdb
+from cmakelang.parse.argument_nodes import ArgGroupNode, ConditionalGroupNode
+from cmakelang.parse.body_nodes import BodyNode, FlowControlNode
+from cmakelang.parse.common import TreeNode
+from cmakelang.parse.statement_node import StatementNode
+
+
+class CountingChecker(basic_checker.LintChecker):
+  """Checker which also records every node and token that it visits."""
+
+  def __init__(self, *args, **kwargs):
+    super(CountingChecker, self).__init__(*args, **kwargs)
+    self.visited_nodes = []
+    self.visited_tokens = []
+    self._token_checks[lex.TokenType.WORD].append(self.visited_tokens.append)
+    for node_class in (BodyNode, StatementNode, ConditionalGroupNode):
+      self.get_node_checks(node_class).append(self.visited_nodes.append)
+
+
+class TestLintChecker(unittest.TestCase):
+
+  def setUp(self):
+    self.config = configuration.Configuration()
+    global_ctx = lint_util.GlobalContext(None)
+    self.local_ctx = global_ctx.get_file_ctx("test.cmake", self.config)
+
+  def parse(self, content):
+    tokens = lex.tokenize(content)
+    parse_db = parse.funs.get_parse_db()
+    parse_tree = parse.parse(
+        tokens, parse.ParseContext(parse_db, self.local_ctx, self.config))
+    parse_tree.build_ancestry()
+    return parse_tree
+
+  def test_registry(self):
+    names = [spec.name for spec in basic_checker.CHECKS]
+    self.assertEqual(len(names), len(set(names)))
+    known_ids = lintdb.get_database()
+    for spec in basic_checker.CHECKS:
+      self.assertTrue(callable(getattr(basic_checker.LintChecker, spec.name)))
+      self.assertTrue(spec.node_types or spec.token_types)
+      for idstr in spec.ids or ():
+        self.assertIn(idstr, known_ids)
+    for idstr in basic_checker.BASIC_IDS + basic_checker.TOKEN_IDS:
+      self.assertIn(idstr, known_ids)
+
+  def get_check_names(self, checker):
+    return set(
+        check.__name__ for checks in checker._token_checks.values()  # pylint: disable=W0212
+        for check in checks) | set(
+            check.__name__ for check in checker.get_node_checks(BodyNode))
+
+  def test_disabled_checks(self):
+    """Checks which can only record disabled lint should not be run."""
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    self.assertIn("check_token", self.get_check_names(checker))
+    self.assertIn("check_body", self.get_check_names(checker))
+
+    self.config.lint.disabled_codes = [
+        "C0307", "C0111", "C0112", "C0321", "C0305"]
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    self.assertNotIn("check_token", self.get_check_names(checker))
+    self.assertIn("check_body", self.get_check_names(checker))
+    self.assertIn("check_body_pragmas", self.get_check_names(checker))
+
+    self.config.lint.disabled_codes.append("W0101")
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    self.assertNotIn("check_body", self.get_check_names(checker))
+    self.assertIn("check_body_pragmas", self.get_check_names(checker))
+
+  def test_file_wide_suppression(self):
+    """Lint disabled by a pragma before the first statement is suppressed for
+       the whole file, and the checks for it are not run."""
+    parse_tree = self.parse(
+        "  # Indented comment\n"
+        "# cmake-lint: disable=C0307\n"
+        "if(TRUE)\n"
+        "message(foo)\n"
+        "endif()\n")
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    checker.check_parse_tree(parse_tree)
+    self.assertNotIn("check_token", self.get_check_names(checker))
+    self.assertEqual([], self.local_ctx.get_lint())
+
+    self.setUp()
+    parse_tree = self.parse(
+        "  # Indented comment\n"
+        "if(TRUE)\n"
+        "# cmake-lint: disable=C0307\n"
+        "message(foo)\n"
+        "endif()\n")
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    checker.check_parse_tree(parse_tree)
+    self.assertIn("check_token", self.get_check_names(checker))
+    self.assertEqual(
+        [("C0307", 1)],
+        [(record.spec.idstr, record.location[0])
+         for record in self.local_ctx.get_lint()])
+
+  def test_missing_closing_brace(self):
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    checker.check_tokens(lex.tokenize(
+        'message("$foo ${CMAKE_CXX_FLAGS")\n'
+        'message("plain" ${CMAKE_CXX_FLAGS})\n'))
+    self.assertEqual(
+        ["01,08: [W0106] String looks like a variable reference missing an"
+         " closing tag '${CMAKE_CXX_FLAGS'"],
+        [str(record) for record in self.local_ctx.get_lint()])
+
+  def test_dispatch_by_class(self):
+    """Checks registered for a node class should be dispatched for its
+       subclasses as well, in the order that they were registered."""
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    checks = [
+        check.__name__ for check in
+        checker.get_node_checks(ConditionalGroupNode)]
+    self.assertEqual(["count_conditional", "check_arggroup"], checks)
+    self.assertEqual(
+        ["end_body"],
+        [check.__name__
+         for check in checker.get_node_checks(BodyNode, leave=True)])
+    self.assertEqual([], checker.get_node_checks(TreeNode))
+
+  def test_single_traversal(self):
+    """Each node and token should be visited exactly once, in order."""
+    parse_tree = self.parse(
+        "function(foo)\n"
+        "  if(a STREQUAL b)\n"
+        "    message(foo)\n"
+        "  endif()\n"
+        "endfunction()\n")
+    checker = CountingChecker(self.config, self.local_ctx)
+    checker.check_parse_tree(parse_tree)
+
+    self.assertEqual(
+        ["function", "if", "message", "endif", "endfunction"],
+        [node.get_funname() for node in checker.visited_nodes
+         if isinstance(node, StatementNode)])
+    self.assertEqual(
+        len(checker.visited_nodes),
+        len(set(id(node) for node in checker.visited_nodes)))
+    self.assertEqual(
+        [token for token in parse_tree.get_tokens()
+         if token.type is lex.TokenType.WORD],
+        checker.visited_tokens)
+    self.assertEqual([], checker._node_stack)  # pylint: disable=W0212
+
+  def test_scope_tracking(self):
+    """The scope counts should match a scan of the node stack at every
+       token."""
+    parse_tree = self.parse(
+        "foreach(x a b)\n"
+        "  function(foo)\n"
+        "    if(x)\n"
+        "      break()\n"
+        "    endif()\n"
+        "  endfunction()\n"
+        "endforeach()\n"
+        "while(y)\n"
+        "  message(\n"
+        "    foo # comment\n"
+        "    bar)\n"
+        "endwhile()\n"
+        "if(z)\n"
+        "  continue()\n"
+        "endif()\n")
+    checker = basic_checker.LintChecker(self.config, self.local_ctx)
+    scopes = []
+
+    # pylint: disable=W0212
+    node_stack = checker._node_stack
+    kind_counts = checker._kind_counts
+
+    def record_scope(_token):
+      scopes.append((
+          (checker.get_scope_depth(), checker.am_in_statement(),
+           checker.am_in_arggroup(),
+           bool(kind_counts[basic_checker.LOOP_NODE])),
+          (sum(isinstance(node, BodyNode) for node in node_stack),
+           any(isinstance(node, StatementNode) for node in node_stack),
+           any(isinstance(node, ArgGroupNode) for node in node_stack),
+           any(isinstance(node, FlowControlNode)
+               and node.children[0].get_funname() in ("foreach", "while")
+               for node in node_stack))))
+
+    checker._token_checks[lex.TokenType.WORD].append(record_scope)
+    checker.check_parse_tree(parse_tree)
+    self.assertGreater(len(scopes), 10)
+    for actual, expected in scopes:
+      self.assertEqual(expected, actual)
+    self.assertEqual(
+        [0] * (basic_checker.LOOP_NODE + 1), kind_counts)
+
+    self.assertEqual(
+        ["14,02: [E0103] continue outside of loop"],
+        [repr(record) for record in self.local_ctx.get_lint()
+         if record.spec.idstr == "E0103"])
+
+
+
+def check_lines(checker, infile_content):
+  """Check each line of the file in turn, as `check_basics()` did before it
+     used a line scanner."""
+  lines = infile_content.split("\n")
+  for lineno, line in enumerate(lines):
+    checker.check_line(lineno + 1, line)
+  if not infile_content.endswith("\n"):
+    checker.context[1].record_lint("C0304", location=(len(lines),))
+
+
+class TestLineScanner(unittest.TestCase):
+
+  def get_lint(self, config, infile_content, use_scanner):
+    global_ctx = lint_util.GlobalContext(None)
+    local_ctx = global_ctx.get_file_ctx("test.cmake", config)
+    checker = basic_checker.LintChecker(config, local_ctx)
+    if use_scanner:
+      checker.check_basics(infile_content)
+    else:
+      check_lines(checker, infile_content)
+    return [str(record) for record in local_ctx.get_lint()]
+
+  def test_same_as_each_line(self):
+    rng = random.Random(0)
+    alphabet = ["a", "b", " ", "\t", "\r", "\n", "\n", "\x0c", "\u00a0"]
+    for line_ending in ("unix", "windows"):
+      for use_tabchars in (False, True):
+        for policy in ("use-space", "round-up"):
+          config = configuration.Configuration(
+              line_width=6, line_ending=line_ending,
+              use_tabchars=use_tabchars, fractional_tab_policy=policy)
+          for _ in range(200):
+            content = "".join(
+                rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            self.assertEqual(
+                self.get_lint(config, content, use_scanner=False),
+                self.get_lint(config, content, use_scanner=True),
+                repr(content))
+
+  def test_line_numbers(self):
+    config = configuration.Configuration(line_width=10)
+    content = "ok\n\ttab\n\nok\ntrailing \n" + "x" * 11
+    self.assertEqual([
+        "02,00: [C0306] Tab-policy violation. Found tab but should be space",
+        "05: [C0303] Trailing whitespace",
+        "06: [C0301] Line too long (11/10)",
+        "06: [C0304] Final newline missing"],
+                     self.get_lint(config, content, use_scanner=True))
+
+
+class TestFileContext(unittest.TestCase):
+
+  def setUp(self):
+    self.config = configuration.Configuration()
+    self.global_ctx = lint_util.GlobalContext(None)
+    self.local_ctx = self.global_ctx.get_file_ctx("test.cmake", self.config)
+
+  def get_lint(self):
+    return [
+        (record.spec.idstr, record.location[0])
+        for record in self.local_ctx.get_lint()]
+
+  def test_sorted_and_cached(self):
+    self.local_ctx.record_lint("C0303", location=(5,))
+    self.local_ctx.record_lint("C0304", location=(2,))
+    self.local_ctx.record_lint("C0303", location=(2,))
+    records = self.local_ctx.get_lint()
+    self.assertEqual([("C0303", 2), ("C0304", 2), ("C0303", 5)],
+                     self.get_lint())
+    self.assertIs(records, self.local_ctx.get_lint())
+    self.assertEqual({"C": 3}, self.global_ctx.get_category_counts())
+
+    self.local_ctx.record_lint("W0101", location=(1, 0))
+    self.assertEqual(("W0101", 1), self.get_lint()[0])
+    self.assertEqual({"C": 3, "W": 1}, self.global_ctx.get_category_counts())
+
+  def test_nested_suppressions(self):
+    """A suppression within the scope of another should apply even though it
+       is recorded after the end of the outer one."""
+    for lineno in (1, 4, 9):
+      self.local_ctx.record_lint("C0303", location=(lineno,))
+      self.local_ctx.record_lint("C0304", location=(lineno,))
+    # Outer scope, lines [2, 10)
+    self.local_ctx.suppress(2, ["C0303"])
+    self.local_ctx.unsuppress(10, ["C0303"])
+    # Inner scope, lines [3, 5)
+    self.local_ctx.suppress(3, ["C0304"])
+    self.local_ctx.unsuppress(5, ["C0304"])
+    self.assertEqual(
+        [("C0303", 1), ("C0304", 1), ("C0304", 9)], self.get_lint())
+
+  def test_suppression_index(self):
+    index = lint_util.SuppressionIndex([
+        lint_util.SuppressionEvent(3, "add", ["C0303"]),
+        lint_util.SuppressionEvent(5, "remove", ["C0303"]),
+        lint_util.SuppressionEvent(4, "add", ["C0303"]),
+        lint_util.SuppressionEvent(8, "remove", ["C0303"]),
+        lint_util.SuppressionEvent(20, "add", ["C0303", "C0304"]),
+    ])
+    self.assertEqual(
+        [3, 4, 5, 6, 7, 20, 21],
+        [lineno for lineno in range(22)
+         if index.is_suppressed("C0303", lineno)])
+    self.assertTrue(index.is_suppressed("C0303", 1000))
+    self.assertFalse(index.is_suppressed("C0304", 19))
+    self.assertTrue(index.is_suppressed("C0304", 1000))
+    self.assertFalse(index.is_suppressed("C0305", 20))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,92 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+from cmakelang import configuration
+from cmakelang.lint import lint_output
+from cmakelang.lint import lint_util
+from cmakelang.lint import lintdb
+
+ROOTDIR = os.sep.join(os.path.realpath(__file__).split(os.sep)[:-4])
+
+
+class TestLintOutput(unittest.TestCase):
+
+  def setUp(self):
+    self.config = configuration.Configuration()
+    self.global_ctx = lint_util.GlobalContext(None)
+    local_ctx = self.global_ctx.get_file_ctx("test.cmake", self.config)
+    local_ctx.record_lint("C0303", location=(3,))
+    local_ctx.record_lint("E1120", location=(5, 2, 40))
+    local_ctx.record_lint("C0304", location=())
+    self.local_ctx = local_ctx
+
+  def test_jsonl(self):
+    outfile = io.StringIO()
+    lint_output.write_jsonl(outfile, self.local_ctx)
+    self.assertEqual([
+        {"path": "test.cmake", "line": None, "column": None, "id": "C0304",
+         "category": "Convention",
+         "message": "Final newline missing"},
+        {"path": "test.cmake", "line": 3, "column": None, "id": "C0303",
+         "category": "Convention", "message": "Trailing whitespace"},
+        {"path": "test.cmake", "line": 5, "column": 2, "id": "E1120",
+         "category": "Error",
+         "message": "Missing required positional argument"},
+    ], [json.loads(line) for line in outfile.getvalue().splitlines()])
+
+  def test_sarif(self):
+    log = lint_output.get_sarif_log([self.local_ctx], True)
+    run = log["runs"][0]
+    rules = run["tool"]["driver"]["rules"]
+    self.assertEqual(
+        [idstr for idstr, _, _ in lintdb.LINT_DB],
+        [rule["id"] for rule in rules])
+    for rule in rules:
+      self.assertTrue(rule["shortDescription"]["text"])
+
+    results = run["results"]
+    self.assertEqual(
+        ["C0304", "C0303", "E1120"], [result["ruleId"] for result in results])
+    for result in results:
+      self.assertEqual(result["ruleId"], rules[result["ruleIndex"]]["id"])
+    self.assertEqual(
+        ["note", "note", "error"], [result["level"] for result in results])
+
+    # NOTE(josh): SARIF columns are one-based
+    self.assertNotIn("region", results[0]["locations"][0]["physicalLocation"])
+    self.assertEqual(
+        {"startLine": 5, "startColumn": 3},
+        results[2]["locations"][0]["physicalLocation"]["region"])
+
+  def test_output_formats(self):
+    """Each output format contains the same lint."""
+    infile_path = os.path.join("cmakelang", "lint", "test", "expect_lint.cmake")
+    outputs = {}
+    for output_format in lint_output.OUTPUT_FORMATS:
+      proc = subprocess.Popen(
+          [sys.executable, "-Bm", "cmakelang.lint", "--suppress-decorations",
+           "--output-format", output_format, infile_path],
+          cwd=ROOTDIR, stdout=subprocess.PIPE)
+      outputs[output_format] = proc.communicate()[0].decode("utf-8")
+      self.assertEqual(1, proc.returncode)
+
+    expect = re.findall(r"^[^ ]* \[(\w+)\]", outputs["text"], re.MULTILINE)
+    self.assertGreater(len(expect), 10)
+    self.assertEqual(expect, [
+        json.loads(line)["id"] for line in outputs["jsonl"].splitlines()])
+
+    log = json.loads(outputs["sarif"])
+    self.assertEqual(expect, [
+        result["ruleId"] for result in log["runs"][0]["results"]])
+    self.assertTrue(log["runs"][0]["invocations"][0]["executionSuccessful"])
+
+
+if __name__ == "__main__":
+  unittest.main()
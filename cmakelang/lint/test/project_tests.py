@@ -0,0 +1,186 @@
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from cmakelang import configuration
+from cmakelang import lex
+from cmakelang import parse
+from cmakelang.lint import lint_util
+from cmakelang.lint import project_checker
+from cmakelang.lint import symbol_index
+
+ROOTDIR = os.sep.join(os.path.realpath(__file__).split(os.sep)[:-4])
+
+MAIN_CONTENT = """\
+project(demo)
+include(cmake/helpers.cmake)
+add_subdirectory(sub)
+set(DEMO_VAR 1)
+my_helper(foo)
+undefined_command(bar)
+cmake_language(CALL dynamic_helper)
+"""
+
+HELPERS_CONTENT = """\
+function(my_helper arg)
+  message(STATUS "${arg}")
+endfunction()
+
+macro(unused_macro)
+endmacro()
+
+function(dynamic_helper)
+endfunction()
+"""
+
+
+def get_symbols(content):
+  parse_tree = parse.parse(lex.tokenize(content), parse.ParseContext())
+  return symbol_index.get_file_symbols(
+      parse_tree, symbol_index.get_digest(content),
+      project_checker.get_builtins())
+
+
+class TestProjectChecks(unittest.TestCase):
+
+  def setUp(self):
+    self.tempdir = tempfile.mkdtemp(prefix="cmakelang-lint-project-")
+    self.index = symbol_index.SymbolIndex(
+        os.path.join(self.tempdir, "index.json"))
+    self.index.update(self.get_path("CMakeLists.txt"),
+                      get_symbols(MAIN_CONTENT))
+    self.index.update(self.get_path("cmake/helpers.cmake"),
+                      get_symbols(HELPERS_CONTENT))
+
+  def tearDown(self):
+    shutil.rmtree(self.tempdir)
+
+  def get_path(self, relpath):
+    return os.path.join(self.tempdir, *relpath.split("/"))
+
+  def get_lint(self, relpath, config):
+    local_ctx = lint_util.GlobalContext(None).get_file_ctx(
+        self.get_path(relpath), config)
+    project_checker.check_file(config, local_ctx, self.index)
+    return [repr(record) for record in local_ctx.get_lint()]
+
+  def test_file_symbols(self):
+    symbols = get_symbols(MAIN_CONTENT)
+    self.assertEqual(symbol_index.get_digest(MAIN_CONTENT), symbols.digest)
+    self.assertEqual([], symbols.definitions)
+    self.assertEqual(
+        {"my_helper": [[5, 0]], "undefined_command": [[6, 0]],
+         "dynamic_helper": [[7, 20]]}, symbols.calls)
+    self.assertEqual(
+        [["include", "cmake/helpers.cmake", 2], ["add_subdirectory", "sub", 3]],
+        symbols.includes)
+    self.assertEqual({"DEMO_VAR": [4]}, symbols.assignments)
+
+    symbols = get_symbols(HELPERS_CONTENT)
+    self.assertEqual(
+        [["my_helper", "function", 1, 9], ["unused_macro", "macro", 5, 6],
+         ["dynamic_helper", "function", 8, 9]], symbols.definitions)
+    self.assertEqual({}, symbols.calls)
+
+  def test_queries(self):
+    self.assertEqual(
+        [("cmake/helpers.cmake", "function", 1, 9)],
+        self.index.get_definitions("MY_HELPER"))
+    self.assertEqual([], self.index.get_definitions("undefined_command"))
+    self.assertEqual(1, self.index.get_call_count("my_helper"))
+    self.assertEqual(0, self.index.get_call_count("unused_macro"))
+
+  def test_checks(self):
+    config = configuration.Configuration()
+    self.assertEqual(
+        ['06,00: [E0110] Command "undefined_command" is not a builtin and is'
+         ' not defined in the project'],
+        self.get_lint("CMakeLists.txt", config))
+    self.assertEqual(
+        ['05,06: [W0107] Macro "unused_macro" is never called in the project'],
+        self.get_lint("cmake/helpers.cmake", config))
+
+    config = configuration.Configuration(
+        additional_commands={"undefined_command": {}},
+        disabled_codes=["W0107"])
+    self.assertEqual([], self.get_lint("CMakeLists.txt", config))
+    self.assertEqual([], self.get_lint("cmake/helpers.cmake", config))
+
+    # Files which aren't in the index aren't checked
+    self.assertEqual(
+        [], self.get_lint("other.cmake", configuration.Configuration()))
+
+  def test_dump_and_load(self):
+    index_path = self.index.index_path
+    self.index.dump()
+    loaded = symbol_index.SymbolIndex.load(index_path)
+    self.assertEqual(
+        ["CMakeLists.txt", "cmake/helpers.cmake"], sorted(loaded.files))
+    self.assertEqual(
+        {path: symbols.as_dict() for path, symbols in self.index.files.items()},
+        {path: symbols.as_dict() for path, symbols in loaded.files.items()})
+    self.assertEqual(
+        symbol_index.get_digest(MAIN_CONTENT),
+        loaded.get_digest(os.path.join(self.tempdir, ".", "CMakeLists.txt")))
+
+    # Files which no longer exist are removed
+    loaded.update(index_path, get_symbols(""))
+    loaded.update(os.path.join(self.tempdir, "missing.cmake"), get_symbols(""))
+    loaded.remove_missing()
+    self.assertIsNotNone(loaded.get_file(index_path))
+    self.assertIsNone(
+        loaded.get_file(os.path.join(self.tempdir, "missing.cmake")))
+
+    # An invalid index is ignored
+    with io.open(index_path, "w", encoding="utf-8") as outfile:
+      outfile.write("{\"files\": ")
+    self.assertEqual({}, symbol_index.SymbolIndex.load(index_path).files)
+
+  def test_incremental_update(self):
+    """Only files which have changed are indexed again."""
+    for relpath, content in (("CMakeLists.txt", MAIN_CONTENT),
+                             ("helpers.cmake", HELPERS_CONTENT)):
+      with io.open(os.path.join(self.tempdir, relpath), "w",
+                   encoding="utf-8") as outfile:
+        outfile.write(content.replace("cmake/helpers", "helpers"))
+
+    argv = [sys.executable, "-Bm", "cmakelang.lint", "--log-level", "debug",
+            "--suppress-decorations", "--project-index",
+            os.path.join(self.tempdir, "index.json"),
+            os.path.join(self.tempdir, "CMakeLists.txt"),
+            os.path.join(self.tempdir, "helpers.cmake")]
+    proc = subprocess.Popen(argv, cwd=ROOTDIR, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    output, errors = proc.communicate()
+    self.assertEqual(1, proc.returncode)
+    self.assertIn(b"Indexed 2 files (2 changed, 0 removed)", errors)
+    self.assertIn(b"[E0110]", output)
+    self.assertIn(b"[W0107]", output)
+
+    with io.open(os.path.join(self.tempdir, "helpers.cmake"), "a",
+                 encoding="utf-8") as outfile:
+      outfile.write("macro(undefined_command)\nendmacro()\n")
+    proc = subprocess.Popen(argv, cwd=ROOTDIR, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    output, errors = proc.communicate()
+    self.assertIn(b"Indexed 2 files (1 changed, 0 removed)", errors)
+    self.assertNotIn(b"[E0110]", output)
+
+    # The index is still valid when run from a different directory
+    env = dict(os.environ, PYTHONPATH=ROOTDIR)
+    argv = argv[:-3] + ["index.json", "CMakeLists.txt", "helpers.cmake"]
+    proc = subprocess.Popen(argv, cwd=self.tempdir, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output, errors = proc.communicate()
+    self.assertIn(b"Indexed 2 files (0 changed, 0 removed)", errors)
+    self.assertNotIn(b"[E0110]", output)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,212 @@
+"""
+Memory instrumentation: peak and retained bytes per pipeline stage.
+
+Like `stats`, this is disabled unless a collector is activated with
+`collect()`, which also starts `tracemalloc` (if it is not already tracing).
+Each `stage()` context records:
+
+* ``peak``: the high-water mark of traced memory during the stage, relative
+  to the traced memory at the start of the stage
+* ``retained``: the traced memory at the end of the stage, relative to the
+  start, i.e. the size of whatever the stage produced that is still alive
+* the allocation sites (file and line) accounting for the most retained
+  memory, from a comparison of `tracemalloc` snapshots taken before and after
+
+The stage names used by the frontends are ``tokenize``, ``parse``,
+``create_box_tree``, ``reflow`` and ``write_tree``. Stages must not be
+nested. `tracemalloc` requires python 3.4, and resetting the peak between
+stages requires python 3.9. With older versions the peak of a stage is the
+peak since tracing started.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import contextlib
+import os
+
+try:
+  import tracemalloc
+except ImportError:
+  # NOTE(josh): python2
+  tracemalloc = None
+
+# The currently active collector, if any
+ACTIVE = None
+
+# Number of allocation sites to report for each stage
+NUM_TOP_SITES = 5
+
+
+class StageStats(object):
+  """Accumulated memory statistics for one stage (over all calls)."""
+
+  def __init__(self, name):
+    self.name = name
+    self.calls = 0
+    self.peak = 0
+    self.retained = 0
+    self.sites = collections.Counter()
+
+
+class MemStats(object):
+  """Memory statistics for each stage of processing one file (or a run)."""
+
+  def __init__(self, name=None, with_sites=True):
+    self.name = name
+    self.with_sites = with_sites
+    self.stages = collections.OrderedDict()
+    self.active_stage = None
+
+  def get_stage(self, name):
+    if name not in self.stages:
+      self.stages[name] = StageStats(name)
+    return self.stages[name]
+
+
+def get_site_filters():
+  """Filters which exclude the allocations made by tracemalloc itself."""
+  return [
+      tracemalloc.Filter(False, tracemalloc.__file__),
+      tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+  ]
+
+
+def format_site(traceback):
+  frame = traceback[0]
+  filename = frame.filename
+  # Shorten paths within this package
+  pkgdir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  if filename.startswith(pkgdir + os.sep):
+    filename = os.path.relpath(filename, pkgdir)
+  return "{}:{}".format(filename, frame.lineno)
+
+
+class MemStage(object):
+  """Context manager which records the memory usage of one stage."""
+
+  def __init__(self, collector, name):
+    self.collector = collector
+    self.name = name
+    self.start = 0
+    self.snapshot = None
+
+  def __enter__(self):
+    assert self.collector.active_stage is None, \
+        "memstats stage {} nested in {}".format(
+            self.name, self.collector.active_stage)
+    self.collector.active_stage = self.name
+    if self.collector.with_sites:
+      # NOTE(josh): take the snapshot before reading the baseline, so that it
+      # is not counted against the stage
+      self.snapshot = tracemalloc.take_snapshot().filter_traces(
+          get_site_filters())
+    if hasattr(tracemalloc, "reset_peak"):
+      tracemalloc.reset_peak()
+    self.start = tracemalloc.get_traced_memory()[0]
+    return self
+
+  def __exit__(self, *_):
+    current, peak = tracemalloc.get_traced_memory()
+    stage = self.collector.get_stage(self.name)
+    stage.calls += 1
+    stage.peak = max(stage.peak, peak - self.start)
+    stage.retained += current - self.start
+    if self.snapshot is not None:
+      snapshot = tracemalloc.take_snapshot().filter_traces(
+          get_site_filters())
+      for stat in snapshot.compare_to(self.snapshot, "lineno"):
+        if stat.size_diff > 0:
+          stage.sites[format_site(stat.traceback)] += stat.size_diff
+      self.snapshot = None
+    self.collector.active_stage = None
+
+
+class NullStage(object):
+  """Context manager which does nothing."""
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *_):
+    return None
+
+
+NULL_STAGE = NullStage()
+
+
+def stage(name):
+  """Return a context manager recording stage `name` in the active
+     collector."""
+  if ACTIVE is None:
+    return NULL_STAGE
+  return MemStage(ACTIVE, name)
+
+
+@contextlib.contextmanager
+def collect(name=None, enabled=True, with_sites=True):
+  """
+  Activate a new `MemStats` collector for the duration of the context and
+  yield it, tracing allocations with `tracemalloc`. If not `enabled`, yield
+  None and leave instrumentation disabled.
+  """
+  global ACTIVE  # pylint: disable=global-statement
+  if not enabled:
+    yield None
+    return
+
+  assert tracemalloc is not None, "--memstats requires tracemalloc"
+  started = not tracemalloc.is_tracing()
+  if started:
+    tracemalloc.start()
+  prev = ACTIVE
+  ACTIVE = MemStats(name, with_sites)
+  collector = ACTIVE
+  try:
+    yield collector
+  finally:
+    ACTIVE = prev
+    if started:
+      tracemalloc.stop()
+
+
+def format_size(nbytes):
+  """Return a human readable size."""
+  for unit in ("B", "KiB", "MiB"):
+    if abs(nbytes) < 1024:
+      return "{:.1f}{}".format(nbytes, unit)
+    nbytes /= 1024.0
+  return "{:.1f}GiB".format(nbytes)
+
+
+def write_report(outfile, memstats_list):
+  """Write a human readable report of the peak and retained memory of each
+     stage, and the top allocation sites, for each collector."""
+  for memstats in memstats_list:
+    outfile.write("memory: {}\n".format(memstats.name))
+    namewidth = max([len("stage")] + [len(name) for name in memstats.stages])
+    outfile.write("  {:{}s} {:>6s} {:>10s} {:>10s}\n".format(
+        "stage", namewidth, "calls", "peak", "retained"))
+    for stage_stats in memstats.stages.values():
+      outfile.write("  {:{}s} {:6d} {:>10s} {:>10s}\n".format(
+          stage_stats.name, namewidth, stage_stats.calls,
+          format_size(stage_stats.peak), format_size(stage_stats.retained)))
+
+    if not any(stage_stats.sites for stage_stats in memstats.stages.values()):
+      outfile.write("\n")
+      continue
+    outfile.write("  top allocation sites (retained):\n")
+    for stage_stats in memstats.stages.values():
+      outfile.write("    {}:\n".format(stage_stats.name))
+      for site, nbytes in stage_stats.sites.most_common(NUM_TOP_SITES):
+        outfile.write("      {:>10s} {}\n".format(format_size(nbytes), site))
+    outfile.write("\n")
+
+
+def add_argument(argparser):
+  """Add the --memstats option to a command line parser."""
+  argparser.add_argument(
+      '--memstats', action='store_true',
+      help='Trace memory allocations and report the peak and retained memory'
+           ' of each stage (tokenize, parse, ...) and the top allocation'
+           ' sites to stderr. This is slow.')
@@ -0,0 +1,43 @@
+"""
+Helpers to process a stream of files with a pool of worker processes.
+"""
+
+from __future__ import unicode_literals
+
+import multiprocessing
+
+
+def get_num_jobs(jobs):
+  """Return the number of worker processes to use for the `--jobs` command
+     line value. Zero (or less) means one per cpu."""
+  if jobs is None or jobs < 1:
+    return multiprocessing.cpu_count()
+  return jobs
+
+
+def imap(fun, items, jobs=1, ordered=True):
+  """
+  Generate `fun(item)` for each item in `items`, in order. If more than one
+  job is requested then the calls are distributed over a pool of worker
+  processes, and if not `ordered` then results are generated as soon as each
+  worker returns, in whatever order they finish. `items` may be a lazy
+  iterable (e.g. from `discovery`); it is consumed by the pool as workers
+  become available, so generating the items overlaps with processing them.
+  `fun` must be picklable (i.e. a module-level function or a
+  `functools.partial` of one).
+  """
+  jobs = get_num_jobs(jobs)
+  if jobs == 1:
+    for item in items:
+      yield fun(item)
+    return
+
+  pool = multiprocessing.Pool(jobs)
+  try:
+    pool_imap = pool.imap if ordered else pool.imap_unordered
+    for result in pool_imap(fun, items):
+      yield result
+    pool.close()
+  finally:
+    pool.terminate()
+    pool.join()
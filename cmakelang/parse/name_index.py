@@ -0,0 +1,241 @@
+"""
+Lookup of builtin variable and property names without regular expressions.
+
+The generated `variables` and `properties` modules each contain a list of
+`PATTERNS`, one for each builtin name, in which a generic label such as
+``<LANG>`` becomes a group matching anything (e.g.
+``CMAKE_(?P<LANG>.*)_FLAGS``). Names are matched against all of the patterns
+joined into one regular expression with ``|``, which tries one alternative
+at a time. The generated modules also contain a `NameIndex` of the same
+patterns, which gives the same answers with a few lookups in sorted tables
+of the names, and of the prefixes and suffixes of the names with generic
+labels.
+"""
+
+from __future__ import unicode_literals
+
+import bisect
+import re
+
+
+def is_ascii(text):
+  try:
+    text.encode("ascii")
+  except UnicodeError:
+    return False
+  return True
+
+
+def match_parts(name, pos, parts):
+  """
+  Return true if each string in `parts` occurs in `name`, in order, and
+  starting at or after `pos`.
+  """
+  for part in parts:
+    pos = name.find(part, pos)
+    if pos < 0:
+      return False
+    pos += len(part)
+  return True
+
+
+def get_min(value_a, value_b):
+  """Return the lesser of two values, either of which may be None."""
+  if value_a is None:
+    return value_b
+  if value_b is None:
+    return value_a
+  return min(value_a, value_b)
+
+
+class PrefixTable(object):
+  """
+  Sorted table of strings (keys) with a value for each, to find the keys
+  which are a prefix of some text. The keys which are a prefix of the text
+  are all prefixes of the longest one, which is found by bisection: it is
+  either the greatest key not greater than the text, or one of the prefixes
+  of that key.
+  """
+
+  def __init__(self, items):
+    values = {}
+    for key, value in items:
+      values[key] = get_min(value, values.get(key))
+    self.keys = sorted(values)
+    self.values = [values[key] for key in self.keys]
+
+    # For each key, the position of the longest other key which is a prefix
+    # of it (or -1), and the least value of the key and of all its prefixes
+    self._parents = []
+    self._mins = []
+    for idx, key in enumerate(self.keys):
+      parent = idx - 1
+      while parent >= 0 and not key.startswith(self.keys[parent]):
+        parent = self._parents[parent]
+      self._parents.append(parent)
+      value = self.values[idx]
+      if parent >= 0:
+        value = min(value, self._mins[parent])
+      self._mins.append(value)
+
+  def find(self, text, start=0):
+    """
+    Return the position in the table of the longest key which is a prefix of
+    `text[start:]`, or -1 if there is none.
+    """
+    idx = bisect.bisect_right(self.keys, text[start:]) - 1
+    while idx >= 0 and not text.startswith(self.keys[idx], start):
+      idx = self._parents[idx]
+    return idx
+
+  def iter_prefixes(self, text):
+    """Yield the position of each key which is a prefix of `text`."""
+    idx = self.find(text)
+    while idx >= 0:
+      yield idx
+      idx = self._parents[idx]
+
+  def get_min_value(self, text, start=0):
+    """
+    Return the least value of the keys which are a prefix of `text[start:]`,
+    or None if there are none.
+    """
+    idx = self.find(text, start)
+    if idx < 0:
+      return None
+    return self._mins[idx]
+
+
+class TemplateTable(object):
+  """
+  Index of the patterns with generic labels. Each one is given as a list of
+  the literal strings between its labels, and is a match for any text which
+  starts with the first string and contains the rest, in order. Nearly all
+  patterns have a single label, so they are indexed by their prefix (the
+  first string) and then by their suffix (the second): a match for the
+  suffix starts where the text contains its first character.
+  """
+
+  def __init__(self, templates):
+    heads = []
+    anchored = {}
+    self._unindexed = []
+    for index, parts in sorted(templates):
+      suffixes = [part for part in parts[1:] if part]
+      if not suffixes:
+        heads.append((parts[0], index))
+      elif len(suffixes) == 1:
+        anchored.setdefault(parts[0], []).append((suffixes[0], index))
+      else:
+        self._unindexed.append((index, parts[0], suffixes))
+
+    self._heads = PrefixTable(heads)
+    self._prefixes = PrefixTable(
+        (prefix, min(index for _, index in items))
+        for prefix, items in anchored.items())
+    self._suffixes = []
+    for prefix in self._prefixes.keys:
+      items = anchored[prefix]
+      self._suffixes.append((
+          PrefixTable(items), sorted(set(suffix[0] for suffix, _ in items))))
+
+  def match(self, name, best=None):
+    """
+    Return the least index of the patterns which match `name`, if it is less
+    than `best`, else return `best`.
+    """
+    best = get_min(best, self._heads.get_min_value(name))
+
+    for idx in self._prefixes.iter_prefixes(name):
+      if best is not None and best <= self._prefixes.values[idx]:
+        continue
+      suffixes, chars = self._suffixes[idx]
+      start = len(self._prefixes.keys[idx])
+      for char in chars:
+        pos = name.find(char, start)
+        while pos >= 0:
+          best = get_min(best, suffixes.get_min_value(name, pos))
+          pos = name.find(char, pos + 1)
+
+    for index, prefix, suffixes in self._unindexed:
+      if best is not None and best <= index:
+        break
+      if name.startswith(prefix) and match_parts(name, len(prefix), suffixes):
+        best = index
+    return best
+
+
+class NameIndex(object):
+  """
+  Index of a list of patterns, constructed from:
+
+  * `exact_names`: a map of each name without a generic label to the index
+    of its (first) pattern
+  * `templates`: a list of `(index, parts)` for each pattern with generic
+    labels, where `parts` are the literal strings between the labels (e.g.
+    ``("CMAKE_", "_FLAGS")`` for ``CMAKE_<LANG>_FLAGS``).
+
+  `match()` gives the same answer as the regular expression of the patterns
+  joined with ``|``. Note that, as with `re.match()`, a name matches a
+  pattern if any prefix of the name matches the pattern.
+  """
+
+  def __init__(self, exact_names, templates):
+    self._exact_names = dict(exact_names)
+    self._templates = [(index, tuple(parts)) for index, parts in templates]
+    self._templated = set(index for index, _ in self._templates)
+
+    self._exact = PrefixTable(self._exact_names.items())
+    self._folded_exact = PrefixTable(
+        (name.lower(), index) for name, index in self._exact_names.items())
+    self._template_table = TemplateTable(self._templates)
+    self._folded_template_table = TemplateTable(
+        (index, [part.lower() for part in parts])
+        for index, parts in self._templates)
+    self._regex = None
+
+  def is_templated(self, index):
+    """Return true if the pattern at `index` contains a generic label."""
+    return index in self._templated
+
+  def _match_regex(self, name):
+    """
+    Return the index of the first pattern which is a case-insensitive match
+    for `name`, using a regular expression.
+    """
+    if self._regex is None:
+      patterns = [
+          (index, re.escape(exact_name))
+          for exact_name, index in self._exact_names.items()]
+      patterns.extend(
+          (index, ".*".join(re.escape(part) for part in parts))
+          for index, parts in self._templates)
+      patterns.sort()
+      # NOTE(josh): each alternative is the only group, so the group index
+      # of a match identifies the pattern that matched
+      self._regex = (
+          re.compile("|".join("({})".format(pattern)
+                              for _, pattern in patterns), re.IGNORECASE),
+          [index for index, _ in patterns])
+    regex, indices = self._regex
+    match = regex.match(name)
+    if match is None:
+      return None
+    return indices[match.lastindex - 1]
+
+  def match(self, name, ignorecase=False):
+    """
+    Return the index of the first pattern which matches `name` (the same
+    pattern that the joined regular expression would match) or None if no
+    pattern matches.
+    """
+    if not ignorecase:
+      return self._template_table.match(name, self._exact.get_min_value(name))
+
+    # NOTE(josh): outside of ascii, case-insensitive regular expressions
+    # match some characters that `lower()` doesn't fold (e.g. the long s)
+    if not is_ascii(name):
+      return self._match_regex(name)
+    name = name.lower()
+    return self._folded_template_table.match(
+        name, self._folded_exact.get_min_value(name))
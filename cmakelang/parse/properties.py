@@ -6,6 +6,8 @@ python -Bm cmakelang.tools.parse_cmake_help properties
 """
 import re
 
+from cmakelang.parse.name_index import NameIndex
+
 
 PATTERNS = [
     "(?P<CONFIG>.*)_OUTPUT_NAME",
@@ -389,3 +391,360 @@ CASE_SENSITIVE_REGEX = re.compile(
     "|".join(stripped_patterns()))
 CASE_INSENSITIVE_REGEX = re.compile(
     "|".join(stripped_patterns()), re.IGNORECASE)
+
+
+# Each name without a generic label, and the index of its pattern
+EXACT_NAMES = {
+    "ABSTRACT": 8,
+    "ADDITIONAL_MAKE_CLEAN_FILES": 9,
+    "ADVANCED": 10,
+    "ALIASED_TARGET": 11,
+    "ALLOW_DUPLICATE_CUSTOM_TARGETS": 12,
+    "ANDROID_ANT_ADDITIONAL_OPTIONS": 13,
+    "ANDROID_API": 14,
+    "ANDROID_API_MIN": 15,
+    "ANDROID_ARCH": 16,
+    "ANDROID_ASSETS_DIRECTORIES": 17,
+    "ANDROID_GUI": 18,
+    "ANDROID_JAR_DEPENDENCIES": 19,
+    "ANDROID_JAR_DIRECTORIES": 20,
+    "ANDROID_JAVA_SOURCE_DIR": 21,
+    "ANDROID_NATIVE_LIB_DEPENDENCIES": 22,
+    "ANDROID_NATIVE_LIB_DIRECTORIES": 23,
+    "ANDROID_PROCESS_MAX": 24,
+    "ANDROID_PROGUARD": 25,
+    "ANDROID_PROGUARD_CONFIG_PATH": 26,
+    "ANDROID_SECURE_PROPS_PATH": 27,
+    "ANDROID_SKIP_ANT_STEP": 28,
+    "ANDROID_STL_TYPE": 29,
+    "ARCHIVE_OUTPUT_DIRECTORY": 30,
+    "ARCHIVE_OUTPUT_NAME": 32,
+    "ATTACHED_FILES": 34,
+    "ATTACHED_FILES_ON_FAIL": 35,
+    "AUTOGEN_BUILD_DIR": 36,
+    "AUTOGEN_SOURCE_GROUP": 37,
+    "AUTOGEN_TARGETS_FOLDER": 38,
+    "AUTOGEN_TARGET_DEPENDS": 39,
+    "AUTOMOC": 40,
+    "AUTOMOC_COMPILER_PREDEFINES": 41,
+    "AUTOMOC_DEPEND_FILTERS": 42,
+    "AUTOMOC_MACRO_NAMES": 43,
+    "AUTOMOC_MOC_OPTIONS": 44,
+    "AUTOMOC_SOURCE_GROUP": 45,
+    "AUTOMOC_TARGETS_FOLDER": 46,
+    "AUTORCC": 47,
+    "AUTORCC_OPTIONS": 48,
+    "AUTORCC_SOURCE_GROUP": 50,
+    "AUTOUIC": 51,
+    "AUTOUIC_OPTIONS": 52,
+    "AUTOUIC_SEARCH_PATHS": 54,
+    "BINARY_DIR": 55,
+    "BUILDSYSTEM_TARGETS": 57,
+    "BUILD_RPATH": 58,
+    "BUILD_WITH_INSTALL_NAME_DIR": 59,
+    "BUILD_WITH_INSTALL_RPATH": 60,
+    "BUNDLE": 61,
+    "BUNDLE_EXTENSION": 62,
+    "CACHE_VARIABLES": 63,
+    "CLEAN_NO_CUSTOM": 64,
+    "CMAKE_CONFIGURE_DEPENDS": 65,
+    "CMAKE_CXX_KNOWN_FEATURES": 66,
+    "CMAKE_C_KNOWN_FEATURES": 67,
+    "COMPATIBLE_INTERFACE_BOOL": 68,
+    "COMPATIBLE_INTERFACE_NUMBER_MAX": 69,
+    "COMPATIBLE_INTERFACE_NUMBER_MIN": 70,
+    "COMPATIBLE_INTERFACE_STRING": 71,
+    "COMPILE_DEFINITIONS": 72,
+    "COMPILE_FEATURES": 78,
+    "COMPILE_FLAGS": 79,
+    "COMPILE_OPTIONS": 81,
+    "COMPILE_PDB_NAME": 83,
+    "COMPILE_PDB_OUTPUT_DIRECTORY": 85,
+    "COST": 87,
+    "CPACK_DESKTOP_SHORTCUTS": 88,
+    "CPACK_NEVER_OVERWRITE": 89,
+    "CPACK_PERMANENT": 90,
+    "CPACK_STARTUP_SHORTCUTS": 91,
+    "CPACK_START_MENU_SHORTCUTS": 92,
+    "CPACK_WIX_ACL": 93,
+    "CROSSCOMPILING_EMULATOR": 94,
+    "CUDA_EXTENSIONS": 95,
+    "CUDA_PTX_COMPILATION": 96,
+    "CUDA_RESOLVE_DEVICE_SYMBOLS": 97,
+    "CUDA_SEPARABLE_COMPILATION": 98,
+    "CUDA_STANDARD": 99,
+    "CUDA_STANDARD_REQUIRED": 100,
+    "CXX_EXTENSIONS": 101,
+    "CXX_STANDARD": 102,
+    "CXX_STANDARD_REQUIRED": 103,
+    "C_EXTENSIONS": 104,
+    "C_STANDARD": 105,
+    "C_STANDARD_REQUIRED": 106,
+    "DEBUG_CONFIGURATIONS": 107,
+    "DEBUG_POSTFIX": 108,
+    "DEFINE_SYMBOL": 109,
+    "DEFINITIONS": 110,
+    "DEPENDS": 111,
+    "DEPLOYMENT_REMOTE_DIRECTORY": 112,
+    "DISABLED": 113,
+    "DISABLED_FEATURES": 114,
+    "ECLIPSE_EXTRA_NATURES": 115,
+    "ENABLED_FEATURES": 116,
+    "ENABLED_LANGUAGES": 117,
+    "ENABLE_EXPORTS": 118,
+    "ENVIRONMENT": 119,
+    "EXCLUDE_FROM_ALL": 120,
+    "EXCLUDE_FROM_DEFAULT_BUILD": 122,
+    "EXPORT_NAME": 124,
+    "EXTERNAL_OBJECT": 125,
+    "EchoString": 126,
+    "FAIL_REGULAR_EXPRESSION": 127,
+    "FIND_LIBRARY_USE_LIB32_PATHS": 128,
+    "FIND_LIBRARY_USE_LIB64_PATHS": 129,
+    "FIND_LIBRARY_USE_LIBX32_PATHS": 130,
+    "FIND_LIBRARY_USE_OPENBSD_VERSIONING": 131,
+    "FIXTURES_CLEANUP": 132,
+    "FIXTURES_REQUIRED": 133,
+    "FIXTURES_SETUP": 134,
+    "FOLDER": 135,
+    "FRAMEWORK": 136,
+    "FRAMEWORK_VERSION": 137,
+    "Fortran_FORMAT": 138,
+    "Fortran_MODULE_DIRECTORY": 140,
+    "GENERATED": 141,
+    "GENERATOR_FILE_NAME": 142,
+    "GENERATOR_IS_MULTI_CONFIG": 143,
+    "GLOBAL_DEPENDS_DEBUG_MODE": 144,
+    "GLOBAL_DEPENDS_NO_CYCLES": 145,
+    "GNUtoMS": 146,
+    "HAS_CXX": 147,
+    "HEADER_FILE_ONLY": 148,
+    "HELPSTRING": 149,
+    "IMPLICIT_DEPENDS_INCLUDE_TRANSFORM": 150,
+    "IMPORTED": 152,
+    "IMPORTED_CONFIGURATIONS": 153,
+    "IMPORTED_IMPLIB": 154,
+    "IMPORTED_LIBNAME": 156,
+    "IMPORTED_LINK_DEPENDENT_LIBRARIES": 158,
+    "IMPORTED_LINK_INTERFACE_LANGUAGES": 160,
+    "IMPORTED_LINK_INTERFACE_LIBRARIES": 162,
+    "IMPORTED_LINK_INTERFACE_MULTIPLICITY": 164,
+    "IMPORTED_LOCATION": 166,
+    "IMPORTED_NO_SONAME": 168,
+    "IMPORTED_OBJECTS": 170,
+    "IMPORTED_SONAME": 172,
+    "IMPORT_PREFIX": 174,
+    "IMPORT_SUFFIX": 175,
+    "INCLUDE_DIRECTORIES": 176,
+    "INCLUDE_REGULAR_EXPRESSION": 178,
+    "INSTALL_NAME_DIR": 179,
+    "INSTALL_RPATH": 180,
+    "INSTALL_RPATH_USE_LINK_PATH": 181,
+    "INTERFACE_AUTOUIC_OPTIONS": 182,
+    "INTERFACE_COMPILE_DEFINITIONS": 183,
+    "INTERFACE_COMPILE_FEATURES": 184,
+    "INTERFACE_COMPILE_OPTIONS": 185,
+    "INTERFACE_INCLUDE_DIRECTORIES": 186,
+    "INTERFACE_LINK_LIBRARIES": 187,
+    "INTERFACE_POSITION_INDEPENDENT_CODE": 188,
+    "INTERFACE_SOURCES": 189,
+    "INTERFACE_SYSTEM_INCLUDE_DIRECTORIES": 190,
+    "INTERPROCEDURAL_OPTIMIZATION": 191,
+    "IN_TRY_COMPILE": 195,
+    "IOS_INSTALL_COMBINED": 196,
+    "JOB_POOLS": 197,
+    "JOB_POOL_COMPILE": 198,
+    "JOB_POOL_LINK": 199,
+    "KEEP_EXTENSION": 200,
+    "LABELS": 201,
+    "LANGUAGE": 205,
+    "LIBRARY_OUTPUT_DIRECTORY": 206,
+    "LIBRARY_OUTPUT_NAME": 208,
+    "LINKER_LANGUAGE": 210,
+    "LINK_DEPENDS": 211,
+    "LINK_DEPENDS_NO_SHARED": 212,
+    "LINK_DIRECTORIES": 213,
+    "LINK_FLAGS": 214,
+    "LINK_INTERFACE_LIBRARIES": 216,
+    "LINK_INTERFACE_MULTIPLICITY": 218,
+    "LINK_LIBRARIES": 220,
+    "LINK_SEARCH_END_STATIC": 221,
+    "LINK_SEARCH_START_STATIC": 222,
+    "LINK_WHAT_YOU_USE": 223,
+    "LISTFILE_STACK": 224,
+    "LOCATION": 225,
+    "MACOSX_BUNDLE": 228,
+    "MACOSX_BUNDLE_INFO_PLIST": 229,
+    "MACOSX_FRAMEWORK_INFO_PLIST": 230,
+    "MACOSX_PACKAGE_LOCATION": 231,
+    "MACOSX_RPATH": 232,
+    "MACROS": 233,
+    "MANUALLY_ADDED_DEPENDENCIES": 234,
+    "MEASUREMENT": 236,
+    "MODIFIED": 237,
+    "NAME": 238,
+    "NO_SONAME": 239,
+    "NO_SYSTEM_FROM_IMPORTED": 240,
+    "OBJECT_DEPENDS": 241,
+    "OBJECT_OUTPUTS": 242,
+    "OSX_ARCHITECTURES": 243,
+    "OUTPUT_NAME": 245,
+    "PACKAGES_FOUND": 247,
+    "PACKAGES_NOT_FOUND": 248,
+    "PARENT_DIRECTORY": 249,
+    "PASS_REGULAR_EXPRESSION": 250,
+    "PDB_NAME": 251,
+    "PDB_OUTPUT_DIRECTORY": 253,
+    "POSITION_INDEPENDENT_CODE": 255,
+    "POST_INSTALL_SCRIPT": 256,
+    "PREDEFINED_TARGETS_FOLDER": 257,
+    "PREFIX": 258,
+    "PRE_INSTALL_SCRIPT": 259,
+    "PRIVATE_HEADER": 260,
+    "PROCESSORS": 261,
+    "PROJECT_LABEL": 262,
+    "PUBLIC_HEADER": 263,
+    "REPORT_UNDEFINED_PROPERTIES": 264,
+    "REQUIRED_FILES": 265,
+    "RESOURCE": 266,
+    "RESOURCE_LOCK": 267,
+    "RULE_LAUNCH_COMPILE": 268,
+    "RULE_LAUNCH_CUSTOM": 271,
+    "RULE_LAUNCH_LINK": 274,
+    "RULE_MESSAGES": 277,
+    "RUNTIME_OUTPUT_DIRECTORY": 278,
+    "RUNTIME_OUTPUT_NAME": 280,
+    "RUN_SERIAL": 282,
+    "SKIP_AUTOGEN": 283,
+    "SKIP_AUTOMOC": 284,
+    "SKIP_AUTORCC": 285,
+    "SKIP_AUTOUIC": 286,
+    "SKIP_BUILD_RPATH": 287,
+    "SKIP_RETURN_CODE": 288,
+    "SOURCES": 289,
+    "SOURCE_DIR": 290,
+    "SOVERSION": 292,
+    "STATIC_LIBRARY_FLAGS": 293,
+    "STRINGS": 295,
+    "SUBDIRECTORIES": 296,
+    "SUFFIX": 297,
+    "SYMBOLIC": 298,
+    "TARGET_ARCHIVES_MAY_BE_SHARED_LIBS": 299,
+    "TARGET_MESSAGES": 300,
+    "TARGET_SUPPORTS_SHARED_LIBS": 301,
+    "TEST_INCLUDE_FILE": 302,
+    "TEST_INCLUDE_FILES": 303,
+    "TIMEOUT": 304,
+    "TIMEOUT_AFTER_MATCH": 305,
+    "TYPE": 306,
+    "USE_FOLDERS": 308,
+    "VALUE": 309,
+    "VARIABLES": 310,
+    "VERSION": 311,
+    "VISIBILITY_INLINES_HIDDEN": 312,
+    "VS_CONFIGURATION_TYPE": 313,
+    "VS_COPY_TO_OUT_DIR": 314,
+    "VS_DEBUGGER_WORKING_DIRECTORY": 316,
+    "VS_DEPLOYMENT_CONTENT": 317,
+    "VS_DEPLOYMENT_LOCATION": 318,
+    "VS_DESKTOP_EXTENSIONS_VERSION": 319,
+    "VS_DOTNET_REFERENCES": 321,
+    "VS_DOTNET_REFERENCES_COPY_LOCAL": 322,
+    "VS_DOTNET_TARGET_FRAMEWORK_VERSION": 324,
+    "VS_GLOBAL_KEYWORD": 326,
+    "VS_GLOBAL_PROJECT_TYPES": 327,
+    "VS_GLOBAL_ROOTNAMESPACE": 328,
+    "VS_INCLUDE_IN_VSIX": 331,
+    "VS_IOT_EXTENSIONS_VERSION": 332,
+    "VS_IOT_STARTUP_TASK": 333,
+    "VS_KEYWORD": 334,
+    "VS_MOBILE_EXTENSIONS_VERSION": 335,
+    "VS_RESOURCE_GENERATOR": 336,
+    "VS_SCC_AUXPATH": 337,
+    "VS_SCC_LOCALPATH": 338,
+    "VS_SCC_PROJECTNAME": 339,
+    "VS_SCC_PROVIDER": 340,
+    "VS_SDK_REFERENCES": 341,
+    "VS_SHADER_ENTRYPOINT": 342,
+    "VS_SHADER_FLAGS": 343,
+    "VS_SHADER_MODEL": 344,
+    "VS_SHADER_OUTPUT_HEADER_FILE": 345,
+    "VS_SHADER_TYPE": 346,
+    "VS_SHADER_VARIABLE_NAME": 347,
+    "VS_STARTUP_PROJECT": 348,
+    "VS_TOOL_OVERRIDE": 349,
+    "VS_USER_PROPS": 350,
+    "VS_WINDOWS_TARGET_PLATFORM_MIN_VERSION": 351,
+    "VS_WINRT_COMPONENT": 352,
+    "VS_WINRT_EXTENSIONS": 353,
+    "VS_WINRT_REFERENCES": 354,
+    "VS_XAML_TYPE": 355,
+    "WILL_FAIL": 356,
+    "WIN32_EXECUTABLE": 357,
+    "WINDOWS_EXPORT_ALL_SYMBOLS": 358,
+    "WORKING_DIRECTORY": 359,
+    "WRAP_EXCLUDE": 360,
+    "XCODE_EMIT_EFFECTIVE_PLATFORM_NAME": 362,
+    "XCODE_EXPLICIT_FILE_TYPE": 363,
+    "XCODE_FILE_ATTRIBUTES": 365,
+    "XCODE_LAST_KNOWN_FILE_TYPE": 366,
+    "XCODE_PRODUCT_TYPE": 367,
+    "XCTEST": 368,
+}
+
+# The index of each pattern with a generic label, and the literal text
+# between the labels
+TEMPLATES = [
+    (0, ("", "_OUTPUT_NAME")),
+    (1, ("", "_POSTFIX")),
+    (2, ("", "_CLANG_TIDY")),
+    (3, ("", "_COMPILER_LAUNCHER")),
+    (4, ("", "_CPPCHECK")),
+    (5, ("", "_CPPLINT")),
+    (6, ("", "_INCLUDE_WHAT_YOU_USE")),
+    (7, ("", "_VISIBILITY_PRESET")),
+    (31, ("ARCHIVE_OUTPUT_DIRECTORY_", "")),
+    (33, ("ARCHIVE_OUTPUT_NAME_", "")),
+    (75, ("COMPILE_DEFINITIONS_", "")),
+    (76, ("COMPILE_DEFINITIONS_", "")),
+    (77, ("COMPILE_DEFINITIONS_", "")),
+    (84, ("COMPILE_PDB_NAME_", "")),
+    (86, ("COMPILE_PDB_OUTPUT_DIRECTORY_", "")),
+    (123, ("EXCLUDE_FROM_DEFAULT_BUILD_", "")),
+    (155, ("IMPORTED_IMPLIB_", "")),
+    (157, ("IMPORTED_LIBNAME_", "")),
+    (159, ("IMPORTED_LINK_DEPENDENT_LIBRARIES_", "")),
+    (161, ("IMPORTED_LINK_INTERFACE_LANGUAGES_", "")),
+    (163, ("IMPORTED_LINK_INTERFACE_LIBRARIES_", "")),
+    (165, ("IMPORTED_LINK_INTERFACE_MULTIPLICITY_", "")),
+    (167, ("IMPORTED_LOCATION_", "")),
+    (169, ("IMPORTED_NO_SONAME_", "")),
+    (171, ("IMPORTED_OBJECTS_", "")),
+    (173, ("IMPORTED_SONAME_", "")),
+    (193, ("INTERPROCEDURAL_OPTIMIZATION_", "")),
+    (194, ("INTERPROCEDURAL_OPTIMIZATION_", "")),
+    (207, ("LIBRARY_OUTPUT_DIRECTORY_", "")),
+    (209, ("LIBRARY_OUTPUT_NAME_", "")),
+    (215, ("LINK_FLAGS_", "")),
+    (217, ("LINK_INTERFACE_LIBRARIES_", "")),
+    (219, ("LINK_INTERFACE_MULTIPLICITY_", "")),
+    (227, ("LOCATION_", "")),
+    (235, ("MAP_IMPORTED_CONFIG_", "")),
+    (244, ("OSX_ARCHITECTURES_", "")),
+    (246, ("OUTPUT_NAME_", "")),
+    (252, ("PDB_NAME_", "")),
+    (254, ("PDB_OUTPUT_DIRECTORY_", "")),
+    (279, ("RUNTIME_OUTPUT_DIRECTORY_", "")),
+    (281, ("RUNTIME_OUTPUT_NAME_", "")),
+    (294, ("STATIC_LIBRARY_FLAGS_", "")),
+    (315, ("VS_CSHARP_", "")),
+    (320, ("VS_DOTNET_REFERENCEPROP_", "_TAG_", "")),
+    (323, ("VS_DOTNET_REFERENCE_", "")),
+    (325, ("VS_GLOBAL_", "")),
+    (329, ("VS_GLOBAL_SECTION_POST_", "")),
+    (330, ("VS_GLOBAL_SECTION_PRE_", "")),
+    (361, ("XCODE_ATTRIBUTE_", "")),
+]
+
+# Gives the same answers as the regular expressions above, but faster
+INDEX = NameIndex(EXACT_NAMES, TEMPLATES)
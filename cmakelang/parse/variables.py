@@ -6,6 +6,8 @@ python -Bm cmakelang.tools.parse_cmake_help variables
 """
 import re
 
+from cmakelang.parse.name_index import NameIndex
+
 
 PATTERNS = [
     "(?P<PROJECT_NAME>.*)_BINARY_DIR",
@@ -498,3 +500,490 @@ CASE_SENSITIVE_REGEX = re.compile(
     "|".join(stripped_patterns()))
 CASE_INSENSITIVE_REGEX = re.compile(
     "|".join(stripped_patterns()), re.IGNORECASE)
+
+
+# Each name without a generic label, and the index of its pattern
+EXACT_NAMES = {
+    "ANDROID": 7,
+    "APPLE": 8,
+    "BORLAND": 9,
+    "BUILD_SHARED_LIBS": 10,
+    "CMAKE_ABSOLUTE_DESTINATION_FILES": 71,
+    "CMAKE_ANDROID_ANT_ADDITIONAL_OPTIONS": 72,
+    "CMAKE_ANDROID_API": 73,
+    "CMAKE_ANDROID_API_MIN": 74,
+    "CMAKE_ANDROID_ARCH": 75,
+    "CMAKE_ANDROID_ARCH_ABI": 76,
+    "CMAKE_ANDROID_ARM_MODE": 77,
+    "CMAKE_ANDROID_ARM_NEON": 78,
+    "CMAKE_ANDROID_ASSETS_DIRECTORIES": 79,
+    "CMAKE_ANDROID_GUI": 80,
+    "CMAKE_ANDROID_JAR_DEPENDENCIES": 81,
+    "CMAKE_ANDROID_JAR_DIRECTORIES": 82,
+    "CMAKE_ANDROID_JAVA_SOURCE_DIR": 83,
+    "CMAKE_ANDROID_NATIVE_LIB_DEPENDENCIES": 84,
+    "CMAKE_ANDROID_NATIVE_LIB_DIRECTORIES": 85,
+    "CMAKE_ANDROID_NDK": 86,
+    "CMAKE_ANDROID_NDK_DEPRECATED_HEADERS": 87,
+    "CMAKE_ANDROID_NDK_TOOLCHAIN_HOST_TAG": 88,
+    "CMAKE_ANDROID_NDK_TOOLCHAIN_VERSION": 89,
+    "CMAKE_ANDROID_PROCESS_MAX": 90,
+    "CMAKE_ANDROID_PROGUARD": 91,
+    "CMAKE_ANDROID_PROGUARD_CONFIG_PATH": 92,
+    "CMAKE_ANDROID_SECURE_PROPS_PATH": 93,
+    "CMAKE_ANDROID_SKIP_ANT_STEP": 94,
+    "CMAKE_ANDROID_STANDALONE_TOOLCHAIN": 95,
+    "CMAKE_ANDROID_STL_TYPE": 96,
+    "CMAKE_APPBUNDLE_PATH": 97,
+    "CMAKE_AR": 98,
+    "CMAKE_ARCHIVE_OUTPUT_DIRECTORY": 99,
+    "CMAKE_ARGC": 101,
+    "CMAKE_ARGV0": 102,
+    "CMAKE_AUTOMOC": 103,
+    "CMAKE_AUTOMOC_COMPILER_PREDEFINES": 104,
+    "CMAKE_AUTOMOC_DEPEND_FILTERS": 105,
+    "CMAKE_AUTOMOC_MACRO_NAMES": 106,
+    "CMAKE_AUTOMOC_MOC_OPTIONS": 107,
+    "CMAKE_AUTOMOC_RELAXED_MODE": 108,
+    "CMAKE_AUTORCC": 109,
+    "CMAKE_AUTORCC_OPTIONS": 110,
+    "CMAKE_AUTOUIC": 111,
+    "CMAKE_AUTOUIC_OPTIONS": 112,
+    "CMAKE_AUTOUIC_SEARCH_PATHS": 113,
+    "CMAKE_BACKWARDS_COMPATIBILITY": 114,
+    "CMAKE_BINARY_DIR": 115,
+    "CMAKE_BUILD_RPATH": 116,
+    "CMAKE_BUILD_TOOL": 117,
+    "CMAKE_BUILD_TYPE": 118,
+    "CMAKE_BUILD_WITH_INSTALL_NAME_DIR": 119,
+    "CMAKE_BUILD_WITH_INSTALL_RPATH": 120,
+    "CMAKE_CACHEFILE_DIR": 121,
+    "CMAKE_CACHE_MAJOR_VERSION": 122,
+    "CMAKE_CACHE_MINOR_VERSION": 123,
+    "CMAKE_CACHE_PATCH_VERSION": 124,
+    "CMAKE_CFG_INTDIR": 125,
+    "CMAKE_CL_64": 126,
+    "CMAKE_CODEBLOCKS_EXCLUDE_EXTERNAL_FILES": 127,
+    "CMAKE_CODELITE_USE_TARGETS": 128,
+    "CMAKE_COLOR_MAKEFILE": 129,
+    "CMAKE_COMMAND": 130,
+    "CMAKE_COMPILER_2005": 131,
+    "CMAKE_COMPILER_IS_GNUCC": 132,
+    "CMAKE_COMPILER_IS_GNUCXX": 133,
+    "CMAKE_COMPILER_IS_GNUG77": 134,
+    "CMAKE_COMPILE_PDB_OUTPUT_DIRECTORY": 135,
+    "CMAKE_CONFIGURATION_TYPES": 137,
+    "CMAKE_CROSSCOMPILING": 138,
+    "CMAKE_CROSSCOMPILING_EMULATOR": 139,
+    "CMAKE_CTEST_COMMAND": 140,
+    "CMAKE_CUDA_EXTENSIONS": 141,
+    "CMAKE_CUDA_HOST_COMPILER": 142,
+    "CMAKE_CUDA_STANDARD": 143,
+    "CMAKE_CUDA_STANDARD_REQUIRED": 144,
+    "CMAKE_CUDA_TOOLKIT_INCLUDE_DIRECTORIES": 145,
+    "CMAKE_CURRENT_BINARY_DIR": 146,
+    "CMAKE_CURRENT_LIST_DIR": 147,
+    "CMAKE_CURRENT_LIST_FILE": 148,
+    "CMAKE_CURRENT_LIST_LINE": 149,
+    "CMAKE_CURRENT_SOURCE_DIR": 150,
+    "CMAKE_CXX_COMPILE_FEATURES": 151,
+    "CMAKE_CXX_EXTENSIONS": 152,
+    "CMAKE_CXX_STANDARD": 153,
+    "CMAKE_CXX_STANDARD_REQUIRED": 154,
+    "CMAKE_C_COMPILE_FEATURES": 155,
+    "CMAKE_C_EXTENSIONS": 156,
+    "CMAKE_C_STANDARD": 157,
+    "CMAKE_C_STANDARD_REQUIRED": 158,
+    "CMAKE_DEBUG_POSTFIX": 159,
+    "CMAKE_DEBUG_TARGET_PROPERTIES": 160,
+    "CMAKE_DEPENDS_IN_PROJECT_ONLY": 161,
+    "CMAKE_DIRECTORY_LABELS": 162,
+    "CMAKE_DL_LIBS": 164,
+    "CMAKE_ECLIPSE_GENERATE_LINKED_RESOURCES": 165,
+    "CMAKE_ECLIPSE_GENERATE_SOURCE_PROJECT": 166,
+    "CMAKE_ECLIPSE_MAKE_ARGUMENTS": 167,
+    "CMAKE_ECLIPSE_VERSION": 168,
+    "CMAKE_EDIT_COMMAND": 169,
+    "CMAKE_ENABLE_EXPORTS": 170,
+    "CMAKE_ERROR_DEPRECATED": 171,
+    "CMAKE_ERROR_ON_ABSOLUTE_INSTALL_DESTINATION": 172,
+    "CMAKE_EXECUTABLE_SUFFIX": 173,
+    "CMAKE_EXE_LINKER_FLAGS": 174,
+    "CMAKE_EXE_LINKER_FLAGS_INIT": 177,
+    "CMAKE_EXPORT_COMPILE_COMMANDS": 178,
+    "CMAKE_EXPORT_NO_PACKAGE_REGISTRY": 179,
+    "CMAKE_EXTRA_GENERATOR": 180,
+    "CMAKE_EXTRA_SHARED_LIBRARY_SUFFIXES": 181,
+    "CMAKE_FIND_APPBUNDLE": 182,
+    "CMAKE_FIND_FRAMEWORK": 183,
+    "CMAKE_FIND_LIBRARY_CUSTOM_LIB_SUFFIX": 184,
+    "CMAKE_FIND_LIBRARY_PREFIXES": 185,
+    "CMAKE_FIND_LIBRARY_SUFFIXES": 186,
+    "CMAKE_FIND_NO_INSTALL_PREFIX": 187,
+    "CMAKE_FIND_PACKAGE_NAME": 188,
+    "CMAKE_FIND_PACKAGE_NO_PACKAGE_REGISTRY": 189,
+    "CMAKE_FIND_PACKAGE_NO_SYSTEM_PACKAGE_REGISTRY": 190,
+    "CMAKE_FIND_PACKAGE_SORT_DIRECTION": 191,
+    "CMAKE_FIND_PACKAGE_SORT_ORDER": 192,
+    "CMAKE_FIND_PACKAGE_WARN_NO_MODULE": 193,
+    "CMAKE_FIND_ROOT_PATH": 194,
+    "CMAKE_FIND_ROOT_PATH_MODE_INCLUDE": 195,
+    "CMAKE_FIND_ROOT_PATH_MODE_LIBRARY": 196,
+    "CMAKE_FIND_ROOT_PATH_MODE_PACKAGE": 197,
+    "CMAKE_FIND_ROOT_PATH_MODE_PROGRAM": 198,
+    "CMAKE_FRAMEWORK_PATH": 199,
+    "CMAKE_Fortran_FORMAT": 200,
+    "CMAKE_Fortran_MODDIR_DEFAULT": 201,
+    "CMAKE_Fortran_MODDIR_FLAG": 202,
+    "CMAKE_Fortran_MODOUT_FLAG": 203,
+    "CMAKE_Fortran_MODULE_DIRECTORY": 204,
+    "CMAKE_GENERATOR": 205,
+    "CMAKE_GENERATOR_PLATFORM": 206,
+    "CMAKE_GENERATOR_TOOLSET": 207,
+    "CMAKE_GNUtoMS": 208,
+    "CMAKE_HOME_DIRECTORY": 209,
+    "CMAKE_HOST_APPLE": 210,
+    "CMAKE_HOST_SOLARIS": 211,
+    "CMAKE_HOST_SYSTEM": 212,
+    "CMAKE_HOST_SYSTEM_NAME": 213,
+    "CMAKE_HOST_SYSTEM_PROCESSOR": 214,
+    "CMAKE_HOST_SYSTEM_VERSION": 215,
+    "CMAKE_HOST_UNIX": 216,
+    "CMAKE_HOST_WIN32": 217,
+    "CMAKE_IGNORE_PATH": 218,
+    "CMAKE_IMPORT_LIBRARY_PREFIX": 219,
+    "CMAKE_IMPORT_LIBRARY_SUFFIX": 220,
+    "CMAKE_INCLUDE_CURRENT_DIR": 221,
+    "CMAKE_INCLUDE_CURRENT_DIR_IN_INTERFACE": 222,
+    "CMAKE_INCLUDE_DIRECTORIES_BEFORE": 223,
+    "CMAKE_INCLUDE_DIRECTORIES_PROJECT_BEFORE": 224,
+    "CMAKE_INCLUDE_PATH": 225,
+    "CMAKE_INSTALL_DEFAULT_COMPONENT_NAME": 226,
+    "CMAKE_INSTALL_MESSAGE": 227,
+    "CMAKE_INSTALL_NAME_DIR": 228,
+    "CMAKE_INSTALL_PREFIX": 229,
+    "CMAKE_INSTALL_PREFIX_INITIALIZED_TO_DEFAULT": 230,
+    "CMAKE_INSTALL_RPATH": 231,
+    "CMAKE_INSTALL_RPATH_USE_LINK_PATH": 232,
+    "CMAKE_INTERNAL_PLATFORM_ABI": 233,
+    "CMAKE_INTERPROCEDURAL_OPTIMIZATION": 234,
+    "CMAKE_IOS_INSTALL_COMBINED": 236,
+    "CMAKE_JOB_POOL_COMPILE": 237,
+    "CMAKE_JOB_POOL_LINK": 238,
+    "CMAKE_LIBRARY_ARCHITECTURE": 239,
+    "CMAKE_LIBRARY_ARCHITECTURE_REGEX": 240,
+    "CMAKE_LIBRARY_OUTPUT_DIRECTORY": 241,
+    "CMAKE_LIBRARY_PATH": 243,
+    "CMAKE_LIBRARY_PATH_FLAG": 244,
+    "CMAKE_LINK_DEF_FILE_FLAG": 245,
+    "CMAKE_LINK_DEPENDS_NO_SHARED": 246,
+    "CMAKE_LINK_INTERFACE_LIBRARIES": 247,
+    "CMAKE_LINK_LIBRARY_FILE_FLAG": 248,
+    "CMAKE_LINK_LIBRARY_FLAG": 249,
+    "CMAKE_LINK_LIBRARY_SUFFIX": 250,
+    "CMAKE_LINK_SEARCH_END_STATIC": 251,
+    "CMAKE_LINK_SEARCH_START_STATIC": 252,
+    "CMAKE_LINK_WHAT_YOU_USE": 253,
+    "CMAKE_MACOSX_BUNDLE": 254,
+    "CMAKE_MACOSX_RPATH": 255,
+    "CMAKE_MAJOR_VERSION": 256,
+    "CMAKE_MAKE_PROGRAM": 257,
+    "CMAKE_MATCH_COUNT": 260,
+    "CMAKE_MFC_FLAG": 261,
+    "CMAKE_MINIMUM_REQUIRED_VERSION": 262,
+    "CMAKE_MINOR_VERSION": 263,
+    "CMAKE_MODULE_LINKER_FLAGS": 264,
+    "CMAKE_MODULE_LINKER_FLAGS_INIT": 267,
+    "CMAKE_MODULE_PATH": 268,
+    "CMAKE_MSVCIDE_RUN_PATH": 269,
+    "CMAKE_NINJA_OUTPUT_PATH_PREFIX": 270,
+    "CMAKE_NOT_USING_CONFIG_FLAGS": 271,
+    "CMAKE_NO_BUILTIN_CHRPATH": 272,
+    "CMAKE_NO_SYSTEM_FROM_IMPORTED": 273,
+    "CMAKE_OBJECT_PATH_MAX": 274,
+    "CMAKE_OSX_ARCHITECTURES": 275,
+    "CMAKE_OSX_DEPLOYMENT_TARGET": 276,
+    "CMAKE_OSX_SYSROOT": 277,
+    "CMAKE_PARENT_LIST_FILE": 278,
+    "CMAKE_PATCH_VERSION": 279,
+    "CMAKE_PDB_OUTPUT_DIRECTORY": 280,
+    "CMAKE_POSITION_INDEPENDENT_CODE": 284,
+    "CMAKE_PREFIX_PATH": 285,
+    "CMAKE_PROGRAM_PATH": 286,
+    "CMAKE_PROJECT_DESCRIPTION": 288,
+    "CMAKE_PROJECT_NAME": 289,
+    "CMAKE_RANLIB": 290,
+    "CMAKE_ROOT": 291,
+    "CMAKE_RUNTIME_OUTPUT_DIRECTORY": 292,
+    "CMAKE_SCRIPT_MODE_FILE": 294,
+    "CMAKE_SHARED_LIBRARY_PREFIX": 295,
+    "CMAKE_SHARED_LIBRARY_SUFFIX": 296,
+    "CMAKE_SHARED_LINKER_FLAGS": 297,
+    "CMAKE_SHARED_LINKER_FLAGS_INIT": 300,
+    "CMAKE_SHARED_MODULE_PREFIX": 301,
+    "CMAKE_SHARED_MODULE_SUFFIX": 302,
+    "CMAKE_SIZEOF_VOID_P": 303,
+    "CMAKE_SKIP_BUILD_RPATH": 304,
+    "CMAKE_SKIP_INSTALL_ALL_DEPENDENCY": 305,
+    "CMAKE_SKIP_INSTALL_RPATH": 306,
+    "CMAKE_SKIP_INSTALL_RULES": 307,
+    "CMAKE_SKIP_RPATH": 308,
+    "CMAKE_SOURCE_DIR": 309,
+    "CMAKE_STAGING_PREFIX": 310,
+    "CMAKE_STATIC_LIBRARY_PREFIX": 311,
+    "CMAKE_STATIC_LIBRARY_SUFFIX": 312,
+    "CMAKE_STATIC_LINKER_FLAGS": 313,
+    "CMAKE_STATIC_LINKER_FLAGS_INIT": 316,
+    "CMAKE_SUBLIME_TEXT_2_ENV_SETTINGS": 317,
+    "CMAKE_SUBLIME_TEXT_2_EXCLUDE_BUILD_TREE": 318,
+    "CMAKE_SYSROOT": 319,
+    "CMAKE_SYSROOT_COMPILE": 320,
+    "CMAKE_SYSROOT_LINK": 321,
+    "CMAKE_SYSTEM": 322,
+    "CMAKE_SYSTEM_APPBUNDLE_PATH": 323,
+    "CMAKE_SYSTEM_FRAMEWORK_PATH": 324,
+    "CMAKE_SYSTEM_IGNORE_PATH": 325,
+    "CMAKE_SYSTEM_INCLUDE_PATH": 326,
+    "CMAKE_SYSTEM_LIBRARY_PATH": 327,
+    "CMAKE_SYSTEM_NAME": 328,
+    "CMAKE_SYSTEM_PREFIX_PATH": 329,
+    "CMAKE_SYSTEM_PROCESSOR": 330,
+    "CMAKE_SYSTEM_PROGRAM_PATH": 331,
+    "CMAKE_SYSTEM_VERSION": 332,
+    "CMAKE_Swift_LANGUAGE_VERSION": 333,
+    "CMAKE_TOOLCHAIN_FILE": 334,
+    "CMAKE_TRY_COMPILE_CONFIGURATION": 335,
+    "CMAKE_TRY_COMPILE_PLATFORM_VARIABLES": 336,
+    "CMAKE_TRY_COMPILE_TARGET_TYPE": 337,
+    "CMAKE_TWEAK_VERSION": 338,
+    "CMAKE_USER_MAKE_RULES_OVERRIDE": 339,
+    "CMAKE_USE_RELATIVE_PATHS": 341,
+    "CMAKE_VERBOSE_MAKEFILE": 342,
+    "CMAKE_VERSION": 343,
+    "CMAKE_VISIBILITY_INLINES_HIDDEN": 344,
+    "CMAKE_VS_DEVENV_COMMAND": 345,
+    "CMAKE_VS_INCLUDE_INSTALL_TO_DEFAULT_BUILD": 346,
+    "CMAKE_VS_INCLUDE_PACKAGE_TO_DEFAULT_BUILD": 347,
+    "CMAKE_VS_INTEL_Fortran_PROJECT_VERSION": 348,
+    "CMAKE_VS_MSBUILD_COMMAND": 349,
+    "CMAKE_VS_NsightTegra_VERSION": 350,
+    "CMAKE_VS_PLATFORM_NAME": 351,
+    "CMAKE_VS_PLATFORM_TOOLSET": 352,
+    "CMAKE_VS_PLATFORM_TOOLSET_CUDA": 353,
+    "CMAKE_VS_PLATFORM_TOOLSET_HOST_ARCHITECTURE": 354,
+    "CMAKE_VS_WINDOWS_TARGET_PLATFORM_VERSION": 355,
+    "CMAKE_WARN_DEPRECATED": 356,
+    "CMAKE_WARN_ON_ABSOLUTE_INSTALL_DESTINATION": 357,
+    "CMAKE_WIN32_EXECUTABLE": 358,
+    "CMAKE_WINDOWS_EXPORT_ALL_SYMBOLS": 359,
+    "CMAKE_XCODE_GENERATE_SCHEME": 361,
+    "CMAKE_XCODE_PLATFORM_TOOLSET": 362,
+    "CPACK_ABSOLUTE_DESTINATION_FILES": 363,
+    "CPACK_COMPONENT_INCLUDE_TOPLEVEL_DIRECTORY": 364,
+    "CPACK_ERROR_ON_ABSOLUTE_INSTALL_DESTINATION": 365,
+    "CPACK_INCLUDE_TOPLEVEL_DIRECTORY": 366,
+    "CPACK_INSTALL_SCRIPT": 367,
+    "CPACK_PACKAGING_INSTALL_PREFIX": 368,
+    "CPACK_SET_DESTDIR": 369,
+    "CPACK_WARN_ON_ABSOLUTE_INSTALL_DESTINATION": 370,
+    "CTEST_BINARY_DIRECTORY": 371,
+    "CTEST_BUILD_COMMAND": 372,
+    "CTEST_BUILD_NAME": 373,
+    "CTEST_BZR_COMMAND": 374,
+    "CTEST_BZR_UPDATE_OPTIONS": 375,
+    "CTEST_CHANGE_ID": 376,
+    "CTEST_CHECKOUT_COMMAND": 377,
+    "CTEST_CONFIGURATION_TYPE": 378,
+    "CTEST_CONFIGURE_COMMAND": 379,
+    "CTEST_COVERAGE_COMMAND": 380,
+    "CTEST_COVERAGE_EXTRA_FLAGS": 381,
+    "CTEST_CURL_OPTIONS": 382,
+    "CTEST_CUSTOM_COVERAGE_EXCLUDE": 383,
+    "CTEST_CUSTOM_ERROR_EXCEPTION": 384,
+    "CTEST_CUSTOM_ERROR_MATCH": 385,
+    "CTEST_CUSTOM_ERROR_POST_CONTEXT": 386,
+    "CTEST_CUSTOM_ERROR_PRE_CONTEXT": 387,
+    "CTEST_CUSTOM_MAXIMUM_FAILED_TEST_OUTPUT_SIZE": 388,
+    "CTEST_CUSTOM_MAXIMUM_NUMBER_OF_ERRORS": 389,
+    "CTEST_CUSTOM_MAXIMUM_NUMBER_OF_WARNINGS": 390,
+    "CTEST_CUSTOM_MAXIMUM_PASSED_TEST_OUTPUT_SIZE": 391,
+    "CTEST_CUSTOM_MEMCHECK_IGNORE": 392,
+    "CTEST_CUSTOM_POST_MEMCHECK": 393,
+    "CTEST_CUSTOM_POST_TEST": 394,
+    "CTEST_CUSTOM_PRE_MEMCHECK": 395,
+    "CTEST_CUSTOM_PRE_TEST": 396,
+    "CTEST_CUSTOM_TEST_IGNORE": 397,
+    "CTEST_CUSTOM_WARNING_EXCEPTION": 398,
+    "CTEST_CUSTOM_WARNING_MATCH": 399,
+    "CTEST_CVS_CHECKOUT": 400,
+    "CTEST_CVS_COMMAND": 401,
+    "CTEST_CVS_UPDATE_OPTIONS": 402,
+    "CTEST_DROP_LOCATION": 403,
+    "CTEST_DROP_METHOD": 404,
+    "CTEST_DROP_SITE": 405,
+    "CTEST_DROP_SITE_CDASH": 406,
+    "CTEST_DROP_SITE_PASSWORD": 407,
+    "CTEST_DROP_SITE_USER": 408,
+    "CTEST_EXTRA_COVERAGE_GLOB": 409,
+    "CTEST_GIT_COMMAND": 410,
+    "CTEST_GIT_INIT_SUBMODULES": 411,
+    "CTEST_GIT_UPDATE_CUSTOM": 412,
+    "CTEST_GIT_UPDATE_OPTIONS": 413,
+    "CTEST_HG_COMMAND": 414,
+    "CTEST_HG_UPDATE_OPTIONS": 415,
+    "CTEST_LABELS_FOR_SUBPROJECTS": 416,
+    "CTEST_MEMORYCHECK_COMMAND": 417,
+    "CTEST_MEMORYCHECK_COMMAND_OPTIONS": 418,
+    "CTEST_MEMORYCHECK_SANITIZER_OPTIONS": 419,
+    "CTEST_MEMORYCHECK_SUPPRESSIONS_FILE": 420,
+    "CTEST_MEMORYCHECK_TYPE": 421,
+    "CTEST_NIGHTLY_START_TIME": 422,
+    "CTEST_P4_CLIENT": 423,
+    "CTEST_P4_COMMAND": 424,
+    "CTEST_P4_OPTIONS": 425,
+    "CTEST_P4_UPDATE_OPTIONS": 426,
+    "CTEST_SCP_COMMAND": 427,
+    "CTEST_SITE": 428,
+    "CTEST_SOURCE_DIRECTORY": 429,
+    "CTEST_SVN_COMMAND": 430,
+    "CTEST_SVN_OPTIONS": 431,
+    "CTEST_SVN_UPDATE_OPTIONS": 432,
+    "CTEST_TEST_LOAD": 433,
+    "CTEST_TEST_TIMEOUT": 434,
+    "CTEST_TRIGGER_SITE": 435,
+    "CTEST_UPDATE_COMMAND": 436,
+    "CTEST_UPDATE_OPTIONS": 437,
+    "CTEST_UPDATE_VERSION_ONLY": 438,
+    "CTEST_USE_LAUNCHERS": 439,
+    "CYGWIN": 440,
+    "ENV": 441,
+    "EXECUTABLE_OUTPUT_PATH": 442,
+    "GHS-MULTI": 443,
+    "LIBRARY_OUTPUT_PATH": 444,
+    "MINGW": 445,
+    "MSVC": 446,
+    "MSVC10": 447,
+    "MSVC11": 448,
+    "MSVC12": 449,
+    "MSVC14": 450,
+    "MSVC60": 451,
+    "MSVC70": 452,
+    "MSVC71": 453,
+    "MSVC80": 454,
+    "MSVC90": 455,
+    "MSVC_IDE": 456,
+    "MSVC_VERSION": 457,
+    "PROJECT_BINARY_DIR": 458,
+    "PROJECT_DESCRIPTION": 459,
+    "PROJECT_NAME": 460,
+    "PROJECT_SOURCE_DIR": 461,
+    "PROJECT_VERSION": 462,
+    "PROJECT_VERSION_MAJOR": 463,
+    "PROJECT_VERSION_MINOR": 464,
+    "PROJECT_VERSION_PATCH": 465,
+    "PROJECT_VERSION_TWEAK": 466,
+    "UNIX": 467,
+    "WIN32": 468,
+    "WINCE": 469,
+    "WINDOWS_PHONE": 470,
+    "WINDOWS_STORE": 471,
+    "XCODE": 472,
+    "XCODE_VERSION": 473,
+}
+
+# The index of each pattern with a generic label, and the literal text
+# between the labels
+TEMPLATES = [
+    (0, ("", "_BINARY_DIR")),
+    (1, ("", "_SOURCE_DIR")),
+    (2, ("", "_VERSION")),
+    (3, ("", "_VERSION_MAJOR")),
+    (4, ("", "_VERSION_MINOR")),
+    (5, ("", "_VERSION_PATCH")),
+    (6, ("", "_VERSION_TWEAK")),
+    (11, ("CMAKE_", "_POSTFIX")),
+    (12, ("CMAKE_", "_ANDROID_TOOLCHAIN_MACHINE")),
+    (13, ("CMAKE_", "_ANDROID_TOOLCHAIN_PREFIX")),
+    (14, ("CMAKE_", "_ANDROID_TOOLCHAIN_SUFFIX")),
+    (15, ("CMAKE_", "_ARCHIVE_APPEND")),
+    (16, ("CMAKE_", "_ARCHIVE_CREATE")),
+    (17, ("CMAKE_", "_ARCHIVE_FINISH")),
+    (18, ("CMAKE_", "_CLANG_TIDY")),
+    (19, ("CMAKE_", "_COMPILER")),
+    (20, ("CMAKE_", "_COMPILER_ABI")),
+    (21, ("CMAKE_", "_COMPILER_AR")),
+    (22, ("CMAKE_", "_COMPILER_ARCHITECTURE_ID")),
+    (23, ("CMAKE_", "_COMPILER_EXTERNAL_TOOLCHAIN")),
+    (24, ("CMAKE_", "_COMPILER_ID")),
+    (25, ("CMAKE_", "_COMPILER_LAUNCHER")),
+    (26, ("CMAKE_", "_COMPILER_LOADED")),
+    (27, ("CMAKE_", "_COMPILER_PREDEFINES_COMMAND")),
+    (28, ("CMAKE_", "_COMPILER_RANLIB")),
+    (29, ("CMAKE_", "_COMPILER_TARGET")),
+    (30, ("CMAKE_", "_COMPILER_VERSION")),
+    (31, ("CMAKE_", "_COMPILER_VERSION_INTERNAL")),
+    (32, ("CMAKE_", "_COMPILE_OBJECT")),
+    (33, ("CMAKE_", "_CPPCHECK")),
+    (34, ("CMAKE_", "_CPPLINT")),
+    (35, ("CMAKE_", "_CREATE_SHARED_LIBRARY")),
+    (36, ("CMAKE_", "_CREATE_SHARED_MODULE")),
+    (37, ("CMAKE_", "_CREATE_STATIC_LIBRARY")),
+    (38, ("CMAKE_", "_FLAGS")),
+    (39, ("CMAKE_", "_FLAGS_DEBUG")),
+    (40, ("CMAKE_", "_FLAGS_DEBUG_INIT")),
+    (41, ("CMAKE_", "_FLAGS_INIT")),
+    (42, ("CMAKE_", "_FLAGS_MINSIZEREL")),
+    (43, ("CMAKE_", "_FLAGS_MINSIZEREL_INIT")),
+    (44, ("CMAKE_", "_FLAGS_RELEASE")),
+    (45, ("CMAKE_", "_FLAGS_RELEASE_INIT")),
+    (46, ("CMAKE_", "_FLAGS_RELWITHDEBINFO")),
+    (47, ("CMAKE_", "_FLAGS_RELWITHDEBINFO_INIT")),
+    (48, ("CMAKE_", "_GHS_KERNEL_FLAGS_DEBUG")),
+    (49, ("CMAKE_", "_GHS_KERNEL_FLAGS_MINSIZEREL")),
+    (50, ("CMAKE_", "_GHS_KERNEL_FLAGS_RELEASE")),
+    (51, ("CMAKE_", "_GHS_KERNEL_FLAGS_RELWITHDEBINFO")),
+    (52, ("CMAKE_", "_IGNORE_EXTENSIONS")),
+    (53, ("CMAKE_", "_IMPLICIT_INCLUDE_DIRECTORIES")),
+    (54, ("CMAKE_", "_IMPLICIT_LINK_DIRECTORIES")),
+    (55, ("CMAKE_", "_IMPLICIT_LINK_FRAMEWORK_DIRECTORIES")),
+    (56, ("CMAKE_", "_IMPLICIT_LINK_LIBRARIES")),
+    (57, ("CMAKE_", "_INCLUDE_WHAT_YOU_USE")),
+    (58, ("CMAKE_", "_LIBRARY_ARCHITECTURE")),
+    (59, ("CMAKE_", "_LINKER_PREFERENCE")),
+    (60, ("CMAKE_", "_LINKER_PREFERENCE_PROPAGATES")),
+    (61, ("CMAKE_", "_LINK_EXECUTABLE")),
+    (62, ("CMAKE_", "_OUTPUT_EXTENSION")),
+    (63, ("CMAKE_", "_PLATFORM_ID")),
+    (64, ("CMAKE_", "_SIMULATE_ID")),
+    (65, ("CMAKE_", "_SIMULATE_VERSION")),
+    (66, ("CMAKE_", "_SIZEOF_DATA_PTR")),
+    (67, ("CMAKE_", "_SOURCE_FILE_EXTENSIONS")),
+    (68, ("CMAKE_", "_STANDARD_INCLUDE_DIRECTORIES")),
+    (69, ("CMAKE_", "_STANDARD_LIBRARIES")),
+    (70, ("CMAKE_", "_VISIBILITY_PRESET")),
+    (100, ("CMAKE_ARCHIVE_OUTPUT_DIRECTORY_", "")),
+    (136, ("CMAKE_COMPILE_PDB_OUTPUT_DIRECTORY_", "")),
+    (163, ("CMAKE_DISABLE_FIND_PACKAGE_", "")),
+    (175, ("CMAKE_EXE_LINKER_FLAGS_", "")),
+    (176, ("CMAKE_EXE_LINKER_FLAGS_", "_INIT")),
+    (235, ("CMAKE_INTERPROCEDURAL_OPTIMIZATION_", "")),
+    (242, ("CMAKE_LIBRARY_OUTPUT_DIRECTORY_", "")),
+    (258, ("CMAKE_MAP_IMPORTED_CONFIG_", "")),
+    (259, ("CMAKE_MATCH_", "")),
+    (265, ("CMAKE_MODULE_LINKER_FLAGS_", "")),
+    (266, ("CMAKE_MODULE_LINKER_FLAGS_", "_INIT")),
+    (281, ("CMAKE_PDB_OUTPUT_DIRECTORY_", "")),
+    (282, ("CMAKE_POLICY_DEFAULT_CMP", "")),
+    (283, ("CMAKE_POLICY_WARNING_CMP", "")),
+    (287, ("CMAKE_PROJECT_", "_INCLUDE")),
+    (293, ("CMAKE_RUNTIME_OUTPUT_DIRECTORY_", "")),
+    (298, ("CMAKE_SHARED_LINKER_FLAGS_", "")),
+    (299, ("CMAKE_SHARED_LINKER_FLAGS_", "_INIT")),
+    (314, ("CMAKE_STATIC_LINKER_FLAGS_", "")),
+    (315, ("CMAKE_STATIC_LINKER_FLAGS_", "_INIT")),
+    (340, ("CMAKE_USER_MAKE_RULES_OVERRIDE_", "")),
+    (360, ("CMAKE_XCODE_ATTRIBUTE_", "")),
+]
+
+# Gives the same answers as the regular expressions above, but faster
+INDEX = NameIndex(EXACT_NAMES, TEMPLATES)
@@ -0,0 +1,286 @@
+"""
+Built-in profiler hook for the command line tools.
+
+With ``--profile=OUT`` each file is processed under `cProfile` and the
+results are written, when all files are finished, as:
+
+* ``OUT.pstats``: the merged profile of all files, in the `pstats` marshal
+  format (i.e. ``python -m pstats OUT.pstats``, snakeviz, gprof2dot, ...)
+* ``OUT.speedscope.json``: a flame graph in the speedscope file format (see
+  https://www.speedscope.app). With ``--profile-per-file`` this contains one
+  profile per input file rather than a single merged profile.
+
+If ``OUT`` already ends with ``.pstats`` that suffix is not repeated.
+
+`cProfile` records only caller/callee totals, not full stacks, so the flame
+graph is reconstructed by splitting the time of each function among its
+callees in proportion to the time spent in each call edge. It is exact for
+functions which are only reached along one path, and an approximation
+otherwise.
+"""
+
+from __future__ import unicode_literals
+
+import cProfile
+import collections
+import contextlib
+import io
+import json
+import os
+import pstats
+
+# The profile of the file currently being processed, if any
+ACTIVE = None
+
+# Frames of the reconstructed flame graph which account for less than this
+# fraction of the total time are folded into their parent.
+MIN_FRACTION = 1e-3
+
+# Recursion limit for the reconstructed flame graph
+MAX_DEPTH = 256
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class FileProfile(object):
+  """
+  Profile of a single input file. Use as a context manager to profile a
+  section of code, any number of times. Call `finish()` to convert the
+  profile to a (picklable) stats dictionary, as produced by
+  `cProfile.Profile.create_stats()`.
+  """
+
+  def __init__(self, name=None):
+    self.name = name
+    self.profiler = cProfile.Profile()
+    self.stats = None
+
+  def __enter__(self):
+    self.profiler.enable()
+    return self
+
+  def __exit__(self, *_):
+    self.profiler.disable()
+
+  def finish(self):
+    self.profiler.create_stats()
+    self.stats = self.profiler.stats
+    self.profiler = None
+
+  def __getstate__(self):
+    assert self.profiler is None, "Can't pickle an unfinished profile"
+    return {"name": self.name, "stats": self.stats}
+
+  def __setstate__(self, state):
+    self.name = state["name"]
+    self.stats = state["stats"]
+    self.profiler = None
+
+
+class NullSection(object):
+  """Context manager which does nothing."""
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *_):
+    return None
+
+
+NULL_SECTION = NullSection()
+
+
+def section():
+  """
+  Return a context manager which profiles its body as part of the active
+  file profile, or does nothing if there is none.
+  """
+  if ACTIVE is None:
+    return NULL_SECTION
+  return ACTIVE
+
+
+@contextlib.contextmanager
+def collect(name=None, enabled=True):
+  """
+  Activate a new `FileProfile` for the duration of the context and yield it.
+  Only code within `section()` is profiled. If not `enabled`, yield None and
+  leave profiling disabled.
+  """
+  global ACTIVE  # pylint: disable=global-statement
+  if not enabled:
+    yield None
+    return
+
+  prev = ACTIVE
+  ACTIVE = FileProfile(name)
+  file_profile = ACTIVE
+  try:
+    yield file_profile
+  finally:
+    ACTIVE = prev
+    file_profile.finish()
+
+
+class StatsShim(object):
+  """
+  Adapts a stats dictionary for `pstats.Stats()`, which accepts any object
+  with a `create_stats()` method and a `stats` member (which it then clears).
+  """
+
+  def __init__(self, stats):
+    self.stats = dict(stats)
+
+  def create_stats(self):
+    pass
+
+
+def merge_stats(profile_list):
+  """Return a `pstats.Stats` which is the sum of the file profiles."""
+  merged = pstats.Stats()
+  for file_profile in profile_list:
+    merged.add(StatsShim(file_profile.stats))
+  return merged
+
+
+class FrameTable(object):
+  """Speedscope frames shared by all profiles in a file, indexed by the
+     `(filename, lineno, funcname)` keys used by `pstats`."""
+
+  def __init__(self):
+    self.frames = []
+    self.index = {}
+
+  def get_index(self, func):
+    idx = self.index.get(func, None)
+    if idx is None:
+      idx = len(self.frames)
+      self.index[func] = idx
+      filename, lineno, funcname = func
+      frame = collections.OrderedDict([("name", funcname)])
+      # NOTE(josh): builtins are reported with a filename of "~"
+      if filename != "~":
+        frame["file"] = filename
+        frame["line"] = lineno
+      self.frames.append(frame)
+    return idx
+
+
+def get_children(stats):
+  """Return a map from each function to a list of (callee, cumulative time)
+     for every function it called."""
+  children = collections.defaultdict(list)
+  for func, (_, _, _, _, callers) in stats.items():
+    for caller, edge in callers.items():
+      children[caller].append((func, edge[3]))
+  for callees in children.values():
+    callees.sort()
+  return children
+
+
+def get_speedscope_profile(stats, name, frames):
+  """
+  Reconstruct a flame graph from a stats dictionary and return it as a
+  "sampled" speedscope profile, in which each sample is a stack of frame
+  indices (in `frames`) and its weight is the self time of that stack.
+  """
+  children = get_children(stats)
+  roots = sorted(func for func, value in stats.items() if not value[4])
+  total = sum(stats[func][3] for func in roots)
+  threshold = MIN_FRACTION * total
+
+  samples = []
+  weights = []
+  queue = [(func, stats[func][3], ()) for func in reversed(roots)]
+  while queue:
+    func, allotted, path = queue.pop()
+    _, _, selftime, cumtime, _ = stats[func]
+    ratio = allotted / cumtime if cumtime > 0 else 0.0
+    path = path + (frames.get_index(func),)
+
+    selftime *= ratio
+    callees = [(callee, edgetime * ratio)
+               for callee, edgetime in children.get(func, [])]
+    # NOTE(josh): time in recursive calls is counted in more than one edge,
+    # so scale the callees down to fit within the time of this frame.
+    available = max(allotted - selftime, 0.0)
+    callee_total = sum(edgetime for _, edgetime in callees)
+    if callee_total > available:
+      callees = [(callee, edgetime * available / callee_total)
+                 for callee, edgetime in callees]
+
+    expand = []
+    for callee, edgetime in callees:
+      if (edgetime < threshold or len(path) >= MAX_DEPTH
+          or frames.index.get(callee) in path):
+        selftime += edgetime
+      else:
+        expand.append((callee, edgetime, path))
+    queue.extend(reversed(expand))
+
+    if selftime > 0:
+      samples.append(list(path))
+      weights.append(selftime)
+
+  return collections.OrderedDict([
+      ("type", "sampled"),
+      ("name", name),
+      ("unit", "seconds"),
+      ("startValue", 0),
+      ("endValue", sum(weights)),
+      ("samples", samples),
+      ("weights", weights),
+  ])
+
+
+def get_outpaths(outpath):
+  """Return the (pstats, speedscope) output paths for ``--profile=OUT``."""
+  if outpath.endswith(".pstats"):
+    outpath = outpath[:-len(".pstats")]
+  return outpath + ".pstats", outpath + ".speedscope.json"
+
+
+def write_profiles(outpath, profile_list, per_file=False):
+  """
+  Write the merged pstats profile and the speedscope flame graph for a list
+  of `FileProfile`. See the module documentation for details.
+  """
+  pstats_path, speedscope_path = get_outpaths(outpath)
+  merged = merge_stats(profile_list)
+  merged.dump_stats(pstats_path)
+
+  frames = FrameTable()
+  if per_file:
+    profiles = [
+        get_speedscope_profile(
+            file_profile.stats, "{}".format(file_profile.name), frames)
+        for file_profile in profile_list]
+  else:
+    profiles = [get_speedscope_profile(
+        merged.stats, "{} files".format(len(profile_list)), frames)]
+
+  document = collections.OrderedDict([
+      ("$schema", SPEEDSCOPE_SCHEMA),
+      ("name", os.path.basename(speedscope_path)),
+      ("exporter", "cmakelang"),
+      ("activeProfileIndex", 0),
+      ("shared", {"frames": frames.frames}),
+      ("profiles", profiles),
+  ])
+  with io.open(speedscope_path, "w", encoding="utf-8") as outfile:
+    outfile.write("{}".format(json.dumps(document)))
+  return pstats_path, speedscope_path
+
+
+def add_argument(argparser):
+  """Add the --profile and --profile-per-file options to a command line
+     parser."""
+  argparser.add_argument(
+      '--profile', metavar='OUT', default=None,
+      help='Profile the processing of each file and, when finished, write the'
+           ' merged profile to OUT.pstats and a speedscope flame graph to'
+           ' OUT.speedscope.json')
+  argparser.add_argument(
+      '--profile-per-file', action='store_true',
+      help='With --profile, write one speedscope profile per input file'
+           ' rather than a single merged profile')
@@ -20,6 +20,7 @@ setup(
     name="cmakelang",
     packages=[
         "cmakelang",
+        "cmakelang.bench",
         "cmakelang.format",
         "cmakelang.lex",
         "cmakelang.lint",
@@ -44,6 +45,9 @@ setup(
     package_data={
         "cmakelang": [
             "templates/*"
+        ],
+        "cmakelang.bench": [
+            "fuzz_cases/*.cmake"
         ]
     },
     entry_points={
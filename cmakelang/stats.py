@@ -0,0 +1,378 @@
+"""
+Lightweight instrumentation: phase timers and event counters.
+
+Instrumentation is disabled unless a collector is activated with `collect()`.
+While disabled, `timer()` returns a shared no-op context manager and
+`count()` returns immediately. Hot paths should guard with
+``if stats.ACTIVE is not None:`` to avoid even the function call.
+
+Phases are timed with a monotonic clock. The names used by the frontends
+are:
+
+* ``config``: resolving and loading configuration
+* ``read``: reading the input file
+* ``lex``, ``parse``: `lex.tokenize()` and `parse.parse()`
+* ``layout``, ``write``: `formatter.layout_tree()` and `formatter.write_tree()`
+* ``lint``: running the lint checks
+* ``annotate``: rendering annotated html
+* ``total``: everything done for one file
+
+If tracing is requested, each collector also records the start and end of
+every phase, which `write_trace()` exports as Chrome trace events.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import contextlib
+import json
+import os
+import time
+
+# The currently active collector, if any
+ACTIVE = None
+
+if hasattr(time, "perf_counter"):
+  get_time = time.perf_counter  # pylint: disable=invalid-name
+else:
+  get_time = time.time  # pylint: disable=invalid-name
+
+# Counters listed in the slowest files table, if they were recorded
+SLOWEST_COUNTERS = ("tokens", "parse_nodes", "layout_nodes")
+
+# The order in which to list phases in text output. Others follow sorted.
+PHASE_ORDER = (
+    "config", "read", "lex", "parse", "layout", "write", "lint", "annotate",
+    "total")
+
+
+class Stats(object):
+  """Accumulated timers (seconds) and counters for one file, or a total. If
+     `trace` then the (phase, start, end) of each timed span is also recorded,
+     along with the id of the process which did the work."""
+
+  def __init__(self, name=None, trace=False):
+    self.name = name
+    self.timers = collections.defaultdict(float)
+    self.counters = collections.defaultdict(int)
+    self.spans = [] if trace else None
+    self.pid = os.getpid()
+
+  def add_time(self, phase, seconds):
+    self.timers[phase] += seconds
+
+  def add_span(self, phase, start, end):
+    self.add_time(phase, end - start)
+    if self.spans is not None:
+      self.spans.append((phase, start, end))
+
+  def count(self, key, increment=1):
+    self.counters[key] += increment
+
+  def merge(self, other):
+    """Add the timers and counters of `other` into this object."""
+    for phase, seconds in other.timers.items():
+      self.timers[phase] += seconds
+    for key, value in other.counters.items():
+      self.counters[key] += value
+
+  def as_dict(self):
+    return collections.OrderedDict([
+        ("name", self.name),
+        ("timers", dict(self.timers)),
+        ("counters", dict(self.counters)),
+    ])
+
+
+class PhaseTimer(object):
+  """Context manager which adds its elapsed time to a collector."""
+
+  __slots__ = ("collector", "phase", "start")
+
+  def __init__(self, collector, phase):
+    self.collector = collector
+    self.phase = phase
+    self.start = None
+
+  def __enter__(self):
+    self.start = get_time()
+    return self
+
+  def __exit__(self, *_):
+    self.collector.add_span(self.phase, self.start, get_time())
+
+
+class NullTimer(object):
+  """Context manager which does nothing."""
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *_):
+    return None
+
+
+NULL_TIMER = NullTimer()
+
+
+def timer(phase):
+  """Return a context manager timing `phase` in the active collector."""
+  if ACTIVE is None:
+    return NULL_TIMER
+  return PhaseTimer(ACTIVE, phase)
+
+
+def count(key, increment=1):
+  """Increment the counter `key` of the active collector."""
+  if ACTIVE is not None:
+    ACTIVE.count(key, increment)
+
+
+def count_nodes(root):
+  """Return the number of nodes in a tree (parse or layout) rooted at `root`.
+     Tokens (which have no children) are not counted."""
+  num_nodes = 0
+  queue = [root]
+  while queue:
+    node = queue.pop()
+    children = getattr(node, "children", None)
+    if children is None:
+      continue
+    num_nodes += 1
+    queue.extend(children)
+  return num_nodes
+
+
+@contextlib.contextmanager
+def collect(name=None, enabled=True, collector=None, trace=False):
+  """
+  Activate a new `Stats` collector (or `collector`, if given) for the
+  duration of the context and yield it. The elapsed time of the context is
+  recorded as the ``total`` phase. If not `enabled`, yield None and leave
+  instrumentation disabled. If `trace`, the new collector records spans.
+  """
+  global ACTIVE  # pylint: disable=global-statement
+  if not enabled:
+    yield None
+    return
+
+  prev = ACTIVE
+  ACTIVE = Stats(name, trace) if collector is None else collector
+  collector = ACTIVE
+  start = get_time()
+  try:
+    yield collector
+  finally:
+    collector.add_span("total", start, get_time())
+    ACTIVE = prev
+
+
+def get_total(stats_list):
+  """Return a `Stats` which is the sum of those in `stats_list`."""
+  total = Stats("total")
+  for file_stats in stats_list:
+    total.merge(file_stats)
+  total.count("files", len(stats_list))
+  return total
+
+
+def sort_phases(phases):
+  return sorted(
+      phases,
+      key=lambda phase: (
+          PHASE_ORDER.index(phase) if phase in PHASE_ORDER
+          else len(PHASE_ORDER), phase))
+
+
+def write_text(outfile, stats_list):
+  """Write a human readable report: one line of timings per file, followed by
+     the aggregate timings and counters."""
+  total = get_total(stats_list)
+  phases = sort_phases(total.timers)
+  namewidth = max([len("total")] + [
+      len("{}".format(file_stats.name)) for file_stats in stats_list])
+
+  outfile.write("{:{}s}".format("file", namewidth))
+  for phase in phases:
+    outfile.write(" {:>9s}".format(phase))
+  outfile.write("\n")
+  for file_stats in stats_list + [total]:
+    outfile.write("{:{}s}".format("{}".format(file_stats.name), namewidth))
+    for phase in phases:
+      outfile.write(" {:8.2f}ms".format(
+          1000.0 * file_stats.timers.get(phase, 0.0)))
+    outfile.write("\n")
+
+  outfile.write("\ncounters:\n")
+  keywidth = max([0] + [len(key) for key in total.counters])
+  for key, value in sorted(total.counters.items()):
+    outfile.write("  {:{}s}: {:d}\n".format(key, keywidth, value))
+
+
+def write_json(outfile, stats_list):
+  """Write a json report with the stats of each file and the aggregate."""
+  json.dump(collections.OrderedDict([
+      ("files", [file_stats.as_dict() for file_stats in stats_list]),
+      ("total", get_total(stats_list).as_dict()),
+  ]), outfile, indent=2)
+  outfile.write("\n")
+
+
+def get_slowest(stats_list, num):
+  """Return the `num` collectors of `stats_list` with the longest ``total``
+     time, slowest first."""
+  return sorted(
+      stats_list, key=lambda file_stats: -file_stats.timers.get("total", 0.0)
+  )[:num]
+
+
+def get_slowest_columns(stats_list):
+  """Return the node counters recorded in any of `stats_list`, for use as the
+     columns of the slowest files table."""
+  return [
+      key for key in SLOWEST_COUNTERS
+      if any(key in file_stats.counters for file_stats in stats_list)]
+
+
+def write_slowest_text(outfile, stats_list, num):
+  """Write a table of the wall time and node counts of the `num` slowest
+     files."""
+  slowest = get_slowest(stats_list, num)
+  columns = get_slowest_columns(slowest)
+  namewidth = max([len("file")] + [
+      len("{}".format(file_stats.name)) for file_stats in slowest])
+
+  outfile.write("slowest files:\n")
+  outfile.write("  {:{}s} {:>10s}".format("file", namewidth, "time"))
+  for key in columns:
+    outfile.write(" {:>12s}".format(key))
+  outfile.write("\n")
+  for file_stats in slowest:
+    outfile.write("  {:{}s} {:8.2f}ms".format(
+        "{}".format(file_stats.name), namewidth,
+        1000.0 * file_stats.timers.get("total", 0.0)))
+    for key in columns:
+      outfile.write(" {:12d}".format(file_stats.counters.get(key, 0)))
+    outfile.write("\n")
+  outfile.write("\n")
+
+
+def write_slowest_json(outfile, stats_list, num):
+  """Write the `num` slowest files, with their wall time (seconds) and node
+     counts, as a json list."""
+  slowest = get_slowest(stats_list, num)
+  columns = get_slowest_columns(slowest)
+  json.dump([
+      collections.OrderedDict(
+          [("name", file_stats.name),
+           ("time", file_stats.timers.get("total", 0.0))]
+          + [(key, file_stats.counters.get(key, 0)) for key in columns])
+      for file_stats in slowest], outfile, indent=2)
+  outfile.write("\n")
+
+
+def write_report(outfile, outfmt, stats_list):
+  if outfmt == "json":
+    write_json(outfile, stats_list)
+  else:
+    write_text(outfile, stats_list)
+
+
+def get_trace_events(stats_list):
+  """
+  Return a list of Chrome trace events for the spans recorded in
+  `stats_list`. All of the work is shown as one process, with one track
+  (thread) per worker process. The ``total`` span of each file is named for
+  the file, and the phases are nested within it.
+  """
+  # NOTE(josh): `get_time()` is a system-wide monotonic clock, so the spans
+  # recorded in different worker processes share a time base.
+  spans = [span for file_stats in stats_list for span in file_stats.spans]
+  origin = min([start for _, start, _ in spans] or [0.0])
+
+  events = []
+  tids = collections.OrderedDict()
+  for file_stats in stats_list:
+    if file_stats.pid not in tids:
+      tids[file_stats.pid] = len(tids)
+    tid = tids[file_stats.pid]
+    for phase, start, end in file_stats.spans:
+      if phase == "total":
+        name = "{}".format(file_stats.name)
+        category = "file"
+      else:
+        name = phase
+        category = "phase"
+      events.append(collections.OrderedDict([
+          ("name", name),
+          ("cat", category),
+          ("ph", "X"),
+          ("ts", 1e6 * (start - origin)),
+          ("dur", 1e6 * (end - start)),
+          ("pid", 0),
+          ("tid", tid),
+          ("args", {"file": "{}".format(file_stats.name)}),
+      ]))
+
+  for pid, tid in tids.items():
+    events.append(collections.OrderedDict([
+        ("name", "thread_name"),
+        ("ph", "M"),
+        ("pid", 0),
+        ("tid", tid),
+        ("args", {"name": "worker {} (pid {})".format(tid, pid)}),
+    ]))
+  return events
+
+
+def write_trace(outfile, stats_list):
+  """Write the recorded spans as a Chrome trace (json object format), which
+     can be loaded in chrome://tracing or https://ui.perfetto.dev."""
+  json.dump(collections.OrderedDict([
+      ("traceEvents", get_trace_events(stats_list)),
+      ("displayTimeUnit", "ms"),
+  ]), outfile)
+  outfile.write("\n")
+
+
+def add_argument(argparser):
+  """Add the --stats[=json] option to a command line parser."""
+  # NOTE(josh): `nargs='?'` would swallow a following input path, so instead
+  # we register the two spellings as separate flags. argparse matches an
+  # option string exactly before splitting on '='.
+  argparser.add_argument(
+      '--stats', dest='stats', action='store_const', const='text',
+      default=None,
+      help='Collect phase timings and counters, and write them to stderr per'
+           ' file and in aggregate when finished')
+  argparser.add_argument(
+      '--stats=json', dest='stats', action='store_const', const='json',
+      help='Like --stats, but write the report as json')
+
+
+def add_slowest_argument(argparser):
+  """Add the --slowest and --slowest-format options to a command line
+     parser."""
+  argparser.add_argument(
+      '--slowest', type=int, metavar='N', default=0,
+      help='When finished, report the N files which took the longest to'
+           ' process, with their wall time and node counts')
+  argparser.add_argument(
+      '--slowest-format', choices=['text', 'json'], default='text',
+      help='Format of the --slowest report. The json report is always'
+           ' written to stderr.')
+
+
+def is_requested(args):
+  """Return true if any option which requires per-file stats (--stats,
+     --trace or --slowest) was given on the command line."""
+  return bool(args.stats or args.trace or args.slowest)
+
+
+def add_trace_argument(argparser):
+  """Add the --trace option to a command line parser."""
+  argparser.add_argument(
+      '--trace', metavar='OUT',
+      help='Write a Chrome trace (for chrome://tracing or'
+           ' https://ui.perfetto.dev) to OUT with a span for each phase of'
+           ' each file, on one track per worker process')
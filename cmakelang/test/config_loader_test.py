@@ -0,0 +1,131 @@
+"""
+Test the caching config loader
+"""
+
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from cmakelang import common
+from cmakelang import config_loader
+
+
+class TestConfigLoader(unittest.TestCase):
+
+  def setUp(self):
+    self.outdir = tempfile.mkdtemp(prefix="cmake-format-loader-")
+    self.loader = config_loader.ConfigLoader()
+
+  def tearDown(self):
+    shutil.rmtree(self.outdir)
+
+  def write_config(self, filename, content):
+    outpath = os.path.join(self.outdir, filename)
+    with io.open(outpath, "w", encoding="utf-8") as outfile:
+      outfile.write(content)
+    return outpath
+
+  def test_sniff_format(self):
+    self.assertEqual("json", config_loader.sniff_format('{"a": 1}'))
+    self.assertEqual("json", config_loader.sniff_format(''))
+    self.assertEqual("yaml", config_loader.sniff_format('a: 1\nb: [2]\n'))
+    self.assertEqual("python", config_loader.sniff_format(
+        'with section("format"):\n  line_width = 100\n'))
+
+  def test_extensionless_python(self):
+    outpath = self.write_config(
+        ".cmake-format", 'with section("format"):\n  line_width = 100\n')
+    config_dict = self.loader.get_configdict([outpath])
+    self.assertEqual(100, config_dict["format"]["line_width"])
+
+  def test_cached_parse(self):
+    outpath = self.write_config("config.yaml", "format:\n  line_width: 100\n")
+    for _ in range(3):
+      config_dict = self.loader.get_configdict([outpath])
+      self.assertEqual(100, config_dict["format"].pop("line_width"))
+    self.assertEqual(1, self.loader.read_count)
+
+  def test_cache_invalidated_on_change(self):
+    outpath = self.write_config("config.json", '{"line_width": 100}')
+    self.assertEqual(100, self.loader.get_configdict([outpath])["line_width"])
+    self.write_config("config.json", '{"line_width": 1000}')
+    self.assertEqual(1000, self.loader.get_configdict([outpath])["line_width"])
+
+  def test_python_reexecuted(self):
+    outpath = self.write_config("config.py", "counter = [1]\n")
+    first = self.loader.get_configdict([outpath])
+    first["counter"].append(2)
+    second = self.loader.get_configdict([outpath])
+    self.assertEqual([1], second["counter"])
+    self.assertEqual(1, self.loader.read_count)
+
+  def test_include_cycle(self):
+    self.write_config("config-2.py", 'include = ["config-1.py"]\n')
+    outpath = self.write_config("config-1.py", 'include = ["config-2.py"]\n')
+    with self.assertRaises(common.UserError):
+      self.loader.get_configdict([outpath])
+
+  def test_diamond_include(self):
+    self.write_config("config-4.json", '{"var_d": 4}')
+    self.write_config(
+        "config-3.json", '{"include": ["config-4.json"], "var_c": 3}')
+    self.write_config(
+        "config-2.json", '{"include": ["config-4.json"], "var_b": 2}')
+    outpath = self.write_config(
+        "config-1.json",
+        '{"include": ["config-2.json", "config-3.json"], "var_a": 1}')
+    config_dict = self.loader.get_configdict([outpath])
+    self.assertEqual(
+        {"var_a": 1, "var_b": 2, "var_c": 3, "var_d": 4}, config_dict)
+
+  def test_python_executed_once(self):
+    """Resolving includes should not execute python configs again."""
+    logpath = os.path.join(self.outdir, "log.txt")
+    self.write_config("config-2.py", (
+        "import io\n"
+        "with io.open({!r}, 'a') as _outfile:\n"
+        "  _outfile.write(u'2')\n"
+        "var_b = 2\n").format(logpath))
+    outpath = self.write_config("config-1.py", (
+        "import io\n"
+        "with io.open({!r}, 'a') as _outfile:\n"
+        "  _outfile.write(u'1')\n"
+        "include = ['config-2.py', 'config-2.py']\n"
+        "var_a = 1\n").format(logpath))
+    config_dict = self.loader.get_configdict([outpath])
+    self.assertEqual(1, config_dict["var_a"])
+    self.assertEqual(2, config_dict["var_b"])
+    with io.open(logpath, "r", encoding="utf-8") as infile:
+      self.assertEqual("12", infile.read())
+
+    self.loader.get_configdict([outpath])
+    with io.open(logpath, "r", encoding="utf-8") as infile:
+      self.assertEqual("1212", infile.read())
+
+  def test_invalid_config(self):
+    for filename, content in (
+        ("config-list.json", '["line_width", 100]'),
+        ("config-list.yaml", "- line_width\n"),
+        ("config-str.json", '{"include": "config-list.json"}'),
+        ("config-int.yaml", "include: [1]\n"),
+        ("config-str.py", "include = 'config-list.json'\n")):
+      outpath = self.write_config(filename, content)
+      with self.assertRaises(common.UserError):
+        self.loader.get_configdict([outpath])
+
+  def test_find_config_file(self):
+    subdir = os.path.join(self.outdir, "a", "b")
+    os.makedirs(subdir)
+    outpath = self.write_config(".cmake-format.yaml", "line_width: 90\n")
+    infile_path = os.path.join(subdir, "CMakeLists.txt")
+    self.assertEqual(outpath, self.loader.find_config_file(infile_path))
+    self.assertEqual(
+        90, self.loader.get_config(infile_path, None)["line_width"])
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,106 @@
+"""
+Test listfile discovery and ignore rules
+"""
+
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from cmakelang import discovery
+
+
+class TestDiscovery(unittest.TestCase):
+
+  def setUp(self):
+    self.outdir = tempfile.mkdtemp(prefix="cmake-format-discovery-")
+
+  def tearDown(self):
+    shutil.rmtree(self.outdir)
+
+  def touch(self, relpath, content=""):
+    outpath = os.path.join(self.outdir, *relpath.split("/"))
+    if not os.path.exists(os.path.dirname(outpath)):
+      os.makedirs(os.path.dirname(outpath))
+    with io.open(outpath, "w", encoding="utf-8") as outfile:
+      outfile.write(content)
+    return outpath
+
+  def find(self, finder):
+    return [
+        os.path.relpath(path, self.outdir).replace(os.sep, "/")
+        for path in finder.iter_listfiles(self.outdir)]
+
+  def test_ignore_rule_syntax(self):
+    rules = discovery.IgnoreRules(discovery.parse_ignore_lines("/root", [
+        "# comment",
+        "",
+        "*.log",
+        "build/",
+        "/top.cmake",
+        "docs/**/gen",
+        "!keep.log",
+    ]))
+    self.assertTrue(rules.is_ignored("/root/a/b/x.log", False))
+    self.assertFalse(rules.is_ignored("/root/a/keep.log", False))
+    self.assertTrue(rules.is_ignored("/root/a/build", True))
+    self.assertFalse(rules.is_ignored("/root/a/build", False))
+    self.assertTrue(rules.is_ignored("/root/top.cmake", False))
+    self.assertFalse(rules.is_ignored("/root/sub/top.cmake", False))
+    self.assertTrue(rules.is_ignored("/root/docs/gen", True))
+    self.assertTrue(rules.is_ignored("/root/docs/a/b/gen", True))
+    self.assertFalse(rules.is_ignored("/other/x.log", False))
+
+  def test_sorted_depth_first(self):
+    for relpath in ["z.cmake", "b/CMakeLists.txt", "a/c/x.cmake",
+                    "a/CMakeLists.txt", "CMakeLists.txt", "a/readme.txt",
+                    ".git/foo.cmake"]:
+      self.touch(relpath)
+    finder = discovery.ListfileFinder(["CMakeLists.txt", "*.cmake"])
+    self.assertEqual([
+        "CMakeLists.txt",
+        "z.cmake",
+        "a/CMakeLists.txt",
+        "a/c/x.cmake",
+        "b/CMakeLists.txt",
+    ], self.find(finder))
+
+  def test_ignore_files_and_exclude(self):
+    for relpath in ["CMakeLists.txt", "build/CMakeLists.txt",
+                    "src/CMakeLists.txt", "src/gen.cmake",
+                    "src/vendor/CMakeLists.txt", "extern/CMakeLists.txt"]:
+      self.touch(relpath)
+    self.touch(".gitignore", "build/\n")
+    self.touch("src/.cmake-format-ignore", "gen.cmake\n")
+
+    finder = discovery.ListfileFinder(
+        ["CMakeLists.txt", "*.cmake"],
+        ignore_files=[".gitignore", ".cmake-format-ignore"],
+        exclude=["/extern", "vendor/"])
+    self.assertEqual(
+        ["CMakeLists.txt", "src/CMakeLists.txt"], self.find(finder))
+
+    # Without ignore files, only the exclude patterns apply
+    finder = discovery.ListfileFinder(
+        ["CMakeLists.txt", "*.cmake"], exclude=["/extern", "vendor/"])
+    self.assertEqual([
+        "CMakeLists.txt",
+        "build/CMakeLists.txt",
+        "src/CMakeLists.txt",
+        "src/gen.cmake",
+    ], self.find(finder))
+
+  def test_iter_infilepaths(self):
+    filepath = self.touch("a/CMakeLists.txt")
+    finder = discovery.ListfileFinder(["CMakeLists.txt"])
+    self.assertEqual(
+        ["-", "foo.cmake", filepath],
+        list(discovery.iter_infilepaths(
+            ["-", "foo.cmake", self.outdir], lambda _: finder)))
+
+
+if __name__ == "__main__":
+  unittest.main()
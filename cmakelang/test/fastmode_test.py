@@ -0,0 +1,47 @@
+"""
+Check that fast mode (``CMAKELANG_FAST=1``) formats exactly like the default
+mode.
+"""
+
+from __future__ import unicode_literals
+
+import glob
+import os
+import subprocess
+import sys
+import unittest
+
+
+def get_listfiles():
+  """Return the listfiles of the formatting tests."""
+  thisdir = os.path.dirname(os.path.realpath(__file__))
+  srcdir = os.path.dirname(thisdir)
+  return sorted(
+      glob.glob(os.path.join(srcdir, "command_tests", "*.cmake"))
+      + [os.path.join(srcdir, "format", "testdata", "test_in.cmake"),
+         os.path.join(srcdir, "format", "testdata", "test_out.cmake")])
+
+
+def format_listfiles(infile_paths, fast_mode):
+  """Return the output of cmake-format for `infile_paths`, run in a new
+     process with the requested mode."""
+  env = dict(os.environ)
+  env["CMAKELANG_FAST"] = "1" if fast_mode else "0"
+  return subprocess.check_output(
+      [sys.executable, "-Bm", "cmakelang.format"] + infile_paths, env=env)
+
+
+class TestFastMode(unittest.TestCase):
+
+  def test_identical_output(self):
+    infile_paths = get_listfiles()
+    self.assertGreater(len(infile_paths), 2)
+    expect = format_listfiles(infile_paths, fast_mode=False)
+    actual = format_listfiles(infile_paths, fast_mode=True)
+    self.assertTrue(expect)
+    self.assertEqual(
+        expect, actual, "fast mode formats differently than default mode")
+
+
+if __name__ == '__main__':
+  unittest.main()
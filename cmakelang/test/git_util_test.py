@@ -0,0 +1,186 @@
+"""
+Test git changed-files and changed-lines mode against a temporary repository
+"""
+
+from __future__ import unicode_literals
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from cmakelang import configuration
+from cmakelang import git_util
+from cmakelang.format import __main__
+
+
+def git_available():
+  try:
+    with open(os.devnull, "wb") as devnull:
+      subprocess.check_call(["git", "--version"], stdout=devnull)
+  except (OSError, subprocess.CalledProcessError):
+    return False
+  return True
+
+
+class TestParseHunks(unittest.TestCase):
+
+  def test_parse_hunks(self):
+    diff_text = "\n".join([
+        "diff --git a/CMakeLists.txt b/CMakeLists.txt",
+        "index 1111111..2222222 100644",
+        "--- a/CMakeLists.txt",
+        "+++ b/CMakeLists.txt",
+        "@@ -2 +2 @@ set(a b)",
+        "-set(c d)",
+        "+set(c e)",
+        "@@ -10,0 +11,3 @@",
+        "+foo()",
+        "+bar()",
+        "+baz()",
+        "@@ -20,2 +22,0 @@",
+        "-foo()",
+        "-bar()",
+        "diff --git a/new.cmake b/new.cmake",
+        "new file mode 100644",
+        "--- /dev/null",
+        "+++ b/new.cmake",
+        "@@ -0,0 +1 @@",
+        "+set(x y)",
+        "",
+    ])
+    self.assertEqual({
+        "CMakeLists.txt": [(2, 2), (11, 13), (22, 23)],
+        "new.cmake": [(1, 1)],
+    }, git_util.parse_hunks(diff_text))
+
+
+class TestRangeFormat(unittest.TestCase):
+
+  def test_only_overlapping_statements(self):
+    infile_content = "\n".join([
+        "set(a   b)",
+        "if(x)",
+        "  foo( y ) # comment",
+        "  bar(   z)",
+        "endif()",
+        "",
+        "",
+        "set(  q r)",
+        "",
+    ])
+    config = configuration.Configuration()
+    outfile_content, _ = __main__.process_file(
+        config, infile_content, line_ranges=[(3, 3), (8, 8)])
+    self.assertEqual("\n".join([
+        "set(a   b)",
+        "if(x)",
+        "  foo(y) # comment",
+        "  bar(   z)",
+        "endif()",
+        "",
+        "",
+        "set(q r)",
+        "",
+    ]), outfile_content)
+
+
+@unittest.skipIf(not git_available(), "git is not available")
+class TestGitChanges(unittest.TestCase):
+
+  def setUp(self):
+    self.repodir = os.path.realpath(
+        tempfile.mkdtemp(prefix="cmake-format-git-"))
+    self.git("init", "-q")
+    self.git("config", "user.name", "Test")
+    self.git("config", "user.email", "test@example.com")
+
+    self.write("CMakeLists.txt", "set(a   b)\nset(c   d)\nset(e   f)\n")
+    self.write("lib/util.cmake", "set(x   y)\n")
+    self.write("notes.txt", "set(x   y)\n")
+    self.git("add", ".")
+    self.git("commit", "-q", "-m", "initial")
+
+    thisdir = os.path.realpath(os.path.dirname(__file__))
+    hostenv = os.environ.copy()
+    python_path_parts = hostenv.get("PYTHONPATH", "").split(":")
+    if not python_path_parts[0]:
+      python_path_parts.pop(0)
+    python_path_parts.append(os.path.dirname(os.path.dirname(thisdir)))
+    self.env = hostenv
+    self.env["PYTHONPATH"] = ":".join(python_path_parts)
+
+  def tearDown(self):
+    shutil.rmtree(self.repodir)
+
+  def git(self, *args):
+    with open(os.devnull, "wb") as devnull:
+      subprocess.check_call(
+          ["git"] + list(args), cwd=self.repodir, stdout=devnull)
+
+  def write(self, relpath, content):
+    outpath = os.path.join(self.repodir, relpath)
+    if not os.path.exists(os.path.dirname(outpath)):
+      os.makedirs(os.path.dirname(outpath))
+    with io.open(outpath, "w", encoding="utf-8") as outfile:
+      outfile.write(content)
+
+  def read(self, relpath):
+    with io.open(os.path.join(self.repodir, relpath), "r",
+                 encoding="utf-8") as infile:
+      return infile.read()
+
+  def format(self, *args):
+    subprocess.check_call(
+        [sys.executable, "-Bm", "cmakelang.format"] + list(args),
+        cwd=self.repodir, env=self.env)
+
+  def test_changed_files(self):
+    self.write("CMakeLists.txt", "set(a   b)\nset(c   e)\nset(e   f)\n")
+    self.write("notes.txt", "set(x   z)\n")
+    self.assertEqual(
+        [os.path.join(self.repodir, "CMakeLists.txt"),
+         os.path.join(self.repodir, "notes.txt")],
+        git_util.get_changed_files(cwd=self.repodir))
+    self.assertEqual([], git_util.get_changed_files(
+        staged=True, cwd=self.repodir))
+    self.assertEqual(
+        {os.path.join(self.repodir, "CMakeLists.txt"): [(2, 2)],
+         os.path.join(self.repodir, "notes.txt"): [(1, 1)]},
+        git_util.get_changed_lines(since="HEAD", cwd=self.repodir))
+
+  def test_staged_changed_lines_only(self):
+    self.write("CMakeLists.txt", "set(a   b)\nset(c   e)\nset(e   f)\n")
+    self.write("lib/util.cmake", "set(x   z)\n")
+    self.write("notes.txt", "set(x   z)\n")
+    self.git("add", "CMakeLists.txt", "notes.txt")
+
+    self.format("-i", "--staged", "--changed-lines-only")
+    self.assertEqual(
+        "set(a   b)\nset(c e)\nset(e   f)\n", self.read("CMakeLists.txt"))
+    # Changed, but not staged
+    self.assertEqual("set(x   z)\n", self.read("lib/util.cmake"))
+    # Staged, but not a listfile
+    self.assertEqual("set(x   z)\n", self.read("notes.txt"))
+
+  def test_since_whole_files(self):
+    self.write("lib/util.cmake", "set(x   z)\n")
+    self.format("-i", "--since", "HEAD")
+    self.assertEqual("set(x z)\n", self.read("lib/util.cmake"))
+    self.assertEqual(
+        "set(a   b)\nset(c   d)\nset(e   f)\n", self.read("CMakeLists.txt"))
+
+    # Restricted to the input paths from the command line
+    self.write("lib/util.cmake", "set(x   w)\n")
+    self.write("CMakeLists.txt", "set(a   b)\nset(c   e)\nset(e   f)\n")
+    self.format("-i", "--since", "HEAD", "lib")
+    self.assertEqual("set(x w)\n", self.read("lib/util.cmake"))
+    self.assertEqual(
+        "set(a   b)\nset(c   e)\nset(e   f)\n", self.read("CMakeLists.txt"))
+
+
+if __name__ == "__main__":
+  unittest.main()
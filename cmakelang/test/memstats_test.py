@@ -0,0 +1,68 @@
+"""
+Test the per-stage memory instrumentation
+"""
+
+from __future__ import unicode_literals
+
+import io
+import os
+import unittest
+
+from cmakelang import configuration
+from cmakelang import memstats
+from cmakelang.format import __main__
+
+
+@unittest.skipIf(memstats.tracemalloc is None, "requires tracemalloc")
+class TestMemStats(unittest.TestCase):
+
+  def test_process_file(self):
+    """Every stage of cmake-format should be recorded, with the retained
+       memory attributed to the modules that allocated it."""
+    thisdir = os.path.dirname(os.path.realpath(__file__))
+    infile_path = os.path.join(
+        thisdir, "..", "format", "testdata", "test_in.cmake")
+    with io.open(infile_path, "r", encoding="utf-8") as infile:
+      content = infile.read()
+
+    config = configuration.Configuration()
+    with memstats.collect("test_in.cmake") as collector:
+      __main__.process_file(config, content)
+    self.assertIsNone(memstats.ACTIVE)
+    self.assertFalse(memstats.tracemalloc.is_tracing())
+
+    self.assertEqual(
+        ["tokenize", "parse", "create_box_tree", "reflow", "write_tree"],
+        list(collector.stages))
+    for stage_stats in collector.stages.values():
+      self.assertEqual(1, stage_stats.calls)
+      self.assertGreaterEqual(stage_stats.peak, stage_stats.retained)
+    tokenize = collector.stages["tokenize"]
+    self.assertGreater(tokenize.retained, 0)
+    site, _ = tokenize.sites.most_common(1)[0]
+    self.assertIn(os.path.join("cmakelang", "lex"), site)
+
+    outfile = io.StringIO()
+    memstats.write_report(outfile, [collector])
+    report = outfile.getvalue()
+    self.assertIn("memory: test_in.cmake", report)
+    self.assertIn("top allocation sites (retained):", report)
+    for name in collector.stages:
+      self.assertIn("  {} ".format(name), report)
+
+  def test_disabled(self):
+    with memstats.collect("foo", enabled=False) as collector:
+      self.assertIsNone(collector)
+      self.assertIs(memstats.NULL_STAGE, memstats.stage("tokenize"))
+
+  def test_nested_stage(self):
+    with memstats.collect("foo", with_sites=False) as collector:
+      with memstats.stage("outer"):
+        with self.assertRaises(AssertionError):
+          with memstats.stage("inner"):
+            pass
+    self.assertEqual(["outer"], list(collector.stages))
+
+
+if __name__ == '__main__':
+  unittest.main()
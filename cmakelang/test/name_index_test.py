@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Check that the generated `NameIndex` of builtin variables and properties
+gives the same answers as the regular expressions of the same patterns.
+"""
+
+from __future__ import unicode_literals
+
+import re
+import unittest
+
+from cmakelang.parse import properties
+from cmakelang.parse import variables
+
+# Strings substituted for the generic labels in the patterns
+SUBSTITUTIONS = ("", "CXX", "Release", "my_Project", "_FLAGS")
+
+
+def get_first_match_regex(patterns, flags=0):
+  """
+  Return a regular expression of the patterns joined by ``|``, in which each
+  alternative is the only group, so that the group index of a match is one
+  more than the index of the pattern which matched.
+  """
+  regex = re.compile(r"\(\?P<[\w_]+>\.\*\)")
+  return re.compile(
+      "|".join("({})".format(regex.sub(".*", pattern))
+               for pattern in patterns), flags)
+
+
+def get_test_names(patterns):
+  """
+  Return a list of names to look up: the patterns with each substitution
+  for the generic labels, with variations in case, and with characters
+  added or removed.
+  """
+  regex = re.compile(r"\(\?P<[\w_]+>\.\*\)")
+  # NOTE(josh): the long s and the kelvin sign are case-insensitive matches for
+  # "s" and "k" in a regular expression, but are not folded by `lower()`
+  names = set(["", "_", "-", "FOO", "cmake", "ſ", "K", "CMAKE_ſ_FLAGS"])
+  for pattern in patterns:
+    for substitution in SUBSTITUTIONS:
+      name = regex.sub(substitution, pattern)
+      for variant in (name, name.lower(), name.swapcase(), name.title()):
+        names.update([
+            variant, variant[:-1], variant[1:], variant + "_EXTRA",
+            "X" + variant, variant.replace("S", "ſ"),
+            variant.replace("K", "K")])
+  return sorted(names)
+
+
+class TestNameIndex(unittest.TestCase):
+
+  def check_equivalence(self, module):
+    index = module.INDEX
+    first_match = get_first_match_regex(module.PATTERNS)
+    ifirst_match = get_first_match_regex(module.PATTERNS, re.IGNORECASE)
+
+    names = get_test_names(module.PATTERNS)
+    self.assertGreater(len(names), 10 * len(module.PATTERNS))
+    for name in names:
+      match = first_match.match(name)
+      expect = None if match is None else match.lastindex - 1
+      self.assertEqual(expect, index.match(name), name)
+      self.assertEqual(
+          match is None, module.CASE_SENSITIVE_REGEX.match(name) is None, name)
+
+      match = ifirst_match.match(name)
+      expect = None if match is None else match.lastindex - 1
+      self.assertEqual(expect, index.match(name, ignorecase=True), name)
+
+      # The lint checks ignore names which match a generic label
+      imatch = module.CASE_INSENSITIVE_REGEX.match(name)
+      if imatch is not None:
+        self.assertEqual(
+            any(group is not None for group in imatch.groups()),
+            index.is_templated(expect), name)
+
+  def test_variables(self):
+    self.check_equivalence(variables)
+
+  def test_properties(self):
+    self.check_equivalence(properties)
+
+  def test_prefix_match(self):
+    # NOTE(josh): like the regular expressions, names which start with a
+    # builtin name are a match
+    index = variables.INDEX
+    self.assertEqual(
+        variables.PATTERNS.index("APPLE"), index.match("APPLE"))
+    self.assertEqual(
+        variables.PATTERNS.index("APPLE"), index.match("APPLESAUCE"))
+    self.assertEqual(None, index.match("apple"))
+    self.assertEqual(
+        variables.PATTERNS.index("APPLE"),
+        index.match("apple", ignorecase=True))
+    self.assertTrue(index.is_templated(index.match("CMAKE_CXX_FLAGS_DEBUG")))
+    self.assertIsNone(index.match("NOT_A_BUILTIN"))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,106 @@
+"""
+Test the profiler hook and the speedscope conversion
+"""
+
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from cmakelang import configuration
+from cmakelang import profiling
+from cmakelang.format import __main__
+
+
+def make_stats(edges, selftimes):
+  """
+  Return a stats dictionary, in the format of `cProfile`, for a call graph
+  given as a map of (caller, callee) -> cumulative time of the edge and a map
+  of function -> self time.
+  """
+  cumtimes = dict(selftimes)
+  callers = dict((func, {}) for func in selftimes)
+  for (caller, callee), cumtime in edges.items():
+    callers[callee][("x.py", 1, caller)] = (1, 1, 0.0, cumtime)
+  for func in sorted(selftimes, reverse=True):
+    cumtimes[func] = selftimes[func] + sum(
+        cumtime for (caller, _), cumtime in edges.items() if caller == func)
+  return dict(
+      (("x.py", 1, func),
+       (1, 1, selftimes[func], cumtimes[func], callers[func]))
+      for func in selftimes)
+
+
+class TestProfiling(unittest.TestCase):
+
+  def test_speedscope_profile(self):
+    # main -> a -> c and main -> b -> c. c is reached along two paths, so its
+    # time is split in proportion to the edges.
+    stats = make_stats(
+        {("main", "a"): 3.0, ("main", "b"): 5.0,
+         ("a", "c"): 2.0, ("b", "c"): 4.0},
+        {"main": 1.0, "a": 1.0, "b": 1.0, "c": 6.0})
+    frames = profiling.FrameTable()
+    profile = profiling.get_speedscope_profile(stats, "test", frames)
+    names = [frame["name"] for frame in frames.frames]
+
+    samples = dict(
+        (" > ".join(names[idx] for idx in sample), weight)
+        for sample, weight in zip(profile["samples"], profile["weights"]))
+    self.assertEqual(
+        ["main", "main > a", "main > a > c", "main > b", "main > b > c"],
+        sorted(samples))
+    for key, expect in [("main", 1.0), ("main > a", 1.0),
+                        ("main > a > c", 2.0), ("main > b", 1.0),
+                        ("main > b > c", 4.0)]:
+      self.assertAlmostEqual(expect, samples[key])
+    self.assertAlmostEqual(9.0, profile["endValue"])
+
+  def test_write_profiles(self):
+    config = configuration.Configuration()
+    profile_list = []
+    for name in ("a.cmake", "b.cmake"):
+      with profiling.collect(name) as file_profile:
+        with profiling.section():
+          __main__.process_file(config, "set(foo   bar)\n")
+      self.assertIsNone(profiling.ACTIVE)
+      profile_list.append(file_profile)
+
+    with profiling.collect(enabled=False) as file_profile:
+      self.assertIsNone(file_profile)
+      self.assertIs(profiling.NULL_SECTION, profiling.section())
+
+    outdir = tempfile.mkdtemp(prefix="cmake-format-profile-")
+    try:
+      pstats_path, speedscope_path = profiling.write_profiles(
+          os.path.join(outdir, "out.pstats"), profile_list, per_file=True)
+      self.assertEqual(os.path.join(outdir, "out.pstats"), pstats_path)
+      self.assertEqual(
+          os.path.join(outdir, "out.speedscope.json"), speedscope_path)
+
+      merged = pstats.Stats(pstats_path)
+      process_file = [
+          value for func, value in merged.stats.items()
+          if func[2] == "process_file"]
+      self.assertEqual(1, len(process_file))
+      self.assertEqual(2, process_file[0][1])
+
+      with io.open(speedscope_path, "r", encoding="utf-8") as infile:
+        document = json.load(infile)
+      self.assertEqual(
+          ["a.cmake", "b.cmake"],
+          [profile["name"] for profile in document["profiles"]])
+      for profile in document["profiles"]:
+        self.assertEqual("sampled", profile["type"])
+        self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+    finally:
+      shutil.rmtree(outdir)
+
+
+if __name__ == "__main__":
+  unittest.main()
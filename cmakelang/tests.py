@@ -4,6 +4,11 @@ import unittest
 # pylint: disable=unused-wildcard-import
 # pylint: disable=unused-import
 
+from cmakelang.bench.tests import (
+    TestBenchmarks,
+    TestCompare,
+    TestCorpus,
+    TestFuzz)
 from cmakelang.format.invocation_tests import TestInvocations
 from cmakelang.format.layout_tests import TestCanonicalLayout
 from cmakelang.lex.tests import TestSpecificLexings
@@ -33,17 +38,45 @@ from cmakelang.contrib.validate_database \
     import TestContributorAgreements
 from cmakelang.contrib.validate_pullrequest \
     import TestContribution
+from cmakelang.lint.test.baseline_tests import (
+    TestLintBaseline)
+from cmakelang.lint.test.cache_tests import (
+    TestLintCache)
+from cmakelang.lint.test.checker_tests import (
+    TestFileContext,
+    TestLineScanner,
+    TestLintChecker)
 from cmakelang.lint.test.expect_tests import (
     ConfigTestCase,
     LintTests)
 from cmakelang.lint.test.execution_tests import (
     TestFormatFiles)
+from cmakelang.lint.test.output_tests import (
+    TestLintOutput)
+from cmakelang.lint.test.project_tests import (
+    TestProjectChecks)
 from cmakelang.test.version_number_test \
     import TestVersionNumber
 from cmakelang.test.command_db_test \
     import TestCommandDatabase
 from cmakelang.test.config_include_test \
     import TestConfigInclude
+from cmakelang.test.config_loader_test \
+    import TestConfigLoader
+from cmakelang.test.discovery_test \
+    import TestDiscovery
+from cmakelang.test.fastmode_test \
+    import TestFastMode
+from cmakelang.test.git_util_test import (
+    TestGitChanges,
+    TestParseHunks,
+    TestRangeFormat)
+from cmakelang.test.memstats_test \
+    import TestMemStats
+from cmakelang.test.name_index_test \
+    import TestNameIndex
+from cmakelang.test.profiling_test \
+    import TestProfiling
 
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark for per-command configuration lookup.
+
+Generates a listfile with many statements and compares the cost of resolving
+per-command configuration through `Configuration.resolve_for_command()`
+against the precompiled table from `Configuration.get_command_config()`. It
+also reports the time spent in `formatter.write_tree()`, which is where
+the lookup is done for every statement.
+"""
+
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import logging
+import sys
+import timeit
+
+from cmakelang import configuration
+from cmakelang import lex
+from cmakelang import parse
+from cmakelang.format import formatter
+
+logger = logging.getLogger(__name__)
+
+COMMAND_NAMES = [
+    "add_library", "set", "message", "install", "target_link_libraries",
+    "foo", "list", "if", "endif", "my_custom_command",
+]
+
+
+def generate_listfile(num_statements):
+  """Return the content of a listfile with `num_statements` statements."""
+  lines = []
+  for idx in range(num_statements):
+    if idx % 7 == 0:
+      lines.append("message(STATUS \"statement {}\")".format(idx))
+    else:
+      lines.append("set(var_{0} value_{0})".format(idx))
+  return "\n".join(lines) + "\n"
+
+
+def bench_lookup(config, funnames, repeat):
+  """Time both lookup strategies over the sequence of command names and
+     return a tuple of (resolve_for_command, get_command_config) seconds."""
+
+  def legacy_lookup():
+    for funname in funnames:
+      config.resolve_for_command(funname, "format.command_case")
+
+  def table_lookup():
+    for funname in funnames:
+      config.get_command_config(funname)
+
+  legacy_time = min(timeit.repeat(legacy_lookup, number=1, repeat=repeat))
+  table_time = min(timeit.repeat(table_lookup, number=1, repeat=repeat))
+  return legacy_time, table_time
+
+
+def main():
+  argparser = argparse.ArgumentParser(description=__doc__)
+  argparser.add_argument(
+      "-n", "--num-statements", type=int, default=50000,
+      help="number of statements in the generated listfile")
+  argparser.add_argument(
+      "-r", "--repeat", type=int, default=5,
+      help="number of repetitions (the best is reported)")
+  args = argparser.parse_args()
+
+  config = configuration.Configuration()
+  content = generate_listfile(args.num_statements)
+  tokens = lex.tokenize(content)
+  parse_tree = parse.parse(tokens, parse.ParseContext(config=config))
+  box_tree = formatter.layout_tree(parse_tree, config)
+
+  funnames = [
+      COMMAND_NAMES[idx % len(COMMAND_NAMES)]
+      for idx in range(args.num_statements)]
+  legacy_time, table_time = bench_lookup(config, funnames, args.repeat)
+
+  write_time = min(timeit.repeat(
+      lambda: formatter.write_tree(box_tree, config, content),
+      number=1, repeat=args.repeat))
+
+  print("statements: {:d}".format(args.num_statements))
+  print("resolve_for_command: {:8.4f}s".format(legacy_time))
+  print(" get_command_config: {:8.4f}s ({:.1f}x)".format(
+      table_time, legacy_time / max(table_time, 1e-9)))
+  print("         write_tree: {:8.4f}s".format(write_time))
+  return 0
+
+
+if __name__ == "__main__":
+  logging.basicConfig(level=logging.INFO)
+  sys.exit(main())
@@ -50,6 +50,54 @@ def strip_named_groups(pattern):
   return re.sub(r"\(?P<[\w_]>", "(", pattern)
 
 
+# Literal parts of a name which match themselves in a regular expression
+LITERAL_NAME = re.compile(r"^[A-Za-z0-9_\-]*$")
+
+
+def get_name_index(names):
+  """
+  Return the data for a `NameIndex` of the patterns for `names`: a list of
+  `(name, index)` for each name without a generic label (the first, if it is
+  repeated) and a list of `(index, parts)` for each name with generic labels,
+  where `parts` are the literal strings between the labels.
+  """
+  exact_names = []
+  seen = set()
+  templates = []
+  for index, namestr in enumerate(names):
+    parts = GENERIC_LABEL.split(namestr)[::2]
+    for part in parts:
+      if not LITERAL_NAME.match(part):
+        raise ValueError(
+            "Name {} contains characters which cannot be indexed"
+            .format(namestr))
+    if len(parts) > 1:
+      templates.append((index, parts))
+    elif namestr not in seen:
+      seen.add(namestr)
+      exact_names.append((namestr, index))
+  return exact_names, templates
+
+
+def write_name_database(args, jenv, template_name, names):
+  """
+  Render the template for a database of the builtin `names` (variables or
+  properties) to the output file.
+  """
+  patterns = [make_pattern(namestr) for namestr in names]
+  exact_names, templates = get_name_index(names)
+
+  template = jenv.get_template(template_name)
+  content = template.render(
+      patterns=patterns, exact_names=exact_names, templates=templates)
+
+  if args.outfile == "-":
+    args.outfile = os.dup(sys.stdout.fileno())
+  with io.open(args.outfile, "w", encoding="utf-8") as outfile:
+    outfile.write(content)
+    outfile.write("\n")
+
+
 def get_properties(args, jenv):
 
   proc = subprocess.Popen(
@@ -58,17 +106,9 @@ def get_properties(args, jenv):
 
   with proc.stdout as infile:
     properties = [line.decode("utf-8").strip() for line in infile]
-  patterns = [make_pattern(namestr) for namestr in properties]
   proc.wait()
 
-  template = jenv.get_template("properties.jinja.py")
-  content = template.render(patterns=patterns)
-
-  if args.outfile == "-":
-    args.outfile = os.dup(sys.stdout.fileno())
-  with io.open(args.outfile, "w", encoding="utf-8") as outfile:
-    outfile.write(content)
-    outfile.write("\n")
+  write_name_database(args, jenv, "properties.jinja.py", properties)
 
 
 def get_variables(args, jenv):
@@ -79,17 +119,9 @@ def get_variables(args, jenv):
 
   with proc.stdout as infile:
     variables = [line.decode("utf-8").strip() for line in infile]
-  patterns = [make_pattern(namestr) for namestr in variables]
   proc.wait()
 
-  template = jenv.get_template("variables.jinja.py")
-  content = template.render(patterns=patterns)
-
-  if args.outfile == "-":
-    args.outfile = os.dup(sys.stdout.fileno())
-  with io.open(args.outfile, "w", encoding="utf-8") as outfile:
-    outfile.write(content)
-    outfile.write("\n")
+  write_name_database(args, jenv, "variables.jinja.py", variables)
 
 
 def get_command_list(args):
@@ -6,6 +6,8 @@ python -Bm cmakelang.tools.parse_cmake_help variables
 """
 import re
 
+from cmakelang.parse.name_index import NameIndex
+
 
 PATTERNS = [
   {%-for pattern in patterns%}
@@ -27,3 +29,22 @@ CASE_SENSITIVE_REGEX = re.compile(
     "|".join(stripped_patterns()))
 CASE_INSENSITIVE_REGEX = re.compile(
     "|".join(stripped_patterns()), re.IGNORECASE)
+
+
+# Each name without a generic label, and the index of its pattern
+EXACT_NAMES = {
+  {%-for name, index in exact_names%}
+    "{{name}}": {{index}},
+  {%-endfor%}
+}
+
+# The index of each pattern with a generic label, and the literal text
+# between the labels
+TEMPLATES = [
+  {%-for index, parts in templates%}
+    ({{index}}, ({%for part in parts%}"{{part}}"{%if not loop.last%}, {%endif%}{%endfor%})),
+  {%-endfor%}
+]
+
+# Gives the same answers as the regular expressions above, but faster
+INDEX = NameIndex(EXACT_NAMES, TEMPLATES)